@@ -24,7 +24,7 @@ class CountyAdmin(admin.ModelAdmin):
 
 @admin.register(City)
 class CityAdmin(admin.ModelAdmin):
-    list_display = ("name", "county", "postal_code")
+    list_display = ("name", "county", "postal_code", "latitude", "longitude")
     list_filter = ("county",)
     search_fields = ("name", "county__name")
     ordering = ("county__name", "name")
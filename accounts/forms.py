@@ -617,8 +617,8 @@ class ProfileUpdateForm(forms.ModelForm):
             self.fields["instagram_url"].initial = craftsman.instagram_url
 
     def clean_profile_picture(self):
-        """Validate and optimize profile picture"""
-        from .utils import optimize_profile_picture
+        """Validate the profile picture and strip its metadata (resized variants are rendered in the background)"""
+        from core.images import strip_metadata
 
         picture = self.cleaned_data.get("profile_picture")
         if picture:
@@ -635,8 +635,8 @@ class ProfileUpdateForm(forms.ModelForm):
             if content_type and not content_type.startswith("image/"):
                 raise forms.ValidationError("Fișierul trebuie să fie o imagine.")
 
-            # Optimize the image
-            picture = optimize_profile_picture(picture)
+            # Drop EXIF (GPS position etc.) before the original is stored and served
+            picture = strip_metadata(picture)
 
         return picture
 
@@ -839,8 +839,8 @@ class CraftsmanPortfolioForm(forms.ModelForm):
         self.fields["description"].help_text = "Detalii despre lucrarea realizată"
 
     def clean_image(self):
-        """Validate and optimize portfolio image"""
-        from .utils import optimize_portfolio_image
+        """Validate the portfolio image and strip its metadata (resized variants are rendered in the background)"""
+        from core.images import strip_metadata
 
         image = self.cleaned_data.get("image")
         if image:
@@ -857,8 +857,8 @@ class CraftsmanPortfolioForm(forms.ModelForm):
             if content_type and not content_type.startswith("image/"):
                 raise forms.ValidationError("Fișierul trebuie să fie o imagine.")
 
-            # Optimize the image
-            image = optimize_portfolio_image(image)
+            # Drop EXIF (GPS position etc.) before the original is stored and served
+            image = strip_metadata(image)
 
         validate_portfolio_image(image)
         return image
@@ -891,8 +891,8 @@ class BulkPortfolioUploadForm(forms.Form):
             self.fields[field_name].widget.attrs.update({"class": "form-control", "accept": "image/*"})
 
     def clean(self):
-        """Validate and optimize all uploaded images"""
-        from .utils import optimize_portfolio_image
+        """Validate all uploaded images and strip their metadata; they are resized in the background"""
+        from core.images import strip_metadata
 
         cleaned_data = super().clean()
 
@@ -907,8 +907,7 @@ class BulkPortfolioUploadForm(forms.Form):
                 if not image.content_type.startswith("image/"):
                     raise forms.ValidationError(f"{field_name}: Fișierul trebuie să fie o imagine.")
 
-                # Optimize the image
-                cleaned_data[field_name] = optimize_portfolio_image(image)
+                cleaned_data[field_name] = strip_metadata(image)
 
         return cleaned_data
 
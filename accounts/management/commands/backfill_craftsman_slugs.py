@@ -1,11 +1,14 @@
 """
 Management command to backfill missing slugs for craftsmen profiles
+
+Usage:
+    python manage.py backfill_craftsman_slugs --dry-run
+    python manage.py backfill_craftsman_slugs --batch-size 1000
 """
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from django.db.models import Q
 
-from accounts.models import CraftsmanProfile
+from accounts.services.slugs import backfill_slugs
 
 
 class Command(BaseCommand):
@@ -15,50 +18,32 @@ class Command(BaseCommand):
         parser.add_argument(
             "--dry-run", action="store_true", help="Simulează operația fără a salva modificările în baza de date"
         )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Profiluri salvate pe lot (implicit 1000)"
+        )
 
     @transaction.atomic
     def handle(self, *args, **options):
         dry_run = options.get("dry_run", False)
 
-        # Import helper here to avoid circular imports
-        from accounts.views import ensure_craftsman_slug
-
-        # Find craftsmen without slugs
-        craftsmen_without_slugs = CraftsmanProfile.objects.filter(Q(slug__isnull=True) | Q(slug=""))
+        if dry_run:
+            self.stdout.write(self.style.WARNING("MODE DRY-RUN - nicio modificare nu va fi salvată"))
 
-        total_count = craftsmen_without_slugs.count()
+        # Slugurile se alocă în memorie față de o singură citire a celor existente
+        assigned = backfill_slugs(batch_size=options["batch_size"], dry_run=dry_run)
 
-        if total_count == 0:
+        if not assigned:
             self.stdout.write(self.style.SUCCESS("✓ Toți meșterii au sluguri valide!"))
             return
 
-        self.stdout.write(f"Găsite {total_count} profile fără slug...")
+        for craftsman in assigned:
+            self.stdout.write(
+                f"  ✓ ID {craftsman.pk}: "
+                f"{craftsman.display_name or craftsman.user.username} → slug: {craftsman.slug}"
+            )
 
         if dry_run:
-            self.stdout.write(self.style.WARNING("MODE DRY-RUN - nicio modificare nu va fi salvată"))
-            for craftsman in craftsmen_without_slugs:
-                self.stdout.write(
-                    f"  - ID {craftsman.pk}: {craftsman.display_name or craftsman.user.username} "
-                    f"(ar primi slug: {craftsman.generate_slug()})"
-                )
+            self.stdout.write(f"\n{len(assigned)} profile ar primi slug")
             return
 
-        # Generate slugs for all craftsmen without them
-        updated_count = 0
-        for craftsman in craftsmen_without_slugs:
-            try:
-                old_slug = craftsman.slug
-                ensure_craftsman_slug(craftsman)
-                updated_count += 1
-                self.stdout.write(
-                    f"  ✓ ID {craftsman.pk}: "
-                    f"{craftsman.display_name or craftsman.user.username} → slug: {craftsman.slug}"
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f"  ✗ Eroare la ID {craftsman.pk}: {e}")
-                )
-
-        self.stdout.write(
-            self.style.SUCCESS(f"\n✓ Completare finalizată: {updated_count}/{total_count} sluguri generate")
-        )
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Completare finalizată: {len(assigned)} sluguri generate"))
@@ -0,0 +1,94 @@
+"""
+Management command to load latitude/longitude for cities from the bundled gazetteer
+"""
+import csv
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import City, County
+from core.filters import normalize_slug
+
+DEFAULT_GAZETTEER = Path(__file__).resolve().parents[2] / "data" / "ro_cities.csv"
+
+
+class Command(BaseCommand):
+    help = "Încarcă coordonatele geografice ale orașelor din gazetteer-ul inclus"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file", default=str(DEFAULT_GAZETTEER), help="Fișier CSV cu coloanele name,county,latitude,longitude"
+        )
+        parser.add_argument(
+            "--create-missing", action="store_true", help="Creează orașele din gazetteer care nu există în baza de date"
+        )
+        parser.add_argument(
+            "--overwrite", action="store_true", help="Suprascrie coordonatele deja completate"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Simulează operația fără a salva modificările în baza de date"
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["file"])
+        if not path.exists():
+            raise CommandError(f"Fișierul {path} nu există")
+
+        dry_run = options["dry_run"]
+        create_missing = options["create_missing"]
+        overwrite = options["overwrite"]
+
+        # Match on diacritic-insensitive slugs so "Timisoara" and "Timișoara" are the same city
+        counties = {normalize_slug(county.name): county for county in County.objects.all()}
+        cities = {
+            (normalize_slug(city.name), city.county_id): city for city in City.objects.select_related("county")
+        }
+
+        to_update = []
+        to_create = []
+        unknown_counties = set()
+
+        with path.open(encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                county = counties.get(normalize_slug(row["county"]))
+                if county is None:
+                    unknown_counties.add(row["county"])
+                    continue
+
+                latitude = Decimal(row["latitude"])
+                longitude = Decimal(row["longitude"])
+                city = cities.get((normalize_slug(row["name"]), county.id))
+
+                if city is None:
+                    if create_missing:
+                        to_create.append(
+                            City(name=row["name"], county=county, latitude=latitude, longitude=longitude)
+                        )
+                    continue
+
+                if city.latitude is not None and not overwrite:
+                    continue
+                city.latitude = latitude
+                city.longitude = longitude
+                to_update.append(city)
+
+        for name in sorted(unknown_counties):
+            self.stdout.write(self.style.WARNING(f"  ! Județ necunoscut: {name}"))
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("MODE DRY-RUN - nicio modificare nu va fi salvată"))
+        else:
+            with transaction.atomic():
+                City.objects.bulk_update(to_update, ["latitude", "longitude"], batch_size=500)
+                City.objects.bulk_create(to_create, batch_size=500)
+
+            # bulk_* bypass model signals, so rebuild the coverage index explicitly
+            from accounts.services.coverage_index import invalidate_coverage_index
+
+            invalidate_coverage_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ Coordonate actualizate: {len(to_update)} orașe, create: {len(to_create)} orașe")
+        )
@@ -0,0 +1,20 @@
+"""
+Management command to recompute craftsman rating counters from their reviews (idempotent)
+Usage: python manage.py reconcile_craftsman_ratings
+Run periodically (e.g. nightly cron) to absorb review changes made without model signals.
+"""
+
+from django.core.management.base import BaseCommand
+
+from accounts.services.ratings import CraftsmanRatings
+
+
+class Command(BaseCommand):
+    help = "Recompute review counts, rating sums and averages on craftsman profiles and fix drifted rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Profiles per query (default: 500)")
+
+    def handle(self, *args, **options):
+        fixed = CraftsmanRatings.reconcile(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rating counters reconciled: {fixed} profiles corrected"))
@@ -1,10 +1,17 @@
 """
 Management command pentru actualizarea profilurilor și badge-urilor
+
+Usage:
+    python manage.py update_profiles
+    python manage.py update_profiles --badges-only --chunk-size 5000
 """
 
+import time
+
 from django.core.management.base import BaseCommand
 
 from accounts.services import BadgeService, ProfileCompletionService
+from accounts.services.recompute import DEFAULT_CHUNK_SIZE
 
 
 class Command(BaseCommand):
@@ -26,26 +33,48 @@ class Command(BaseCommand):
             action="store_true",
             help="Afișează doar statisticile",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Profiluri procesate pe lot (implicit {DEFAULT_CHUNK_SIZE})",
+        )
 
     def handle(self, *args, **options):
         if options["stats"]:
             self.show_statistics()
             return
 
+        chunk_size = options["chunk_size"]
+
         if not options["badges_only"]:
             self.stdout.write("Actualizează procentajele de completare...")
-            updated_profiles = ProfileCompletionService.update_all_profiles()
-            self.stdout.write(self.style.SUCCESS(f"Actualizate {updated_profiles} profiluri"))
+            started = time.monotonic()
+            updated_profiles = ProfileCompletionService.update_all_profiles(
+                chunk_size=chunk_size, progress=self.report_progress
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Actualizate {updated_profiles} profiluri în {time.monotonic() - started:.1f}s")
+            )
 
         if not options["completion_only"]:
             self.stdout.write("Actualizează badge-urile...")
-            updated_badges = BadgeService.update_all_badges()
-            self.stdout.write(self.style.SUCCESS(f"Actualizate badge-uri pentru {updated_badges} profiluri"))
+            started = time.monotonic()
+            updated_badges = BadgeService.update_all_badges(chunk_size=chunk_size, progress=self.report_progress)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Actualizate badge-uri pentru {updated_badges} profiluri în {time.monotonic() - started:.1f}s"
+                )
+            )
 
         # Afișează statistici finale
         self.show_statistics()
         self.stdout.write("\nActualizarea s-a încheiat!")
 
+    def report_progress(self, processed, updated):
+        """Afișează progresul după fiecare lot"""
+        self.stdout.write(f"  {processed} profiluri procesate, {updated} modificate")
+
     def show_statistics(self):
         """Afișează statisticile badge-urilor"""
         stats = BadgeService.get_badge_statistics()
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0015_alter_craftsmanprofile_id_alter_user_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="latitude",
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name="city",
+            name="longitude",
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0016_city_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="profile_photo_hash",
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="profile_photo_height",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="profile_photo_width",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="profile_picture_hash",
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="profile_picture_height",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="profile_picture_width",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:41
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+DETAIL_RATINGS = ("quality_rating", "punctuality_rating", "communication_rating")
+
+
+def populate_counters(apps, schema_editor):
+    CraftsmanProfile = apps.get_model("accounts", "CraftsmanProfile")
+    Review = apps.get_model("services", "Review")
+
+    aggregates = {"ratings_sum": Sum("rating")}
+    for detail in DETAIL_RATINGS:
+        aggregates[f"{detail}_sum"] = Sum(detail)
+        aggregates[f"{detail}_count"] = Count("pk", filter=Q(**{f"{detail}__isnull": False}))
+
+    for row in Review.objects.order_by().values("craftsman").annotate(**aggregates):
+        craftsman_id = row.pop("craftsman")
+        CraftsmanProfile.objects.filter(pk=craftsman_id).update(**{k: v or 0 for k, v in row.items()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0017_media_fingerprints"),
+        ("services", "0014_alter_order_id_alter_quote_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="communication_rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="communication_rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="punctuality_rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="punctuality_rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="quality_rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="quality_rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="craftsmanprofile",
+            name="ratings_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
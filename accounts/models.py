@@ -21,6 +21,10 @@ class User(AbstractUser):
         blank=True,
     )
     profile_picture = models.ImageField(upload_to="profile_pics/", blank=True, null=True)
+    # Fingerprint of profile_picture taken at upload (core.images.fingerprint), used for versioned URLs
+    profile_picture_hash = models.CharField(max_length=16, blank=True, editable=False)
+    profile_picture_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_picture_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     is_verified = models.BooleanField(default=False)
 
     # Two-Factor Authentication fields
@@ -184,6 +188,10 @@ class City(models.Model):
     county = models.ForeignKey(County, on_delete=models.CASCADE, related_name="cities")
     postal_code = models.CharField(max_length=10, blank=True)
 
+    # Coordonate geografice (încărcate cu `manage.py load_city_coordinates`)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+
     class Meta:
         verbose_name_plural = "Cities"
         ordering = ["name"]
@@ -193,6 +201,28 @@ class City(models.Model):
         return f"{self.name}, {self.county.name}"
 
 
+# Câmpuri din care se calculează completarea profilului și badge-urile
+COMPLETION_INPUT_FIELDS = {
+    "display_name",
+    "county",
+    "county_id",
+    "city",
+    "city_id",
+    "coverage_radius_km",
+    "bio",
+    "profile_photo",
+    "company_cui",
+    "company_verified_at",
+    "average_rating",
+    "total_reviews",
+    "total_jobs_completed",
+}
+
+
+def _rating_average(total, count):
+    return round(total / count, 1) if count else None
+
+
 class CraftsmanProfile(models.Model):
     """
     Profil meșter redesigned pentru protecția datelor și profesionalism.
@@ -231,6 +261,10 @@ class CraftsmanProfile(models.Model):
 
     # Poză de profil obligatorie (temporar opțională pentru migrație)
     profile_photo = models.ImageField(upload_to="profiles/", blank=True, null=True, help_text="Poză de profil")
+    # Fingerprint of profile_photo taken at upload (core.images.fingerprint), used for versioned URLs
+    profile_photo_hash = models.CharField(max_length=16, blank=True, editable=False)
+    profile_photo_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_photo_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     # CÂMPURI OPȚIONALE (dar utile pentru clienți)
     years_experience = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Ani de experiență")
@@ -313,6 +347,14 @@ class CraftsmanProfile(models.Model):
     # SISTEM DE RATING ȘI REPUTAȚIE
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     total_reviews = models.PositiveIntegerField(default=0)
+    # Sume/numărători întreținute incremental la fiecare recenzie (accounts.services.ratings)
+    ratings_sum = models.PositiveIntegerField(default=0, editable=False)
+    quality_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    quality_rating_count = models.PositiveIntegerField(default=0, editable=False)
+    punctuality_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    punctuality_rating_count = models.PositiveIntegerField(default=0, editable=False)
+    communication_rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    communication_rating_count = models.PositiveIntegerField(default=0, editable=False)
     total_jobs_completed = models.PositiveIntegerField(default=0)
 
     # CALCULARE COMPLETARE PROFIL (0-100%)
@@ -374,34 +416,6 @@ class CraftsmanProfile(models.Model):
             # Normalize phone to +407XXXXXXXX
             self.phone = re.sub(r'^(\+40|0040|0)', '+40', self.phone)
 
-    def save(self, *args, **kwargs):
-        """Auto-generate slug from display_name or username if not set"""
-        if not self.slug:
-            import uuid
-
-            from django.utils.text import slugify
-
-            # Use display_name if available, otherwise use username with UUID for uniqueness
-            if self.display_name:
-                base_slug = slugify(self.display_name, allow_unicode=True)
-            else:
-                # Use username + short UUID to ensure uniqueness when display_name is missing
-                unique_suffix = str(uuid.uuid4())[:8]
-                base_slug = slugify(self.user.username, allow_unicode=True) or "user"
-                base_slug = f"{base_slug}-{unique_suffix}"
-
-            slug = base_slug
-            counter = 1
-
-            # Ensure uniqueness
-            while CraftsmanProfile.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-
-            self.slug = slug
-
-        super().save(*args, **kwargs)
-
     def calculate_profile_completion(self):
         """
         Calculează procentajul de completare folosind logica nouă.
@@ -413,22 +427,10 @@ class CraftsmanProfile(models.Model):
         return result["score"]
 
     def update_profile_completion(self):
-        """Actualizează procentajul de completare și badge-urile"""
-        self.profile_completion = self.calculate_profile_completion()
-        self.is_profile_complete = self.profile_completion == 100
-
-        # Update badge-uri
-        self.update_badges()
+        """Actualizează imediat procentajul de completare și badge-urile (o singură interogare pentru numărători)"""
+        from accounts.services.profile_completion import recompute_profile_completion
 
-        # Salvează fără a declanșa din nou save()
-        CraftsmanProfile.objects.filter(pk=self.pk).update(
-            profile_completion=self.profile_completion,
-            is_profile_complete=self.is_profile_complete,
-            is_company_verified=self.is_company_verified,
-            is_top_rated=self.is_top_rated,
-            is_active=self.is_active,
-            is_trusted=self.is_trusted,
-        )
+        recompute_profile_completion([self.pk], instances={self.pk: self})
 
     def update_badges(self):
         """Actualizează badge-urile bazate pe criterii"""
@@ -444,6 +446,21 @@ class CraftsmanProfile(models.Model):
         # Badge "De încredere" - după 10 recenzii verificate
         self.is_trusted = self.total_reviews >= 10
 
+    @property
+    def quality_rating_average(self):
+        """Media notelor pentru calitate (None fără note)"""
+        return _rating_average(self.quality_rating_sum, self.quality_rating_count)
+
+    @property
+    def punctuality_rating_average(self):
+        """Media notelor pentru punctualitate (None fără note)"""
+        return _rating_average(self.punctuality_rating_sum, self.punctuality_rating_count)
+
+    @property
+    def communication_rating_average(self):
+        """Media notelor pentru comunicare (None fără note)"""
+        return _rating_average(self.communication_rating_sum, self.communication_rating_count)
+
     def can_bid_on_jobs(self):
         """Verifică dacă meșterul poate licita (profil complet)"""
         return (
@@ -511,12 +528,24 @@ class CraftsmanProfile(models.Model):
         return badges
 
     def save(self, *args, **kwargs):
-        # Calculează completarea profilului la fiecare salvare
-        self.profile_completion = self.calculate_profile_completion()
-        self.is_profile_complete = self.profile_completion == 100
+        from accounts.services.profile_completion import schedule_profile_completion
+        from accounts.services.slugs import save_with_unique_slug
+
+        # Badge-urile depind doar de câmpurile profilului; completarea (portofoliu, servicii) se
+        # recalculează o singură dată la commit, oricâte salvări au loc în tranzacție
         self.update_badges()
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            # Slug unic generat din numele afișat (ion-popescu, ion-popescu-1, ...)
+            def save_profile(update_fields):
+                super(CraftsmanProfile, self).save(*args, **{**kwargs, "update_fields": update_fields})
 
-        super().save(*args, **kwargs)
+            save_with_unique_slug(self, save_profile, update_fields=kwargs.get("update_fields"))
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or COMPLETION_INPUT_FIELDS.intersection(update_fields):
+            schedule_profile_completion(self)
 
 
 class CraftsmanPortfolio(models.Model):
@@ -551,7 +580,3 @@ class CraftsmanPortfolio(models.Model):
     def __str__(self):
         return f"{self.craftsman.display_name} - {self.title or 'Imagine Portofoliu'}"
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Actualizează completarea profilului meșterului
-        self.craftsman.update_profile_completion()
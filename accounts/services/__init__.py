@@ -0,0 +1,4 @@
+from .cui_verification import CUIVerificationService
+from .recompute import BadgeService, ProfileCompletionService, recompute_profiles
+
+__all__ = ["BadgeService", "CUIVerificationService", "ProfileCompletionService", "recompute_profiles"]
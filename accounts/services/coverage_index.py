@@ -0,0 +1,302 @@
+"""
+In-memory spatial index for craftsman coverage areas.
+
+Answers "which craftsmen cover this city?" and "which cities does this craftsman cover?"
+without scanning every craftsman profile. Cities with coordinates are bucketed in a
+lat/lon grid, and every craftsman's coverage disc (base city + radius) is registered in
+each grid cell it overlaps, so a lookup only measures distances for the few candidates
+that share a cell with the target.
+
+The index lives per process. It is built lazily from the database, kept up to date
+incrementally by the signals in accounts.signals, and rebuilt when another process
+bumps the shared version key in the cache.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+# Grid cell size in degrees (~55 km north-south, ~39 km east-west at Romanian latitudes)
+CELL_DEGREES = 0.5
+
+VERSION_CACHE_KEY = "coverage_index:version"
+VERSION_CHECK_INTERVAL = 5  # seconds between cache round-trips for the version key
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _cell(lat, lon):
+    return (math.floor(lat / CELL_DEGREES), math.floor(lon / CELL_DEGREES))
+
+
+def _cells_around(lat, lon, radius_km):
+    """Grid cells intersecting the bounding box of a circle"""
+    dlat = radius_km / 111.0
+    # A degree of longitude shrinks with latitude; size the box for the edge closest to the pole
+    widest_lat = min(abs(lat) + dlat, 89.0)
+    dlon = radius_km / (111.32 * math.cos(math.radians(widest_lat)))
+
+    lat_lo, lon_lo = _cell(lat - dlat, lon - dlon)
+    lat_hi, lon_hi = _cell(lat + dlat, lon + dlon)
+    return [(i, j) for i in range(lat_lo, lat_hi + 1) for j in range(lon_lo, lon_hi + 1)]
+
+
+def _coverage_of(city_id, radius_km, area_city_id, area_radius_km):
+    """An explicit CoverageArea takes precedence over the profile's city and radius"""
+    if area_city_id:
+        return area_city_id, area_radius_km or 0
+    return city_id, radius_km or 0
+
+
+class CoverageIndex:
+    """Grid index of city coordinates and craftsman coverage discs"""
+
+    CRAFTSMAN_FIELDS = ("id", "city_id", "coverage_radius_km", "coverage__base_city_id", "coverage__radius_km")
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cities = {}  # city_id -> (lat, lon)
+        self._city_grid = defaultdict(set)  # cell -> city ids
+        self._craftsmen = {}  # craftsman_id -> (base city_id, radius_km)
+        self._craftsmen_by_city = defaultdict(set)  # base city_id -> craftsman ids
+        self._coverage_grid = defaultdict(set)  # cell -> craftsman ids whose disc overlaps the cell
+        self._coverage_cells = {}  # craftsman_id -> cells registered in _coverage_grid
+
+    @classmethod
+    def build(cls):
+        """Load every city with coordinates and every craftsman in two queries"""
+        from accounts.models import City, CraftsmanProfile
+
+        index = cls()
+        cities = City.objects.filter(latitude__isnull=False, longitude__isnull=False).values_list(
+            "id", "latitude", "longitude"
+        )
+        for city_id, lat, lon in cities:
+            index._put_city(city_id, float(lat), float(lon))
+
+        for craftsman_id, *coverage in CraftsmanProfile.objects.values_list(*cls.CRAFTSMAN_FIELDS):
+            index._put_craftsman(craftsman_id, *_coverage_of(*coverage))
+
+        logger.info(f"Coverage index built: {len(index._cities)} cities, {len(index._craftsmen)} craftsmen")
+        return index
+
+    # Queries
+
+    def craftsmen_covering(self, city_id):
+        """
+        IDs of craftsmen whose coverage radius includes the given city.
+
+        Returns None when the city has no coordinates, so callers can fall back to
+        non-geographic matching instead of showing nobody.
+        """
+        point = self._cities.get(city_id)
+        if point is None:
+            return None
+
+        lat, lon = point
+        result = set()
+        for craftsman_id in tuple(self._coverage_grid.get(_cell(lat, lon), ())):
+            coverage = self._craftsmen.get(craftsman_id)
+            if coverage is None:
+                continue
+            base = self._cities.get(coverage[0])
+            if base is not None and haversine_km(lat, lon, *base) <= coverage[1]:
+                result.add(craftsman_id)
+        return result
+
+    def cities_within(self, lat, lon, radius_km):
+        """IDs of cities within radius_km of a point"""
+        result = set()
+        for cell in _cells_around(lat, lon, radius_km):
+            for city_id in tuple(self._city_grid.get(cell, ())):
+                point = self._cities.get(city_id)
+                if point is not None and haversine_km(lat, lon, *point) <= radius_km:
+                    result.add(city_id)
+        return result
+
+    def cities_covered_by(self, craftsman_id):
+        """
+        IDs of cities inside the craftsman's coverage area.
+
+        Returns None when the craftsman is unknown or their base city has no coordinates.
+        """
+        coverage = self._craftsmen.get(craftsman_id)
+        if coverage is None:
+            return None
+        base = self._cities.get(coverage[0])
+        if base is None:
+            return None
+        return self.cities_within(base[0], base[1], coverage[1])
+
+    # Incremental updates
+
+    def refresh_craftsman(self, craftsman_id):
+        """Re-read one craftsman's coverage from the database"""
+        from accounts.models import CraftsmanProfile
+
+        row = CraftsmanProfile.objects.filter(pk=craftsman_id).values_list(*self.CRAFTSMAN_FIELDS[1:]).first()
+        if row is None:
+            self.remove_craftsman(craftsman_id)
+        else:
+            self._put_craftsman(craftsman_id, *_coverage_of(*row))
+
+    def remove_craftsman(self, craftsman_id):
+        with self._lock:
+            self._unregister_coverage(craftsman_id)
+            coverage = self._craftsmen.pop(craftsman_id, None)
+            if coverage is not None:
+                self._craftsmen_by_city[coverage[0]].discard(craftsman_id)
+
+    def update_city(self, city_id, lat, lon):
+        if lat is None or lon is None:
+            self.remove_city(city_id)
+        else:
+            self._put_city(city_id, float(lat), float(lon))
+
+    def remove_city(self, city_id):
+        with self._lock:
+            point = self._cities.pop(city_id, None)
+            if point is not None:
+                self._city_grid[_cell(*point)].discard(city_id)
+            # Craftsmen based here stay known but drop out of the grid until the city has coordinates again
+            for craftsman_id in tuple(self._craftsmen_by_city.get(city_id, ())):
+                self._unregister_coverage(craftsman_id)
+
+    def _put_city(self, city_id, lat, lon):
+        with self._lock:
+            old = self._cities.get(city_id)
+            if old is not None:
+                self._city_grid[_cell(*old)].discard(city_id)
+            self._cities[city_id] = (lat, lon)
+            self._city_grid[_cell(lat, lon)].add(city_id)
+
+            # Coverage discs centred on this city move with it
+            for craftsman_id in tuple(self._craftsmen_by_city.get(city_id, ())):
+                self._register_coverage(craftsman_id)
+
+    def _put_craftsman(self, craftsman_id, city_id, radius_km):
+        with self._lock:
+            old = self._craftsmen.get(craftsman_id)
+            if old is not None:
+                self._craftsmen_by_city[old[0]].discard(craftsman_id)
+            self._unregister_coverage(craftsman_id)
+
+            if not city_id:
+                self._craftsmen.pop(craftsman_id, None)
+                return
+
+            self._craftsmen[craftsman_id] = (city_id, radius_km)
+            self._craftsmen_by_city[city_id].add(craftsman_id)
+            self._register_coverage(craftsman_id)
+
+    def _register_coverage(self, craftsman_id):
+        self._unregister_coverage(craftsman_id)
+        city_id, radius_km = self._craftsmen[craftsman_id]
+        base = self._cities.get(city_id)
+        if base is None:
+            return
+        cells = _cells_around(base[0], base[1], radius_km)
+        for cell in cells:
+            self._coverage_grid[cell].add(craftsman_id)
+        self._coverage_cells[craftsman_id] = cells
+
+    def _unregister_coverage(self, craftsman_id):
+        for cell in self._coverage_cells.pop(craftsman_id, ()):
+            self._coverage_grid[cell].discard(craftsman_id)
+
+
+_index = None
+_index_version = None
+_last_version_check = 0.0
+_build_lock = threading.Lock()
+
+
+def _read_version():
+    return cache.get(VERSION_CACHE_KEY, 0)
+
+
+def _bump_version():
+    """Increment the shared version so other processes rebuild their index"""
+    cache.add(VERSION_CACHE_KEY, 0, None)
+    try:
+        return cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        # Key evicted between add() and incr()
+        return None
+
+
+def get_coverage_index():
+    """Return this process's coverage index, building or rebuilding it when stale"""
+    global _index, _index_version, _last_version_check
+
+    now = time.monotonic()
+    if _index is not None and now - _last_version_check < VERSION_CHECK_INTERVAL:
+        return _index
+
+    version = _read_version()
+    _last_version_check = now
+    if _index is not None and version == _index_version:
+        return _index
+
+    with _build_lock:
+        if _index is None or version != _index_version:
+            _index = CoverageIndex.build()
+            _index_version = version
+    return _index
+
+
+def apply_coverage_change(update):
+    """
+    Apply an incremental update to the local index and notify other processes.
+
+    If no other process changed the index since our last sync, the local copy stays
+    current and only the shared version moves forward; otherwise the next
+    get_coverage_index() call rebuilds from the database.
+    """
+    global _index_version
+
+    if _index is not None:
+        update(_index)
+
+    new_version = _bump_version()
+    if new_version is not None and _index_version is not None and new_version == _index_version + 1:
+        _index_version = new_version
+
+
+def invalidate_coverage_index():
+    """Drop the local index and force every process to rebuild on next use"""
+    global _index
+
+    _index = None
+    _bump_version()
+
+
+def covering_filter(city_id):
+    """
+    Q keeping craftsmen whose coverage reaches the city, or None when the city has no coordinates.
+
+    Craftsmen the index cannot place (no base city, or one without coordinates) are kept:
+    distance is unknown for them, so they are matched as before coverage radii existed.
+    """
+    covering_ids = get_coverage_index().craftsmen_covering(city_id)
+    if covering_ids is None:
+        return None
+    # "Cannot be placed" stays in SQL: its id list would grow with every geocoded craftsman
+    unplaced = Q(city__isnull=True) | Q(city__latitude__isnull=True) | Q(city__longitude__isnull=True)
+    return Q(pk__in=list(covering_ids)) | unplaced
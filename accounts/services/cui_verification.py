@@ -1,13 +1,11 @@
 """
-Services for account management and validation
+Verificarea automată a CUI-urilor românești
 """
 
 import re
 
 from django.utils import timezone
 
-from .models import CraftsmanProfile
-
 
 class CUIVerificationService:
     """
@@ -139,121 +137,7 @@ class CUIVerificationService:
             craftsman_profile.company_verified_at = None
             craftsman_profile.is_company_verified = False
 
-        # Actualizează badge-urile și procentajul de completare
-        craftsman_profile.update_badges()
-        craftsman_profile.update_profile_completion()
+        # save() actualizează badge-urile; procentajul de completare se recalculează la commit
         craftsman_profile.save()
 
         return verification_result
-
-
-class ProfileCompletionService:
-    """
-    Service pentru calcularea și actualizarea completării profilului
-    """
-
-    @staticmethod
-    def calculate_completion_percentage(craftsman_profile):
-        """
-        Calculează procentajul de completare al profilului
-
-        Args:
-            craftsman_profile (CraftsmanProfile): Profilul de evaluat
-
-        Returns:
-            int: Procentaj de completare (0-100)
-        """
-        total_points = 100
-        score = 0
-
-        # Câmpuri obligatorii (70 puncte total)
-        if craftsman_profile.display_name:
-            score += 15
-        if craftsman_profile.bio and len(craftsman_profile.bio.strip()) >= 200:
-            score += 15
-        if craftsman_profile.profile_photo:
-            score += 10
-        if craftsman_profile.county and craftsman_profile.city:
-            score += 10
-        if craftsman_profile.coverage_radius_km:
-            score += 10
-
-        # Portofoliu (20 puncte)
-        portfolio_count = craftsman_profile.portfolio_images.filter(is_approved=True).count()
-        if portfolio_count >= 3:
-            score += 20
-        elif portfolio_count >= 1:
-            score += 10
-
-        # Câmpuri opționale (10 puncte total)
-        if craftsman_profile.years_experience:
-            score += 3
-        if craftsman_profile.hourly_rate or craftsman_profile.min_job_value:
-            score += 3
-        if craftsman_profile.website_url or craftsman_profile.facebook_url or craftsman_profile.instagram_url:
-            score += 2
-        if craftsman_profile.company_cui:
-            score += 2
-
-        return min(score, total_points)
-
-    @staticmethod
-    def update_all_profiles():
-        """
-        Actualizează procentajul de completare pentru toate profilurile
-        """
-        profiles = CraftsmanProfile.objects.all()
-        updated_count = 0
-
-        for profile in profiles:
-            old_completion = profile.profile_completion
-            new_completion = ProfileCompletionService.calculate_completion_percentage(profile)
-
-            if old_completion != new_completion:
-                profile.profile_completion = new_completion
-                profile.update_badges()
-                profile.save()
-                updated_count += 1
-
-        return updated_count
-
-
-class BadgeService:
-    """
-    Service pentru gestionarea badge-urilor de meșteri
-    """
-
-    @staticmethod
-    def update_all_badges():
-        """
-        Actualizează badge-urile pentru toate profilurile de meșteri
-        """
-        profiles = CraftsmanProfile.objects.all()
-        updated_count = 0
-
-        for profile in profiles:
-            old_badges = profile.get_badges()
-            profile.update_badges()
-            new_badges = profile.get_badges()
-
-            if len(old_badges) != len(new_badges):
-                profile.save()
-                updated_count += 1
-
-        return updated_count
-
-    @staticmethod
-    def get_badge_statistics():
-        """
-        Returnează statistici despre badge-uri
-        """
-        total_profiles = CraftsmanProfile.objects.count()
-
-        return {
-            "total_profiles": total_profiles,
-            "profile_complete": CraftsmanProfile.objects.filter(is_profile_complete=True).count(),
-            "company_verified": CraftsmanProfile.objects.filter(is_company_verified=True).count(),
-            "top_rated": CraftsmanProfile.objects.filter(is_top_rated=True).count(),
-            "active": CraftsmanProfile.objects.filter(is_active=True).count(),
-            "trusted": CraftsmanProfile.objects.filter(is_trusted=True).count(),
-        }
@@ -1,10 +1,33 @@
 """
 Service for calculating profile completion percentage for craftsman profiles.
 Clear, transparent logic that tells craftsmen exactly what they need to do to reach 100%.
+
+Stored completion and badges are recomputed lazily: saves of a profile, its portfolio or
+its services call schedule_profile_completion(), which marks the profile dirty and
+recomputes every dirty profile once when the transaction commits, with one query for
+the portfolio and service counts (recompute_profile_completion).
 """
 
+import functools
+import weakref
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from core.cache_utils import CacheManager, invalidate_tags
+
+# Fields written by recompute_profile_completion
+COMPLETION_FIELDS = [
+    "profile_completion",
+    "is_profile_complete",
+    "is_company_verified",
+    "is_top_rated",
+    "is_active",
+    "is_trusted",
+]
 
-def calculate_profile_completion(craftsman):
+
+def calculate_profile_completion(craftsman, portfolio_count=None, has_services=None):
     """
     Calculate profile completion percentage (0-100%) for a craftsman profile.
 
@@ -29,6 +52,8 @@ def calculate_profile_completion(craftsman):
 
     Args:
         craftsman: CraftsmanProfile instance
+        portfolio_count: number of portfolio images, if already known (otherwise counted)
+        has_services: whether the craftsman offers any service, if already known (otherwise queried)
 
     Returns:
         dict with keys:
@@ -51,7 +76,7 @@ def calculate_profile_completion(craftsman):
     else:
         breakdown["obligatoriu"]["items"]["display_name"] = {"score": 0, "status": "✗", "needed": "Adaugă nume afișat"}
 
-    if craftsman.county and craftsman.city:
+    if craftsman.county_id and craftsman.city_id:
         score += 10
         breakdown["obligatoriu"]["score"] += 10
         breakdown["obligatoriu"]["items"]["location"] = {"score": 10, "status": "✓"}
@@ -86,7 +111,8 @@ def calculate_profile_completion(craftsman):
 
     # 2. PORTFOLIO (40 puncte) - requires craftsman to be saved
     if craftsman.pk:
-        portfolio_count = craftsman.portfolio_images.count()
+        if portfolio_count is None:
+            portfolio_count = craftsman.portfolio_images.count()
         if portfolio_count >= 3:
             portfolio_score = 40
             breakdown["portfolio"]["items"]["images"] = {"score": 40, "status": "✓", "count": portfolio_count}
@@ -108,7 +134,9 @@ def calculate_profile_completion(craftsman):
         breakdown["portfolio"]["items"]["images"] = {"score": 0, "status": "✗", "needed": "Salvează profilul pentru a adăuga poze"}
 
     # 3. SERVICII (20 puncte)
-    if craftsman.pk and hasattr(craftsman, "services") and craftsman.services.exists():
+    if has_services is None:
+        has_services = bool(craftsman.pk and hasattr(craftsman, "services") and craftsman.services.exists())
+    if has_services:
         score += 20
         breakdown["servicii"]["score"] = 20
         breakdown["servicii"]["items"]["categories"] = {"score": 20, "status": "✓"}
@@ -148,3 +176,84 @@ def get_completion_summary(craftsman):
             missing.append(item["needed"])
 
     return missing
+
+
+def recompute_profile_completion(craftsman_ids, instances=None):
+    """
+    Recompute completion and badges for the given profiles and store the changed ones.
+
+    Portfolio counts and service presence are fetched with the profiles in one query.
+    `instances` ({pk: CraftsmanProfile}) are in-memory objects to refresh as well.
+    Returns the number of profiles whose stored values changed.
+    """
+    from accounts.models import CraftsmanProfile
+    from services.models import CraftsmanService
+
+    profiles = CraftsmanProfile.objects.filter(pk__in=craftsman_ids).annotate(
+        portfolio_count=Count("portfolio_images"),
+        has_services=Exists(CraftsmanService.objects.filter(craftsman=OuterRef("pk"))),
+    )
+
+    changed = []
+    for profile in profiles:
+        stored = [getattr(profile, field) for field in COMPLETION_FIELDS]
+        result = calculate_profile_completion(
+            profile, portfolio_count=profile.portfolio_count, has_services=profile.has_services
+        )
+        profile.profile_completion = result["score"]
+        profile.is_profile_complete = result["score"] == 100
+        profile.update_badges()
+        if [getattr(profile, field) for field in COMPLETION_FIELDS] != stored:
+            changed.append(profile)
+
+        instance = (instances or {}).get(profile.pk)
+        if instance is not None:
+            for field in COMPLETION_FIELDS:
+                setattr(instance, field, getattr(profile, field))
+
+    if changed:
+        CraftsmanProfile.objects.bulk_update(changed, COMPLETION_FIELDS)
+        # Badges show on listing cards
+        invalidate_tags("craftsmen_list", *(CacheManager.craftsman_tag(profile.pk) for profile in changed))
+    return len(changed)
+
+
+def schedule_profile_completion(craftsman):
+    """
+    Mark a profile (instance or pk) for recomputation when the current transaction commits.
+
+    Profiles marked several times in one transaction are recomputed once; outside a
+    transaction the recomputation runs immediately.
+    """
+    craftsman_id = getattr(craftsman, "pk", craftsman)
+    if craftsman_id is None:
+        return
+
+    connection = transaction.get_connection()
+    queued = getattr(connection, "profile_completion_flush", None)
+    flush = queued() if queued else None
+    first_mark = flush is None
+    if first_mark:
+        # Nothing queued yet, or a rollback discarded the queued flush (and with it the weak reference)
+        flush = functools.partial(_flush_profile_completion, connection)
+        connection.profile_completion_flush = weakref.ref(flush)
+        connection.pending_profile_completion = {}
+
+    pending = connection.pending_profile_completion
+    if hasattr(craftsman, "_meta"):
+        # Keep the latest in-memory instance so the caller sees the recomputed values
+        pending[craftsman_id] = craftsman
+    else:
+        pending.setdefault(craftsman_id, None)
+
+    # One flush per transaction, queued by the first mark
+    if first_mark:
+        transaction.on_commit(flush)
+
+
+def _flush_profile_completion(connection):
+    pending = getattr(connection, "pending_profile_completion", None)
+    connection.profile_completion_flush = None
+    connection.pending_profile_completion = {}
+    if pending:
+        recompute_profile_completion(list(pending), instances={pk: obj for pk, obj in pending.items() if obj})
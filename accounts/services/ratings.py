@@ -0,0 +1,125 @@
+"""
+Incremental rating aggregates on CraftsmanProfile.
+
+Each review contributes to its craftsman's counters:
+
+- total_reviews / ratings_sum: overall rating (average_rating = sum / count)
+- <detail>_rating_sum / <detail>_rating_count: quality, punctuality and communication,
+  counted only when the client gave that rating
+
+accounts.signals applies the difference between a review's old and new contribution
+as F() deltas on create, edit and delete, then refreshes average_rating and the
+rating badges from the locked row. `manage.py reconcile_craftsman_ratings` recomputes
+everything from the reviews and fixes drift left by bulk changes.
+"""
+
+import logging
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from core.cache_utils import CacheManager, invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+DETAIL_RATINGS = ("quality_rating", "punctuality_rating", "communication_rating")
+COUNTER_FIELDS = ["total_reviews", "ratings_sum"] + [
+    f"{detail}_{suffix}" for detail in DETAIL_RATINGS for suffix in ("sum", "count")
+]
+# Fields written together with the counters
+DERIVED_FIELDS = ["average_rating", "is_top_rated", "is_trusted"]
+
+
+class CraftsmanRatings:
+    """Maintains the rating counters stored on CraftsmanProfile"""
+
+    @staticmethod
+    def contribution(review_values):
+        """Counter values one review adds, from a dict with rating and the detail ratings"""
+        counters = {"total_reviews": 1, "ratings_sum": review_values["rating"]}
+        for detail in DETAIL_RATINGS:
+            value = review_values.get(detail)
+            counters[f"{detail}_sum"] = value or 0
+            counters[f"{detail}_count"] = int(bool(value))
+        return counters
+
+    @staticmethod
+    def apply(craftsman_id, deltas):
+        """Add counter deltas to one craftsman and refresh the average and rating badges"""
+        from accounts.models import CraftsmanProfile
+
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas or craftsman_id is None:
+            return
+
+        with transaction.atomic():
+            updated = CraftsmanProfile.objects.filter(pk=craftsman_id).update(
+                **{field: F(field) + delta for field, delta in deltas.items()}
+            )
+            if not updated:
+                return
+            # The UPDATE above holds the row lock until commit, so these values are current
+            craftsman = CraftsmanProfile.objects.only(
+                *COUNTER_FIELDS, "total_jobs_completed", "company_cui", "company_verified_at"
+            ).get(pk=craftsman_id)
+            CraftsmanRatings.refresh_derived(craftsman)
+            CraftsmanProfile.objects.filter(pk=craftsman_id).update(
+                **{field: getattr(craftsman, field) for field in DERIVED_FIELDS}
+            )
+
+        invalidate_tags("craftsmen_list", CacheManager.craftsman_tag(craftsman_id))
+
+    @staticmethod
+    def refresh_derived(craftsman):
+        """Set average_rating and the badges from the counters on the instance (not saved)"""
+        average = Decimal(craftsman.ratings_sum) / craftsman.total_reviews if craftsman.total_reviews else Decimal(0)
+        craftsman.average_rating = average.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        craftsman.update_badges()
+
+    @staticmethod
+    def compute(craftsman_ids=None):
+        """Exact counters for every craftsman with reviews (or those given): {craftsman_id: {field: value}}"""
+        from services.models import Review
+
+        reviews = Review.objects.order_by()
+        if craftsman_ids is not None:
+            reviews = reviews.filter(craftsman__in=craftsman_ids)
+
+        aggregates = {"total_reviews": Count("pk"), "ratings_sum": Sum("rating")}
+        for detail in DETAIL_RATINGS:
+            aggregates[f"{detail}_sum"] = Sum(detail)
+            aggregates[f"{detail}_count"] = Count("pk", filter=Q(**{f"{detail}__isnull": False}))
+
+        return {
+            row.pop("craftsman"): {field: value or 0 for field, value in row.items()}
+            for row in reviews.values("craftsman").annotate(**aggregates)
+        }
+
+    @staticmethod
+    def reconcile(batch_size=500):
+        """Recompute all counters in bulk and store the rows that drifted; returns how many"""
+        from accounts.models import CraftsmanProfile
+
+        exact = CraftsmanRatings.compute()
+        empty = dict.fromkeys(COUNTER_FIELDS, 0)
+        fields = COUNTER_FIELDS + DERIVED_FIELDS
+
+        drifted = []
+        craftsmen = CraftsmanProfile.objects.only(
+            *fields, "total_jobs_completed", "company_cui", "company_verified_at"
+        ).iterator(chunk_size=batch_size)
+        for craftsman in craftsmen:
+            stored = {field: getattr(craftsman, field) for field in fields}
+            for field, value in exact.get(craftsman.pk, empty).items():
+                setattr(craftsman, field, value)
+            CraftsmanRatings.refresh_derived(craftsman)
+            if any(getattr(craftsman, field) != stored[field] for field in fields):
+                drifted.append(craftsman)
+
+        with transaction.atomic():
+            CraftsmanProfile.objects.bulk_update(drifted, fields, batch_size=batch_size)
+        if drifted:
+            invalidate_tags("craftsmen_list", *(CacheManager.craftsman_tag(c.pk) for c in drifted))
+            logger.info(f"Reconciled rating counters for {len(drifted)} craftsmen")
+        return len(drifted)
@@ -0,0 +1,171 @@
+"""
+Set-based recompute of stored profile scores, rating counters and badges.
+
+Nightly refreshes walk the craftsmen in primary-key chunks. For each chunk a handful of
+grouped queries fetch the inputs (portfolio counts, service presence, review aggregates,
+completed orders); scoring runs in memory with the same rules as the live path
+(calculate_profile_completion, CraftsmanProfile.update_badges) and only rows whose stored
+values differ are written back with bulk_update. Cost grows with the number of chunks,
+not with one query per profile.
+"""
+
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from core.cache_utils import CacheManager, invalidate_tags
+
+from .profile_completion import calculate_profile_completion
+from .ratings import COUNTER_FIELDS, CraftsmanRatings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+# Profile fields read by the completion rules and update_badges()
+INPUT_FIELDS = [
+    "display_name",
+    "county_id",
+    "city_id",
+    "coverage_radius_km",
+    "bio",
+    "profile_photo",
+    "company_cui",
+    "company_verified_at",
+]
+COMPLETION_FIELDS = ["profile_completion", "is_profile_complete"]
+BADGE_FIELDS = [
+    *COUNTER_FIELDS,
+    "average_rating",
+    "total_jobs_completed",
+    "is_company_verified",
+    "is_top_rated",
+    "is_active",
+    "is_trusted",
+]
+
+
+def recompute_profiles(completion=True, badges=True, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Recompute completion and/or badges for every craftsman profile.
+
+    progress(processed, updated) is called after each chunk.
+    Returns {"processed": int, "updated": int, "seconds": float}.
+    """
+    from accounts.models import CraftsmanProfile
+
+    fields = (COMPLETION_FIELDS if completion else []) + (BADGE_FIELDS if badges else [])
+    started = time.monotonic()
+    processed = updated = 0
+    last_pk = None
+
+    while True:
+        ids = CraftsmanProfile.objects.order_by("pk")
+        if last_pk is not None:
+            ids = ids.filter(pk__gt=last_pk)
+        ids = list(ids.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            break
+        last_pk = ids[-1]
+
+        changed = _recompute_chunk(ids, fields, completion, badges)
+        if changed:
+            with transaction.atomic():
+                CraftsmanProfile.objects.bulk_update(changed, fields)
+            invalidate_tags("craftsmen_list", *(CacheManager.craftsman_tag(profile.pk) for profile in changed))
+
+        processed += len(ids)
+        updated += len(changed)
+        if progress:
+            progress(processed, updated)
+
+    seconds = time.monotonic() - started
+    logger.info(f"Recomputed {processed} craftsman profiles in {seconds:.1f}s, {updated} updated")
+    return {"processed": processed, "updated": updated, "seconds": seconds}
+
+
+def _grouped_counts(queryset, group_field):
+    return dict(queryset.order_by().values(group_field).annotate(count=Count("pk")).values_list(group_field, "count"))
+
+
+def _recompute_chunk(ids, fields, completion, badges):
+    """Evaluate the rules for one chunk of profile ids; returns the profiles that changed"""
+    from accounts.models import CraftsmanPortfolio, CraftsmanProfile
+    from services.models import CraftsmanService, Order
+
+    profiles = list(CraftsmanProfile.objects.filter(pk__in=ids).only(*INPUT_FIELDS, *fields, "total_reviews"))
+
+    if completion:
+        portfolio_counts = _grouped_counts(CraftsmanPortfolio.objects.filter(craftsman__in=ids), "craftsman")
+        with_services = set(
+            CraftsmanService.objects.filter(craftsman__in=ids).values_list("craftsman", flat=True).distinct()
+        )
+    if badges:
+        ratings = CraftsmanRatings.compute(craftsman_ids=ids)
+        no_reviews = dict.fromkeys(COUNTER_FIELDS, 0)
+        completed_jobs = _grouped_counts(
+            Order.objects.filter(status__in=Order.COMPLETED_STATUSES, assigned_craftsman__in=ids), "assigned_craftsman"
+        )
+
+    changed = []
+    for profile in profiles:
+        stored = [getattr(profile, field) for field in fields]
+
+        if badges:
+            for field, value in ratings.get(profile.pk, no_reviews).items():
+                setattr(profile, field, value)
+            profile.total_jobs_completed = completed_jobs.get(profile.pk, 0)
+            # Sets average_rating and all four badges from the values above
+            CraftsmanRatings.refresh_derived(profile)
+
+        if completion:
+            result = calculate_profile_completion(
+                profile,
+                portfolio_count=portfolio_counts.get(profile.pk, 0),
+                has_services=profile.pk in with_services,
+            )
+            profile.profile_completion = result["score"]
+            profile.is_profile_complete = result["score"] == 100
+
+        if [getattr(profile, field) for field in fields] != stored:
+            changed.append(profile)
+    return changed
+
+
+class ProfileCompletionService:
+    """
+    Service pentru recalcularea în masă a completării profilului
+    """
+
+    @staticmethod
+    def update_all_profiles(chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        """Recalculează procentajul de completare pentru toate profilurile; returnează câte s-au schimbat"""
+        return recompute_profiles(completion=True, badges=False, chunk_size=chunk_size, progress=progress)["updated"]
+
+
+class BadgeService:
+    """
+    Service pentru gestionarea badge-urilor de meșteri
+    """
+
+    @staticmethod
+    def update_all_badges(chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        """Recalculează recenziile, lucrările finalizate și badge-urile; returnează câte profiluri s-au schimbat"""
+        return recompute_profiles(completion=False, badges=True, chunk_size=chunk_size, progress=progress)["updated"]
+
+    @staticmethod
+    def get_badge_statistics():
+        """
+        Returnează statistici despre badge-uri (o singură interogare)
+        """
+        from accounts.models import CraftsmanProfile
+
+        return CraftsmanProfile.objects.aggregate(
+            total_profiles=Count("pk"),
+            profile_complete=Count("pk", filter=Q(is_profile_complete=True)),
+            company_verified=Count("pk", filter=Q(is_company_verified=True)),
+            top_rated=Count("pk", filter=Q(is_top_rated=True)),
+            active=Count("pk", filter=Q(is_active=True)),
+            trusted=Count("pk", filter=Q(is_trusted=True)),
+        )
@@ -0,0 +1,150 @@
+"""
+Unique slug allocation for craftsman profiles.
+
+Slugs are built from the display name (then full name, then username) and deduplicated
+with a numeric suffix: ion-popescu, ion-popescu-1, ion-popescu-2, ... The next suffix is
+one above the highest one in use, found with a single prefix query instead of probing
+candidates one by one. The unique index on slug stays the arbiter: a save that loses a
+race to a concurrent signup allocates again.
+
+assign_slugs() / backfill_slugs() do the same for many profiles in memory, against one
+read of the existing slugs, and store them with bulk_update.
+"""
+
+import logging
+import re
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from core.cache_utils import CacheManager, invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_SLUG = "mester"
+# Room left in the 120-character slug for "-<suffix>"
+BASE_MAX_LENGTH = 110
+MAX_ATTEMPTS = 5
+SUFFIXED_SLUG = re.compile(r"^(?P<base>.+)-(?P<suffix>[0-9]+)$")
+
+
+def base_slug(craftsman):
+    """Slug before deduplication"""
+    user = craftsman.user if craftsman.user_id else None
+    name = craftsman.display_name or (user and (user.get_full_name() or user.username)) or ""
+    return slugify(name, allow_unicode=True)[:BASE_MAX_LENGTH].strip("-") or FALLBACK_SLUG
+
+
+class SlugIndex:
+    """Highest suffix in use per base slug, built from a list of existing slugs"""
+
+    def __init__(self, slugs=()):
+        self.max_suffix = {}
+        for slug in slugs:
+            self.add(slug)
+
+    def add(self, slug):
+        # The bare base counts as suffix 0, so the next one is base-1
+        self.max_suffix.setdefault(slug, 0)
+        match = SUFFIXED_SLUG.match(slug)
+        if match:
+            base, suffix = match["base"], int(match["suffix"])
+            self.max_suffix[base] = max(self.max_suffix.get(base, 0), suffix)
+
+    def allocate(self, base):
+        """Next free slug for base, recorded as used"""
+        if base in self.max_suffix:
+            slug = f"{base}-{self.max_suffix[base] + 1}"
+        else:
+            slug = base
+        self.add(slug)
+        return slug
+
+
+def next_free_slug(base, exclude_pk=None):
+    """Next free slug for base, with one query over the slugs sharing its prefix"""
+    from accounts.models import CraftsmanProfile
+
+    taken = CraftsmanProfile.objects.filter(
+        # startswith can use the slug index; the regex keeps only base and base-<n>
+        slug__startswith=base,
+        slug__regex=rf"^{re.escape(base)}(-[0-9]+)?$",
+    )
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    return SlugIndex(taken.values_list("slug", flat=True)).allocate(base)
+
+
+def save_with_unique_slug(craftsman, save, update_fields=None):
+    """
+    Allocate a slug for a profile without one and run save(update_fields).
+
+    The save runs in a savepoint; if another profile took the slug meanwhile the unique
+    index rejects it and a fresh slug is allocated, up to MAX_ATTEMPTS times.
+    """
+    from accounts.models import CraftsmanProfile
+
+    if update_fields is not None:
+        update_fields = {*update_fields, "slug"}
+    base = base_slug(craftsman)
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        craftsman.slug = next_free_slug(base, exclude_pk=craftsman.pk)
+        try:
+            with transaction.atomic():
+                save(update_fields)
+            return
+        except IntegrityError:
+            taken = CraftsmanProfile.objects.filter(slug=craftsman.slug).exclude(pk=craftsman.pk).exists()
+            if not taken or attempt == MAX_ATTEMPTS:
+                craftsman.slug = ""
+                raise
+            logger.info(f"Slug {craftsman.slug} taken concurrently, allocating again")
+
+
+def assign_slugs(craftsmen):
+    """
+    Give every profile in craftsmen without a slug a unique one, in memory (not saved).
+
+    Existing slugs are read once. Returns the profiles that received a slug.
+    """
+    from accounts.models import CraftsmanProfile
+
+    index = SlugIndex(CraftsmanProfile.objects.exclude(slug="").values_list("slug", flat=True).iterator())
+    assigned = []
+    for craftsman in craftsmen:
+        if craftsman.slug:
+            index.add(craftsman.slug)
+        else:
+            craftsman.slug = index.allocate(base_slug(craftsman))
+            assigned.append(craftsman)
+    return assigned
+
+
+def backfill_slugs(batch_size=1000, dry_run=False):
+    """
+    Assign slugs to every stored profile missing one and store them with bulk_update.
+
+    A batch rejected by the unique index (a concurrent signup took a slug) falls back to
+    saving its profiles one by one. Returns the profiles that received a slug.
+    """
+    from accounts.models import CraftsmanProfile
+
+    missing = list(CraftsmanProfile.objects.filter(slug="").select_related("user").order_by("pk"))
+    assigned = assign_slugs(missing)
+    if dry_run or not assigned:
+        return assigned
+
+    for start in range(0, len(assigned), batch_size):
+        batch = assigned[start : start + batch_size]
+        try:
+            with transaction.atomic():
+                CraftsmanProfile.objects.bulk_update(batch, ["slug"])
+        except IntegrityError:
+            for craftsman in batch:
+                craftsman.slug = ""
+                craftsman.save(update_fields=["slug"])
+
+    invalidate_tags("craftsmen_list", *(CacheManager.craftsman_tag(craftsman.pk) for craftsman in assigned))
+    logger.info(f"Assigned slugs to {len(assigned)} craftsman profiles")
+    return assigned
@@ -0,0 +1,99 @@
+"""
+Signal handlers for accounts app
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import City, CraftsmanPortfolio, CraftsmanProfile, User
+from .services.coverage_index import apply_coverage_change
+from .services.profile_completion import schedule_profile_completion
+from .services.ratings import DETAIL_RATINGS, CraftsmanRatings
+
+# Fields that change where a craftsman works; other profile saves don't touch the coverage index
+COVERAGE_FIELDS = {"city", "coverage_radius_km"}
+# Review fields that feed the craftsman's rating counters
+REVIEW_RATING_FIELDS = ["rating", *DETAIL_RATINGS]
+
+
+def _on_commit_apply(update):
+    transaction.on_commit(lambda: apply_coverage_change(update))
+
+
+@receiver(post_save, sender=CraftsmanProfile)
+def update_craftsman_coverage(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not COVERAGE_FIELDS.intersection(update_fields):
+        return
+    craftsman_id = instance.pk
+    _on_commit_apply(lambda index: index.refresh_craftsman(craftsman_id))
+
+
+@receiver(post_delete, sender=CraftsmanProfile)
+def remove_craftsman_coverage(sender, instance, **kwargs):
+    craftsman_id = instance.pk
+    _on_commit_apply(lambda index: index.remove_craftsman(craftsman_id))
+
+
+@receiver([post_save, post_delete], sender="services.CoverageArea")
+def update_coverage_area(sender, instance, **kwargs):
+    craftsman_id = instance.profile_id
+    _on_commit_apply(lambda index: index.refresh_craftsman(craftsman_id))
+
+
+@receiver(post_save, sender=City)
+def update_city_coordinates(sender, instance, **kwargs):
+    city_id, lat, lon = instance.pk, instance.latitude, instance.longitude
+    _on_commit_apply(lambda index: index.update_city(city_id, lat, lon))
+
+
+@receiver(post_delete, sender=City)
+def remove_city_coordinates(sender, instance, **kwargs):
+    city_id = instance.pk
+    _on_commit_apply(lambda index: index.remove_city(city_id))
+
+
+# Rating counters (accounts.services.ratings): apply the change in a review's contribution
+
+
+def _review_values(instance):
+    return {field: getattr(instance, field) for field in REVIEW_RATING_FIELDS}
+
+
+@receiver(post_save, sender="services.Review")
+def update_craftsman_ratings(sender, instance, created=False, **kwargs):
+    current = CraftsmanRatings.contribution(_review_values(instance))
+    # Values before the save, remembered by core.signals from the post_init snapshot
+    previous = getattr(instance, "_stats_previous", None)
+    if created or previous is None:
+        CraftsmanRatings.apply(instance.craftsman_id, current)
+        return
+
+    old = CraftsmanRatings.contribution(previous)
+    if previous["craftsman_id"] == instance.craftsman_id:
+        CraftsmanRatings.apply(instance.craftsman_id, {field: current[field] - old[field] for field in current})
+    else:
+        # Review moved to another craftsman
+        CraftsmanRatings.apply(previous["craftsman_id"], {field: -value for field, value in old.items()})
+        CraftsmanRatings.apply(instance.craftsman_id, current)
+
+
+@receiver(post_delete, sender="services.Review")
+def remove_review_ratings(sender, instance, origin=None, **kwargs):
+    if getattr(origin, "model", type(origin)) in (CraftsmanProfile, User):
+        # The craftsman is deleted with their reviews
+        return
+    contribution = CraftsmanRatings.contribution(_review_values(instance))
+    CraftsmanRatings.apply(instance.craftsman_id, {field: -value for field, value in contribution.items()})
+
+
+# Profile completion (accounts.services.profile_completion): portfolio and services count towards it
+
+
+@receiver([post_save, post_delete], sender=CraftsmanPortfolio)
+@receiver([post_save, post_delete], sender="services.CraftsmanService")
+def mark_profile_completion_dirty(sender, instance, origin=None, **kwargs):
+    if getattr(origin, "model", type(origin)) in (CraftsmanProfile, User):
+        # Deleted together with the profile
+        return
+    schedule_profile_completion(instance.craftsman_id)
@@ -0,0 +1,125 @@
+"""
+Tests for the set-based profile recompute (accounts.services.recompute).
+
+Tests verify:
+1. Completion and badges are recomputed from grouped queries and drifted rows are repaired
+2. Only rows whose stored values differ are written
+3. The query count grows with chunks, not with profiles
+4. update_profiles reports progress and timing
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import City, County, CraftsmanPortfolio, CraftsmanProfile, User
+from accounts.services import BadgeService, ProfileCompletionService, recompute_profiles
+from services.models import CraftsmanService, Order, Review, Service, ServiceCategory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestBulkRecompute:
+    """Test chunked recompute of completion, rating counters and badges"""
+
+    @pytest.fixture
+    def location(self, db):
+        county = County.objects.create(name="Iași", code="IS", slug="iasi")
+        return county, City.objects.create(name="Iași", county=county)
+
+    @pytest.fixture
+    def service(self, db):
+        category = ServiceCategory.objects.create(name="Zugrăveli", slug="zugraveli")
+        return Service.objects.create(category=category, name="Zugrăvit", slug="zugravit")
+
+    @pytest.fixture
+    def client_user(self, db):
+        return User.objects.create_user(username="bulk_client", email="bulk_client@test.com", password="x")
+
+    def make_craftsman(self, username, location):
+        county, city = location
+        user = User.objects.create_user(
+            username=username, email=f"{username}@test.com", password="x", user_type="craftsman"
+        )
+        return CraftsmanProfile.objects.create(
+            user=user, display_name=username, slug=username, county=county, city=city, coverage_radius_km=20
+        )
+
+    def test_repairs_drifted_profiles(self, location, service, client_user):
+        craftsman = self.make_craftsman("bulk_one", location)
+        CraftsmanPortfolio.objects.create(craftsman=craftsman, title="Lucrare", image="portfolio/a.jpg")
+        CraftsmanService.objects.create(craftsman=craftsman, service=service)
+        for _ in range(5):
+            Review.objects.create(craftsman=craftsman, client=client_user, rating=5)
+        for index in range(3):
+            Order.objects.create(
+                client=client_user,
+                title=f"Comanda {index}",
+                description="Zugrăvit apartament",
+                service=service,
+                county=location[0],
+                city=location[1],
+                status="completed",
+                assigned_craftsman=craftsman,
+            )
+
+        # Bulk changes bypass signals and leave stale stored values
+        CraftsmanProfile.objects.filter(pk=craftsman.pk).update(
+            profile_completion=0, total_reviews=0, ratings_sum=0, average_rating=0, is_top_rated=False
+        )
+
+        assert ProfileCompletionService.update_all_profiles() == 1
+        assert BadgeService.update_all_badges() == 1
+        craftsman.refresh_from_db()
+
+        # Name, location, coverage (30) + one portfolio image (13) + services (20)
+        assert craftsman.profile_completion == 63
+        assert (craftsman.total_reviews, craftsman.ratings_sum, craftsman.average_rating) == (5, 25, Decimal("5.00"))
+        assert craftsman.total_jobs_completed == 3
+        assert craftsman.is_top_rated and craftsman.is_active and not craftsman.is_trusted
+
+    def test_unchanged_profiles_are_not_written(self, location):
+        self.make_craftsman("bulk_clean", location)
+        recompute_profiles()
+
+        with CaptureQueriesContext(connection) as queries:
+            result = recompute_profiles()
+
+        assert result["updated"] == 0
+        assert not [query for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+
+    def test_queries_scale_with_chunks(self, location):
+        for index in range(6):
+            self.make_craftsman(f"bulk_{index}", location)
+        CraftsmanProfile.objects.update(profile_completion=0)
+        progress = []
+
+        with CaptureQueriesContext(connection) as queries:
+            result = recompute_profiles(chunk_size=3, progress=lambda *args: progress.append(args))
+
+        assert result["processed"] == 6 and result["updated"] == 6
+        assert progress == [(3, 3), (6, 6)]
+        # Per chunk: ids, profiles, portfolio, services, reviews, orders and the bulk UPDATE
+        # in a transaction, plus the final empty id page
+        assert len(queries) <= 2 * 9 + 1
+
+    def test_command_reports_progress(self, location):
+        self.make_craftsman("bulk_cmd", location)
+        out = StringIO()
+
+        call_command("update_profiles", "--chunk-size", "10", stdout=out)
+
+        output = out.getvalue()
+        assert "1 profiluri procesate" in output
+        assert "Total profiluri: 1" in output
@@ -0,0 +1,158 @@
+"""
+Tests for the craftsman coverage index (accounts.services.coverage_index).
+
+Tests verify:
+1. Radius matching in both directions (craftsmen covering a city, cities covered by a craftsman)
+2. CoverageArea overrides the profile's city and radius
+3. Profile and city saves update the index incrementally
+4. load_city_coordinates fills coordinates from the bundled gazetteer
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import City, County, CraftsmanProfile, User
+from accounts.services.coverage_index import (
+    CoverageIndex,
+    covering_filter,
+    get_coverage_index,
+    haversine_km,
+    invalidate_coverage_index,
+)
+from services.models import CoverageArea
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    invalidate_coverage_index()
+    yield
+    invalidate_coverage_index()
+
+
+@pytest.fixture
+def cities(db):
+    cluj = County.objects.create(name="Cluj", code="CJ", slug="cluj")
+    brasov = County.objects.create(name="Brașov", code="BV", slug="brasov")
+    return {
+        "cluj": City.objects.create(
+            name="Cluj-Napoca", county=cluj, latitude=Decimal("46.771200"), longitude=Decimal("23.623600")
+        ),
+        "turda": City.objects.create(
+            name="Turda", county=cluj, latitude=Decimal("46.566700"), longitude=Decimal("23.783300")
+        ),
+        "brasov": City.objects.create(
+            name="Brașov", county=brasov, latitude=Decimal("45.642700"), longitude=Decimal("25.588700")
+        ),
+        "nowhere": City.objects.create(name="Fără coordonate", county=cluj),
+    }
+
+
+def make_craftsman(username, city, radius_km):
+    user = User.objects.create_user(
+        username=username, email=f"{username}@test.com", password="x", user_type="craftsman"
+    )
+    return CraftsmanProfile.objects.create(
+        user=user,
+        display_name=username,
+        slug=username,
+        city=city,
+        county=city.county if city else None,
+        coverage_radius_km=radius_km,
+    )
+
+
+@pytest.mark.django_db
+class TestCoverageIndex:
+    """Test radius lookups on an index built from the database"""
+
+    def test_haversine_distance(self):
+        # Cluj-Napoca -> Turda is roughly 26 km
+        assert 24 < haversine_km(46.7712, 23.6236, 46.5667, 23.7833) < 28
+
+    def test_craftsmen_covering_city(self, cities):
+        local = make_craftsman("local", cities["cluj"], 10)
+        regional = make_craftsman("regional", cities["cluj"], 50)
+        far = make_craftsman("far", cities["brasov"], 150)
+
+        index = CoverageIndex.build()
+
+        assert index.craftsmen_covering(cities["cluj"].id) == {local.pk, regional.pk}
+        assert index.craftsmen_covering(cities["turda"].id) == {regional.pk}
+        assert index.craftsmen_covering(cities["brasov"].id) == {far.pk}
+        assert index.craftsmen_covering(cities["nowhere"].id) is None
+
+    def test_covering_filter_keeps_unplaced_craftsmen(self, cities):
+        covering = make_craftsman("covering", cities["turda"], 50)
+        too_far = make_craftsman("too_far", cities["brasov"], 20)
+        ungeocoded = make_craftsman("ungeocoded", cities["nowhere"], 20)
+        cityless = make_craftsman("cityless", None, 20)
+
+        matched = CraftsmanProfile.objects.filter(covering_filter(cities["cluj"].id))
+        with CaptureQueriesContext(connection) as queries:
+            assert set(matched.values_list("pk", flat=True)) == {covering.pk, ungeocoded.pk, cityless.pk}
+
+        # Placed craftsmen outside the radius are not listed in the query
+        assert too_far.pk.hex not in queries[0]["sql"]
+        assert covering_filter(cities["nowhere"].id) is None
+
+    def test_cities_covered_by_craftsman(self, cities):
+        craftsman = make_craftsman("regional", cities["cluj"], 50)
+        unlocated = make_craftsman("unlocated", cities["nowhere"], 50)
+
+        index = CoverageIndex.build()
+
+        assert index.cities_covered_by(craftsman.pk) == {cities["cluj"].id, cities["turda"].id}
+        assert index.cities_covered_by(unlocated.pk) is None
+
+    def test_coverage_area_overrides_profile(self, cities):
+        craftsman = make_craftsman("mover", cities["cluj"], 10)
+        CoverageArea.objects.create(profile=craftsman, base_city=cities["brasov"], radius_km=20)
+
+        index = CoverageIndex.build()
+
+        assert index.cities_covered_by(craftsman.pk) == {cities["brasov"].id}
+        assert craftsman.pk not in index.craftsmen_covering(cities["cluj"].id)
+
+    def test_signals_update_index_incrementally(self, cities, django_capture_on_commit_callbacks):
+        craftsman = make_craftsman("grower", cities["cluj"], 10)
+        index = get_coverage_index()
+        assert craftsman.pk not in index.craftsmen_covering(cities["turda"].id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            craftsman.coverage_radius_km = 40
+            craftsman.save()
+        assert get_coverage_index() is index
+        assert craftsman.pk in index.craftsmen_covering(cities["turda"].id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            cities["nowhere"].latitude = Decimal("46.700000")
+            cities["nowhere"].longitude = Decimal("23.600000")
+            cities["nowhere"].save()
+        assert cities["nowhere"].id in index.cities_covered_by(craftsman.pk)
+
+
+@pytest.mark.django_db
+class TestLoadCityCoordinates:
+    """Test the load_city_coordinates management command"""
+
+    def test_matches_cities_ignoring_diacritics(self):
+        county = County.objects.create(name="Timiș", code="TM", slug="timis")
+        city = City.objects.create(name="Timisoara", county=county)
+
+        call_command("load_city_coordinates", stdout=StringIO())
+
+        city.refresh_from_db()
+        assert city.latitude is not None and city.longitude is not None
+        assert not City.objects.filter(name="Lugoj").exists()
+
+    def test_create_missing(self):
+        County.objects.create(name="Timiș", code="TM", slug="timis")
+
+        call_command("load_city_coordinates", "--create-missing", stdout=StringIO())
+
+        assert City.objects.filter(name="Lugoj", latitude__isnull=False).exists()
@@ -0,0 +1,130 @@
+"""
+Tests for deferred profile completion (accounts.services.profile_completion).
+
+Tests verify:
+1. Saves inside a transaction are recomputed once, on commit
+2. Scoring uses the pre-fetched portfolio and service counts
+3. Portfolio deletes and service changes update the stored completion
+4. Marks discarded by a rollback are not recomputed later
+"""
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+
+from accounts.models import City, County, CraftsmanPortfolio, CraftsmanProfile, User
+from accounts.services import profile_completion
+from services.models import CraftsmanService, Service, ServiceCategory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def image(name="lucrare.jpg"):
+    return SimpleUploadedFile(name, b"\xff\xd8\xff\xe0fake", content_type="image/jpeg")
+
+
+@pytest.mark.django_db
+class TestProfileCompletion:
+    """Test coalesced completion recomputation"""
+
+    @pytest.fixture
+    def craftsman(self, db, django_capture_on_commit_callbacks):
+        county = County.objects.create(name="Cluj", code="CJ", slug="cluj")
+        city = City.objects.create(name="Cluj-Napoca", county=county)
+        user = User.objects.create_user(
+            username="pc_craftsman", email="pc@test.com", password="x", user_type="craftsman"
+        )
+        # Run the creation's flush as a commit would, so each test starts with nothing queued
+        with django_capture_on_commit_callbacks(execute=True):
+            return CraftsmanProfile.objects.create(
+                user=user,
+                display_name="Ion",
+                slug="pc-craftsman",
+                county=county,
+                city=city,
+                coverage_radius_km=20,
+            )
+
+    def test_bulk_upload_recomputes_once_on_commit(
+        self, craftsman, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        calls = []
+        original = profile_completion.recompute_profile_completion
+        monkeypatch.setattr(
+            profile_completion,
+            "recompute_profile_completion",
+            lambda ids, instances=None: calls.append(list(ids)) or original(ids, instances),
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                for index in range(3):
+                    CraftsmanPortfolio.objects.create(craftsman=craftsman, image=image(f"l{index}.jpg"))
+                craftsman.bio = "y" * 250
+                craftsman.save()
+                assert calls == []
+
+        assert calls == [[craftsman.pk]]
+        # Name, location, radius 30 + bio 15 + portfolio 40; no photo or services
+        assert craftsman.profile_completion == 85
+        craftsman.refresh_from_db()
+        assert (craftsman.profile_completion, craftsman.is_profile_complete) == (85, False)
+
+    def test_one_flush_queued_per_transaction(self, craftsman, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            for _ in range(20):
+                profile_completion.schedule_profile_completion(craftsman.pk)
+
+        assert len(callbacks) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rolled_back_marks_are_dropped(self, craftsman, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            profile_completion, "recompute_profile_completion", lambda ids, instances=None: calls.append(ids)
+        )
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            profile_completion.schedule_profile_completion("rolled-back")
+            raise RuntimeError
+
+        # Autocommit: recomputed immediately, without the rolled-back mark
+        profile_completion.schedule_profile_completion(craftsman)
+
+        assert calls == [[craftsman.pk]]
+
+    def test_services_and_deletes_update_completion(self, craftsman, django_capture_on_commit_callbacks):
+        category = ServiceCategory.objects.create(name="Instalații", slug="instalatii")
+        service = Service.objects.create(category=category, name="Țevi", slug="tevi")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            items = [CraftsmanPortfolio.objects.create(craftsman=craftsman, image=image()) for _ in range(3)]
+            CraftsmanService.objects.create(craftsman=craftsman, service=service)
+        craftsman.refresh_from_db()
+        assert craftsman.profile_completion == 30 + 40 + 20
+
+        with django_capture_on_commit_callbacks(execute=True):
+            items[0].delete()
+        craftsman.refresh_from_db()
+        assert craftsman.profile_completion == 30 + 26 + 20
+
+    def test_scoring_uses_prefetched_counts(self, craftsman, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            result = profile_completion.calculate_profile_completion(craftsman, portfolio_count=3, has_services=True)
+        assert result["score"] == 90
+
+    def test_unrelated_update_fields_are_not_scheduled(self, craftsman, monkeypatch):
+        monkeypatch.setattr(profile_completion, "schedule_profile_completion", lambda c: pytest.fail("scheduled"))
+        craftsman.phone = "+40722123456"
+        craftsman.save(update_fields=["phone"])
@@ -0,0 +1,140 @@
+"""
+Tests for incremental craftsman rating counters (accounts.services.ratings).
+
+Tests verify:
+1. Creating, editing and deleting reviews keeps counters, average and badges exact
+2. Moving a review to another craftsman updates both profiles
+3. Edits take previous values from the loaded instance, reading the row only for deferred fields
+4. reconcile_craftsman_ratings repairs drift left by bulk changes
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from accounts.models import CraftsmanProfile, User
+from core.stats import PlatformStats
+from services.models import Review
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def make_craftsman(username):
+    user = User.objects.create_user(
+        username=username, email=f"{username}@test.com", password="x", user_type="craftsman"
+    )
+    return CraftsmanProfile.objects.create(user=user, display_name=username, slug=username)
+
+
+@pytest.mark.django_db
+class TestCraftsmanRatings:
+    """Test rating counters maintained from review signals"""
+
+    @pytest.fixture
+    def craftsman(self, db):
+        return make_craftsman("rating_craftsman")
+
+    @pytest.fixture
+    def client_user(self, db):
+        return User.objects.create_user(username="rating_client", email="rc@test.com", password="x")
+
+    def review(self, craftsman, client_user, rating, **details):
+        return Review.objects.create(craftsman=craftsman, client=client_user, rating=rating, **details)
+
+    def test_create_edit_delete(self, craftsman, client_user):
+        first = self.review(craftsman, client_user, 5, quality_rating=5, punctuality_rating=4)
+        self.review(craftsman, client_user, 4, quality_rating=3)
+        craftsman.refresh_from_db()
+
+        assert (craftsman.total_reviews, craftsman.ratings_sum, craftsman.average_rating) == (2, 9, Decimal("4.50"))
+        assert craftsman.quality_rating_average == 4.0
+        assert craftsman.punctuality_rating_average == 4.0
+        assert craftsman.communication_rating_average is None
+
+        first.rating = 2
+        first.quality_rating = None
+        first.save()
+        craftsman.refresh_from_db()
+        assert (craftsman.total_reviews, craftsman.average_rating) == (2, Decimal("3.00"))
+        assert (craftsman.quality_rating_sum, craftsman.quality_rating_count) == (3, 1)
+
+        first.delete()
+        craftsman.refresh_from_db()
+        assert (craftsman.total_reviews, craftsman.ratings_sum, craftsman.average_rating) == (1, 4, Decimal("4.00"))
+        assert (craftsman.punctuality_rating_sum, craftsman.punctuality_rating_count) == (0, 0)
+
+    def test_badges_follow_counters(self, craftsman, client_user):
+        for _ in range(5):
+            self.review(craftsman, client_user, 5)
+        craftsman.refresh_from_db()
+        assert craftsman.is_top_rated and not craftsman.is_trusted
+
+        self.review(craftsman, client_user, 1)
+        craftsman.refresh_from_db()
+        assert craftsman.average_rating == Decimal("4.33") and not craftsman.is_top_rated
+
+    def test_review_write_does_not_save_profile(self, craftsman, client_user, django_assert_num_queries):
+        PlatformStats.reconcile()
+
+        # INSERT, platform counters in a savepoint, then counter UPDATE / row read / derived UPDATE in a savepoint
+        with django_assert_num_queries(9):
+            self.review(craftsman, client_user, 4)
+
+    def test_edit_reuses_loaded_values(self, craftsman, client_user, django_assert_num_queries):
+        review = Review.objects.get(pk=self.review(craftsman, client_user, 4, quality_rating=3).pk)
+        review.rating = 2
+
+        # UPDATE, platform counters in a savepoint, counter UPDATE / row read / derived UPDATE in a savepoint;
+        # no SELECT of the previous review values
+        with django_assert_num_queries(9):
+            review.save()
+        craftsman.refresh_from_db()
+        assert (craftsman.ratings_sum, craftsman.quality_rating_sum) == (2, 3)
+
+    def test_edit_of_deferred_review_reads_previous_values(self, craftsman, client_user):
+        review = self.review(craftsman, client_user, 4, quality_rating=3)
+        deferred = Review.objects.only("pk", "rating").get(pk=review.pk)
+        deferred.rating = 5
+        deferred.quality_rating = 1
+        deferred.save(update_fields=["rating", "quality_rating"])
+
+        craftsman.refresh_from_db()
+        assert (craftsman.total_reviews, craftsman.ratings_sum) == (1, 5)
+        assert (craftsman.quality_rating_sum, craftsman.quality_rating_count) == (1, 1)
+
+    def test_moving_review_updates_both_craftsmen(self, craftsman, client_user):
+        other = make_craftsman("rating_other")
+        review = self.review(craftsman, client_user, 3, communication_rating=5)
+
+        review.craftsman = other
+        review.save()
+
+        craftsman.refresh_from_db()
+        other.refresh_from_db()
+        assert (craftsman.total_reviews, craftsman.communication_rating_count) == (0, 0)
+        assert (other.total_reviews, other.communication_rating_sum, other.average_rating) == (1, 5, Decimal("3.00"))
+
+    def test_reconcile_repairs_drift(self, craftsman, client_user):
+        self.review(craftsman, client_user, 5)
+        # Bulk writes bypass signals
+        Review.objects.bulk_create([Review(craftsman=craftsman, client=client_user, rating=1, quality_rating=2)])
+        CraftsmanProfile.objects.filter(pk=craftsman.pk).update(total_reviews=7)
+
+        out = StringIO()
+        call_command("reconcile_craftsman_ratings", stdout=out)
+
+        craftsman.refresh_from_db()
+        assert (craftsman.total_reviews, craftsman.ratings_sum, craftsman.average_rating) == (2, 6, Decimal("3.00"))
+        assert (craftsman.quality_rating_sum, craftsman.quality_rating_count) == (2, 1)
+        assert "1 profiles corrected" in out.getvalue()
+
+        call_command("reconcile_craftsman_ratings", stdout=out)
+        assert "0 profiles corrected" in out.getvalue()
@@ -0,0 +1,112 @@
+"""
+Tests for craftsman slug allocation (accounts.services.slugs).
+
+Tests verify:
+1. Duplicate names get the next suffix above the highest in use, found in one query
+2. A slug taken concurrently is allocated again on IntegrityError
+3. Bulk assignment deduplicates in memory and backfill stores with bulk_update
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from accounts.models import CraftsmanProfile, User
+from accounts.services import slugs
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def make_user(username):
+    return User.objects.create_user(
+        username=username, email=f"{username}@test.com", password="x", user_type="craftsman"
+    )
+
+
+def make_craftsman(username, display_name="Ion Popescu", **fields):
+    return CraftsmanProfile.objects.create(user=make_user(username), display_name=display_name, **fields)
+
+
+@pytest.mark.django_db
+class TestSlugAllocation:
+    """Test unique slug allocation on save"""
+
+    def test_duplicates_get_increasing_suffixes(self):
+        assert [make_craftsman(f"slug_{index}").slug for index in range(3)] == [
+            "ion-popescu",
+            "ion-popescu-1",
+            "ion-popescu-2",
+        ]
+
+    def test_next_suffix_is_above_highest(self, django_assert_num_queries):
+        make_craftsman("slug_a", slug="ion-popescu")
+        make_craftsman("slug_b", slug="ion-popescu-7")
+        # Other prefixes sharing the start are ignored
+        make_craftsman("slug_c", slug="ion-popescu-junior-9")
+
+        with django_assert_num_queries(1):
+            assert slugs.next_free_slug("ion-popescu") == "ion-popescu-8"
+
+    def test_fallbacks(self):
+        user = make_user("slug_fallback")
+        user.first_name, user.last_name = "Ana", "Ionescu"
+        user.save()
+
+        assert CraftsmanProfile.objects.create(user=user).slug == "ana-ionescu"
+        assert make_craftsman("slug_unicode", display_name="Ștefan Mureșan").slug == "ștefan-mureșan"
+        assert make_craftsman("slug_symbols", display_name="!!!").slug == "mester"
+
+    def test_retries_when_slug_taken_concurrently(self, monkeypatch):
+        make_craftsman("slug_first")
+        original = slugs.next_free_slug
+        calls = []
+
+        def stale(base, exclude_pk=None):
+            # The first lookup misses a profile saved in between
+            calls.append(base)
+            return base if len(calls) == 1 else original(base, exclude_pk=exclude_pk)
+
+        monkeypatch.setattr(slugs, "next_free_slug", stale)
+
+        assert make_craftsman("slug_second").slug == "ion-popescu-1"
+        assert len(calls) == 2
+
+
+@pytest.mark.django_db
+class TestBulkSlugs:
+    """Test in-memory assignment and backfill"""
+
+    def test_assign_slugs_in_memory(self, django_assert_num_queries):
+        make_craftsman("bulk_existing")
+        profiles = [CraftsmanProfile(display_name="Ion Popescu") for _ in range(3)]
+        profiles.append(CraftsmanProfile(display_name="Maria Pop"))
+
+        with django_assert_num_queries(1):
+            assigned = slugs.assign_slugs(profiles)
+
+        assert [profile.slug for profile in assigned] == [
+            "ion-popescu-1",
+            "ion-popescu-2",
+            "ion-popescu-3",
+            "maria-pop",
+        ]
+
+    def test_backfill_command(self):
+        make_craftsman("backfill_existing")
+        missing = make_craftsman("backfill_missing")
+        CraftsmanProfile.objects.filter(pk=missing.pk).update(slug="")
+        out = StringIO()
+
+        call_command("backfill_craftsman_slugs", "--dry-run", stdout=out)
+        assert "ion-popescu-1" in out.getvalue()
+        assert CraftsmanProfile.objects.get(pk=missing.pk).slug == ""
+
+        call_command("fix_craftsman_slugs", stdout=StringIO())
+        assert CraftsmanProfile.objects.get(pk=missing.pk).slug == "ion-popescu-1"
@@ -12,8 +12,7 @@ from django.contrib.auth.views import PasswordResetCompleteView as BasePasswordR
 from django.contrib.auth.views import PasswordResetConfirmView as BasePasswordResetConfirmView
 from django.contrib.auth.views import PasswordResetDoneView as BasePasswordResetDoneView
 from django.contrib.auth.views import PasswordResetView as BasePasswordResetView
-from django.core.files.storage import default_storage
-from django.db import models
+from django.db import models, transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
@@ -23,6 +22,8 @@ from django.views.generic import CreateView, DetailView, FormView, ListView, Tem
 from django.utils.decorators import method_decorator
 from django_ratelimit.decorators import ratelimit
 
+from core.images import versioned_url
+
 from .forms import (
     BulkPortfolioUploadForm,
     CraftsmanPortfolioForm,
@@ -383,9 +384,8 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
                 if field in form.cleaned_data and form.cleaned_data[field] is not None:
                     setattr(craftsman_profile, field, form.cleaned_data[field])
 
+            # Completion and badges are recomputed when the save commits
             craftsman_profile.save()
-            craftsman_profile.update_profile_completion()
-            craftsman_profile.update_badges()
 
         messages.success(self.request, "Profilul a fost actualizat cu succes!")
         return super().form_valid(form)
@@ -413,24 +413,43 @@ class CraftsmenListView(ListView):
             return max(10, min(60, per_page))
         return self.paginate_by
 
-    def get_queryset(self):
+    def get_filter_params(self):
+        """Parsed filter parameters, resolved once per request"""
+        if hasattr(self, "_filter_params"):
+            return self._filter_params
+
         from services.models import ServiceCategory
-        from services.querydefs import q_active_craftsmen
 
-        # Get filter parameters
-        q = (self.request.GET.get("q") or "").strip()
         county = self.request.GET.get("county") or ""
         category = self.request.GET.get("category") or ""
-        verified = self.request.GET.get("verified") == "1"
-        available = self.request.GET.get("available") == "1"
-        rating = self.request.GET.get("rating")
-        sort = self.request.GET.get("sort") or "popular"
+        try:
+            rating_min = float(self.request.GET.get("rating") or "")
+        except ValueError:
+            rating_min = None
+
+        self._filter_params = {
+            "q": (self.request.GET.get("q") or "").strip(),
+            "county": County.objects.filter(slug=county).first() if county else None,
+            "category": ServiceCategory.objects.filter(slug=category).first() if category else None,
+            "verified": self.request.GET.get("verified") == "1",
+            "available": self.request.GET.get("available") == "1",
+            "min_rate": self.request.GET.get("min_rate") or "",
+            "max_rate": self.request.GET.get("max_rate") or "",
+            "rating": rating_min,
+        }
+        return self._filter_params
+
+    def get_base_queryset(self):
+        """Listed craftsmen matching the filters that are not facets (text, availability, rate)"""
+        from services.querydefs import q_active_craftsmen
+
+        params = self.get_filter_params()
 
         # Base queryset - use permissive filter (only requires active user account)
         qs = CraftsmanProfile.objects.filter(q_active_craftsmen())
-        qs = qs.select_related("user", "county").prefetch_related("services__service__category")
 
         # Text search
+        q = params["q"]
         if q:
             qs = qs.filter(
                 models.Q(user__first_name__icontains=q)
@@ -439,42 +458,51 @@ class CraftsmenListView(ListView):
                 | models.Q(company_name__icontains=q)
             )
 
-        # County filter (by slug)
-        if county:
-            county_obj = County.objects.filter(slug=county).first()
-            if county_obj:
-                qs = qs.filter(county=county_obj)
-
-        # Category filter (by slug)
-        if category:
-            category_obj = ServiceCategory.objects.filter(slug=category).first()
-            if category_obj:
-                qs = qs.filter(services__service__category=category_obj)
-
-        # Verified filter
-        if verified:
-            qs = qs.filter(user__is_verified=True)
-
         # Available filter (if field exists)
-        if available and hasattr(CraftsmanProfile, "is_available"):
+        if params["available"] and hasattr(CraftsmanProfile, "is_available"):
             qs = qs.filter(is_available=True)
 
         # Hourly rate filter (if fields exist)
-        min_rate = self.request.GET.get("min_rate")
-        max_rate = self.request.GET.get("max_rate")
         if hasattr(CraftsmanProfile, "hourly_rate"):
-            if min_rate and min_rate.isdigit():
-                qs = qs.filter(hourly_rate__gte=int(min_rate))
-            if max_rate and max_rate.isdigit():
-                qs = qs.filter(hourly_rate__lte=int(max_rate))
+            if params["min_rate"].isdigit():
+                qs = qs.filter(hourly_rate__gte=int(params["min_rate"]))
+            if params["max_rate"].isdigit():
+                qs = qs.filter(hourly_rate__lte=int(params["max_rate"]))
+
+        return qs
+
+    def get_facet_filters(self):
+        """Active facet filters as {dimension: Q}"""
+        from services.models import CraftsmanService
+
+        params = self.get_filter_params()
+        filters = {}
+
+        # County filter (by slug)
+        if params["county"]:
+            filters["county"] = models.Q(county=params["county"])
+
+        # Category filter (by slug) - subquery instead of a join so no DISTINCT is needed
+        if params["category"]:
+            filters["category"] = models.Q(
+                pk__in=CraftsmanService.objects.filter(service__category=params["category"]).values("craftsman_id")
+            )
+
+        # Verified filter
+        if params["verified"]:
+            filters["verified"] = models.Q(user__is_verified=True)
 
         # Rating filter
-        if rating:
-            try:
-                rating_min = float(rating)
-                qs = qs.filter(average_rating__gte=rating_min)
-            except ValueError:
-                pass
+        if params["rating"] is not None:
+            filters["rating"] = models.Q(average_rating__gte=params["rating"])
+
+        return filters
+
+    def get_queryset(self):
+        sort = self.request.GET.get("sort") or "popular"
+
+        qs = self.get_base_queryset().filter(*self.get_facet_filters().values())
+        qs = qs.select_related("user", "county").prefetch_related("services__service__category")
 
         # Sorting
         if sort == "reviews":
@@ -486,14 +514,48 @@ class CraftsmenListView(ListView):
         else:  # popular (default)
             qs = qs.order_by("-total_reviews", "-average_rating")
 
-        return qs.distinct()
+        return qs
+
+    def get_facets(self, counties, categories):
+        """Facet counts for the current filters (one aggregate query, cached per filter signature)"""
+        from core.facets import CraftsmanFacets
+
+        params = self.get_filter_params()
+        county_ids = [c.id for c in counties]
+        category_ids = [c.id for c in categories]
+        signature = {
+            "view": "craftsmen_list",
+            "q": params["q"].lower(),
+            "county": params["county"].id if params["county"] else None,
+            "category": params["category"].id if params["category"] else None,
+            "verified": params["verified"],
+            "available": params["available"],
+            "min_rate": params["min_rate"] if params["min_rate"].isdigit() else "",
+            "max_rate": params["max_rate"] if params["max_rate"].isdigit() else "",
+            "rating": params["rating"],
+            "counties": county_ids,
+            "categories": category_ids,
+        }
+        return CraftsmanFacets.cached(
+            signature,
+            lambda: CraftsmanFacets.compute(
+                self.get_base_queryset(), self.get_facet_filters(), county_ids, category_ids
+            ),
+        )
 
     def get_context_data(self, **kwargs):
         from services.models import ServiceCategory
 
         context = super().get_context_data(**kwargs)
-        context["counties"] = County.objects.only("name", "slug").order_by("name")
-        context["categories"] = ServiceCategory.objects.only("name", "slug").order_by("name")
+        context["counties"] = list(County.objects.only("name", "slug").order_by("name"))
+        context["categories"] = list(ServiceCategory.objects.only("name", "slug").order_by("name"))
+
+        facets = self.get_facets(context["counties"], context["categories"])
+        context["county_counts"] = facets["counties"]
+        context["category_counts"] = facets["categories"]
+        context["rating_counts"] = facets["ratings"]
+        context["verified_count"] = facets["verified"]
+
         context["sort_options"] = {
             "popular": "Cei mai populari",
             "newest": "Cei mai noi",
@@ -524,31 +586,14 @@ class CraftsmanDetailView(DetailView):
         )
         # Portfolio images (first 6)
         context["portfolio_images"] = self.object.portfolio_images.all()[:6]
-        # Safe profile photo url with fallback if file missing on disk
+        # Profile photo with fallback to the user's picture, cache-busted by the stored fingerprint
+        # (no storage round-trip per hit). Files not fingerprinted yet are served by their plain URL.
         profile_photo_url = None
-
-        if self.object.profile_photo and getattr(self.object.profile_photo, "name", None):
-            try:
-                if default_storage.exists(self.object.profile_photo.name):
-                    profile_photo_url = self.object.profile_photo.url
-                else:
-                    # File doesn't exist, try fallback
-                    pass
-            except Exception:
-                profile_photo_url = None
-
-        # Fallback to the user's profile picture if available and exists
-        if (
-            not profile_photo_url
-            and hasattr(self.object, "user")
-            and getattr(self.object.user, "profile_picture", None)
-        ):
-            try:
-                user_pic = self.object.user.profile_picture
-                if user_pic and getattr(user_pic, "name", None) and default_storage.exists(user_pic.name):
-                    profile_photo_url = user_pic.url
-            except Exception:
-                profile_photo_url = None
+        craftsman = self.object
+        if craftsman.profile_photo:
+            profile_photo_url = versioned_url(craftsman.profile_photo, craftsman.profile_photo_hash)
+        elif craftsman.user.profile_picture:
+            profile_photo_url = versioned_url(craftsman.user.profile_picture, craftsman.user.profile_picture_hash)
 
         # Final fallback: static placeholder avatar.svg to avoid corrupted media default.jpg
         if not profile_photo_url:
@@ -608,12 +653,14 @@ class BulkPortfolioUploadView(LoginRequiredMixin, FormView):
             craftsman = self.request.user.craftsman_profile
             images = form.get_images()
 
+            # One transaction: profile completion is recomputed once for the whole batch
             created_count = 0
-            for image in images:
-                CraftsmanPortfolio.objects.create(
-                    craftsman=craftsman, image=image, title=f"Lucrare {created_count + 1}"
-                )
-                created_count += 1
+            with transaction.atomic():
+                for image in images:
+                    CraftsmanPortfolio.objects.create(
+                        craftsman=craftsman, image=image, title=f"Lucrare {created_count + 1}"
+                    )
+                    created_count += 1
 
             messages.success(self.request, f"Au fost încărcate {created_count} imagini în portfolio.")
             return redirect("accounts:portfolio")
@@ -752,12 +799,9 @@ class ManagePortfolioView(LoginRequiredMixin, TemplateView):
         if form.is_valid():
             portfolio_item = form.save(commit=False)
             portfolio_item.craftsman = profile
+            # Procentajul de completare se actualizează la commit (accounts.signals)
             portfolio_item.save()
 
-            # Actualizează procentajul de completare
-            profile.update_profile_completion()
-            profile.update_badges()
-
             messages.success(request, "Lucrarea a fost adăugată în portofoliu!")
             return redirect("accounts:manage_portfolio")
         else:
@@ -3,6 +3,10 @@ ASGI config for bricli project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production runs this under gunicorn with uvicorn workers so long-lived requests such
+as the unread-count stream (notifications.views.unread_stream) hold an event loop task
+instead of a worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -116,6 +116,10 @@ CACHES = {
     }
 }
 
+# Realtime push across worker processes
+REALTIME_BROKER = "redis"
+REALTIME_REDIS_URL = os.environ.get("REALTIME_REDIS_URL", os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/2"))
+
 # Session configuration
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
@@ -283,6 +283,21 @@ VAPID_PRIVATE_KEY = "your-vapid-private-key-here"
 VAPID_PUBLIC_KEY = "your-vapid-public-key-here"
 VAPID_ADMIN_EMAIL = "admin@bricli.ro"
 
+# Notification delivery outbox
+# Email/push are delivered by `python manage.py process_notification_outbox --loop`.
+# Set NOTIFICATION_DELIVERY_EAGER=True (local dev) to deliver right after commit instead.
+NOTIFICATION_DELIVERY_EAGER = env.bool('NOTIFICATION_DELIVERY_EAGER', default=False)
+
+# Image derivatives (core.images)
+# Resized JPEG/WebP variants are rendered by `python manage.py process_image_derivatives --loop`.
+# Set IMAGE_DERIVATIVES_EAGER=True (local dev) to render right after commit instead.
+IMAGE_DERIVATIVES_EAGER = env.bool('IMAGE_DERIVATIVES_EAGER', default=False)
+
+# Realtime push (core.realtime) for the unread-count stream
+# "local" only reaches streams served by the same process; use "redis" with several workers.
+REALTIME_BROKER = env('REALTIME_BROKER', default="local")
+REALTIME_REDIS_URL = env('REALTIME_REDIS_URL', default="redis://127.0.0.1:6379/2")
+
 # Django REST Framework Settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
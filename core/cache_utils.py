@@ -4,6 +4,7 @@ Caching utilities for performance optimization
 
 import hashlib
 import json
+import time
 from functools import wraps
 
 from django.core.cache import cache
@@ -83,43 +84,66 @@ def cached_queryset(timeout=300, key_prefix="queryset"):
     return decorator
 
 
-def invalidate_cache_pattern(pattern):
+# Tag/generation based invalidation
+#
+# Every tag has a generation counter in the cache. Entries stored with set_tagged() remember
+# the generation of each of their tags; get_tagged() treats an entry as a miss once any of
+# those counters has moved. Invalidating a tag is a single incr, with no keyspace scan, and
+# only touches entries that carry the tag.
+
+TAG_KEY_PREFIX = "cache_tag"
+
+
+def _tag_key(tag):
+    return f"{TAG_KEY_PREFIX}:{tag}"
+
+
+def get_tag_versions(tags, create=False):
     """
-    Invalidate cache keys matching a pattern.
-    Uses Redis pattern matching when available; provides safe fallbacks for LocMemCache.
+    Current generation of each tag.
+
+    Tags without a counter are missing from the result, or get one when create=True.
+    A new counter starts from the current time, so entries recorded against an evicted
+    counter can never match it again.
     """
-    # Try Redis first
-    try:
-        from django.core.cache.backends.redis import RedisCache
-
-        if isinstance(cache, RedisCache):
-            keys = cache._cache.get_client().keys(f"*{pattern}*")
-            if keys:
-                cache._cache.get_client().delete(*keys)
-            return
-    except Exception:
-        # If Redis backend is not available or operation fails, continue to fallback
-        pass
-
-    # Fallback for LocMemCache (default dev backend): iterate internal keys safely
-    try:
-        from django.core.cache.backends.locmem import LocMemCache
-
-        if isinstance(cache, LocMemCache):
-            keys_to_delete = [k for k in cache._cache.keys() if pattern in str(k)]
-            for k in keys_to_delete:
-                cache.delete(k)
-            return
-    except Exception:
-        # LocMem fallback failed; proceed to last resort
-        pass
-
-    # Last resort: clear cache to avoid stale data
-    try:
-        cache.clear()
-    except Exception:
-        # Silently ignore if clear is not available
-        pass
+    keys = {tag: _tag_key(tag) for tag in tags}
+    found = cache.get_many(list(keys.values()))
+
+    versions = {}
+    for tag, key in keys.items():
+        if key in found:
+            versions[tag] = found[key]
+        elif create:
+            cache.add(key, time.time_ns(), None)
+            versions[tag] = cache.get(key)
+    return versions
+
+
+def set_tagged(key, value, tags, timeout=300):
+    """Cache value under key, bound to the current generation of each tag"""
+    cache.set(key, {"tags": get_tag_versions(tags, create=True), "value": value}, timeout)
+
+
+def get_tagged(key, default=None):
+    """Return the value cached by set_tagged(), or default if missing or any tag was invalidated"""
+    entry = cache.get(key)
+    if entry is None:
+        return default
+
+    tags = entry["tags"]
+    if tags and get_tag_versions(tags) != tags:
+        return default
+    return entry["value"]
+
+
+def invalidate_tags(*tags):
+    """Invalidate every entry carrying any of the given tags"""
+    for tag in tags:
+        try:
+            cache.incr(_tag_key(tag))
+        except ValueError:
+            # No counter means no entry can still be valid for this tag
+            pass
 
 
 class CacheManager:
@@ -171,22 +195,35 @@ class CacheManager:
         """Generate cache key for statistics"""
         return f"statistics:{stat_type}"
 
+    @staticmethod
+    def craftsman_tag(craftsman_id):
+        """Tag for cache entries that depend on one craftsman (profile, registered services)"""
+        return f"craftsman:{craftsman_id}"
+
+    @staticmethod
+    def service_tag(service_id):
+        """Tag for cache entries that depend on the orders or quotes of one service"""
+        return f"service:{service_id}"
+
+    @staticmethod
+    def user_tag(user_id):
+        """Tag for cache entries that belong to one user"""
+        return f"user:{user_id}"
+
     @staticmethod
     def invalidate_user_cache(user_id):
         """Invalidate all cache entries for a specific user"""
-        patterns = [f"orders_list:{user_id}", f"craftsman_profile:{user_id}", f"view:*:{user_id}:*"]
-        for pattern in patterns:
-            invalidate_cache_pattern(pattern)
+        invalidate_tags(CacheManager.user_tag(user_id))
 
     @staticmethod
     def invalidate_craftsmen_cache():
         """Invalidate craftsmen list cache"""
-        invalidate_cache_pattern("craftsmen_list")
+        invalidate_tags("craftsmen_list")
 
     @staticmethod
     def invalidate_available_orders_cache():
         """Invalidate available orders cache entries across all craftsmen and filters"""
-        invalidate_cache_pattern("available_orders")
+        invalidate_tags("available_orders")
 
     @staticmethod
     def invalidate_services_cache():
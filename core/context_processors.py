@@ -3,6 +3,9 @@ Context processors for Romanian localization and cultural adaptations
 """
 
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .header_state import HeaderState
 from .models import SiteSettings
 
 
@@ -73,38 +76,17 @@ def user_context(request):
         context["is_craftsman"] = request.user.user_type == "craftsman"
         context["is_client"] = request.user.user_type == "client"
 
-        # Get avatar URL (craftsman profile_photo or user profile_picture)
-        avatar_url = ""
-        if hasattr(request.user, "craftsman_profile"):
-            craftsman = request.user.craftsman_profile
-            context["craftsman_profile"] = craftsman
-            context["has_portfolio"] = craftsman.portfolio_images.exists()
-            context["portfolio_count"] = craftsman.portfolio_images.count()
-
-            # Try to get profile photo from craftsman profile
-            if craftsman.profile_photo:
-                try:
-                    avatar_url = craftsman.profile_photo.url
-                except Exception:
-                    pass
-
-        # Fallback to user profile_picture if no craftsman photo
-        if not avatar_url and hasattr(request.user, "profile_picture") and request.user.profile_picture:
-            try:
-                avatar_url = request.user.profile_picture.url
-            except Exception:
-                pass
-
-        context["avatar_url"] = avatar_url
-
-        # Get unread notifications count
-        try:
-            from notifications.models import Notification
-            context["unread_notifications_count"] = Notification.objects.filter(
-                recipient=request.user, is_read=False
-            ).count()
-        except Exception:
-            context["unread_notifications_count"] = 0
+        # Badges and avatar come from the cached header state (one cache round trip)
+        state = HeaderState.get(request.user)
+        if state["profile"]["has_craftsman_profile"]:
+            user = request.user
+            context["craftsman_profile"] = SimpleLazyObject(lambda: user.craftsman_profile)
+            context["has_portfolio"] = state["portfolio"] > 0
+            context["portfolio_count"] = state["portfolio"]
+
+        context["avatar_url"] = state["profile"]["avatar_url"]
+        context["unread_notifications_count"] = state["notifications"]
+        context["unread_messages_count"] = state["messages"]
 
     return context
 
@@ -0,0 +1,93 @@
+"""
+Facet counts for craftsman listings (search page, craftsmen list).
+
+All facets are computed by one aggregate query of conditional COUNT(DISTINCT ...)
+columns. Each facet value is counted with every active filter applied except the
+filter of its own dimension, so the counts show how many results the user would get
+after switching to that value (e.g. other counties while one county is selected).
+
+Results are cached per normalised filter signature and tagged "craftsmen_list", which
+core.signals invalidates whenever a craftsman profile or their services change.
+"""
+
+from django.db.models import Count, Q
+
+from .cache_utils import CacheManager, cache_key_generator, get_tagged, set_tagged
+
+RATING_THRESHOLDS = (3.0, 3.5, 4.0, 4.5, 5.0)
+FACETS_CACHE_TAG = "craftsmen_list"
+FACET_DIMENSIONS = ("county", "category", "rating", "verified")
+
+
+class CraftsmanFacets:
+    """Single-query facet counts over a craftsman queryset"""
+
+    @staticmethod
+    def _count(*conditions):
+        condition = Q()
+        for q in conditions:
+            if q is not None:
+                condition &= q
+        # Category conditions join services, so count each craftsman once
+        return Count("pk", filter=condition, distinct=True) if condition else Count("pk", distinct=True)
+
+    @staticmethod
+    def compute(queryset, filters=None, county_ids=(), category_ids=(), rating_thresholds=RATING_THRESHOLDS):
+        """
+        Count facets for `queryset` (craftsmen matching the filters that are not facets,
+        such as the text query).
+
+        Args:
+            queryset: Base CraftsmanProfile queryset
+            filters: {dimension: Q or None} for the active facet filters, dimensions
+                     being "county", "category", "rating" and "verified"
+            county_ids: Counties to count
+            category_ids: Service categories to count
+            rating_thresholds: Minimum ratings to count
+
+        Returns:
+            {"total", "verified", "ratings": {threshold: n}, "counties": {id: n}, "categories": {id: n}}
+        """
+        filters = {dimension: (filters or {}).get(dimension) for dimension in FACET_DIMENSIONS}
+
+        def other_filters(dimension):
+            return [q for name, q in filters.items() if name != dimension]
+
+        aggregates = {
+            "total": CraftsmanFacets._count(*filters.values()),
+            "verified": CraftsmanFacets._count(*other_filters("verified"), Q(user__is_verified=True)),
+        }
+        for index, threshold in enumerate(rating_thresholds):
+            aggregates[f"rating_{index}"] = CraftsmanFacets._count(
+                *other_filters("rating"), Q(average_rating__gte=threshold)
+            )
+        for county_id in county_ids:
+            aggregates[f"county_{county_id}"] = CraftsmanFacets._count(*other_filters("county"), Q(county_id=county_id))
+        for category_id in category_ids:
+            aggregates[f"category_{category_id}"] = CraftsmanFacets._count(
+                *other_filters("category"), Q(services__service__category_id=category_id)
+            )
+
+        counts = queryset.order_by().aggregate(**aggregates)
+        return {
+            "total": counts["total"],
+            "verified": counts["verified"],
+            "ratings": {threshold: counts[f"rating_{index}"] for index, threshold in enumerate(rating_thresholds)},
+            "counties": {county_id: counts[f"county_{county_id}"] for county_id in county_ids},
+            "categories": {category_id: counts[f"category_{category_id}"] for category_id in category_ids},
+        }
+
+    @staticmethod
+    def cached(signature, compute, timeout=CacheManager.TIMEOUTS["short"]):
+        """
+        Return facets for a normalised filter signature, calling `compute()` on a miss.
+
+        The signature must contain every input that changes the counts (folded query,
+        filter ids, thresholds) and nothing else, so equivalent requests share an entry.
+        """
+        key = f"craftsman_facets:{cache_key_generator(**signature)}"
+        facets = get_tagged(key)
+        if facets is None:
+            facets = compute()
+            set_tagged(key, facets, tags=[FACETS_CACHE_TAG], timeout=timeout)
+        return facets
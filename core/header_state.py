@@ -0,0 +1,143 @@
+"""
+Per-user header state shown on every page (badges, avatar).
+
+Each user has a few small entries in the shared cache:
+
+- notifications: unread Notification count
+- messages: unread Message count
+- portfolio: CraftsmanPortfolio image count (craftsmen)
+- profile: {"has_craftsman_profile", "avatar_url"}
+
+core.context_processors.user_context reads them with one get_many() per request. Write
+paths keep them current: creations and single reads adjust the counters with
+cache.incr() (core.signals, NotificationService.fan_out_notifications), bulk updates
+drop the entry (and drop it again once the writing transaction commits). Counter
+adjustments are applied on commit. Missing entries are recomputed on the next read, and entries expire
+after STATE_TIMEOUT so any drift is short-lived.
+
+Changes to the unread counters are also published to the user's realtime channel
+(core.realtime), which wakes their open unread-count stream.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache_utils import CacheManager
+from .images import versioned_url
+from .realtime import publish_to_users
+
+logger = logging.getLogger(__name__)
+
+STATE_TIMEOUT = CacheManager.TIMEOUTS["medium"]
+COUNTERS = ("notifications", "messages", "portfolio")
+FIELDS = COUNTERS + ("profile",)
+# Counters pushed to open unread-count streams
+STREAMED = ("notifications", "messages")
+
+
+def header_state_key(user_id, field):
+    return f"header_state:{user_id}:{field}"
+
+
+class HeaderState:
+    """Cached header badges and avatar for one user"""
+
+    @staticmethod
+    def _compute(user, field):
+        if field == "notifications":
+            from notifications.models import Notification
+
+            return Notification.objects.filter(recipient_id=user.pk, is_read=False).count()
+
+        if field == "messages":
+            from messaging.models import Message
+
+            return Message.objects.filter(recipient_id=user.pk, is_read=False).count()
+
+        if field == "portfolio":
+            from accounts.models import CraftsmanPortfolio
+
+            return CraftsmanPortfolio.objects.filter(craftsman__user_id=user.pk).count()
+
+        return HeaderState._compute_profile(user)
+
+    @staticmethod
+    def _compute_profile(user):
+        from accounts.models import CraftsmanProfile
+
+        avatar_url = ""
+        craftsman = (
+            CraftsmanProfile.objects.filter(user_id=user.pk).only("pk", "profile_photo", "profile_photo_hash").first()
+        )
+        if craftsman and craftsman.profile_photo:
+            try:
+                avatar_url = versioned_url(craftsman.profile_photo, craftsman.profile_photo_hash)
+            except Exception:
+                pass
+
+        # Fallback to user profile_picture if no craftsman photo
+        profile_picture = getattr(user, "profile_picture", None)
+        if not avatar_url and profile_picture:
+            try:
+                avatar_url = versioned_url(profile_picture, user.profile_picture_hash)
+            except Exception:
+                pass
+
+        return {"has_craftsman_profile": craftsman is not None, "avatar_url": avatar_url}
+
+    @staticmethod
+    def get(user):
+        """Return {"notifications", "messages", "portfolio", "profile"} for the user"""
+        keys = {field: header_state_key(user.pk, field) for field in FIELDS}
+        cached = cache.get_many(keys.values())
+
+        state = {}
+        missing = {}
+        for field, key in keys.items():
+            if key in cached:
+                state[field] = cached[key]
+            else:
+                state[field] = missing[key] = HeaderState._compute(user, field)
+
+        if missing:
+            cache.set_many(missing, STATE_TIMEOUT)
+
+        for field in COUNTERS:
+            # Decrements racing a recompute can overshoot; never show negative badges
+            state[field] = max(state[field], 0)
+        return state
+
+    @staticmethod
+    def adjust(user_ids, field, delta):
+        """Add delta to a counter for each user; users without a cached entry are skipped"""
+        user_ids = set(user_ids)
+        for user_id in user_ids:
+            try:
+                cache.incr(header_state_key(user_id, field), delta)
+            except ValueError:
+                # Not cached; the next read recomputes it
+                pass
+
+        if field in STREAMED:
+            publish_to_users(user_ids, {"field": field, "delta": delta})
+
+    @staticmethod
+    def invalidate(user_ids, *fields):
+        """
+        Drop entries so the next read recomputes them (all fields by default), now and again
+        once the current transaction commits: a read before the commit would cache the old values.
+        """
+        user_ids = set(user_ids)
+        fields = fields or FIELDS
+        keys = [header_state_key(user_id, field) for user_id in user_ids for field in fields]
+        cache.delete_many(keys)
+
+        def after_commit():
+            cache.delete_many(keys)
+            for field in set(fields) & set(STREAMED):
+                # Unknown delta; streams re-read the recomputed count
+                publish_to_users(user_ids, {"field": field, "delta": None})
+
+        transaction.on_commit(after_commit)
@@ -0,0 +1,379 @@
+"""
+Background image derivatives.
+
+Upload forms only strip metadata (strip_metadata) and store the image at its original size;
+core.signals enqueues an ImageAsset for every new profile picture, profile photo, portfolio
+and review image. The worker
+(`manage.py process_image_derivatives --loop`) claims pending assets, decodes each image
+once in a process pool and renders every variant in both formats:
+
+- thumb: longest edge 160px
+- card: longest edge 480px
+- full: longest edge 1200px
+
+as JPEG and WebP, stored under derivatives/ and recorded as ImageDerivative rows.
+Templates read them through ImagePipeline.derivatives() (cached) to build srcset lists;
+until an image is processed they fall back to the original URL.
+"""
+
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache_utils import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest edge in pixels, largest first (each is resized from the previous)
+VARIANTS = {"full": 1200, "card": 480, "thumb": 160}
+# Format -> (PIL format, file extension, encoder options)
+FORMATS = {
+    "jpeg": ("JPEG", "jpg", {"quality": 85, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+}
+DERIVATIVES_DIR = "derivatives"
+EXIF_ORIENTATION = 0x0112
+# Upload format -> format it is re-saved in when its metadata is stripped (others are stored as sent)
+STRIP_FORMATS = {"JPEG": "JPEG", "MPO": "JPEG", "PNG": "PNG", "WEBP": "WEBP"}
+
+
+def render_derivatives(data):
+    """
+    Render every variant of an encoded image.
+
+    Pure function (no Django access) so it can run in a worker process.
+    Returns (width, height, [(variant, format, width, height, bytes), ...]).
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        original_width, original_height = img.size
+        if img.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+            # Rotated a quarter turn by EXIF orientation
+            original_width, original_height = original_height, original_width
+
+        # Let the JPEG decoder downscale while decoding; no variant needs more pixels
+        img.draft("RGB", (VARIANTS["full"], VARIANTS["full"]))
+        img = ImageOps.exif_transpose(img)
+
+        if img.mode != "RGB":
+            # Flatten transparency onto white (JPEG has no alpha channel)
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.split()[-1])
+
+        results = []
+        for variant, edge in VARIANTS.items():
+            img = img.copy()
+            img.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            for format_name, (pil_format, _, options) in FORMATS.items():
+                output = io.BytesIO()
+                img.save(output, format=pil_format, **options)
+                results.append((variant, format_name, img.width, img.height, output.getvalue()))
+
+    return original_width, original_height, results
+
+
+def image_fields():
+    """(model, field name) pairs whose uploads get derivatives"""
+    from accounts.models import CraftsmanPortfolio, CraftsmanProfile, User
+    from services.models import ReviewImage
+
+    return [
+        (User, "profile_picture"),
+        (CraftsmanProfile, "profile_photo"),
+        (CraftsmanPortfolio, "image"),
+        (ReviewImage, "image"),
+    ]
+
+
+def fingerprinted_fields():
+    """(model, field name) pairs storing <field>_hash/_width/_height next to the file"""
+    from accounts.models import CraftsmanProfile, User
+
+    return [(User, "profile_picture"), (CraftsmanProfile, "profile_photo")]
+
+
+def fingerprint(file):
+    """
+    (content hash, width, height) of a FieldFile, read once; ("", None, None) for an empty
+    or missing file. Uploads not yet saved to storage are read from memory.
+    """
+    if not file:
+        return "", None, None
+
+    digest = hashlib.sha256()
+    should_close = file.closed
+    try:
+        file.open("rb")
+        for chunk in file.chunks():
+            digest.update(chunk)
+        file.seek(0)
+        try:
+            with Image.open(file) as img:
+                width, height = img.size
+        except Exception:
+            width = height = None
+        file.seek(0)
+    except (FileNotFoundError, OSError) as e:
+        logger.warning(f"Cannot fingerprint {file.name}: {str(e)}")
+        return "", None, None
+    finally:
+        if should_close:
+            file.close()
+    return digest.hexdigest()[:16], width, height
+
+
+def apply_fingerprint(instance, field):
+    """Store the fingerprint of instance.<field> on the instance (not saved); returns the hash"""
+    content_hash, width, height = fingerprint(getattr(instance, field))
+    setattr(instance, f"{field}_hash", content_hash)
+    setattr(instance, f"{field}_width", width)
+    setattr(instance, f"{field}_height", height)
+    return content_hash
+
+
+def strip_metadata(upload):
+    """
+    An uploaded image re-saved without its EXIF/XMP metadata (GPS position, camera, timestamps),
+    turned upright by its orientation tag. Resizing is left to the derivatives worker.
+
+    Images without metadata are returned as sent; JPEGs that need no rotation keep their
+    quantization tables. Stored files, other formats and unreadable uploads are returned unchanged.
+    """
+    if not isinstance(upload, UploadedFile):
+        return upload
+
+    try:
+        with Image.open(upload) as img:
+            format_name = STRIP_FORMATS.get(img.format)
+            exif = img.getexif()
+            if format_name is None or not (exif or "xmp" in img.info or "XML:com.adobe.xmp" in img.info):
+                return upload
+
+            output = io.BytesIO()
+            options = {"icc_profile": img.info.get("icc_profile")}
+            if img.format == "JPEG" and exif.get(EXIF_ORIENTATION, 1) == 1:
+                img.save(output, format="JPEG", quality="keep", **options)
+            else:
+                upright = ImageOps.exif_transpose(img)
+                if format_name == "JPEG":
+                    options["quality"] = 95
+                upright.save(output, format=format_name, **options)
+    except Exception as e:
+        logger.warning(f"Cannot strip metadata from {upload.name}: {str(e)}")
+        return upload
+    finally:
+        upload.seek(0)
+
+    output.seek(0)
+    return InMemoryUploadedFile(
+        output, getattr(upload, "field_name", None), upload.name, upload.content_type, output.getbuffer().nbytes, None
+    )
+
+
+def versioned_url(file, content_hash):
+    """Cache-busted URL of a file from its stored hash; no storage access"""
+    return f"{file.url}?v={content_hash}" if content_hash else file.url
+
+
+def derivative_name(source, variant, format_name):
+    stem = os.path.splitext(source)[0]
+    return f"{DERIVATIVES_DIR}/{stem}_{variant}.{FORMATS[format_name][1]}"
+
+
+def _derivatives_cache_key(source):
+    return f"image_derivatives:{hashlib.md5(source.encode()).hexdigest()}"
+
+
+class ImagePipeline:
+    """Queue and worker for image derivatives"""
+
+    MAX_ATTEMPTS = 3
+    # Assets stuck in "processing" longer than this (crashed worker) are claimed again
+    LOCK_TIMEOUT = timedelta(minutes=10)
+
+    @staticmethod
+    def enqueue(sources):
+        """Queue derivative generation for the given storage names (already queued names are ignored)"""
+        from .models import ImageAsset
+
+        sources = [source for source in set(sources) if source]
+        if not sources:
+            return
+
+        ImageAsset.objects.bulk_create([ImageAsset(source=source) for source in sources], ignore_conflicts=True)
+
+        # Development convenience: render right after commit instead of waiting for the worker
+        if getattr(settings, "IMAGE_DERIVATIVES_EAGER", False):
+            transaction.on_commit(lambda: ImagePipeline.process_pending(batch_size=len(sources), sources=sources))
+
+    @staticmethod
+    def enqueue_existing(chunk_size=1000):
+        """Queue every stored image (backfill); returns the number of names seen"""
+        total = 0
+        for model, field in image_fields():
+            names = model._default_manager.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+            names = names.values_list(field, flat=True).iterator(chunk_size=chunk_size)
+            batch = []
+            for name in names:
+                batch.append(name)
+                if len(batch) >= chunk_size:
+                    ImagePipeline.enqueue(batch)
+                    total += len(batch)
+                    batch = []
+            ImagePipeline.enqueue(batch)
+            total += len(batch)
+        return total
+
+    @staticmethod
+    def claim_pending(batch_size=20, sources=None):
+        """Atomically claim up to batch_size assets for this worker"""
+        from .models import ImageAsset
+
+        now = timezone.now()
+        due = ImageAsset.objects.filter(
+            Q(status="pending") | Q(status="processing", locked_at__lt=now - ImagePipeline.LOCK_TIMEOUT)
+        )
+        if sources is not None:
+            due = due.filter(source__in=sources)
+
+        claimed_ids = []
+        for asset_id, status, locked_at in due.order_by("created_at").values_list("id", "status", "locked_at")[
+            :batch_size
+        ]:
+            # Conditional UPDATE: only one worker can move a row out of the state it was read in
+            if ImageAsset.objects.filter(id=asset_id, status=status, locked_at=locked_at).update(
+                status="processing", locked_at=now, attempts=F("attempts") + 1
+            ):
+                claimed_ids.append(asset_id)
+
+        return list(ImageAsset.objects.filter(id__in=claimed_ids))
+
+    @staticmethod
+    def process_pending(batch_size=20, workers=1, sources=None):
+        """Claim and render one batch, decoding on a process pool when workers > 1"""
+        assets = ImagePipeline.claim_pending(batch_size=batch_size, sources=sources)
+        results = {"done": 0, "pending": 0, "failed": 0}
+        if not assets:
+            return results
+
+        sources_data = []
+        for asset in assets:
+            try:
+                with default_storage.open(asset.source, "rb") as source_file:
+                    sources_data.append((asset, source_file.read()))
+            except Exception as e:
+                results[ImagePipeline._fail(asset, e)] += 1
+
+        if workers > 1 and len(sources_data) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [(asset, executor.submit(render_derivatives, data)) for asset, data in sources_data]
+                rendered = [(asset, future.exception() or future.result()) for asset, future in futures]
+        else:
+            rendered = []
+            for asset, data in sources_data:
+                try:
+                    rendered.append((asset, render_derivatives(data)))
+                except Exception as e:
+                    rendered.append((asset, e))
+
+        for asset, outcome in rendered:
+            if isinstance(outcome, Exception):
+                results[ImagePipeline._fail(asset, outcome)] += 1
+            else:
+                ImagePipeline._record(asset, *outcome)
+                results["done"] += 1
+        return results
+
+    @staticmethod
+    def _record(asset, width, height, rendered):
+        from .models import ImageAsset, ImageDerivative
+
+        # Re-processing replaces earlier files
+        for name in asset.derivatives.values_list("name", flat=True):
+            default_storage.delete(name)
+
+        derivatives = []
+        for variant, format_name, variant_width, variant_height, data in rendered:
+            name = default_storage.save(derivative_name(asset.source, variant, format_name), ContentFile(data))
+            derivatives.append(
+                ImageDerivative(
+                    asset=asset,
+                    variant=variant,
+                    format=format_name,
+                    name=name,
+                    width=variant_width,
+                    height=variant_height,
+                    size=len(data),
+                )
+            )
+
+        with transaction.atomic():
+            asset.derivatives.all().delete()
+            ImageDerivative.objects.bulk_create(derivatives)
+            ImageAsset.objects.filter(pk=asset.pk).update(
+                status="done", width=width, height=height, locked_at=None, last_error="", processed_at=timezone.now()
+            )
+        cache.delete(_derivatives_cache_key(asset.source))
+
+    @staticmethod
+    def _fail(asset, error):
+        from .models import ImageAsset
+
+        status = "failed" if asset.attempts >= ImagePipeline.MAX_ATTEMPTS else "pending"
+        ImageAsset.objects.filter(pk=asset.pk).update(status=status, locked_at=None, last_error=str(error)[:2000])
+        logger.warning(f"Image derivatives for {asset.source} attempt {asset.attempts} failed: {str(error)}")
+        return status
+
+    @staticmethod
+    def derivatives(source):
+        """
+        {"jpeg": [(url, width), ...], "webp": [...]} for a storage name, smallest first;
+        empty until the image has been processed. Cached, so templates do no queries when warm.
+        """
+        return ImagePipeline.derivatives_many([source]).get(source, {})
+
+    @staticmethod
+    def derivatives_many(sources):
+        """derivatives() for several storage names: one cache round trip and at most one query"""
+        from .models import ImageDerivative
+
+        keys = {_derivatives_cache_key(source): source for source in set(sources) if source}
+        if not keys:
+            return {}
+
+        found = {keys[key]: value for key, value in cache.get_many(keys).items()}
+        missing = {source: {} for source in keys.values() if source not in found}
+        if not missing:
+            return found
+
+        rows = ImageDerivative.objects.filter(asset__source__in=missing, asset__status="done").order_by("width")
+        for source, name, format_name, width in rows.values_list("asset__source", "name", "format", "width"):
+            missing[source].setdefault(format_name, []).append((default_storage.url(name), width))
+
+        # Unprocessed images are re-checked sooner
+        for timeout, processed in (("very_long", True), ("short", False)):
+            batch = {
+                _derivatives_cache_key(source): value for source, value in missing.items() if bool(value) == processed
+            }
+            if batch:
+                cache.set_many(batch, CacheManager.TIMEOUTS[timeout])
+        found.update(missing)
+        return found
+
+
+def srcset(entries):
+    """srcset attribute value from [(url, width), ...]"""
+    return ", ".join(f"{url} {width}w" for url, width in entries)
@@ -0,0 +1,45 @@
+"""
+Management command to fingerprint stored profile images (content hash and dimensions)
+Usage: python manage.py fingerprint_media [--all]
+New uploads are fingerprinted on save; run once after deploying to cover existing media.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.images import apply_fingerprint, fingerprinted_fields
+
+
+class Command(BaseCommand):
+    help = "Store content hash and dimensions for existing profile images (used for versioned media URLs)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute fingerprints that are already stored")
+        parser.add_argument("--batch-size", type=int, default=200, help="Rows written per query (default: 200)")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        for model, field in fingerprinted_fields():
+            fingerprint_fields = [f"{field}_hash", f"{field}_width", f"{field}_height"]
+            queryset = model._base_manager.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""})
+            if not options["all"]:
+                queryset = queryset.filter(**{f"{field}_hash": ""})
+
+            fingerprinted, missing, batch = 0, 0, []
+            for instance in queryset.only("pk", field, *fingerprint_fields).iterator(chunk_size=batch_size):
+                if apply_fingerprint(instance, field):
+                    fingerprinted += 1
+                else:
+                    missing += 1
+                batch.append(instance)
+                if len(batch) >= batch_size:
+                    model._base_manager.bulk_update(batch, fingerprint_fields)
+                    batch = []
+            if batch:
+                model._base_manager.bulk_update(batch, fingerprint_fields)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model.__name__}.{field}: {fingerprinted} fingerprinted, {missing} missing or unreadable"
+                )
+            )
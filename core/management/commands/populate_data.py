@@ -4,6 +4,7 @@ from django.utils.text import slugify
 
 from accounts.models import City, County
 from core.models import FAQ, SiteSettings, Testimonial
+from core.stats import PlatformStats
 from services.models import ServiceCategory
 
 
@@ -221,14 +222,14 @@ class Command(BaseCommand):
                 "site_description": "Platforma care conectează clienții cu meșteri verificați din România",
                 "contact_email": "contact@bricli.ro",
                 "contact_phone": "+40 21 123 4567",
-                "total_craftsmen": 1250,
-                "total_completed_jobs": 5680,
-                "total_reviews": 3420,
             },
         )
         if created:
             self.stdout.write("Created site settings")
 
+        # Counters are derived from the data, not seeded
+        PlatformStats.reconcile()
+
     def create_faqs(self):
         faqs_data = [
             (
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.images import ImagePipeline
+
+
+class Command(BaseCommand):
+    help = "Render queued image derivatives (thumb/card/full as JPEG and WebP) on a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20, help="Images claimed per batch (default: 20)")
+        parser.add_argument(
+            "--workers", type=int, default=2, help="Process pool size for decoding/encoding (default: 2)"
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling the queue instead of exiting")
+        parser.add_argument(
+            "--interval", type=float, default=2.0, help="Seconds to sleep when the queue is empty (default: 2)"
+        )
+        parser.add_argument("--backfill", action="store_true", help="Queue every stored image before processing")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        loop = options["loop"]
+        interval = options["interval"]
+
+        if options["backfill"]:
+            queued = ImagePipeline.enqueue_existing()
+            self.stdout.write(f"Queued {queued} stored images")
+
+        self.stdout.write(self.style.SUCCESS(f"Processing image derivatives (workers={workers}, loop={loop})"))
+
+        totals = {}
+        try:
+            while True:
+                results = ImagePipeline.process_pending(batch_size=batch_size, workers=workers)
+                processed = sum(results.values())
+
+                for status, count in results.items():
+                    totals[status] = totals.get(status, 0) + count
+
+                if processed:
+                    summary = ", ".join(f"{status}={count}" for status, count in results.items() if count)
+                    self.stdout.write(f"Processed {processed} images: {summary}")
+                    continue
+
+                if not loop:
+                    break
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Interrupted"))
+
+        summary = ", ".join(f"{status}={count}" for status, count in totals.items() if count) or "nothing to do"
+        self.stdout.write(self.style.SUCCESS(f"Image derivatives run finished: {summary}"))
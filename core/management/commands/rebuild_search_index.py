@@ -0,0 +1,19 @@
+"""
+Management command to rebuild the craftsman full-text search index (idempotent)
+Usage: python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.search import CraftsmanSearchIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuild CraftsmanSearchDocument rows for every craftsman (after bulk imports or queryset updates)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Profiles indexed per batch")
+
+    def handle(self, *args, **options):
+        total = CraftsmanSearchIndex.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} craftsmen"))
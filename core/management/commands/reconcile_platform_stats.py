@@ -0,0 +1,26 @@
+"""
+Management command to recompute the platform counters on SiteSettings (idempotent)
+Usage: python manage.py reconcile_platform_stats
+Run periodically (e.g. hourly cron) to absorb changes made without model signals.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.cache_utils import invalidate_tags
+from core.stats import HOME_CATEGORIES_TAG, PlatformStats
+
+
+class Command(BaseCommand):
+    help = "Recompute platform statistics (craftsmen, completed jobs, reviews) and refresh the home page snapshot"
+
+    def handle(self, *args, **options):
+        site_settings = PlatformStats.reconcile()
+        invalidate_tags(HOME_CATEGORIES_TAG)
+
+        stats = PlatformStats.get(site_settings)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Platform stats: {stats['active_craftsmen']} craftsmen, {stats['completed_projects']} completed jobs, "
+                f"{stats['total_reviews']} reviews (avg {stats['avg_rating']}), {stats['beta_members']} BETA members"
+            )
+        )
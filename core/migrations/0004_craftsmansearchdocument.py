@@ -0,0 +1,151 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:38
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+# Frozen copies of core.search's table names and document folding, so this migration
+# keeps working however the runtime code changes later
+DOCUMENT_TABLE = "core_craftsmansearchdocument"
+FTS_TABLE = "core_craftsmansearchdocument_fts"
+ROMANIAN_FOLDING = str.maketrans("țȚșȘăĂâÂîÎ", "ttssaaaaii")
+
+SQLITE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name_text, service_text, body_text,
+        content='{DOCUMENT_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name_text, service_text, body_text)
+        VALUES (new.id, new.name_text, new.service_text, new.body_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name_text, service_text, body_text)
+        VALUES ('delete', old.id, old.name_text, old.service_text, old.body_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name_text, service_text, body_text)
+        VALUES ('delete', old.id, old.name_text, old.service_text, old.body_text);
+        INSERT INTO {FTS_TABLE}(rowid, name_text, service_text, body_text)
+        VALUES (new.id, new.name_text, new.service_text, new.body_text);
+    END
+    """,
+]
+
+SQLITE_FTS_DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_FTS_SQL = [
+    f"""
+    ALTER TABLE {DOCUMENT_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name_text, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(service_text, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(body_text, '')), 'C')
+    ) STORED
+    """,
+    f"CREATE INDEX {DOCUMENT_TABLE}_search_vector_gin ON {DOCUMENT_TABLE} USING GIN (search_vector)",
+]
+
+POSTGRES_FTS_DROP_SQL = [
+    f"DROP INDEX IF EXISTS {DOCUMENT_TABLE}_search_vector_gin",
+    f"ALTER TABLE {DOCUMENT_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_FTS_SQL, "postgresql": POSTGRES_FTS_SQL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_FTS_DROP_SQL, "postgresql": POSTGRES_FTS_DROP_SQL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def fold_text(*parts):
+    folded = []
+    for part in parts:
+        if part:
+            text = unicodedata.normalize("NFKD", part.translate(ROMANIAN_FOLDING)).encode("ascii", "ignore")
+            folded.append(slugify(text.decode("ascii")).replace("-", " "))
+    return " ".join(folded)
+
+
+def populate_documents(apps, schema_editor):
+    CraftsmanProfile = apps.get_model("accounts", "CraftsmanProfile")
+    CraftsmanSearchDocument = apps.get_model("core", "CraftsmanSearchDocument")
+
+    profiles = CraftsmanProfile.objects.select_related("user").prefetch_related("services__service__category")
+    documents = []
+    for profile in profiles.iterator(chunk_size=500):
+        service_parts = []
+        description_parts = [profile.bio]
+        for craftsman_service in profile.services.all():
+            service = craftsman_service.service
+            category = service.category
+            service_parts.extend([service.name, service.slug, category.name, category.slug])
+            description_parts.extend([service.description, category.description])
+        documents.append(
+            CraftsmanSearchDocument(
+                profile_id=profile.pk,
+                name_text=fold_text(profile.display_name, profile.user.first_name, profile.user.last_name),
+                service_text=fold_text(*service_parts),
+                body_text=fold_text(*description_parts),
+            )
+        )
+    CraftsmanSearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0016_city_coordinates"),
+        ("core", "0003_citylandingfaq"),
+        ("services", "0014_alter_order_id_alter_quote_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CraftsmanSearchDocument",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name_text", models.TextField(blank=True, verbose_name="Nume")),
+                ("service_text", models.TextField(blank=True, verbose_name="Servicii")),
+                ("body_text", models.TextField(blank=True, verbose_name="Descriere")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "profile",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="accounts.craftsmanprofile",
+                        verbose_name="Profil meșter",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Document căutare meșter",
+                "verbose_name_plural": "Documente căutare meșteri",
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_craftsmansearchdocument"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitesettings",
+            name="beta_members",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="sitesettings",
+            name="ratings_sum",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="sitesettings",
+            name="stats_reconciled_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
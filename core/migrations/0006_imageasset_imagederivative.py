@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_sitesettings_platform_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageAsset",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("source", models.CharField(max_length=255, unique=True, verbose_name="Fișier original")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "În așteptare"),
+                            ("processing", "În procesare"),
+                            ("done", "Procesată"),
+                            ("failed", "Eșuată"),
+                        ],
+                        db_index=True,
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("width", models.PositiveIntegerField(blank=True, null=True)),
+                ("height", models.PositiveIntegerField(blank=True, null=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Imagine procesată",
+                "verbose_name_plural": "Imagini procesate",
+            },
+        ),
+        migrations.CreateModel(
+            name="ImageDerivative",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "variant",
+                    models.CharField(
+                        choices=[("thumb", "Miniatură"), ("card", "Card"), ("full", "Mărime completă")], max_length=10
+                    ),
+                ),
+                ("format", models.CharField(choices=[("jpeg", "JPEG"), ("webp", "WebP")], max_length=10)),
+                ("name", models.CharField(max_length=255, verbose_name="Fișier")),
+                ("width", models.PositiveIntegerField()),
+                ("height", models.PositiveIntegerField()),
+                ("size", models.PositiveIntegerField(help_text="Dimensiune în bytes")),
+                (
+                    "asset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="derivatives", to="core.imageasset"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Variantă imagine",
+                "verbose_name_plural": "Variante imagini",
+                "constraints": [
+                    models.UniqueConstraint(fields=("asset", "variant", "format"), name="unique_image_derivative")
+                ],
+            },
+        ),
+    ]
@@ -67,10 +67,13 @@ class SiteSettings(models.Model):
     instagram_url = models.URLField(blank=True)
     linkedin_url = models.URLField(blank=True)
 
-    # Trust indicators
+    # Trust indicators, maintained by core.signals (see core.stats)
     total_craftsmen = models.PositiveIntegerField(default=0)
     total_completed_jobs = models.PositiveIntegerField(default=0)
     total_reviews = models.PositiveIntegerField(default=0)
+    ratings_sum = models.PositiveBigIntegerField(default=0)
+    beta_members = models.PositiveIntegerField(default=0)
+    stats_reconciled_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         verbose_name = "Site Settings"
@@ -153,3 +156,89 @@ class BlogPost(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class CraftsmanSearchDocument(models.Model):
+    """
+    Denormalised search text for one craftsman, indexed by the database's full-text engine
+    (tsvector + GIN on PostgreSQL, an FTS5 table on SQLite). Text is folded with
+    core.filters.normalize_slug so queries with or without diacritics match. Kept in sync
+    by core.signals; rebuild with `manage.py rebuild_search_index`.
+    """
+
+    profile = models.OneToOneField(
+        "accounts.CraftsmanProfile",
+        on_delete=models.CASCADE,
+        related_name="search_document",
+        verbose_name="Profil meșter",
+    )
+    name_text = models.TextField(blank=True, verbose_name="Nume")
+    service_text = models.TextField(blank=True, verbose_name="Servicii")
+    body_text = models.TextField(blank=True, verbose_name="Descriere")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Document căutare meșter"
+        verbose_name_plural = "Documente căutare meșteri"
+
+    def __str__(self):
+        return f"Document căutare #{self.profile_id}"
+
+
+class ImageAsset(models.Model):
+    """
+    An uploaded image (by storage name) and the state of its derivative generation.
+
+    Uploads store the original as-is and enqueue an asset; `manage.py process_image_derivatives`
+    renders the variants (see core.images) on a process pool and records them as
+    ImageDerivative rows.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "În așteptare"),
+        ("processing", "În procesare"),
+        ("done", "Procesată"),
+        ("failed", "Eșuată"),
+    ]
+
+    source = models.CharField(max_length=255, unique=True, verbose_name="Fișier original")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Imagine procesată"
+        verbose_name_plural = "Imagini procesate"
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+
+
+class ImageDerivative(models.Model):
+    """One resized, re-encoded variant of an ImageAsset"""
+
+    VARIANT_CHOICES = [("thumb", "Miniatură"), ("card", "Card"), ("full", "Mărime completă")]
+    FORMAT_CHOICES = [("jpeg", "JPEG"), ("webp", "WebP")]
+
+    asset = models.ForeignKey(ImageAsset, on_delete=models.CASCADE, related_name="derivatives")
+    variant = models.CharField(max_length=10, choices=VARIANT_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    name = models.CharField(max_length=255, verbose_name="Fișier")
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    size = models.PositiveIntegerField(help_text="Dimensiune în bytes")
+
+    class Meta:
+        verbose_name = "Variantă imagine"
+        verbose_name_plural = "Variante imagini"
+        constraints = [
+            models.UniqueConstraint(fields=["asset", "variant", "format"], name="unique_image_derivative")
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.width}x{self.height})"
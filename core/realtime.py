@@ -0,0 +1,156 @@
+"""
+Per-user pub/sub feeding the streaming endpoints (see notifications.views.unread_stream).
+
+Writers call publish_to_users() and streaming views subscribe to the user's channel.
+The broker is chosen by settings.REALTIME_BROKER:
+
+- "local": in-process queues; only reaches streams served by the same process
+  (development, tests, single-process deployments)
+- "redis": Redis PUBLISH/SUBSCRIBE on settings.REALTIME_REDIS_URL, for several workers
+
+Messages are best-effort hints: subscribers that fall behind drop them, and streams
+re-read the current state from the cache when woken up.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    return f"bricli:user:{user_id}"
+
+
+class LocalBroker:
+    """Delivers messages to subscribers running in this process"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+
+        for loop, queue in subscribers:
+            try:
+                # Publishers run in sync threads; hand over to the subscriber's event loop
+                loop.call_soon_threadsafe(self._put, queue, message)
+            except RuntimeError:
+                # Loop closed while unsubscribing
+                pass
+
+    @staticmethod
+    def _put(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield LocalSubscription(subscriber[1])
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+class LocalSubscription:
+    def __init__(self, queue):
+        self._queue = queue
+
+    async def get(self, timeout):
+        """Next message, or None after `timeout` seconds without one"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class RedisBroker:
+    """Delivers messages through Redis so every worker process receives them"""
+
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+
+    def publish(self, channel, message):
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        try:
+            self._client.publish(channel, json.dumps(message))
+        except redis.RedisError as e:
+            logger.warning(f"Realtime publish to {channel} failed: {e}")
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def get(self, timeout):
+        """Next message, or None after `timeout` seconds without one"""
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message["data"])
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if getattr(settings, "REALTIME_BROKER", "local") == "redis":
+                _broker = RedisBroker(settings.REALTIME_REDIS_URL)
+            else:
+                _broker = LocalBroker()
+        return _broker
+
+
+def publish_to_users(user_ids, message):
+    """Publish `message` to each user's channel once the current transaction commits"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    def publish():
+        broker = get_broker()
+        for user_id in user_ids:
+            broker.publish(user_channel(user_id), message)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,205 @@
+"""
+Full-text search index for craftsmen.
+
+Each CraftsmanProfile has a CraftsmanSearchDocument holding its searchable text folded
+with normalize_slug (lowercase ASCII, Romanian diacritics removed). The database indexes
+the documents itself:
+
+- PostgreSQL: a generated, weighted tsvector column (name > services > description)
+  with a GIN index, queried with to_tsquery / ts_rank
+- SQLite: an external-content FTS5 table kept in sync by triggers, queried with bm25
+
+Both are created by core/migrations/0004_craftsmansearchdocument.py. Other backends
+fall back to icontains over the folded document text.
+
+matching() restricts a CraftsmanProfile queryset to every matching document as a
+subquery, so filters, counts and facets run over the full match set in the same
+statement; search() only ranks the best MAX_HITS matches for ordering.
+"""
+
+import logging
+import uuid
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .filters import normalize_slug
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_TABLE = "core_craftsmansearchdocument"
+FTS_TABLE = "core_craftsmansearchdocument_fts"
+
+# Matches ranked by search() for ordering (matching() itself is not capped)
+MAX_HITS = 500
+MAX_QUERY_TOKENS = 8
+MIN_TOKEN_LENGTH = 2
+
+# Column weights: name, services, description
+SQLITE_BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def fold_text(*parts):
+    """Fold text the same way as normalize_slug, keeping words separated by spaces"""
+    return " ".join(normalize_slug(part).replace("-", " ") for part in parts if part)
+
+
+def query_tokens(query):
+    """Split a search query into folded tokens usable in a full-text query"""
+    tokens = []
+    for token in fold_text(query).split():
+        if len(token) >= MIN_TOKEN_LENGTH and token not in tokens:
+            tokens.append(token)
+    return tokens[:MAX_QUERY_TOKENS]
+
+
+def build_document_fields(profile):
+    """
+    Return the folded text fields for a profile.
+
+    Works with historical models too (used by the migration that creates the index),
+    so it only relies on fields and relations, not on model methods. The profile's
+    services should be prefetched with their service and category.
+    """
+    service_parts = []
+    description_parts = [profile.bio]
+    for craftsman_service in profile.services.all():
+        service = craftsman_service.service
+        category = service.category
+        service_parts.extend([service.name, service.slug, category.name, category.slug])
+        description_parts.extend([service.description, category.description])
+
+    return {
+        "name_text": fold_text(profile.display_name, profile.user.first_name, profile.user.last_name),
+        "service_text": fold_text(*service_parts),
+        "body_text": fold_text(*description_parts),
+    }
+
+
+def save_documents(profiles, document_model):
+    """Insert or update the search documents for the given profiles"""
+    documents = [document_model(profile_id=profile.pk, **build_document_fields(profile)) for profile in profiles]
+    if documents:
+        document_model.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=["profile"],
+            update_fields=["name_text", "service_text", "body_text", "updated_at"],
+        )
+    return len(documents)
+
+
+class CraftsmanSearchIndex:
+    """Keeps craftsman search documents up to date and queries them"""
+
+    @staticmethod
+    def _profiles(profile_ids=None):
+        from accounts.models import CraftsmanProfile
+
+        queryset = CraftsmanProfile.objects.select_related("user").prefetch_related("services__service__category")
+        if profile_ids is not None:
+            queryset = queryset.filter(pk__in=profile_ids)
+        return queryset
+
+    @staticmethod
+    def update_profiles(profile_ids):
+        """Rebuild the documents of the given craftsmen"""
+        from .models import CraftsmanSearchDocument
+
+        profile_ids = list(profile_ids)
+        if not profile_ids:
+            return 0
+        return save_documents(CraftsmanSearchIndex._profiles(profile_ids), CraftsmanSearchDocument)
+
+    @staticmethod
+    def rebuild(batch_size=500):
+        """Rebuild every document; returns the number of indexed profiles"""
+        from .models import CraftsmanSearchDocument
+
+        total = 0
+        batch = []
+        for profile in CraftsmanSearchIndex._profiles().order_by("pk").iterator(chunk_size=batch_size):
+            batch.append(profile)
+            if len(batch) >= batch_size:
+                total += save_documents(batch, CraftsmanSearchDocument)
+                batch = []
+        total += save_documents(batch, CraftsmanSearchDocument)
+
+        if connection.vendor == "sqlite":
+            # Merge FTS5 b-tree segments after a bulk rewrite
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+        logger.info(f"Rebuilt craftsman search index: {total} documents")
+        return total
+
+    @staticmethod
+    def _match_sql(tokens):
+        """(FROM/WHERE clause over the document alias d, params) for the backend, or None"""
+        if connection.vendor == "postgresql":
+            return (
+                f"FROM {DOCUMENT_TABLE} d, to_tsquery('simple', %s) q WHERE d.search_vector @@ q",
+                [" | ".join(f"{token}:*" for token in tokens)],
+            )
+        if connection.vendor == "sqlite":
+            return (
+                f"FROM {FTS_TABLE} JOIN {DOCUMENT_TABLE} d ON d.id = {FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH %s",
+                [" OR ".join(f'"{token}"*' for token in tokens)],
+            )
+        return None
+
+    @staticmethod
+    def _fallback_documents(tokens):
+        from .models import CraftsmanSearchDocument
+
+        matches = Q()
+        for token in tokens:
+            matches |= Q(name_text__icontains=token) | Q(service_text__icontains=token) | Q(body_text__icontains=token)
+        return CraftsmanSearchDocument.objects.filter(matches)
+
+    @staticmethod
+    def matching(query):
+        """
+        Q restricting CraftsmanProfile to every craftsman matching the query, as a subquery
+        (no cap), so it combines with other filters and aggregates in a single statement.
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return Q(pk__in=[])
+
+        match = CraftsmanSearchIndex._match_sql(tokens)
+        if match is None:
+            return Q(pk__in=CraftsmanSearchIndex._fallback_documents(tokens).values("profile_id"))
+        clause, params = match
+        return Q(pk__in=RawSQL(f"SELECT d.profile_id {clause}", params))
+
+    @staticmethod
+    def search(query, limit=None):
+        """
+        Return {profile_id: position} for the best matching craftsmen, best match first,
+        at most `limit` (default MAX_HITS) of them. Used to order results; filter with
+        matching() so that matches outside the ranked set are not lost.
+
+        Tokens are matched as prefixes and OR-ed together, so more matching words
+        (and matches in the name or services) rank higher.
+        """
+        limit = limit or MAX_HITS
+        tokens = query_tokens(query)
+        if not tokens:
+            return {}
+
+        match = CraftsmanSearchIndex._match_sql(tokens)
+        if match is None:
+            profile_ids = CraftsmanSearchIndex._fallback_documents(tokens).values_list("profile_id", flat=True)[:limit]
+            return {profile_id: position for position, profile_id in enumerate(profile_ids)}
+
+        clause, params = match
+        if connection.vendor == "postgresql":
+            rank = "ts_rank(d.search_vector, q) DESC"
+        else:
+            rank = f"bm25({FTS_TABLE}, {', '.join(str(weight) for weight in SQLITE_BM25_WEIGHTS)})"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT d.profile_id {clause} ORDER BY {rank}, d.id LIMIT %s", [*params, limit])
+            rows = cursor.fetchall()
+        return {uuid.UUID(str(profile_id)): position for position, (profile_id,) in enumerate(rows)}
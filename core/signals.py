@@ -1,34 +1,391 @@
 from django.core.cache import cache
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
 
-from accounts.models import CraftsmanProfile
-from core.cache_utils import CacheManager
-from services.models import CraftsmanService, Order, ServiceCategory
+from accounts.models import CraftsmanPortfolio, CraftsmanProfile, User
+from accounts.services.ratings import DETAIL_RATINGS
+from core.cache_utils import CacheManager, invalidate_tags
+from core.header_state import HeaderState
+from core.images import ImagePipeline, apply_fingerprint, fingerprinted_fields, image_fields
+from core.search import CraftsmanSearchIndex
+from core.stats import HOME_CATEGORIES_TAG, PlatformStats
+from messaging.models import Message
+from notifications.models import Notification
+from services.models import CraftsmanService, Order, Quote, Review, Service, ServiceCategory
+
+# Fields whose changes affect a craftsman's search document
+PROFILE_SEARCH_FIELDS = {"display_name", "bio"}
+USER_SEARCH_FIELDS = {"first_name", "last_name"}
+SERVICE_SEARCH_FIELDS = {"name", "slug", "description"}
+# Fields shown in the page header (core.header_state)
+PROFILE_HEADER_FIELDS = {"profile_photo"}
+USER_HEADER_FIELDS = {"profile_picture"}
 
 
 @receiver([post_save, post_delete], sender=CraftsmanProfile)
-def invalidate_craftsmen_cache(sender, **kwargs):
-    """Invalidate craftsmen list cache when a craftsman profile is updated"""
-    CacheManager.invalidate_craftsmen_cache()
+def invalidate_craftsmen_cache(sender, instance, **kwargs):
+    """Invalidate craftsmen list cache and the craftsman's own entries when a profile is updated"""
+    invalidate_tags("craftsmen_list", CacheManager.craftsman_tag(instance.pk))
     cache.delete("counties_list")
 
 
 @receiver([post_save, post_delete], sender=Order)
-def invalidate_orders_cache(sender, **kwargs):
-    """Invalidate orders cache when an order is updated"""
-    CacheManager.invalidate_available_orders_cache()
+def invalidate_orders_cache(sender, instance, **kwargs):
+    """Invalidate cached order lists for craftsmen offering the order's service"""
+    invalidate_tags(CacheManager.service_tag(instance.service_id))
     cache.delete("service_categories_with_stats")
 
 
+@receiver([post_save, post_delete], sender=Quote)
+def invalidate_quotes_cache(sender, instance, **kwargs):
+    """A new quote changes quote counts on the order and hides it from the quoting craftsman"""
+    order_service_id = Order.objects.filter(pk=instance.order_id).values_list("service_id", flat=True).first()
+    invalidate_tags(CacheManager.service_tag(order_service_id), CacheManager.craftsman_tag(instance.craftsman_id))
+
+
 @receiver([post_save, post_delete], sender=ServiceCategory)
 def invalidate_categories_cache(sender, **kwargs):
     """Invalidate service categories cache when a category is updated"""
     cache.delete("service_categories_with_stats")
+    invalidate_tags(HOME_CATEGORIES_TAG)
 
 
 @receiver([post_save, post_delete], sender=CraftsmanService)
-def invalidate_craftsman_services_cache(sender, **kwargs):
-    """Invalidate related caches when craftsman services are updated"""
-    CacheManager.invalidate_available_orders_cache()
-    CacheManager.invalidate_craftsmen_cache()
+def invalidate_craftsman_services_cache(sender, instance, **kwargs):
+    """Invalidate the craftsman's cached order lists when their registered services change"""
+    invalidate_tags("craftsmen_list", CacheManager.craftsman_tag(instance.craftsman_id))
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+def _deleted_with_craftsman(origin):
+    """True when a delete cascades from a craftsman or user; their document goes with them"""
+    origin_model = getattr(origin, "model", type(origin))
+    return origin_model in (CraftsmanProfile, User)
+
+
+@receiver(post_save, sender=CraftsmanProfile)
+def update_profile_search_document(sender, instance, update_fields=None, **kwargs):
+    """Reindex a craftsman when their name or bio changes"""
+    if _touches(update_fields, PROFILE_SEARCH_FIELDS):
+        CraftsmanSearchIndex.update_profiles([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def update_user_search_document(sender, instance, created=False, update_fields=None, **kwargs):
+    """Reindex a craftsman when the user's first/last name changes"""
+    if created or not _touches(update_fields, USER_SEARCH_FIELDS):
+        return
+    CraftsmanSearchIndex.update_profiles(CraftsmanProfile.objects.filter(user=instance).values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=CraftsmanService)
+def update_craftsman_service_search_document(sender, instance, origin=None, **kwargs):
+    """Reindex a craftsman when a service is added or removed from their profile"""
+    if _deleted_with_craftsman(origin):
+        return
+    CraftsmanSearchIndex.update_profiles([instance.craftsman_id])
+
+
+@receiver(post_save, sender=Service)
+def update_service_search_documents(sender, instance, created=False, update_fields=None, **kwargs):
+    """Reindex craftsmen offering a service whose name or description changed"""
+    if created or not _touches(update_fields, SERVICE_SEARCH_FIELDS):
+        return
+    CraftsmanSearchIndex.update_profiles(
+        CraftsmanService.objects.filter(service=instance).values_list("craftsman_id", flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=ServiceCategory)
+def update_category_search_documents(sender, instance, created=False, update_fields=None, **kwargs):
+    """Reindex craftsmen offering services in a category whose name or description changed"""
+    if created or not _touches(update_fields, SERVICE_SEARCH_FIELDS):
+        return
+    CraftsmanSearchIndex.update_profiles(
+        CraftsmanService.objects.filter(service__category=instance).values_list("craftsman_id", flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_craftsman_user_cache(sender, instance, update_fields=None, **kwargs):
+    """Listing facets count active and verified craftsmen, which live on the user"""
+    if instance.user_type == "craftsman" and _touches(update_fields, {"is_active", "is_verified"}):
+        invalidate_tags("craftsmen_list")
+
+
+# Platform statistics (core.stats): apply counter deltas from the values each instance was loaded with
+
+STATS_FIELDS = {
+    Order: ("status",),
+    # The craftsman rating counters (accounts.signals) reuse the review snapshot
+    Review: ("craftsman_id", "rating", *DETAIL_RATINGS),
+    CraftsmanProfile: ("beta_member",),
+    User: ("is_active", "is_verified"),
+}
+
+
+def remember_loaded_stats_fields(sender, instance, **kwargs):
+    """Keep the counted fields as loaded, so saves can compute deltas without reading the row again"""
+    fields = STATS_FIELDS[sender]
+    if all(field in instance.__dict__ for field in fields):
+        instance._stats_loaded = {field: instance.__dict__[field] for field in fields}
+
+
+def _remember_previous(instance, fields, update_fields=None):
+    """Store the instance's previous database values of `fields` on it for the post_save handler"""
+    meta = instance._meta
+    written = [
+        field
+        for field in fields
+        if update_fields is None or {field, meta.get_field(field).name} & set(update_fields)
+    ]
+    instance._stats_previous = None
+    if not instance._state.adding and instance.pk is not None:
+        if not written:
+            # The save cannot change these fields
+            instance._stats_previous = {field: getattr(instance, field) for field in fields}
+            return
+        instance._stats_previous = getattr(instance, "_stats_loaded", None) or (
+            # Deferred when loaded: read them
+            type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+        )
+    # Later saves of this instance start from the values written now
+    instance._stats_loaded = {
+        **(instance._stats_previous or {}),
+        **{field: getattr(instance, field) for field in written},
+    }
+
+
+def _previous(instance, field, default=None):
+    previous = getattr(instance, "_stats_previous", None)
+    return previous[field] if previous else default
+
+
+def _counts_as_active_craftsman(user):
+    return bool(user.is_active and user.is_verified)
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, update_fields=None, **kwargs):
+    _remember_previous(instance, ["status"], update_fields)
+
+
+@receiver(post_save, sender=Order)
+def update_order_stats(sender, instance, **kwargs):
+    """Count completed orders; published orders change the home page category counts"""
+    old_status = _previous(instance, "status")
+    PlatformStats.apply(total_completed_jobs=(instance.status == "completed") - (old_status == "completed"))
+    if (instance.status == "published") != (old_status == "published"):
+        invalidate_tags(HOME_CATEGORIES_TAG)
+
+
+@receiver(post_delete, sender=Order)
+def update_deleted_order_stats(sender, instance, **kwargs):
+    PlatformStats.apply(total_completed_jobs=-(instance.status == "completed"))
+    if instance.status == "published":
+        invalidate_tags(HOME_CATEGORIES_TAG)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, update_fields=None, **kwargs):
+    _remember_previous(instance, STATS_FIELDS[Review], update_fields)
+
+
+@receiver(post_save, sender=Review)
+def update_review_stats(sender, instance, created=False, **kwargs):
+    """Keep the review count and rating sum behind the platform average rating"""
+    if created:
+        PlatformStats.apply(total_reviews=1, ratings_sum=instance.rating)
+    else:
+        PlatformStats.apply(ratings_sum=instance.rating - _previous(instance, "rating", instance.rating))
+
+
+@receiver(post_delete, sender=Review)
+def update_deleted_review_stats(sender, instance, **kwargs):
+    PlatformStats.apply(total_reviews=-1, ratings_sum=-instance.rating)
+
+
+@receiver(pre_save, sender=CraftsmanProfile)
+def remember_profile_beta_member(sender, instance, update_fields=None, **kwargs):
+    _remember_previous(instance, ["beta_member"], update_fields)
+
+
+@receiver(post_save, sender=CraftsmanProfile)
+def update_profile_stats(sender, instance, created=False, **kwargs):
+    """Count new craftsmen and BETA members"""
+    if created:
+        PlatformStats.apply(
+            total_craftsmen=int(_counts_as_active_craftsman(instance.user)), beta_members=int(instance.beta_member)
+        )
+    else:
+        previous_beta_member = _previous(instance, "beta_member", instance.beta_member)
+        PlatformStats.apply(beta_members=instance.beta_member - previous_beta_member)
+
+
+@receiver(post_delete, sender=CraftsmanProfile)
+def update_deleted_profile_stats(sender, instance, **kwargs):
+    # The user row outlives the profile when the delete cascades from it
+    counted = User.objects.filter(pk=instance.user_id, is_active=True, is_verified=True).exists()
+    PlatformStats.apply(total_craftsmen=-int(counted), beta_members=-int(instance.beta_member))
+
+
+@receiver(pre_save, sender=User)
+def remember_user_flags(sender, instance, update_fields=None, **kwargs):
+    _remember_previous(instance, ["is_active", "is_verified"], update_fields)
+
+
+@receiver(post_save, sender=User)
+def update_user_stats(sender, instance, created=False, **kwargs):
+    """A craftsman counts as active once their account is active and verified"""
+    if created:
+        return
+    was_counted = bool(_previous(instance, "is_active") and _previous(instance, "is_verified"))
+    delta = _counts_as_active_craftsman(instance) - was_counted
+    if delta and CraftsmanProfile.objects.filter(user=instance).exists():
+        PlatformStats.apply(total_craftsmen=delta)
+
+
+for stats_model in STATS_FIELDS:
+    post_init.connect(remember_loaded_stats_fields, sender=stats_model, dispatch_uid=f"stats_{stats_model.__name__}")
+
+
+# Header state (core.header_state): counters move after commit, so rolled back writes never show up
+
+
+def _adjust_header_counter(user_id, field, delta):
+    transaction.on_commit(lambda: HeaderState.adjust([user_id], field, delta))
+
+
+def _update_unread_header_counter(instance, field, created, update_fields, read_fields):
+    if created:
+        if not instance.is_read:
+            _adjust_header_counter(instance.recipient_id, field, 1)
+    elif update_fields is not None and set(update_fields) == read_fields:
+        # mark_as_read() only saves on the unread -> read transition
+        if instance.is_read:
+            _adjust_header_counter(instance.recipient_id, field, -1)
+    else:
+        # Arbitrary saves may flip is_read either way
+        HeaderState.invalidate([instance.recipient_id], field)
+
+
+@receiver(post_save, sender=Notification)
+def update_notification_header_state(sender, instance, created=False, update_fields=None, **kwargs):
+    _update_unread_header_counter(instance, "notifications", created, update_fields, {"is_read", "read_at"})
+
+
+@receiver(post_delete, sender=Notification)
+def update_deleted_notification_header_state(sender, instance, **kwargs):
+    if not instance.is_read:
+        _adjust_header_counter(instance.recipient_id, "notifications", -1)
+
+
+@receiver(post_save, sender=Message)
+def update_message_header_state(sender, instance, created=False, update_fields=None, **kwargs):
+    _update_unread_header_counter(instance, "messages", created, update_fields, {"is_read"})
+
+
+@receiver(post_delete, sender=Message)
+def update_deleted_message_header_state(sender, instance, **kwargs):
+    if not instance.is_read:
+        _adjust_header_counter(instance.recipient_id, "messages", -1)
+
+
+@receiver(post_save, sender=CraftsmanPortfolio)
+def update_portfolio_header_state(sender, instance, created=False, **kwargs):
+    if created:
+        _adjust_header_counter(instance.craftsman.user_id, "portfolio", 1)
+
+
+@receiver(post_delete, sender=CraftsmanPortfolio)
+def update_deleted_portfolio_header_state(sender, instance, origin=None, **kwargs):
+    if not _deleted_with_craftsman(origin):
+        # Otherwise the profile receiver below drops the whole entry
+        _adjust_header_counter(instance.craftsman.user_id, "portfolio", -1)
+
+
+@receiver(post_save, sender=CraftsmanProfile)
+def update_profile_header_state(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or _touches(update_fields, PROFILE_HEADER_FIELDS):
+        HeaderState.invalidate([instance.user_id], "profile")
+
+
+@receiver(post_delete, sender=CraftsmanProfile)
+def update_deleted_profile_header_state(sender, instance, **kwargs):
+    HeaderState.invalidate([instance.user_id], "profile", "portfolio")
+
+
+@receiver(post_save, sender=User)
+def update_user_header_state(sender, instance, created=False, update_fields=None, **kwargs):
+    if not created and _touches(update_fields, USER_HEADER_FIELDS):
+        HeaderState.invalidate([instance.pk], "profile")
+
+
+# Image derivatives (core.images): new uploads are queued for the background worker
+
+
+def enqueue_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    field = IMAGE_FIELDS[sender]
+    if not _touches(update_fields, {field}):
+        return
+    name = getattr(instance, field).name
+    if name:
+        ImagePipeline.enqueue([name])
+
+
+IMAGE_FIELDS = dict(image_fields())
+for image_model in IMAGE_FIELDS:
+    post_save.connect(
+        enqueue_image_derivatives, sender=image_model, dispatch_uid=f"image_derivatives_{image_model.__name__}"
+    )
+
+
+# Media fingerprints (core.images.fingerprint): hash and dimensions are taken once, when the file changes
+
+
+def _image_name(instance, field):
+    # Raw attribute value: a str before the field is first accessed, a FieldFile afterwards
+    value = instance.__dict__.get(field)
+    return getattr(value, "name", value) or ""
+
+
+def remember_fingerprinted_name(sender, instance, **kwargs):
+    field = FINGERPRINTED_FIELDS[sender]
+    if field in instance.__dict__:
+        instance._fingerprinted_name = _image_name(instance, field)
+
+
+def take_fingerprint(sender, instance, update_fields=None, **kwargs):
+    field = FINGERPRINTED_FIELDS[sender]
+    instance._fingerprint_taken = False
+    if not _touches(update_fields, {field}):
+        return
+    file = getattr(instance, field)
+    if file._committed and (file.name or "") == getattr(instance, "_fingerprinted_name", None):
+        # Same file as loaded; existing media is fingerprinted by `fingerprint_media`
+        return
+    apply_fingerprint(instance, field)
+    instance._fingerprint_taken = True
+
+
+def save_fingerprint(sender, instance, update_fields=None, **kwargs):
+    field = FINGERPRINTED_FIELDS[sender]
+    instance._fingerprinted_name = _image_name(instance, field)
+    if instance._fingerprint_taken and update_fields is not None:
+        # update_fields cannot be extended from pre_save; write the fingerprint separately
+        fingerprint_fields = [f"{field}_hash", f"{field}_width", f"{field}_height"]
+        sender._base_manager.filter(pk=instance.pk).update(
+            **{name: getattr(instance, name) for name in fingerprint_fields}
+        )
+
+
+FINGERPRINTED_FIELDS = dict(fingerprinted_fields())
+for fingerprinted_model in FINGERPRINTED_FIELDS:
+    uid = f"fingerprint_{fingerprinted_model.__name__}"
+    post_init.connect(remember_fingerprinted_name, sender=fingerprinted_model, dispatch_uid=uid)
+    pre_save.connect(take_fingerprint, sender=fingerprinted_model, dispatch_uid=uid)
+    post_save.connect(save_fingerprint, sender=fingerprinted_model, dispatch_uid=uid)
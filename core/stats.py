@@ -0,0 +1,168 @@
+"""
+Platform statistics for the home page.
+
+Counters live on the single SiteSettings row and are kept current by core.signals,
+which apply F() deltas in the same transaction as the change that caused them (deltas
+are computed from the values each instance was loaded with, so saves need no extra read):
+
+- total_craftsmen: craftsmen whose user is active and verified
+- total_completed_jobs: orders with status "completed"
+- total_reviews / ratings_sum: number and sum of review ratings (average = sum / count)
+- beta_members: craftsmen with beta_member set
+
+Changes that bypass signals (queryset.update(), bulk_create, raw SQL) or race with a
+stale instance are absorbed by `manage.py reconcile_platform_stats`, which recomputes
+every counter; run it periodically. Until then a counter is clamped at zero rather than
+failing the write that would take it below.
+
+The home page's top craftsmen and category list are precomputed into one cache entry,
+invalidated by tag when craftsmen or published orders change.
+"""
+
+import logging
+
+from django.db import DatabaseError, transaction
+from django.db.models import BigIntegerField, Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .cache_utils import CacheManager, get_tagged, set_tagged
+
+logger = logging.getLogger(__name__)
+
+HOME_SNAPSHOT_KEY = "home:snapshot"
+HOME_CATEGORIES_TAG = "home_categories"
+TOP_CRAFTSMEN_LIMIT = 6
+HOME_CATEGORIES_LIMIT = 8
+
+
+class PlatformStats:
+    """Maintains and reads the platform counters on SiteSettings"""
+
+    @staticmethod
+    def compute():
+        """Exact counter values from the source tables"""
+        from accounts.models import CraftsmanProfile
+        from services.models import Order, Review
+
+        craftsmen = CraftsmanProfile.objects.aggregate(
+            total_craftsmen=Count("pk", filter=Q(user__is_active=True, user__is_verified=True)),
+            beta_members=Count("pk", filter=Q(beta_member=True)),
+        )
+        reviews = Review.objects.aggregate(total_reviews=Count("pk"), ratings_sum=Sum("rating"))
+        return {
+            "total_craftsmen": craftsmen["total_craftsmen"],
+            "beta_members": craftsmen["beta_members"],
+            "total_completed_jobs": Order.objects.filter(status="completed").count(),
+            "total_reviews": reviews["total_reviews"],
+            "ratings_sum": reviews["ratings_sum"] or 0,
+        }
+
+    @staticmethod
+    def reconcile():
+        """Recompute every counter; creates the SiteSettings row if missing. Returns the row."""
+        from .models import SiteSettings
+
+        values = PlatformStats.compute()
+        values["stats_reconciled_at"] = timezone.now()
+
+        site_settings = SiteSettings.objects.order_by("pk").first()
+        if site_settings is None:
+            site_settings = SiteSettings.objects.create(**values)
+        else:
+            SiteSettings.objects.filter(pk=site_settings.pk).update(**values)
+            for field, value in values.items():
+                setattr(site_settings, field, value)
+
+        logger.info(f"Reconciled platform stats: {values}")
+        return site_settings
+
+    @staticmethod
+    def apply(**deltas):
+        """
+        Add deltas to the counters, e.g. apply(total_reviews=1, ratings_sum=5).
+
+        Runs in a savepoint: if the update fails it is logged and left to the next
+        reconcile, and the write that triggered it goes through.
+        """
+        from .models import SiteSettings
+
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        # Drifted counters stop at zero instead of breaking the PositiveIntegerField check
+        changes = {
+            field: Greatest(F(field) + delta, Value(0), output_field=BigIntegerField())
+            for field, delta in deltas.items()
+        }
+        try:
+            with transaction.atomic():
+                if not SiteSettings.objects.update(**changes):
+                    # No row yet: count from scratch, which already includes this change
+                    PlatformStats.reconcile()
+        except DatabaseError:
+            logger.exception(f"Could not apply platform stats deltas {deltas}; run reconcile_platform_stats")
+
+    @staticmethod
+    def get(site_settings=None):
+        """Return the home page stats dict from the SiteSettings row (no aggregate queries)"""
+        from .models import SiteSettings
+
+        if site_settings is None:
+            site_settings = SiteSettings.objects.order_by("pk").first()
+        if site_settings is None or site_settings.stats_reconciled_at is None:
+            # Counters never initialised (fresh install or row created by hand)
+            site_settings = PlatformStats.reconcile()
+
+        avg_rating = site_settings.ratings_sum / site_settings.total_reviews if site_settings.total_reviews else 0
+        return {
+            "active_craftsmen": site_settings.total_craftsmen,
+            "avg_rating": round(avg_rating, 1) if avg_rating else 0,
+            "completed_projects": site_settings.total_completed_jobs,
+            "total_reviews": site_settings.total_reviews,
+            "beta_members": site_settings.beta_members,
+        }
+
+    @staticmethod
+    def build_home_snapshot():
+        """Top craftsmen (tier-prioritised) and active categories with published order counts"""
+        from django.db import models
+
+        from accounts.models import CraftsmanProfile
+        from services.models import ServiceCategory
+
+        top_craftsmen = list(
+            CraftsmanProfile.objects.filter(user__is_verified=True)
+            .select_related("user", "subscription", "subscription__tier")
+            .annotate(
+                tier_priority=models.Case(
+                    models.When(subscription__tier__name="pro", then=models.Value(0)),
+                    models.When(subscription__tier__name="plus", then=models.Value(1)),
+                    models.When(subscription__tier__name="free", then=models.Value(2)),
+                    default=models.Value(3),
+                    output_field=models.IntegerField(),
+                )
+            )
+            .order_by("tier_priority", "-average_rating", "-total_reviews")[:TOP_CRAFTSMEN_LIMIT]
+        )
+        service_categories = list(
+            ServiceCategory.objects.filter(is_active=True).annotate(
+                orders_count=Count("services__order", filter=Q(services__order__status="published"))
+            )[:HOME_CATEGORIES_LIMIT]
+        )
+        return {"top_craftsmen": top_craftsmen, "service_categories": service_categories}
+
+    @staticmethod
+    def home_snapshot():
+        """Cached home page lists; rebuilt after craftsmen or published orders change"""
+        snapshot = get_tagged(HOME_SNAPSHOT_KEY)
+        if snapshot is None:
+            snapshot = PlatformStats.build_home_snapshot()
+            set_tagged(
+                HOME_SNAPSHOT_KEY,
+                snapshot,
+                tags=["craftsmen_list", HOME_CATEGORIES_TAG],
+                timeout=CacheManager.TIMEOUTS["long"],
+            )
+        return snapshot
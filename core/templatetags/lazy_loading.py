@@ -1,23 +1,82 @@
 import hashlib
+from collections.abc import Iterable
 
 from django import template
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 
+from core.images import ImagePipeline, srcset
+
 register = template.Library()
 
+# render_context key of the derivatives loaded by {% prefetch_image_derivatives %}
+PREFETCHED_DERIVATIVES = "image_derivatives"
 
-@register.simple_tag
-def lazy_img(src, alt="", css_class="", width="", height="", placeholder_color="#f8f9fa", style="", **kwargs):
+
+def _derivatives(context, image):
+    """Processed derivatives of an ImageField value, {} for plain URLs and unprocessed images"""
+    name = getattr(image, "name", None)
+    if not name:
+        return {}
+    prefetched = context.render_context.get(PREFETCHED_DERIVATIVES, {})
+    return prefetched[name] if name in prefetched else ImagePipeline.derivatives(name)
+
+
+def _images_at(objects, path):
+    """Values at a dotted path on each object, following related managers (prefetch them to avoid queries)"""
+    items = list(objects) if isinstance(objects, Iterable) and not isinstance(objects, str) else [objects]
+    for attr in path.split("."):
+        values = []
+        for item in items:
+            value = getattr(item, attr, None)
+            if hasattr(value, "all"):
+                values.extend(value.all())
+            elif value is not None:
+                values.append(value)
+        items = values
+    return items
+
+
+@register.simple_tag(takes_context=True)
+def prefetch_image_derivatives(context, objects, *paths):
+    """
+    Load the derivatives of every image a page shows in one batch, before the loop that renders them:
+    {% prefetch_image_derivatives reviews "client.profile_picture" "images.image" %}
+    lazy_img/image_srcset then read them instead of doing a cache lookup (and on a miss a query) per image.
     """
-    Generate a lazy-loaded image with placeholder
+    names = [getattr(image, "name", None) for path in paths for image in _images_at(objects, path)]
+    prefetched = context.render_context.get(PREFETCHED_DERIVATIVES, {})
+    context.render_context[PREFETCHED_DERIVATIVES] = {**prefetched, **ImagePipeline.derivatives_many(names)}
+    return ""
+
+
+@register.simple_tag(takes_context=True)
+def lazy_img(
+    context,
+    src,
+    alt="",
+    css_class="",
+    width="",
+    height="",
+    placeholder_color="#f8f9fa",
+    style="",
+    sizes="100vw",
+    **kwargs,
+):
+    """
+    Generate a lazy-loaded image with placeholder.
+
+    When src is an image field with processed derivatives (core.images), a <picture> with
+    WebP and JPEG srcset candidates is emitted instead of the single original URL.
     """
     # Handle None or empty src
     if not src:
         src = ""
 
-    # Convert src to string if it's not already
-    src_str = str(src) if src else ""
+    derivatives = _derivatives(context, src)
+
+    # Convert src to string if it's not already (image fields render as their URL)
+    src_str = (src.url if hasattr(src, "url") else str(src)) if src else ""
 
     # Generate a unique ID for the image
     img_id = hashlib.md5(src_str.encode()).hexdigest()[:8]
@@ -48,11 +107,16 @@ def lazy_img(src, alt="", css_class="", width="", height="", placeholder_color="
     # Use placeholder if src is empty or None
     actual_src = src_str if src_str else placeholder_svg
 
+    srcset_attrs = ""
+    if derivatives.get("jpeg"):
+        srcset_attrs = f'data-srcset="{srcset(derivatives["jpeg"])}" sizes="{sizes}"'
+
     html = f"""
     <img id="lazy-{img_id}" 
          class="{classes}" 
          src="{placeholder_svg}" 
          data-src="{actual_src}" 
+         {srcset_attrs}
          alt="{alt}" 
          {attrs_str}
          loading="lazy"
@@ -60,9 +124,29 @@ def lazy_img(src, alt="", css_class="", width="", height="", placeholder_color="
          onerror="this.classList.add('error')">
     """
 
+    if derivatives.get("webp"):
+        html = f"""
+    <picture>
+        <source type="image/webp" data-srcset="{srcset(derivatives["webp"])}" sizes="{sizes}">
+        {html}
+    </picture>
+    """
+
     return mark_safe(html)
 
 
+@register.simple_tag(takes_context=True)
+def image_srcset(context, image, sizes="100vw"):
+    """
+    srcset/sizes attributes for a plain <img> showing an image field, empty until its
+    derivatives are processed: <img src="{{ item.image.url }}" {% image_srcset item.image "33vw" %}>
+    """
+    jpeg = _derivatives(context, image).get("jpeg")
+    if not jpeg:
+        return ""
+    return mark_safe(f'srcset="{srcset(jpeg)}" sizes="{sizes}"')
+
+
 @register.simple_tag
 def lazy_bg(src, css_class="", height="200px"):
     """
@@ -113,57 +197,35 @@ def lazy_loading_scripts():
     return {}
 
 
+def _timestamp(dt):
+    dt = timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+    return str(int(dt.timestamp()))
+
+
 @register.simple_tag
 def profile_img_version(user):
     """
-    Return an integer timestamp suitable for cache-busting the user's profile image URL.
-    Prefer the file's last modified time; fallback to user.updated_at or user.date_joined.
-    """
-    try:
-        image = getattr(user, "profile_picture", None)
-        if image and getattr(image, "name", None):
-            storage = getattr(image, "storage", None)
-            if storage:
-                dt = storage.get_modified_time(image.name)
-                if dt:
-                    try:
-                        return str(int(dt.timestamp()))
-                    except Exception:
-                        dt = timezone.make_aware(dt) if timezone.is_naive(dt) else dt
-                        return str(int(dt.timestamp()))
-        dt = getattr(user, "updated_at", None) or getattr(user, "date_joined", None) or timezone.now()
-        return str(int(dt.timestamp()))
-    except Exception:
-        return str(int(timezone.now().timestamp()))
+    Cache-busting version for the user's profile image URL: the content hash stored at upload
+    (no storage access), falling back to user.updated_at or user.date_joined.
+    """
+    content_hash = getattr(user, "profile_picture_hash", "")
+    if content_hash:
+        return content_hash
+    dt = getattr(user, "updated_at", None) or getattr(user, "date_joined", None) or timezone.now()
+    return _timestamp(dt)
 
 
 @register.simple_tag
 def image_version(image, fallback_dt=None):
     """
-    Return an integer timestamp for cache-busting a given ImageField/FileField.
-    Prefer the file's last modified time; fallback to provided datetime or current time.
-    """
-    try:
-        if image and getattr(image, "name", None):
-            storage = getattr(image, "storage", None)
-            if storage:
-                dt = storage.get_modified_time(image.name)
-                if dt:
-                    try:
-                        return str(int(dt.timestamp()))
-                    except Exception:
-                        dt = timezone.make_aware(dt) if timezone.is_naive(dt) else dt
-                        return str(int(dt.timestamp()))
-    except Exception:
-        pass
-    # Fallbacks
-    if fallback_dt:
-        try:
-            return str(int(fallback_dt.timestamp()))
-        except Exception:
-            try:
-                fallback_dt = timezone.make_aware(fallback_dt) if timezone.is_naive(fallback_dt) else fallback_dt
-                return str(int(fallback_dt.timestamp()))
-            except Exception:
-                pass
-    return str(int(timezone.now().timestamp()))
+    Cache-busting version for an ImageField/FileField URL: the content hash stored next to
+    the field (<field>_hash, see core.images.fingerprint), falling back to the provided
+    datetime or the current time. Never touches storage.
+    """
+    field = getattr(image, "field", None)
+    instance = getattr(image, "instance", None)
+    if image and field is not None and instance is not None:
+        content_hash = getattr(instance, f"{field.name}_hash", "")
+        if content_hash:
+            return content_hash
+    return _timestamp(fallback_dt or timezone.now())
@@ -1,15 +1,16 @@
 from django.contrib import messages
-from django.db import models
-from django.db.models import Avg, Count, Q
+from django.db.models import Case, Count, IntegerField, Q, Value, When
 from django.shortcuts import redirect, render, get_object_or_404
-from django.utils.text import slugify
 from django.views.generic import ListView, TemplateView, DetailView
 
 from accounts.models import County, CraftsmanProfile
-from services.models import Order, Review, Service, ServiceCategory
+from services.models import CraftsmanService, Order, Service, ServiceCategory
 
-from .filters import get_county_by_any, sanitize_query
+from .filters import get_county_by_any, normalize_slug, sanitize_query
+from .facets import CraftsmanFacets
 from .models import FAQ, SiteSettings, Testimonial, CityLandingPage
+from .search import CraftsmanSearchIndex, query_tokens
+from .stats import PlatformStats
 
 
 def preview_404(request):
@@ -38,46 +39,29 @@ class HomeView(TemplateView):
         except SiteSettings.DoesNotExist:
             site_settings = None
 
-        # Calculate platform statistics
-        active_craftsmen = CraftsmanProfile.objects.filter(user__is_active=True, user__is_verified=True).count()
-        avg_rating_data = Review.objects.aggregate(avg=Avg("rating"))
-        avg_rating = avg_rating_data["avg"] or 0.0
-        completed_projects = Order.objects.filter(status="completed").count()
+        # Platform statistics are maintained on the SiteSettings row (core.stats);
+        # top craftsmen and categories come precomputed from one cache entry
+        stats = PlatformStats.get(site_settings)
+        home_snapshot = PlatformStats.home_snapshot()
 
         # BETA MODE: Count registered BETA members
         beta_count = 0
         if not settings.SUBSCRIPTIONS_ENABLED:
-            beta_count = CraftsmanProfile.objects.filter(beta_member=True).count()
+            beta_count = stats["beta_members"]
 
         context.update(
             {
                 "site_settings": site_settings,
-                "service_categories": ServiceCategory.objects.filter(is_active=True).annotate(
-                    orders_count=models.Count("services__order", filter=models.Q(services__order__status="published"))
-                )[:8],
+                "service_categories": home_snapshot["service_categories"],
                 "featured_testimonials": Testimonial.objects.filter(is_featured=True)[:3],
                 # Phase 9: Prioritize Pro members in featured craftsmen
-                "top_craftsmen": CraftsmanProfile.objects.filter(user__is_verified=True)
-                .select_related("subscription", "subscription__tier")
-                .annotate(
-                    tier_priority=models.Case(
-                        models.When(subscription__tier__name='pro', then=models.Value(0)),
-                        models.When(subscription__tier__name='plus', then=models.Value(1)),
-                        models.When(subscription__tier__name='free', then=models.Value(2)),
-                        default=models.Value(3),
-                        output_field=models.IntegerField(),
-                    )
-                ).order_by(
-                    "tier_priority",  # Pro > Plus > Free
-                    "-average_rating",
-                    "-total_reviews"
-                )[:6],
+                "top_craftsmen": home_snapshot["top_craftsmen"],
                 "counties": County.objects.all().order_by("name"),  # All counties
                 # Platform statistics
                 "stats": {
-                    "active_craftsmen": active_craftsmen,
-                    "avg_rating": round(avg_rating, 1) if avg_rating else 0,
-                    "completed_projects": completed_projects,
+                    "active_craftsmen": stats["active_craftsmen"],
+                    "avg_rating": stats["avg_rating"],
+                    "completed_projects": stats["completed_projects"],
                 },
                 # BETA MODE: Counter for first 100 members
                 "beta_count": beta_count,
@@ -144,105 +128,101 @@ class SearchView(ListView):
             pass
         return 60  # Default fallback
 
-    def get_queryset(self):
-        query = sanitize_query(self.request.GET.get("q", ""))
-        county_param = self.request.GET.get("county", "")
-        category_param = self.request.GET.get("category", "")
-        rating_min = self.request.GET.get("rating", "")
-
-        # Base queryset with active craftsmen
-        # Phase 9: Include subscription data for tier badges
-        queryset = (
-            CraftsmanProfile.objects.filter(user__is_active=True)
-            .select_related("user", "county", "city", "subscription", "subscription__tier")
-            .prefetch_related("services", "services__service", "services__service__category")
-        )
+    def get_search_query(self):
+        return sanitize_query(self.request.GET.get("q", ""))
+
+    def get_search_hits(self):
+        """
+        Ranked {profile_id: position} of the best text matches, or None without a query.
+        Only orders results; filtering uses the uncapped CraftsmanSearchIndex.matching().
+        """
+        if not hasattr(self, "_search_hits"):
+            query = self.get_search_query()
+            self._search_hits = CraftsmanSearchIndex.search(query) if query else None
+        return self._search_hits
+
+    def get_county(self):
+        if not hasattr(self, "_county"):
+            self._county = get_county_by_any(self.request.GET.get("county", ""))
+        return self._county
+
+    def get_active_category(self):
+        if not hasattr(self, "_active_category"):
+            self._active_category = None
+            category_param = self.request.GET.get("category", "")
+            if category_param:
+                self._active_category = ServiceCategory.objects.filter(
+                    slug=normalize_slug(category_param), is_active=True
+                ).first()
+        return self._active_category
+
+    def get_rating_min(self):
+        try:
+            return float(self.request.GET.get("rating", ""))
+        except (ValueError, TypeError):
+            return None
 
-        # Enhanced search with weighted scoring
+    def get_base_queryset(self):
+        """Active craftsmen matching the text query (every match, as a subquery)"""
+        queryset = CraftsmanProfile.objects.filter(user__is_active=True)
+        query = self.get_search_query()
         if query:
-            # Primary matches (higher weight)
-            primary_matches = Q(bio__icontains=query)
-
-            # Secondary matches (medium weight)
-            secondary_matches = (
-                Q(user__first_name__icontains=query)
-                | Q(user__last_name__icontains=query)
-                | Q(display_name__icontains=query)
-            )
-
-            # Normalize query to slug form to be accent-insensitive (e.g., "amenajare gradina" -> "amenajare-gradina")
-            normalized_query = slugify(query)
-
-            # Service matches by name/category
-            service_matches = Q(services__service__name__icontains=query) | Q(
-                services__service__category__name__icontains=query
-            )
-
-            # Service matches by slug (accent-insensitive)
-            service_slug_matches = Q(services__service__slug__icontains=normalized_query) | Q(
-                services__service__category__slug__icontains=normalized_query
-            )
-
-            # Token-based matching: split normalized query into tokens and match each token
-            tokens = [t for t in normalized_query.replace("-", " ").split() if t]
-            token_matches = Q()
-
-            # Common Romanian diacritics/synonyms variants for better matching
-            synonyms_map = {
-                "gradina": ["gradina", "grădină", "gradinarit", "grădinărit"],
-                "acoperis": ["acoperis", "acoperiș"],
-                "instalatii": ["instalatii", "instalații"],
-            }
-
-            for t in tokens:
-                variants = synonyms_map.get(t, [t])
-                for v in variants:
-                    token_matches |= (
-                        Q(services__service__slug__icontains=v)
-                        | Q(services__service__name__icontains=v)
-                        | Q(services__service__category__slug__icontains=v)
-                        | Q(services__service__category__name__icontains=v)
-                    )
-
-            # Optional: match in service or category descriptions
-            service_desc_matches = Q(services__service__description__icontains=query) | Q(
-                services__service__category__description__icontains=query
-            )
+            queryset = queryset.filter(CraftsmanSearchIndex.matching(query))
+        return queryset
 
-            # Apply search filters including services and ensure distinct results
-            queryset = queryset.filter(
-                primary_matches
-                | secondary_matches
-                | service_matches
-                | service_slug_matches
-                | token_matches
-                | service_desc_matches
-            ).distinct()
+    def get_facet_filters(self):
+        """Active facet filters as {dimension: Q}"""
+        filters = {}
 
         # Location filtering - accepts id, slug, or name
-        county = get_county_by_any(county_param)
+        county = self.get_county()
         if county:
-            queryset = queryset.filter(county=county)
-
-        # Category filtering - filter by service category slug
-        if category_param:
-            from .filters import normalize_slug
+            filters["county"] = Q(county=county)
 
-            normalized_category = normalize_slug(category_param)
-
-            # Validate against active categories
-            valid_slugs = set(ServiceCategory.objects.filter(is_active=True).values_list("slug", flat=True))
+        # Category filtering - subquery instead of a join so no DISTINCT is needed
+        active_category = self.get_active_category()
+        if active_category:
+            filters["category"] = Q(
+                pk__in=CraftsmanService.objects.filter(service__category=active_category).values("craftsman_id")
+            )
 
-            if normalized_category in valid_slugs:
-                queryset = queryset.filter(services__service__category__slug=normalized_category).distinct()
+        rating_min = self.get_rating_min()
+        if rating_min is not None:
+            filters["rating"] = Q(average_rating__gte=rating_min)
+
+        return filters
+
+    def get_facets(self, counties, categories):
+        """Facet counts for the current query and filters (one aggregate query, cached)"""
+        county = self.get_county()
+        active_category = self.get_active_category()
+        county_ids = [c.id for c in counties]
+        category_ids = [c.id for c in categories]
+        query = self.get_search_query()
+        signature = {
+            "view": "search",
+            "query": query_tokens(query) if query else None,
+            "county": county.id if county else None,
+            "category": active_category.id if active_category else None,
+            "rating": self.get_rating_min(),
+            "counties": county_ids,
+            "categories": category_ids,
+        }
+        return CraftsmanFacets.cached(
+            signature,
+            lambda: CraftsmanFacets.compute(
+                self.get_base_queryset(), self.get_facet_filters(), county_ids, category_ids
+            ),
+        )
 
-        # Rating filtering
-        if rating_min:
-            try:
-                rating_min = float(rating_min)
-                queryset = queryset.filter(average_rating__gte=rating_min)
-            except (ValueError, TypeError):
-                pass
+    def get_queryset(self):
+        # Phase 9: Include subscription data for tier badges
+        queryset = (
+            self.get_base_queryset()
+            .filter(*self.get_facet_filters().values())
+            .select_related("user", "county", "city", "subscription", "subscription__tier")
+            .prefetch_related("services", "services__service", "services__service__category")
+        )
 
         # Sorting based on sort parameter
         sort_by = self.request.GET.get("sort", "popular")
@@ -259,17 +239,31 @@ class SearchView(ListView):
             queryset = queryset.order_by("-average_rating", "-total_reviews")
         else:  # Default: "popular"
             # Phase 9: Intelligent ordering with subscription tier priority
-            from django.db.models import Case, When, Value, IntegerField
             queryset = queryset.annotate(
                 tier_priority=Case(
-                    When(subscription__tier__name='pro', then=Value(0)),
-                    When(subscription__tier__name='plus', then=Value(1)),
-                    When(subscription__tier__name='free', then=Value(2)),
+                    When(subscription__tier__name="pro", then=Value(0)),
+                    When(subscription__tier__name="plus", then=Value(1)),
+                    When(subscription__tier__name="free", then=Value(2)),
                     default=Value(3),
                     output_field=IntegerField(),
                 )
-            ).order_by(
-                "tier_priority",  # Pro > Plus > Free
+            )
+            ordering = ["tier_priority"]  # Pro > Plus > Free
+
+            # Within a tier, best text matches first
+            hits = self.get_search_hits()
+            if hits:
+                queryset = queryset.annotate(
+                    search_rank=Case(
+                        *[When(pk=profile_id, then=Value(position)) for profile_id, position in hits.items()],
+                        default=Value(len(hits)),
+                        output_field=IntegerField(),
+                    )
+                )
+                ordering.append("search_rank")
+
+            queryset = queryset.order_by(
+                *ordering,
                 "-user__is_verified",  # Verified craftsmen first
                 "-average_rating",  # Higher rated craftsmen
                 "-total_reviews",  # More reviewed craftsmen
@@ -290,86 +284,18 @@ class SearchView(ListView):
         per_page = self.get_paginate_by(None)
 
         # Get county object if specified (by id, slug, or name)
-        county = get_county_by_any(county_param)
-
-        # Get active category if specified
-        from .filters import normalize_slug
-
-        active_category = None
-        if category_param:
-            normalized_category = normalize_slug(category_param)
-            try:
-                active_category = ServiceCategory.objects.get(slug=normalized_category, is_active=True)
-            except ServiceCategory.DoesNotExist:
-                pass
+        county = self.get_county()
+        active_category = self.get_active_category()
 
-        # Calculate search statistics
-        total_craftsmen = CraftsmanProfile.objects.filter(user__is_active=True).count()
-        verified_craftsmen = CraftsmanProfile.objects.filter(user__is_active=True, user__is_verified=True).count()
+        counties = list(County.objects.all().order_by("name"))
+        service_categories = list(ServiceCategory.objects.filter(is_active=True).order_by("name"))
 
-        # Calculate rating bucket counts (BEFORE applying rating filter)
-        # This shows how many results would appear at each rating threshold
-        rating_counts = {}
-        rating_thresholds = [3.0, 3.5, 4.0, 4.5, 5.0]
-
-        # Build base queryset without rating filter for counting
-        base_queryset_for_rating = CraftsmanProfile.objects.filter(user__is_active=True)
-
-        # Apply same filters as main queryset (query, county, category) but NOT rating
-        if query:
-            # Reuse same search logic as get_queryset()
-            primary_matches = Q(bio__icontains=query)
-            secondary_matches = (
-                Q(user__first_name__icontains=query)
-                | Q(user__last_name__icontains=query)
-                | Q(display_name__icontains=query)
-            )
-            normalized_query = slugify(query)
-            service_matches = Q(services__service__name__icontains=query) | Q(
-                services__service__category__name__icontains=query
-            )
-            service_slug_matches = Q(services__service__slug__icontains=normalized_query) | Q(
-                services__service__category__slug__icontains=normalized_query
-            )
-            tokens = [t for t in normalized_query.replace("-", " ").split() if t]
-            token_matches = Q()
-            synonyms_map = {
-                "gradina": ["gradina", "grădină", "gradinarit", "grădinărit"],
-                "acoperis": ["acoperis", "acoperiș"],
-                "instalatii": ["instalatii", "instalații"],
-            }
-            for t in tokens:
-                variants = synonyms_map.get(t, [t])
-                for v in variants:
-                    token_matches |= (
-                        Q(services__service__slug__icontains=v)
-                        | Q(services__service__name__icontains=v)
-                        | Q(services__service__category__slug__icontains=v)
-                        | Q(services__service__category__name__icontains=v)
-                    )
-            service_desc_matches = Q(services__service__description__icontains=query) | Q(
-                services__service__category__description__icontains=query
-            )
-            base_queryset_for_rating = base_queryset_for_rating.filter(
-                primary_matches
-                | secondary_matches
-                | service_matches
-                | service_slug_matches
-                | token_matches
-                | service_desc_matches
-            ).distinct()
-
-        if county:
-            base_queryset_for_rating = base_queryset_for_rating.filter(county=county)
-
-        if category_param and active_category:
-            base_queryset_for_rating = base_queryset_for_rating.filter(
-                services__service__category__slug=active_category.slug
-            ).distinct()
-
-        # Count craftsmen at each rating threshold
-        for threshold in rating_thresholds:
-            rating_counts[threshold] = base_queryset_for_rating.filter(average_rating__gte=threshold).count()
+        # Site-wide statistics and facet counts for the current search (cached, one query each on a miss)
+        stats = CraftsmanFacets.cached(
+            {"view": "search_stats"},
+            lambda: CraftsmanFacets.compute(CraftsmanProfile.objects.filter(user__is_active=True)),
+        )
+        facets = self.get_facets(counties, service_categories)
 
         context.update(
             {
@@ -379,16 +305,19 @@ class SearchView(ListView):
                 "active_category": active_category,
                 "category_param": category_param,
                 "rating_min": rating_min,
-                "rating_counts": rating_counts,  # Pass rating bucket counts to template
+                "rating_counts": facets["ratings"],  # Pass rating bucket counts to template
+                "county_counts": facets["counties"],
+                "category_counts": facets["categories"],
+                "results_total": facets["total"],
                 "sort_by": sort_by,  # Current sort option
                 # "view_mode": view_mode,  # REMOVED: View toggle eliminated
                 "per_page": per_page,  # Current per-page setting
-                "counties": County.objects.all().order_by("name"),
-                "total_craftsmen": total_craftsmen,
-                "verified_craftsmen": verified_craftsmen,
+                "counties": counties,
+                "total_craftsmen": stats["total"],
+                "verified_craftsmen": stats["verified"],
                 "search_performed": bool(query or county or active_category or rating_min),
                 # Suggestions sidebar data
-                "service_categories": ServiceCategory.objects.filter(is_active=True).order_by("name"),
+                "service_categories": service_categories,
                 "popular_services": Service.objects.filter(is_popular=True, is_active=True).order_by("name")[:30],
             }
         )
@@ -4,7 +4,7 @@ Admin interface for messaging system
 
 from django.contrib import admin
 
-from .models import Conversation, Message, MessageAttachment, MessageTemplate
+from .models import Conversation, InboxEntry, Message, MessageAttachment, MessageTemplate
 
 
 class MessageInline(admin.TabularInline):
@@ -42,6 +42,15 @@ class MessageAdmin(admin.ModelAdmin):
     get_content_preview.short_description = "Conținut"
 
 
+@admin.register(InboxEntry)
+class InboxEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "conversation", "other_display_name", "unread_count", "last_activity_at")
+    search_fields = ("user__username", "other_display_name")
+    raw_id_fields = ("conversation", "user", "other_user", "last_message_sender")
+    # Maintained by send_message() / mark_as_read()
+    readonly_fields = ("last_message_snippet", "last_message_at", "last_activity_at", "unread_count")
+
+
 @admin.register(MessageAttachment)
 class MessageAttachmentAdmin(admin.ModelAdmin):
     list_display = ("id", "message", "filename", "file_size", "content_type", "created_at")
@@ -0,0 +1,53 @@
+"""
+Opaque cursors for keyset pagination on (timestamp, id).
+
+A cursor encodes the sort key of the last row shown; the next page continues strictly
+after it, so pages stay stable while new rows arrive and deep pages cost the same as
+the first one.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(timestamp, pk):
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(value):
+    """Return (timestamp, pk) or None for a missing or malformed cursor"""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        timestamp, pk = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def before_cursor(field, cursor):
+    """Rows sorting after `cursor` in (-field, -id) order"""
+    timestamp, pk = cursor
+    return Q(**{f"{field}__lt": timestamp}) | Q(**{field: timestamp, "id__lt": pk})
+
+
+def keyset_page(queryset, field, cursor, size):
+    """
+    One page of `queryset` ordered by (-field, -id) starting after `cursor`.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        queryset = queryset.filter(before_cursor(field, cursor))
+    rows = list(queryset.order_by(f"-{field}", "-id")[: size + 1])
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor(getattr(rows[-1], field), rows[-1].pk)
+    return rows, next_cursor
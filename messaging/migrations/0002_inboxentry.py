@@ -0,0 +1,126 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def display_data(user, profiles):
+    name = f"{user.first_name} {user.last_name}".strip() or user.username
+    avatar_url = ""
+    profile = profiles.get(user.pk) if user.user_type == "craftsman" else None
+    if profile:
+        name = profile.display_name or name
+        if profile.profile_photo:
+            avatar_url = profile.profile_photo.url
+    if not avatar_url and user.profile_picture:
+        avatar_url = user.profile_picture.url
+    return {"other_display_name": name[:200], "other_avatar_url": avatar_url}
+
+
+def backfill_inbox(apps, schema_editor):
+    Conversation = apps.get_model("messaging", "Conversation")
+    Message = apps.get_model("messaging", "Message")
+    InboxEntry = apps.get_model("messaging", "InboxEntry")
+    CraftsmanProfile = apps.get_model("accounts", "CraftsmanProfile")
+
+    unread = {
+        (row["conversation_id"], row["recipient_id"]): row["total"]
+        for row in Message.objects.filter(is_read=False)
+        .values("conversation_id", "recipient_id")
+        .annotate(total=Count("id"))
+    }
+    profiles = {profile.user_id: profile for profile in CraftsmanProfile.objects.all()}
+
+    entries = []
+    for conversation in Conversation.objects.prefetch_related("participants").iterator(chunk_size=500):
+        participants = list(conversation.participants.all())
+        if len(participants) != 2:
+            continue
+        last = Message.objects.filter(conversation=conversation).order_by("-created_at", "-id").first()
+        for owner, other in (participants, participants[::-1]):
+            entries.append(
+                InboxEntry(
+                    conversation=conversation,
+                    user=owner,
+                    other_user=other,
+                    last_message_snippet=last.content[:200] if last else "",
+                    last_message_sender_id=last.sender_id if last else None,
+                    last_message_at=last.created_at if last else None,
+                    last_activity_at=last.created_at if last else conversation.created_at,
+                    unread_count=unread.get((conversation.pk, owner.pk), 0),
+                    **display_data(other, profiles),
+                )
+            )
+    InboxEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0016_city_coordinates"),
+        ("messaging", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InboxEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("other_display_name", models.CharField(blank=True, max_length=200)),
+                ("other_avatar_url", models.CharField(blank=True, max_length=500)),
+                ("last_message_snippet", models.CharField(blank=True, max_length=200)),
+                ("last_message_at", models.DateTimeField(blank=True, null=True)),
+                ("last_activity_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+                (
+                    "conversation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inbox_entries",
+                        to="messaging.conversation",
+                    ),
+                ),
+                (
+                    "last_message_sender",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "other_user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inbox_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Intrare inbox",
+                "verbose_name_plural": "Intrări inbox",
+                "indexes": [models.Index(fields=["user", "-last_activity_at", "-id"], name="inbox_user_activity_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("conversation", "user"), name="unique_inbox_entry_per_participant")
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0002_inboxentry"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(fields=["conversation", "-created_at", "-id"], name="message_history_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("is_read", False)), fields=["conversation", "recipient"], name="message_unread_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:21
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def populate_participant_pairs(apps, schema_editor):
+    """Key existing two-party conversations; for duplicate threads the most recent one keeps the key"""
+    Conversation = apps.get_model("messaging", "Conversation")
+
+    participants = defaultdict(list)
+    for conversation_id, user_id in Conversation.participants.through.objects.values_list("conversation_id", "user_id"):
+        participants[conversation_id].append(str(user_id))
+
+    seen = set()
+    keyed = []
+    for conversation in Conversation.objects.order_by("-updated_at", "-id").only("id"):
+        users = participants.get(conversation.id, [])
+        if len(users) != 2:
+            continue
+        pair = ":".join(sorted(users))
+        if pair in seen:
+            continue
+        seen.add(pair)
+        conversation.participant_pair = pair
+        keyed.append(conversation)
+
+    Conversation.objects.bulk_update(keyed, ["participant_pair"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0003_message_history_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="participant_pair",
+            field=models.CharField(blank=True, editable=False, max_length=80, null=True, unique=True),
+        ),
+        migrations.RunPython(populate_participant_pairs, migrations.RunPython.noop),
+    ]
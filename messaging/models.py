@@ -3,9 +3,14 @@ Models for in-platform messaging system
 """
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
+from core.header_state import HeaderState
+from core.images import versioned_url
+
 User = get_user_model()
 
 
@@ -15,6 +20,8 @@ class Conversation(models.Model):
     """
 
     participants = models.ManyToManyField(User, related_name="conversations")
+    # Canonical key of the two participants (see participant_pair); one conversation per pair
+    participant_pair = models.CharField(max_length=80, unique=True, null=True, blank=True, editable=False)
     subject = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -44,9 +51,25 @@ class Conversation(models.Model):
         """Returnează ultimul mesaj din conversație"""
         return self.messages.first()
 
-    def mark_as_read(self, user):
-        """Marchează toate mesajele ca citite pentru un utilizator"""
-        self.messages.filter(recipient=user, is_read=False).update(is_read=True)
+    def mark_as_read(self, user, message_ids=None):
+        """
+        Marchează mesajele ca citite pentru un utilizator.
+
+        With message_ids only those messages (e.g. the window just displayed) are marked.
+        """
+        unread = self.messages.filter(recipient=user, is_read=False)
+        if message_ids is not None:
+            unread = unread.filter(id__in=message_ids)
+
+        with transaction.atomic():
+            updated = unread.update(is_read=True)
+            if updated:
+                InboxEntry.objects.filter(conversation=self, user=user).update(
+                    unread_count=Greatest(F("unread_count") - updated, 0)
+                )
+        if updated:
+            HeaderState.invalidate([user.pk], "messages")
+        return updated
 
 
 class Message(models.Model):
@@ -69,6 +92,14 @@ class Message(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Mesaj"
         verbose_name_plural = "Mesaje"
+        indexes = [
+            # Keyset pagination of a conversation's history
+            models.Index(fields=["conversation", "-created_at", "-id"], name="message_history_idx"),
+            # Mark-as-read only touches a recipient's unread rows
+            models.Index(
+                fields=["conversation", "recipient"], condition=Q(is_read=False), name="message_unread_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Mesaj de la {self.sender.username} către {self.recipient.username}"
@@ -77,7 +108,99 @@ class Message(models.Model):
         """Marchează mesajul ca citit"""
         if not self.is_read:
             self.is_read = True
-            self.save(update_fields=["is_read"])
+            with transaction.atomic():
+                self.save(update_fields=["is_read"])
+                InboxEntry.objects.filter(
+                    conversation_id=self.conversation_id, user_id=self.recipient_id, unread_count__gt=0
+                ).update(unread_count=F("unread_count") - 1)
+
+
+def participant_display_data(user):
+    """Numele și avatarul afișate pentru un utilizator în inbox"""
+    name = user.get_full_name() or user.username
+    avatar_url = ""
+    craftsman = getattr(user, "craftsman_profile", None) if user.user_type == "craftsman" else None
+    if craftsman:
+        name = craftsman.display_name or name
+        if craftsman.profile_photo:
+            avatar_url = versioned_url(craftsman.profile_photo, craftsman.profile_photo_hash)
+    if not avatar_url and user.profile_picture:
+        avatar_url = versioned_url(user.profile_picture, user.profile_picture_hash)
+    return {"other_display_name": name[:200], "other_avatar_url": avatar_url}
+
+
+class InboxEntry(models.Model):
+    """
+    Rândul unei conversații în inbox-ul unui participant.
+
+    Denormalised so the inbox page is a single indexed query: one row per (conversation,
+    participant) holding the last message snippet, the other participant's display data
+    and the participant's unread count. Maintained by send_message() and the mark_as_read()
+    methods in the same transaction as the messages they describe.
+    """
+
+    SNIPPET_LENGTH = 200
+
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name="inbox_entries")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="inbox_entries")
+
+    other_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    other_display_name = models.CharField(max_length=200, blank=True)
+    other_avatar_url = models.CharField(max_length=500, blank=True)
+
+    last_message_snippet = models.CharField(max_length=SNIPPET_LENGTH, blank=True)
+    last_message_sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # Sort key: last message time, or creation time for conversations without messages
+    last_activity_at = models.DateTimeField(default=timezone.now)
+
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Intrare inbox"
+        verbose_name_plural = "Intrări inbox"
+        constraints = [
+            models.UniqueConstraint(fields=["conversation", "user"], name="unique_inbox_entry_per_participant")
+        ]
+        indexes = [
+            # Keyset pagination of a user's inbox
+            models.Index(fields=["user", "-last_activity_at", "-id"], name="inbox_user_activity_idx"),
+        ]
+
+    def __str__(self):
+        return f"Inbox {self.user_id}: conversația {self.conversation_id}"
+
+    @property
+    def is_read(self):
+        return self.unread_count == 0
+
+    @staticmethod
+    def open(conversation, user, other_user):
+        """Creează rândurile de inbox pentru ambii participanți (dacă lipsesc)"""
+        for owner, other in ((user, other_user), (other_user, user)):
+            defaults = {"other_user": other, "last_activity_at": conversation.created_at}
+            defaults.update(participant_display_data(other))
+            InboxEntry.objects.get_or_create(conversation=conversation, user=owner, defaults=defaults)
+
+    @staticmethod
+    def record_message(message):
+        """Actualizează inbox-ul ambilor participanți după un mesaj nou"""
+        snippet = message.content[: InboxEntry.SNIPPET_LENGTH]
+        common = {
+            "last_message_snippet": snippet,
+            "last_message_sender": message.sender,
+            "last_message_at": message.created_at,
+            "last_activity_at": message.created_at,
+        }
+        for owner, other, unread in ((message.sender, message.recipient, 0), (message.recipient, message.sender, 1)):
+            values = {**common, "other_user": other, **participant_display_data(other)}
+            updated = InboxEntry.objects.filter(conversation_id=message.conversation_id, user=owner).update(
+                unread_count=F("unread_count") + unread, **values
+            )
+            if not updated:
+                InboxEntry.objects.create(
+                    conversation_id=message.conversation_id, user=owner, unread_count=unread, **values
+                )
 
 
 class MessageAttachment(models.Model):
@@ -127,21 +250,34 @@ class MessageTemplate(models.Model):
 
 
 # Utility functions for messaging
+def participant_pair(user1, user2):
+    """Cheia canonică a unei perechi de utilizatori (independentă de ordine)"""
+    return ":".join(sorted((str(user1.pk), str(user2.pk))))
+
+
 def create_conversation(user1, user2, subject="", related_order=None, related_craftsman=None):
     """
-    Creează o conversație între doi utilizatori
+    Creează o conversație între doi utilizatori (sau o returnează pe cea existentă)
     """
+    pair = participant_pair(user1, user2)
+
     # Verifică dacă există deja o conversație între acești utilizatori
-    existing_conversation = Conversation.objects.filter(participants=user1).filter(participants=user2).first()
+    existing_conversation = Conversation.objects.filter(participant_pair=pair).first()
 
     if existing_conversation:
         return existing_conversation
 
-    # Creează conversația nouă
-    conversation = Conversation.objects.create(
-        subject=subject, related_order=related_order, related_craftsman=related_craftsman
-    )
-    conversation.participants.add(user1, user2)
+    # Creează conversația nouă; indexul unic pe participant_pair oprește duplicatele concurente
+    try:
+        with transaction.atomic():
+            conversation = Conversation.objects.create(
+                participant_pair=pair, subject=subject, related_order=related_order, related_craftsman=related_craftsman
+            )
+            conversation.participants.add(user1, user2)
+            InboxEntry.open(conversation, user1, user2)
+    except IntegrityError:
+        # Another request created it first
+        return Conversation.objects.get(participant_pair=pair)
 
     return conversation
 
@@ -153,17 +289,19 @@ def send_message(sender, recipient, content, conversation=None, is_system_messag
     if not conversation:
         conversation = create_conversation(sender, recipient)
 
-    message = Message.objects.create(
-        conversation=conversation,
-        sender=sender,
-        recipient=recipient,
-        content=content,
-        is_system_message=is_system_message,
-    )
+    with transaction.atomic():
+        message = Message.objects.create(
+            conversation=conversation,
+            sender=sender,
+            recipient=recipient,
+            content=content,
+            is_system_message=is_system_message,
+        )
 
-    # Actualizează timestamp-ul conversației
-    conversation.updated_at = timezone.now()
-    conversation.save(update_fields=["updated_at"])
+        # Actualizează timestamp-ul conversației și inbox-ul participanților
+        conversation.updated_at = timezone.now()
+        conversation.save(update_fields=["updated_at"])
+        InboxEntry.record_message(message)
 
     return message
 
@@ -12,6 +12,7 @@ urlpatterns = [
     # Conversații
     path("", views.ConversationListView.as_view(), name="conversation_list"),
     path("conversatie/<int:pk>/", views.ConversationDetailView.as_view(), name="conversation_detail"),
+    path("conversatie/<int:conversation_id>/istoric/", views.message_history, name="message_history"),
     # Trimitere mesaje
     path("contact/<int:craftsman_id>/", views.send_contact_message, name="send_contact_message"),
     path("raspuns/<int:conversation_id>/", views.send_reply, name="send_reply"),
@@ -7,13 +7,16 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_POST
 from django.views.generic import DetailView, ListView
 
 from accounts.models import CraftsmanProfile
+from core.header_state import HeaderState
 
-from .models import Conversation, Message, create_conversation, send_message
+from .cursors import decode_cursor, keyset_page
+from .models import Conversation, InboxEntry, create_conversation, send_message
 
 
 @login_required
@@ -57,22 +60,40 @@ class ConversationListView(LoginRequiredMixin, ListView):
     Lista conversațiilor utilizatorului
     """
 
-    model = Conversation
+    model = InboxEntry
     template_name = "messaging/conversation_list.html"
     context_object_name = "conversations"
-    paginate_by = 20
+    page_size = 20
 
     def get_queryset(self):
-        return Conversation.objects.filter(participants=self.request.user).prefetch_related("participants", "messages")
+        # Rândurile denormalizate din inbox: o singură interogare indexată, paginată după cursor
+        entries = InboxEntry.objects.filter(user=self.request.user).select_related("conversation")
+        rows, self.next_cursor = keyset_page(
+            entries, "last_activity_at", decode_cursor(self.request.GET.get("cursor")), self.page_size
+        )
+        return rows
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context["next_cursor"] = self.next_cursor
+        context["unread_count"] = HeaderState.get(self.request.user)["messages"]
+        return context
 
-        # Numără mesajele necitite
-        unread_count = Message.objects.filter(recipient=self.request.user, is_read=False).count()
 
-        context["unread_count"] = unread_count
-        return context
+MESSAGE_PAGE_SIZE = 30
+
+
+def message_window(conversation, user, cursor):
+    """
+    One page of messages before `cursor` (the latest ones without a cursor), oldest first.
+
+    Marks the page's messages addressed to `user` as read. Returns (messages, older_cursor).
+    """
+    rows, older_cursor = keyset_page(conversation.messages.all(), "created_at", cursor, MESSAGE_PAGE_SIZE)
+    rows.reverse()
+
+    conversation.mark_as_read(user, [message.pk for message in rows if message.recipient_id == user.pk])
+    return rows, older_cursor
 
 
 class ConversationDetailView(LoginRequiredMixin, DetailView):
@@ -90,22 +111,30 @@ class ConversationDetailView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        conversation = self.get_object()
+        conversation = self.object
 
-        # Obține mesajele conversației
-        messages = conversation.messages.select_related("sender", "recipient").all()
-        context["messages"] = messages
+        # Ultimele mesaje; cele mai vechi se încarcă la cerere (message_history)
+        context["messages"], context["older_cursor"] = message_window(conversation, self.request.user, None)
 
         # Obține celălalt participant
-        other_participant = conversation.get_other_participant(self.request.user)
-        context["other_participant"] = other_participant
-
-        # Marchează mesajele ca citite
-        conversation.mark_as_read(self.request.user)
+        context["other_participant"] = conversation.get_other_participant(self.request.user)
 
         return context
 
 
+@login_required
+def message_history(request, conversation_id):
+    """
+    Returnează o pagină de mesaje mai vechi (AJAX, paginare după cursor)
+    """
+    conversation = get_object_or_404(Conversation, id=conversation_id, participants=request.user)
+
+    messages_page, older_cursor = message_window(conversation, request.user, decode_cursor(request.GET.get("cursor")))
+    html = render_to_string("messaging/_message_list.html", {"messages": messages_page}, request=request)
+
+    return JsonResponse({"html": html, "next_cursor": older_cursor})
+
+
 @login_required
 @require_POST
 @csrf_protect
@@ -159,6 +188,4 @@ def get_unread_count(request):
     """
     Returnează numărul de mesaje necitite (AJAX)
     """
-    unread_count = Message.objects.filter(recipient=request.user, is_read=False).count()
-
-    return JsonResponse({"unread_count": unread_count})
+    return JsonResponse({"unread_count": HeaderState.get(request.user)["messages"]})
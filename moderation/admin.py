@@ -30,13 +30,21 @@ class RateLimitAdmin(admin.ModelAdmin):
 
 @admin.register(IPBlock)
 class IPBlockAdmin(admin.ModelAdmin):
-    list_display = ("ip_address", "reason", "blocked_at", "blocked_until", "is_permanent", "is_active_status")
+    list_display = (
+        "ip_address",
+        "prefix_length",
+        "reason",
+        "blocked_at",
+        "blocked_until",
+        "is_permanent",
+        "is_active_status",
+    )
     list_filter = ("reason", "is_permanent", "blocked_at")
     search_fields = ("ip_address", "user_agent")
     readonly_fields = ("blocked_at",)
 
     fieldsets = (
-        (None, {"fields": ("ip_address", "reason", "is_permanent")}),
+        (None, {"fields": ("ip_address", "prefix_length", "reason", "is_permanent")}),
         ("Detalii blocare", {"fields": ("blocked_until", "user_agent", "notes")}),
         ("Moderare", {"fields": ("blocked_by", "blocked_at")}),
     )
@@ -5,3 +5,7 @@ class ModerationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "moderation"
     verbose_name = "Sistem de moderare și anti-abuz"
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import moderation.signals  # noqa: F401
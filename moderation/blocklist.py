@@ -0,0 +1,142 @@
+"""
+In-memory IP blocklist used by IPBlockingMiddleware.
+
+Active IPBlock rows are loaded into a per-process snapshot: exact addresses in a dict,
+CIDR ranges in one dict per prefix length keyed by the network's integer value, so a
+lookup is a handful of hash probes instead of a database query.
+
+The snapshot is reloaded when block_ip (or any IPBlock save/delete) bumps the shared
+version key in the cache, checked at most every VERSION_CHECK_INTERVAL seconds, and
+unconditionally after SNAPSHOT_TTL seconds in case the cache key was lost. A new block
+therefore reaches every worker within VERSION_CHECK_INTERVAL seconds.
+"""
+
+import ipaddress
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "ip_blocklist:version"
+VERSION_CHECK_INTERVAL = 5  # seconds
+SNAPSHOT_TTL = 300  # seconds
+
+
+class IPBlocklist:
+    """Immutable snapshot of active IP blocks"""
+
+    def __init__(self, entries=()):
+        self._addresses = {}  # ip string -> blocked_until (None = no expiry)
+        self._networks = {}  # (ip version, prefix length) -> {network int: blocked_until}
+        for ip_address, prefix_length, blocked_until in entries:
+            self._add(ip_address, prefix_length, blocked_until)
+
+    def __len__(self):
+        return len(self._addresses) + sum(len(networks) for networks in self._networks.values())
+
+    @classmethod
+    def load(cls):
+        """Build a snapshot from IPBlock rows that are active now"""
+        from .models import IPBlock
+
+        active = IPBlock.objects.filter(
+            Q(is_permanent=True) | Q(blocked_until__isnull=True) | Q(blocked_until__gt=timezone.now())
+        )
+        rows = active.values_list("ip_address", "prefix_length", "is_permanent", "blocked_until")
+        return cls(
+            (ip_address, prefix_length, None if is_permanent else blocked_until)
+            for ip_address, prefix_length, is_permanent, blocked_until in rows
+        )
+
+    def _add(self, ip_address, prefix_length, blocked_until):
+        try:
+            address = ipaddress.ip_address(ip_address)
+        except ValueError:
+            logger.warning(f"Ignoring invalid blocked IP {ip_address!r}")
+            return
+
+        if prefix_length is None or prefix_length >= address.max_prefixlen:
+            self._addresses[str(address)] = self._later(self._addresses.get(str(address), False), blocked_until)
+            return
+
+        network = ipaddress.ip_network(f"{address}/{prefix_length}", strict=False)
+        networks = self._networks.setdefault((address.version, prefix_length), {})
+        key = int(network.network_address)
+        networks[key] = self._later(networks.get(key, False), blocked_until)
+
+    @staticmethod
+    def _later(current, blocked_until):
+        # False = no entry yet; None = never expires and always wins
+        if current is False:
+            return blocked_until
+        if current is None or blocked_until is None:
+            return None
+        return max(current, blocked_until)
+
+    def is_blocked(self, ip_address, now=None):
+        try:
+            address = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return False
+
+        now = now or timezone.now()
+        expiries = [self._addresses.get(str(address), False)]
+
+        value = int(address)
+        for (version, prefix_length), networks in self._networks.items():
+            if version != address.version:
+                continue
+            mask = ((1 << prefix_length) - 1) << (address.max_prefixlen - prefix_length)
+            expiries.append(networks.get(value & mask, False))
+
+        return any(expiry is None or (expiry is not False and now < expiry) for expiry in expiries)
+
+
+_snapshot = None
+_snapshot_version = None
+_snapshot_loaded_at = 0.0
+_last_version_check = 0.0
+_load_lock = threading.Lock()
+
+
+def bump_blocklist_version():
+    """Tell every worker to reload its blocklist snapshot"""
+    cache.add(VERSION_CACHE_KEY, 0, None)
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        # Key evicted between add() and incr(); the TTL reload still applies
+        pass
+
+
+def get_blocklist():
+    """Return this process's blocklist snapshot, reloading it when stale"""
+    global _snapshot, _snapshot_version, _snapshot_loaded_at, _last_version_check
+
+    now = time.monotonic()
+    if _snapshot is not None and now - _last_version_check < VERSION_CHECK_INTERVAL:
+        return _snapshot
+
+    version = cache.get(VERSION_CACHE_KEY, 0)
+    _last_version_check = now
+    if _snapshot is not None and version == _snapshot_version and now - _snapshot_loaded_at < SNAPSHOT_TTL:
+        return _snapshot
+
+    with _load_lock:
+        if _snapshot is None or version != _snapshot_version or now - _snapshot_loaded_at >= SNAPSHOT_TTL:
+            _snapshot = IPBlocklist.load()
+            _snapshot_version = version
+            _snapshot_loaded_at = now
+    return _snapshot
+
+
+def reset_blocklist():
+    """Drop the local snapshot so the next lookup reloads it"""
+    global _snapshot
+
+    _snapshot = None
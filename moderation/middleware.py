@@ -2,13 +2,24 @@
 Middleware for moderation and anti-abuse
 """
 
-import time
-
-from django.http import HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
 from django.utils.deprecation import MiddlewareMixin
 
 from .models import block_ip, is_ip_blocked
+from .ratelimit import get_policies, hit_policy, policies_for_view
+
+
+def get_client_ip(request):
+    """
+    Obține IP-ul real al clientului, ținând cont de proxy-uri
+    """
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(",")[0].strip()
+    else:
+        ip = request.META.get("REMOTE_ADDR")
+    return ip
 
 
 class IPBlockingMiddleware(MiddlewareMixin):
@@ -31,79 +42,54 @@ class IPBlockingMiddleware(MiddlewareMixin):
         return None
 
     def get_client_ip(self, request):
-        """
-        Obține IP-ul real al clientului, ținând cont de proxy-uri
-        """
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0].strip()
-        else:
-            ip = request.META.get("REMOTE_ADDR")
-        return ip
+        return get_client_ip(request)
 
 
 class RateLimitingMiddleware(MiddlewareMixin):
     """
-    Middleware pentru rate limiting global
-    """
+    Middleware pentru rate limiting global și pe rute (autentificare, comenzi, oferte, mesaje)
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-        self.request_counts = {}  # IP -> (count, timestamp)
-        self.max_requests_per_minute = 60
-        super().__init__(get_response)
+    Contoarele sunt în cache (moderation.ratelimit), deci limitele sunt comune tuturor workerilor.
+    """
 
     def process_request(self, request):
-        if not hasattr(request, "client_ip"):
-            return None
+        ip_address = getattr(request, "client_ip", None) or get_client_ip(request)
+
+        result = hit_policy("global", ip_address)
+        if not result.allowed:
+            # Blochează IP-ul temporar pentru flood
+            block_ip(
+                ip_address=ip_address,
+                reason="flood",
+                duration_hours=1,
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            )
 
-        ip_address = request.client_ip
-        current_time = time.time()
-
-        # Curăță intrările vechi (mai vechi de 1 minut)
-        self.cleanup_old_entries(current_time)
-
-        # Verifică rate limiting pentru IP
-        if ip_address in self.request_counts:
-            count, first_request_time = self.request_counts[ip_address]
-
-            # Dacă sunt în aceeași fereastră de timp (1 minut)
-            if current_time - first_request_time < 60:
-                if count >= self.max_requests_per_minute:
-                    # Blochează IP-ul temporar pentru flood
-                    block_ip(
-                        ip_address=ip_address,
-                        reason="flood",
-                        duration_hours=1,
-                        user_agent=request.META.get("HTTP_USER_AGENT", ""),
-                    )
-
-                    return HttpResponseForbidden(
-                        render(request, "moderation/rate_limited.html", {"ip_address": ip_address}).content
-                    )
-                else:
-                    # Incrementează contorul
-                    self.request_counts[ip_address] = (count + 1, first_request_time)
-            else:
-                # Nouă fereastră de timp
-                self.request_counts[ip_address] = (1, current_time)
-        else:
-            # Prima cerere pentru acest IP
-            self.request_counts[ip_address] = (1, current_time)
+            return HttpResponseForbidden(
+                render(request, "moderation/rate_limited.html", {"ip_address": ip_address}).content
+            )
 
         return None
 
-    def cleanup_old_entries(self, current_time):
-        """
-        Curăță intrările mai vechi de 1 minut
-        """
-        expired_ips = []
-        for ip, (count, timestamp) in self.request_counts.items():
-            if current_time - timestamp > 60:
-                expired_ips.append(ip)
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None:
+            return None
+
+        for name in policies_for_view(match.view_name, request.method):
+            user = getattr(request, "user", None)
+            if get_policies()[name].get("key") == "user" and user is not None and user.is_authenticated:
+                identity = f"user:{user.pk}"
+            else:
+                identity = getattr(request, "client_ip", None) or get_client_ip(request)
 
-        for ip in expired_ips:
-            del self.request_counts[ip]
+            result = hit_policy(name, identity)
+            if not result.allowed:
+                response = HttpResponse(render(request, "moderation/rate_limited.html").content, status=429)
+                response["Retry-After"] = str(result.retry_after)
+                return response
+
+        return None
 
 
 class SuspiciousActivityMiddleware(MiddlewareMixin):
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moderation", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ipblock",
+            name="prefix_length",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Lungime prefix CIDR pentru blocarea unui interval (ex. 24); gol = doar acest IP",
+                null=True,
+            ),
+        ),
+    ]
@@ -7,6 +7,7 @@ from datetime import timedelta
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 
@@ -88,6 +89,11 @@ class IPBlock(models.Model):
     ]
 
     ip_address = models.GenericIPAddressField()
+    prefix_length = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Lungime prefix CIDR pentru blocarea unui interval (ex. 24); gol = doar acest IP",
+    )
     reason = models.CharField(max_length=20, choices=BLOCK_REASONS)
     blocked_at = models.DateTimeField(auto_now_add=True)
     blocked_until = models.DateTimeField(null=True, blank=True)
@@ -104,8 +110,16 @@ class IPBlock(models.Model):
         ordering = ["-blocked_at"]
 
     def __str__(self):
+        if self.prefix_length is not None:
+            return f"IP {self.ip_address}/{self.prefix_length} - {self.get_reason_display()}"
         return f"IP {self.ip_address} - {self.get_reason_display()}"
 
+    def clean(self):
+        if self.prefix_length is not None and self.ip_address:
+            max_prefix = 128 if ":" in self.ip_address else 32
+            if self.prefix_length > max_prefix:
+                raise ValidationError({"prefix_length": f"Prefixul maxim pentru această adresă este /{max_prefix}."})
+
     def is_active(self):
         """Verifică dacă blocarea este încă activă"""
         if self.is_permanent:
@@ -271,28 +285,24 @@ class ImageModerationQueue(models.Model):
 def check_rate_limit(user, limit_type):
     """
     Verifică și actualizează rate limiting pentru un utilizator
-    """
-    rate_limit, created = RateLimit.objects.get_or_create(
-        user=user, limit_type=limit_type, defaults={"count": 0, "window_start": timezone.now()}
-    )
 
-    if rate_limit.can_perform_action():
-        rate_limit.increment_count()
-        return True
+    Folosește aceleași limite ca RateLimit (utilizatori noi / verificați, fereastră în ore),
+    dar contorul este ținut în cache de moderation.ratelimit, fără scrieri în baza de date.
+    """
+    from .ratelimit import check_user_action
 
-    return False
+    return check_user_action(user, limit_type).allowed
 
 
 def is_ip_blocked(ip_address):
     """
-    Verifică dacă un IP este blocat
-    """
-    blocked_ip = IPBlock.objects.filter(ip_address=ip_address).first()
+    Verifică dacă un IP este blocat (inclusiv prin intervale CIDR)
 
-    if blocked_ip:
-        return blocked_ip.is_active()
+    Interogarea se face pe snapshot-ul din memorie (moderation.blocklist), nu în baza de date.
+    """
+    from .blocklist import get_blocklist
 
-    return False
+    return get_blocklist().is_blocked(ip_address)
 
 
 def block_ip(ip_address, reason="flood", duration_hours=24, user_agent="", blocked_by=None):
@@ -312,6 +322,13 @@ def block_ip(ip_address, reason="flood", duration_hours=24, user_agent="", block
         },
     )
 
+    # Reactivează o blocare expirată pentru același IP
+    if not created and not ip_block.is_active():
+        ip_block.reason = reason
+        ip_block.blocked_until = blocked_until
+        ip_block.is_permanent = duration_hours is None
+        ip_block.save(update_fields=["reason", "blocked_until", "is_permanent"])
+
     return ip_block
 
 
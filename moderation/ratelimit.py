@@ -0,0 +1,228 @@
+"""
+Rate limiting engine for the moderation middleware and check_rate_limit.
+
+Counters live in the Django cache (Redis in production), so every worker enforces the
+same limit and restarts don't reset them. The default backend is a sliding window
+counter: each key has one bucket per fixed window, and the previous bucket is weighted
+by how much of it still overlaps the sliding window. A hit costs two cache operations
+no matter how many clients are being tracked.
+
+The backend is pluggable through settings.RATE_LIMITER_BACKEND (dotted path to a
+BaseRateLimiter subclass) and the policies through settings.RATE_LIMIT_POLICIES.
+
+Per-user action limits (check_user_action) come from the user's RateLimit rows, as edited
+in the admin, cached per user until a row changes (see moderation.signals).
+"""
+
+import functools
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = "moderation.ratelimit.CacheSlidingWindowLimiter"
+
+# Each policy allows `limit` requests per `window` seconds, counted per client IP ("ip")
+# or per logged-in user ("user", anonymous requests fall back to IP). "global" applies
+# to every request; the others only to the listed URL names and HTTP methods.
+DEFAULT_POLICIES = {
+    "global": {"limit": 60, "window": 60, "key": "ip"},
+    "login": {
+        "limit": 5,
+        "window": 60,
+        "key": "ip",
+        "methods": ["POST"],
+        "views": ["auth:login", "auth:two_factor_verify", "auth:password_reset"],
+    },
+    "order_creation": {
+        "limit": 10,
+        "window": 60 * 60,
+        "key": "user",
+        "methods": ["POST"],
+        "views": ["services:create_order"],
+    },
+    "quote_creation": {
+        "limit": 30,
+        "window": 60 * 60,
+        "key": "user",
+        "methods": ["POST"],
+        "views": ["services:create_quote"],
+    },
+    "message_sending": {
+        "limit": 20,
+        "window": 60,
+        "key": "user",
+        "methods": ["POST"],
+        "views": ["messaging:send_contact_message", "messaging:send_reply"],
+    },
+}
+
+# Users younger than this get the stricter RateLimit.max_limit_new_user allowance
+NEW_USER_DAYS = 30
+
+# Action limits for users without a RateLimit row of that type (overridable via
+# settings.RATE_LIMIT_USER_ACTIONS); the same values the RateLimit fields default to
+DEFAULT_USER_ACTION_LIMITS = {"max_limit_new_user": 3, "max_limit_verified_user": 10, "window_hours": 24}
+USER_ACTION_LIMITS_TIMEOUT = 60 * 60
+
+
+class RateLimitResult:
+    """Outcome of a single rate limit hit"""
+
+    __slots__ = ("allowed", "count", "limit", "retry_after")
+
+    def __init__(self, allowed, count, limit, retry_after=0):
+        self.allowed = allowed
+        self.count = count
+        self.limit = limit
+        self.retry_after = retry_after
+
+    def __bool__(self):
+        return self.allowed
+
+    def __repr__(self):
+        return f"RateLimitResult(allowed={self.allowed}, count={self.count}, limit={self.limit})"
+
+
+class BaseRateLimiter:
+    """Interface for rate limiter backends"""
+
+    def hit(self, key, limit, window):
+        """
+        Record one request for `key` and report whether it fits in `limit` per `window` seconds.
+
+        Rejected requests are not counted, so a client that keeps retrying is let through
+        again as soon as its accepted requests age out of the window.
+        """
+        raise NotImplementedError
+
+    def reset(self, key, window):
+        """Forget every request recorded for `key`"""
+        raise NotImplementedError
+
+
+class CacheSlidingWindowLimiter(BaseRateLimiter):
+    """Sliding window counter stored in a Django cache"""
+
+    key_prefix = "ratelimit"
+
+    def __init__(self, cache_alias="default"):
+        self.cache = caches[cache_alias]
+
+    def _bucket_key(self, key, window, index):
+        return f"{self.key_prefix}:{key}:{window}:{index}"
+
+    def _incr(self, bucket_key, window):
+        try:
+            return self.cache.incr(bucket_key)
+        except ValueError:
+            # First hit in this bucket; keep it long enough to act as the previous bucket
+            if self.cache.add(bucket_key, 1, window * 2):
+                return 1
+            return self.cache.incr(bucket_key)
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        index, offset = divmod(now, window)
+        index = int(index)
+        current_key = self._bucket_key(key, window, index)
+
+        current = self._incr(current_key, window)
+        previous = self.cache.get(self._bucket_key(key, window, index - 1), 0)
+
+        # Share of the previous bucket still inside the sliding window
+        weight = 1 - offset / window
+        count = previous * weight + current
+
+        if count > limit:
+            try:
+                self.cache.decr(current_key)
+            except ValueError:
+                pass
+            return RateLimitResult(False, int(count) - 1, limit, retry_after=int(window - offset) + 1)
+
+        return RateLimitResult(True, int(count), limit)
+
+    def reset(self, key, window):
+        index = int(time.time() // window)
+        self.cache.delete_many([self._bucket_key(key, window, i) for i in (index - 1, index)])
+
+
+@functools.cache
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_rate_limiter():
+    """Return the configured rate limiter backend instance"""
+    return _load_backend(getattr(settings, "RATE_LIMITER_BACKEND", DEFAULT_BACKEND))
+
+
+def get_policies():
+    return getattr(settings, "RATE_LIMIT_POLICIES", DEFAULT_POLICIES)
+
+
+def hit_policy(name, identity):
+    """Count one request from `identity` (IP or user id) against the named policy"""
+    policy = get_policies().get(name)
+    if policy is None:
+        return RateLimitResult(True, 0, None)
+    return get_rate_limiter().hit(f"{name}:{identity}", policy["limit"], policy["window"])
+
+
+def policies_for_view(view_name, method):
+    """Names of the route policies matching a resolved URL name and HTTP method"""
+    matching = []
+    for name, policy in get_policies().items():
+        views = policy.get("views")
+        if not views or view_name not in views:
+            continue
+        methods = policy.get("methods")
+        if methods and method not in methods:
+            continue
+        matching.append(name)
+    return matching
+
+
+def _user_action_limits_key(user_id):
+    return f"ratelimit:user_limits:{user_id}"
+
+
+def user_action_limits(user_id):
+    """
+    The user's RateLimit rows as {limit_type: {max_limit_new_user, max_limit_verified_user,
+    window_hours}}, read once and cached until one of them is saved or deleted.
+    """
+    key = _user_action_limits_key(user_id)
+    limits = cache.get(key)
+    if limits is None:
+        from .models import RateLimit
+
+        rows = RateLimit.objects.filter(user_id=user_id).values("limit_type", *DEFAULT_USER_ACTION_LIMITS)
+        limits = {row.pop("limit_type"): row for row in rows}
+        cache.set(key, limits, USER_ACTION_LIMITS_TIMEOUT)
+    return limits
+
+
+def invalidate_user_action_limits(user_id):
+    cache.delete(_user_action_limits_key(user_id))
+
+
+def check_user_action(user, limit_type):
+    """
+    Rate limit a user action with the semantics of moderation.models.RateLimit:
+    new users (< 30 days) get max_limit_new_user actions, others
+    max_limit_verified_user, per window_hours. Limits come from the user's RateLimit
+    row for limit_type, or the configured defaults when there is none.
+    """
+    limits = user_action_limits(user.pk).get(limit_type) or getattr(
+        settings, "RATE_LIMIT_USER_ACTIONS", DEFAULT_USER_ACTION_LIMITS
+    )
+    is_new_user = user.date_joined > timezone.now() - timedelta(days=NEW_USER_DAYS)
+    limit = limits["max_limit_new_user"] if is_new_user else limits["max_limit_verified_user"]
+    window = limits["window_hours"] * 60 * 60
+
+    return get_rate_limiter().hit(f"user_action:{limit_type}:{user.pk}", limit, window)
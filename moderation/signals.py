@@ -0,0 +1,29 @@
+"""
+Signal handlers for moderation app
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .blocklist import bump_blocklist_version, reset_blocklist
+from .models import IPBlock, RateLimit
+from .ratelimit import invalidate_user_action_limits
+
+
+def _reload_blocklist():
+    reset_blocklist()
+    bump_blocklist_version()
+
+
+@receiver([post_save, post_delete], sender=IPBlock)
+def ip_block_changed(sender, instance, **kwargs):
+    """Propagate new or removed IP blocks to every worker's blocklist snapshot"""
+    transaction.on_commit(_reload_blocklist)
+
+
+@receiver([post_save, post_delete], sender=RateLimit)
+def rate_limit_changed(sender, instance, **kwargs):
+    """Admin-edited limits apply from the user's next action"""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_user_action_limits(user_id))
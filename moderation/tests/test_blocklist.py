@@ -0,0 +1,120 @@
+"""
+Tests for the in-memory IP blocklist (moderation.blocklist).
+
+Tests verify:
+1. Exact addresses, CIDR ranges and expiry are honoured by the snapshot
+2. is_ip_blocked answers from memory without querying the database
+3. A block created by another worker is picked up within VERSION_CHECK_INTERVAL
+4. The snapshot is reloaded after SNAPSHOT_TTL even without a version bump
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from moderation import blocklist
+from moderation.blocklist import IPBlocklist, bump_blocklist_version, reset_blocklist
+from moderation.models import IPBlock, block_ip, is_ip_blocked
+
+
+@pytest.fixture(autouse=True)
+def fresh_blocklist():
+    cache.clear()
+    reset_blocklist()
+    yield
+    reset_blocklist()
+
+
+class TestIPBlocklist:
+    """Test snapshot lookups"""
+
+    def test_exact_address(self):
+        snapshot = IPBlocklist([("10.0.0.1", None, None)])
+        assert snapshot.is_blocked("10.0.0.1")
+        assert not snapshot.is_blocked("10.0.0.2")
+
+    def test_cidr_ranges(self):
+        snapshot = IPBlocklist([("192.168.1.77", 24, None), ("2001:db8::1", 32, None)])
+        assert snapshot.is_blocked("192.168.1.1")
+        assert snapshot.is_blocked("192.168.1.254")
+        assert not snapshot.is_blocked("192.168.2.1")
+        assert snapshot.is_blocked("2001:db8:ffff::5")
+        assert not snapshot.is_blocked("2001:db9::1")
+
+    def test_expired_entries_are_ignored(self):
+        now = timezone.now()
+        snapshot = IPBlocklist(
+            [("10.0.0.1", None, now - timedelta(minutes=1)), ("10.0.0.2", None, now + timedelta(hours=1))]
+        )
+        assert not snapshot.is_blocked("10.0.0.1", now)
+        assert snapshot.is_blocked("10.0.0.2", now)
+
+    def test_invalid_input_is_not_blocked(self):
+        snapshot = IPBlocklist([("not-an-ip", None, None)])
+        assert len(snapshot) == 0
+        assert not snapshot.is_blocked("also-not-an-ip")
+
+
+@pytest.mark.django_db
+class TestIsIPBlocked:
+    """Test lookups and propagation through moderation.models.is_ip_blocked"""
+
+    def test_lookup_does_not_query_database(self, django_assert_num_queries):
+        IPBlock.objects.create(ip_address="10.0.0.1", reason="manual", is_permanent=True)
+        assert is_ip_blocked("10.0.0.1")
+
+        with django_assert_num_queries(0):
+            for _ in range(100):
+                assert is_ip_blocked("10.0.0.1")
+                assert not is_ip_blocked("10.0.0.2")
+
+    def test_block_ip_is_visible_immediately_in_same_worker(self, django_capture_on_commit_callbacks):
+        assert not is_ip_blocked("10.0.0.3")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            block_ip("10.0.0.3", duration_hours=1)
+
+        assert is_ip_blocked("10.0.0.3")
+
+    def test_block_from_other_worker_propagates_within_interval(self):
+        clock = [1000.0]
+        with mock.patch("moderation.blocklist.time.monotonic", side_effect=lambda: clock[0]):
+            assert not is_ip_blocked("10.0.0.4")
+
+            # Another worker inserts the block and bumps the shared version; this process's
+            # snapshot is untouched (queryset insert, no local signal handling)
+            IPBlock.objects.bulk_create([IPBlock(ip_address="10.0.0.4", reason="flood", is_permanent=True)])
+            bump_blocklist_version()
+
+            clock[0] += blocklist.VERSION_CHECK_INTERVAL - 1
+            assert not is_ip_blocked("10.0.0.4")
+
+            clock[0] += 1
+            assert is_ip_blocked("10.0.0.4")
+
+    def test_snapshot_reloads_after_ttl_without_version_bump(self):
+        clock = [1000.0]
+        with mock.patch("moderation.blocklist.time.monotonic", side_effect=lambda: clock[0]):
+            assert not is_ip_blocked("10.0.0.5")
+
+            IPBlock.objects.bulk_create([IPBlock(ip_address="10.0.0.5", reason="flood", is_permanent=True)])
+
+            clock[0] += blocklist.VERSION_CHECK_INTERVAL
+            assert not is_ip_blocked("10.0.0.5")
+
+            clock[0] += blocklist.SNAPSHOT_TTL
+            assert is_ip_blocked("10.0.0.5")
+
+    def test_expired_block_is_reactivated(self, django_capture_on_commit_callbacks):
+        IPBlock.objects.create(
+            ip_address="10.0.0.6", reason="flood", blocked_until=timezone.now() - timedelta(hours=1)
+        )
+        assert not is_ip_blocked("10.0.0.6")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            block_ip("10.0.0.6", duration_hours=1)
+
+        assert is_ip_blocked("10.0.0.6")
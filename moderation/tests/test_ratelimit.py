@@ -0,0 +1,147 @@
+"""
+Tests for the cache-backed rate limiting engine (moderation.ratelimit).
+
+Tests verify:
+1. The sliding window counter allows up to the limit and rejects beyond it
+2. The previous window still counts, weighted by its overlap
+3. Route policies in RateLimitingMiddleware apply per URL name and method
+4. check_rate_limit keeps RateLimit's new/verified user limits
+5. Per-user RateLimit rows override the defaults and are re-read when edited
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils import timezone
+
+from accounts.models import User
+from moderation.middleware import RateLimitingMiddleware
+from moderation.models import RateLimit, check_rate_limit
+from moderation.ratelimit import CacheSlidingWindowLimiter, policies_for_view
+
+TEST_POLICIES = {
+    "global": {"limit": 100, "window": 60, "key": "ip"},
+    "login": {"limit": 2, "window": 60, "key": "ip", "methods": ["POST"], "views": ["auth:login"]},
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestCacheSlidingWindowLimiter:
+    """Test the sliding window counter"""
+
+    def test_allows_up_to_limit(self):
+        limiter = CacheSlidingWindowLimiter()
+        with mock.patch("moderation.ratelimit.time.time", return_value=1000.0):
+            results = [limiter.hit("client", 3, 60) for _ in range(5)]
+
+        assert [r.allowed for r in results] == [True, True, True, False, False]
+        assert results[3].retry_after > 0
+
+    def test_rejected_hits_are_not_counted(self):
+        limiter = CacheSlidingWindowLimiter()
+        with mock.patch("moderation.ratelimit.time.time", return_value=1000.0):
+            for _ in range(10):
+                limiter.hit("client", 2, 60)
+            assert cache.get(limiter._bucket_key("client", 60, 1000 // 60)) == 2
+
+    def test_previous_window_is_weighted(self):
+        limiter = CacheSlidingWindowLimiter()
+        # Fill the window [960, 1020) completely
+        with mock.patch("moderation.ratelimit.time.time", return_value=965.0):
+            for _ in range(4):
+                assert limiter.hit("client", 4, 60).allowed
+
+        # 15s into the next window, 75% of the previous one still overlaps: 3 + 1 = 4 allowed
+        with mock.patch("moderation.ratelimit.time.time", return_value=1035.0):
+            assert limiter.hit("client", 4, 60).allowed
+            assert not limiter.hit("client", 4, 60).allowed
+
+        # Near the end of the window the old hits barely count any more
+        with mock.patch("moderation.ratelimit.time.time", return_value=1079.0):
+            assert limiter.hit("client", 4, 60).allowed
+
+    def test_keys_are_independent(self):
+        limiter = CacheSlidingWindowLimiter()
+        assert limiter.hit("a", 1, 60).allowed
+        assert not limiter.hit("a", 1, 60).allowed
+        assert limiter.hit("b", 1, 60).allowed
+
+
+class TestRateLimitingMiddleware:
+    """Test route policies in the middleware"""
+
+    @pytest.fixture(autouse=True)
+    def policies(self, settings):
+        settings.RATE_LIMIT_POLICIES = TEST_POLICIES
+
+    def _process(self, method, path):
+        request = getattr(RequestFactory(), method)(path, REMOTE_ADDR="10.0.0.1")
+        request.resolver_match = resolve(path)
+        request.user = AnonymousUser()
+        middleware = RateLimitingMiddleware(lambda r: HttpResponse())
+        return middleware.process_request(request) or middleware.process_view(request, None, (), {})
+
+    def test_policies_match_view_and_method(self):
+        assert policies_for_view("auth:login", "POST") == ["login"]
+        assert policies_for_view("auth:login", "GET") == []
+        assert policies_for_view("services:search", "POST") == []
+
+    @pytest.mark.django_db
+    def test_login_policy_returns_429(self):
+        assert self._process("post", "/autentificare/") is None
+        assert self._process("post", "/autentificare/") is None
+
+        response = self._process("post", "/autentificare/")
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) > 0
+
+        # GET requests to the same route are only subject to the global policy
+        assert self._process("get", "/autentificare/") is None
+
+
+@pytest.mark.django_db
+class TestCheckRateLimit:
+    """Test RateLimit semantics through the shared engine"""
+
+    def test_new_user_gets_lower_limit(self):
+        user = User.objects.create_user(username="newbie", email="newbie@test.com", password="x")
+
+        assert [check_rate_limit(user, "order_creation") for _ in range(4)] == [True, True, True, False]
+        # Other action types have their own counter
+        assert check_rate_limit(user, "message_sending")
+
+    def test_verified_user_gets_higher_limit(self):
+        user = User.objects.create_user(username="veteran", email="veteran@test.com", password="x")
+        user.date_joined = timezone.now() - timedelta(days=60)
+
+        results = [check_rate_limit(user, "order_creation") for _ in range(11)]
+        assert results.count(True) == 10
+        assert not results[-1]
+
+    def test_configured_row_overrides_defaults(self, django_assert_num_queries, django_capture_on_commit_callbacks):
+        user = User.objects.create_user(username="limited", email="limited@test.com", password="x")
+        with django_capture_on_commit_callbacks(execute=True):
+            row = RateLimit.objects.create(user=user, limit_type="order_creation", max_limit_new_user=1)
+
+        assert check_rate_limit(user, "order_creation")
+        # Limits are cached per user
+        with django_assert_num_queries(0):
+            assert not check_rate_limit(user, "order_creation")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            row.max_limit_new_user = 2
+            row.save()
+        assert check_rate_limit(user, "order_creation")
+        assert not check_rate_limit(user, "order_creation")
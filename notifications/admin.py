@@ -3,7 +3,9 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.html import format_html
 
-from .models import Notification, NotificationPreference, PushSubscription
+from core.header_state import HeaderState
+
+from .models import Notification, NotificationDelivery, NotificationPreference, PushSubscription
 
 
 @admin.register(Notification)
@@ -56,7 +58,9 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def mark_as_unread(self, request, queryset):
         """Mark selected notifications as unread"""
+        recipient_ids = list(queryset.filter(is_read=True).values_list("recipient_id", flat=True).distinct())
         updated = queryset.filter(is_read=True).update(is_read=False, read_at=None)
+        HeaderState.invalidate(recipient_ids, "notifications")
         self.message_user(request, f"{updated} notificări au fost marcate ca necitite.")
 
     mark_as_unread.short_description = "Marchează ca necitite"
@@ -227,6 +231,28 @@ class PushSubscriptionAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related("user")
 
 
+@admin.register(NotificationDelivery)
+class NotificationDeliveryAdmin(admin.ModelAdmin):
+    list_display = ["notification", "channel", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["channel", "status", "created_at"]
+    search_fields = ["notification__title", "notification__recipient__username", "last_error"]
+    readonly_fields = ["created_at", "sent_at", "locked_at", "attempts", "last_error", "payload"]
+
+    actions = ["retry_deliveries"]
+
+    def retry_deliveries(self, request, queryset):
+        """Requeue failed deliveries for immediate retry"""
+        updated = queryset.filter(status="failed").update(
+            status="pending", attempts=0, next_attempt_at=timezone.now(), last_error=""
+        )
+        self.message_user(request, f"{updated} livrări au fost repuse în coadă.")
+
+    retry_deliveries.short_description = "Reîncearcă livrările eșuate"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("notification", "notification__recipient")
+
+
 # Custom admin site configuration
 admin.site.site_header = "Administrare Bricli"
 admin.site.site_title = "Bricli Admin"
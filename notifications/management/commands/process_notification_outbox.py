@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.services import NotificationDeliveryService
+
+
+class Command(BaseCommand):
+    help = "Deliver queued email/push notifications from the outbox (retries failures with backoff)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Deliveries claimed per batch (default: 100)"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Thread pool size for SMTP/push calls (default: 4)"
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox instead of exiting")
+        parser.add_argument(
+            "--interval", type=float, default=2.0, help="Seconds to sleep when the outbox is empty (default: 2)"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        loop = options["loop"]
+        interval = options["interval"]
+
+        self.stdout.write(self.style.SUCCESS(f"Processing notification outbox (workers={workers}, loop={loop})"))
+
+        totals = {}
+        try:
+            while True:
+                results = NotificationDeliveryService.process_pending(batch_size=batch_size, workers=workers)
+                processed = sum(results.values())
+
+                for status, count in results.items():
+                    totals[status] = totals.get(status, 0) + count
+
+                if processed:
+                    summary = ", ".join(f"{status}={count}" for status, count in results.items() if count)
+                    self.stdout.write(f"Processed {processed} deliveries: {summary}")
+                    continue
+
+                if not loop:
+                    break
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Interrupted"))
+
+        summary = ", ".join(f"{status}={count}" for status, count in totals.items() if count) or "nothing to do"
+        self.stdout.write(self.style.SUCCESS(f"Outbox run finished: {summary}"))
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:06
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationDelivery",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "channel",
+                    models.CharField(
+                        choices=[("email", "Email"), ("push", "Push")], max_length=10, verbose_name="Canal"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "În așteptare"),
+                            ("processing", "În procesare"),
+                            ("sent", "Trimisă"),
+                            ("skipped", "Omisă"),
+                            ("failed", "Eșuată"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Date suplimentare",
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0, verbose_name="Încercări")),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Următoarea încercare"),
+                ),
+                ("locked_at", models.DateTimeField(blank=True, null=True, verbose_name="Preluată la")),
+                ("last_error", models.TextField(blank=True, verbose_name="Ultima eroare")),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now, verbose_name="Creat la")),
+                ("sent_at", models.DateTimeField(blank=True, null=True, verbose_name="Trimisă la")),
+                (
+                    "notification",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="notifications.notification",
+                        verbose_name="Notificare",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Livrare notificare",
+                "verbose_name_plural": "Livrări notificări",
+                "ordering": ["next_attempt_at"],
+                "indexes": [models.Index(fields=["status", "next_attempt_at"], name="notificatio_status_e1aed1_idx")],
+                "unique_together": {("notification", "channel")},
+            },
+        ),
+    ]
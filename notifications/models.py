@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
@@ -254,3 +255,61 @@ class PushSubscription(models.Model):
 
     def __str__(self):
         return f"Push subscription - {self.user.username}"
+
+
+class DeliveryChannel(models.TextChoices):
+    """Channels through which a notification can be delivered"""
+
+    EMAIL = "email", "Email"
+    PUSH = "push", "Push"
+
+
+class DeliveryStatus(models.TextChoices):
+    """Lifecycle states of an outbox delivery"""
+
+    PENDING = "pending", "În așteptare"
+    PROCESSING = "processing", "În procesare"
+    SENT = "sent", "Trimisă"
+    SKIPPED = "skipped", "Omisă"
+    FAILED = "failed", "Eșuată"
+
+
+class NotificationDelivery(models.Model):
+    """
+    Outbox entry for delivering a notification over one channel.
+
+    The request path only inserts these rows; the `process_notification_outbox`
+    worker sends them, retrying failures with exponential backoff.
+    """
+
+    notification = models.ForeignKey(
+        Notification, on_delete=models.CASCADE, related_name="deliveries", verbose_name="Notificare"
+    )
+    channel = models.CharField(max_length=10, choices=DeliveryChannel.choices, verbose_name="Canal")
+    status = models.CharField(
+        max_length=20, choices=DeliveryStatus.choices, default=DeliveryStatus.PENDING, verbose_name="Status"
+    )
+
+    # Extra push payload data (order ids, urls, etc.)
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Date suplimentare")
+
+    # Retry bookkeeping
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Încercări")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Următoarea încercare")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Preluată la")
+    last_error = models.TextField(blank=True, verbose_name="Ultima eroare")
+
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Creat la")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Trimisă la")
+
+    class Meta:
+        ordering = ["next_attempt_at"]
+        verbose_name = "Livrare notificare"
+        verbose_name_plural = "Livrări notificări"
+        unique_together = ["notification", "channel"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_channel_display()} - {self.notification_id} ({self.status})"
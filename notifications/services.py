@@ -1,18 +1,29 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
-from django.db import models, transaction
+from django.db import connection, models, transaction
+from django.db.models import Exists, F, OuterRef, Q, QuerySet
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.html import strip_tags
 from pywebpush import WebPushException, webpush
 
-from .models import Notification, NotificationPreference, PushSubscription
+from core.header_state import HeaderState
+
+from .models import (
+    DeliveryChannel,
+    DeliveryStatus,
+    Notification,
+    NotificationDelivery,
+    NotificationPreference,
+    PushSubscription,
+)
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -58,28 +69,19 @@ class NotificationService:
                 # Get user preferences
                 preferences = NotificationPreference.objects.filter(user=recipient).first()
 
-                # Send email notification if enabled
+                channels = []
                 if (
                     send_email
                     and preferences
                     and NotificationService._should_send_email(preferences, notification_type)
                 ):
-                    email_sent = EmailNotificationService.send_notification_email(notification)
-                    notification.email_sent = email_sent
+                    channels.append(DeliveryChannel.EMAIL)
 
-                # Send push notification if enabled
                 if send_push and preferences and NotificationService._should_send_push(preferences, notification_type):
-                    push_sent = PushNotificationService.send_push_notification(
-                        user=recipient,
-                        title=title,
-                        message=message,
-                        action_url=action_url,
-                        notification_id=notification.id,
-                        data=data,
-                    )
-                    notification.push_sent = push_sent
+                    channels.append(DeliveryChannel.PUSH)
 
-                notification.save()
+                # Email/push fan-out happens off-request via the delivery outbox
+                NotificationDeliveryService.enqueue(notification, channels, data=data)
 
                 logger.info(f"Notification created: {notification.id} for user {recipient.username}")
                 return notification
@@ -125,23 +127,96 @@ class NotificationService:
         action_url: str | None = None,
     ) -> list[Notification]:
         """Create notifications for multiple recipients"""
+        return NotificationService.fan_out_notifications(
+            recipients=User.objects.filter(pk__in=[recipient.pk for recipient in recipients]),
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            priority=priority,
+            sender=sender,
+            action_url=action_url,
+        )
 
-        notifications = []
-        for recipient in recipients:
-            try:
-                notification = NotificationService.create_notification(
-                    recipient=recipient,
-                    title=title,
-                    message=message,
-                    notification_type=notification_type,
-                    priority=priority,
-                    sender=sender,
-                    action_url=action_url,
-                )
-                notifications.append(notification)
-            except Exception as e:
-                logger.error(f"Error creating notification for user {recipient.username}: {str(e)}")
+    @staticmethod
+    def fan_out_notifications(
+        recipients: QuerySet,
+        title: str,
+        message: str,
+        notification_type: str = "system",
+        priority: str = "medium",
+        sender: User | None = None,
+        action_url: str | None = None,
+        related_object_type: str | None = None,
+        related_object_id: int | None = None,
+        data: dict[str, Any] | None = None,
+        send_email: bool = True,
+        send_push: bool = True,
+    ) -> list[Notification]:
+        """
+        Create the same notification for every user in `recipients` in a constant number of queries.
+
+        Recipients are resolved together with their preferences and push-device availability in one
+        query, notifications and outbox deliveries are written with one bulk INSERT each, and the
+        actual email/push sending is left to the outbox worker.
+        """
+        recipients = recipients.select_related("notification_preferences").annotate(
+            has_active_push=Exists(PushSubscription.objects.filter(user=OuterRef("pk"), is_active=True))
+        )
+
+        with transaction.atomic():
+            recipient_list = list(recipients)
+            if not recipient_list:
+                return []
+
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        recipient=recipient,
+                        sender=sender,
+                        title=title,
+                        message=message,
+                        notification_type=notification_type,
+                        priority=priority,
+                        action_url=action_url,
+                        related_object_type=related_object_type,
+                        related_object_id=related_object_id,
+                    )
+                    for recipient in recipient_list
+                ],
+                batch_size=500,
+            )
+
+            deliveries = []
+            for notification, recipient in zip(notifications, recipient_list, strict=True):
+                preferences = getattr(recipient, "notification_preferences", None)
+                if not preferences:
+                    continue
+
+                if send_email and NotificationService._should_send_email(preferences, notification_type):
+                    deliveries.append(
+                        NotificationDelivery(
+                            notification=notification, channel=DeliveryChannel.EMAIL, payload=data or {}
+                        )
+                    )
+
+                if (
+                    send_push
+                    and recipient.has_active_push
+                    and NotificationService._should_send_push(preferences, notification_type)
+                ):
+                    deliveries.append(
+                        NotificationDelivery(
+                            notification=notification, channel=DeliveryChannel.PUSH, payload=data or {}
+                        )
+                    )
+
+            NotificationDeliveryService.enqueue_batch(deliveries)
+
+            # bulk_create skips post_save, so bump the header badges here
+            recipient_ids = [recipient.pk for recipient in recipient_list]
+            transaction.on_commit(lambda: HeaderState.adjust(recipient_ids, "notifications", 1))
 
+        logger.info(f"Fan-out created {len(notifications)} notifications and {len(deliveries)} deliveries")
         return notifications
 
     @staticmethod
@@ -176,8 +251,8 @@ class EmailNotificationService:
     """Service for sending email notifications"""
 
     @staticmethod
-    def send_notification_email(notification: Notification) -> bool:
-        """Send email notification"""
+    def send_notification_email(notification: Notification, fail_silently: bool = True) -> bool:
+        """Send email notification (with fail_silently=False errors are re-raised for retrying)"""
         try:
             # Check if user is in quiet hours
             preferences = NotificationPreference.objects.filter(user=notification.recipient).first()
@@ -214,6 +289,8 @@ class EmailNotificationService:
 
         except Exception as e:
             logger.error(f"Error sending email notification {notification.id}: {str(e)}")
+            if not fail_silently:
+                raise
             return False
 
     @staticmethod
@@ -460,6 +537,161 @@ class PushNotificationService:
         return inactive_count
 
 
+class DeliveryError(Exception):
+    """Raised when a delivery attempt failed and should be retried"""
+
+
+class NotificationDeliveryService:
+    """
+    Durable outbox for email/push delivery.
+
+    `create_notification` only inserts NotificationDelivery rows inside the caller's
+    transaction; the `process_notification_outbox` worker claims due rows, sends them
+    and reschedules failures with exponential backoff.
+    """
+
+    MAX_ATTEMPTS = 5
+    BACKOFF_BASE_SECONDS = 30
+    # Rows stuck in "processing" longer than this (crashed worker) are claimed again
+    LOCK_TIMEOUT = timedelta(minutes=5)
+
+    @staticmethod
+    def enqueue(
+        notification: Notification, channels: list[str], data: dict[str, Any] | None = None
+    ) -> list[NotificationDelivery]:
+        """Queue delivery of a notification over the given channels"""
+        return NotificationDeliveryService.enqueue_batch(
+            [
+                NotificationDelivery(notification=notification, channel=channel, payload=data or {})
+                for channel in channels
+            ]
+        )
+
+    @staticmethod
+    def enqueue_batch(deliveries: list[NotificationDelivery]) -> list[NotificationDelivery]:
+        """Insert unsaved deliveries with a single bulk INSERT"""
+        if not deliveries:
+            return []
+
+        deliveries = NotificationDelivery.objects.bulk_create(deliveries, batch_size=500)
+
+        # Development convenience: deliver right after commit instead of waiting for the worker
+        if getattr(settings, "NOTIFICATION_DELIVERY_EAGER", False):
+            delivery_ids = [delivery.id for delivery in deliveries]
+            transaction.on_commit(
+                lambda: NotificationDeliveryService.process_pending(
+                    batch_size=len(delivery_ids), delivery_ids=delivery_ids
+                )
+            )
+
+        return deliveries
+
+    @staticmethod
+    def claim_due(batch_size: int = 100, delivery_ids: list[int] | None = None) -> list[NotificationDelivery]:
+        """Atomically claim up to batch_size due deliveries for this worker"""
+        now = timezone.now()
+        due = NotificationDelivery.objects.filter(
+            Q(status=DeliveryStatus.PENDING, next_attempt_at__lte=now)
+            | Q(status=DeliveryStatus.PROCESSING, locked_at__lt=now - NotificationDeliveryService.LOCK_TIMEOUT)
+        )
+        if delivery_ids is not None:
+            due = due.filter(id__in=delivery_ids)
+
+        candidates = due.order_by("next_attempt_at").values_list("id", "status", "locked_at")[:batch_size]
+
+        claimed_ids = []
+        for delivery_id, status, locked_at in candidates:
+            # Conditional UPDATE: only one worker can move a row out of the state it was read in
+            claimed = NotificationDelivery.objects.filter(id=delivery_id, status=status, locked_at=locked_at).update(
+                status=DeliveryStatus.PROCESSING, locked_at=now, attempts=F("attempts") + 1
+            )
+            if claimed:
+                claimed_ids.append(delivery_id)
+
+        return list(
+            NotificationDelivery.objects.filter(id__in=claimed_ids).select_related("notification__recipient")
+        )
+
+    @staticmethod
+    def deliver(delivery: NotificationDelivery) -> str:
+        """Send one claimed delivery and record the outcome. Returns the resulting status."""
+        notification = delivery.notification
+        now = timezone.now()
+
+        try:
+            if delivery.channel == DeliveryChannel.EMAIL:
+                sent = EmailNotificationService.send_notification_email(notification, fail_silently=False)
+            else:
+                recipient = notification.recipient
+                if not PushSubscription.objects.filter(user=recipient, is_active=True).exists():
+                    sent = False
+                elif PushNotificationService.send_push_notification(
+                    user=recipient,
+                    title=notification.title,
+                    message=notification.message,
+                    action_url=notification.action_url,
+                    notification_id=notification.id,
+                    data=delivery.payload,
+                ):
+                    sent = True
+                else:
+                    raise DeliveryError("Push delivery failed on all active subscriptions")
+
+        except Exception as e:
+            attempts = max(delivery.attempts, 1)
+            if attempts >= NotificationDeliveryService.MAX_ATTEMPTS:
+                status = DeliveryStatus.FAILED
+                next_attempt_at = now
+            else:
+                status = DeliveryStatus.PENDING
+                backoff = NotificationDeliveryService.BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)
+                next_attempt_at = now + timedelta(seconds=backoff)
+
+            NotificationDelivery.objects.filter(pk=delivery.pk).update(
+                status=status, next_attempt_at=next_attempt_at, locked_at=None, last_error=str(e)[:2000]
+            )
+            logger.warning(f"Delivery {delivery.pk} ({delivery.channel}) attempt {attempts} failed: {str(e)}")
+            return status
+
+        # Nothing was sent (quiet hours, no push devices) - not an error, don't retry
+        status = DeliveryStatus.SENT if sent else DeliveryStatus.SKIPPED
+        NotificationDelivery.objects.filter(pk=delivery.pk).update(
+            status=status, locked_at=None, sent_at=now if sent else None
+        )
+
+        if sent:
+            sent_field = "email_sent" if delivery.channel == DeliveryChannel.EMAIL else "push_sent"
+            Notification.objects.filter(pk=notification.pk).update(**{sent_field: True})
+
+        return status
+
+    @staticmethod
+    def process_pending(
+        batch_size: int = 100, workers: int = 1, delivery_ids: list[int] | None = None
+    ) -> dict[str, int]:
+        """Claim and deliver one batch of due deliveries, optionally on a thread pool"""
+        deliveries = NotificationDeliveryService.claim_due(batch_size=batch_size, delivery_ids=delivery_ids)
+
+        if workers > 1 and len(deliveries) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                statuses = list(executor.map(NotificationDeliveryService._deliver_in_thread, deliveries))
+        else:
+            statuses = [NotificationDeliveryService.deliver(delivery) for delivery in deliveries]
+
+        results = {status: 0 for status in DeliveryStatus.values}
+        for status in statuses:
+            results[status] += 1
+        return results
+
+    @staticmethod
+    def _deliver_in_thread(delivery: NotificationDelivery) -> str:
+        """Thread pool entry point - each worker thread owns (and must close) its DB connection"""
+        try:
+            return NotificationDeliveryService.deliver(delivery)
+        finally:
+            connection.close()
+
+
 class NotificationTemplateService:
     """Service for managing notification templates"""
 
@@ -0,0 +1,134 @@
+"""
+Tests for the notification delivery outbox.
+
+Tests verify:
+1. create_notification only queues deliveries (no SMTP/push on the request path)
+2. The worker delivers queued email and records per-channel status
+3. Failures are retried with exponential backoff and eventually marked failed
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from accounts.models import User
+from notifications.models import DeliveryStatus, Notification, NotificationDelivery, NotificationPreference
+from notifications.services import NotificationDeliveryService, NotificationService
+
+
+@pytest.mark.django_db
+class TestNotificationOutbox:
+    """Test queued notification delivery"""
+
+    @pytest.fixture
+    def recipient(self, db):
+        user = User.objects.create_user(username="outbox_user", email="outbox@test.com", password="testpass123")
+        NotificationPreference.objects.get_or_create(user=user)
+        return user
+
+    def _create(self, recipient, **kwargs):
+        return NotificationService.create_notification(
+            recipient=recipient,
+            title="Ofertă nouă",
+            message="Ați primit o ofertă.",
+            notification_type="quote",
+            **kwargs,
+        )
+
+    def test_create_notification_only_queues_deliveries(self, recipient):
+        """Request path inserts outbox rows but sends nothing"""
+        with mock.patch("notifications.services.webpush") as webpush:
+            notification = self._create(recipient)
+
+        deliveries = NotificationDelivery.objects.filter(notification=notification)
+        assert sorted(deliveries.values_list("channel", flat=True)) == ["email", "push"]
+        assert all(d.status == DeliveryStatus.PENDING for d in deliveries)
+        assert len(mail.outbox) == 0
+        webpush.assert_not_called()
+
+    def test_disabled_channels_are_not_queued(self, recipient):
+        """Preferences and send_* flags decide which channels get an outbox row"""
+        NotificationPreference.objects.filter(user=recipient).update(email_quotes=False)
+        notification = self._create(recipient, send_push=False)
+
+        assert not NotificationDelivery.objects.filter(notification=notification).exists()
+
+    def test_worker_delivers_email(self, recipient):
+        """Worker sends the email and marks the channel as sent"""
+        notification = self._create(recipient, send_push=False)
+
+        results = NotificationDeliveryService.process_pending()
+
+        assert results[DeliveryStatus.SENT] == 1
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ["outbox@test.com"]
+
+        delivery = NotificationDelivery.objects.get(notification=notification)
+        assert delivery.status == DeliveryStatus.SENT
+        assert delivery.sent_at is not None
+        notification.refresh_from_db()
+        assert notification.email_sent is True
+
+    def test_push_without_subscriptions_is_skipped(self, recipient):
+        """No active devices is not an error and is not retried"""
+        notification = self._create(recipient, send_email=False)
+
+        NotificationDeliveryService.process_pending()
+
+        delivery = NotificationDelivery.objects.get(notification=notification)
+        assert delivery.status == DeliveryStatus.SKIPPED
+        assert delivery.attempts == 1
+
+    def test_failed_delivery_is_retried_with_backoff(self, recipient):
+        """SMTP errors reschedule the delivery instead of dropping it"""
+        notification = self._create(recipient, send_push=False)
+
+        with mock.patch("notifications.services.send_mail", side_effect=ConnectionError("SMTP down")):
+            results = NotificationDeliveryService.process_pending()
+
+        assert results[DeliveryStatus.PENDING] == 1
+        delivery = NotificationDelivery.objects.get(notification=notification)
+        assert delivery.status == DeliveryStatus.PENDING
+        assert delivery.attempts == 1
+        assert "SMTP down" in delivery.last_error
+        assert delivery.next_attempt_at > timezone.now() + timedelta(seconds=20)
+
+        # Not due yet - a second run leaves it alone
+        assert sum(NotificationDeliveryService.process_pending().values()) == 0
+
+    def test_delivery_fails_after_max_attempts(self, recipient):
+        """The last allowed attempt marks the delivery as failed"""
+        notification = self._create(recipient, send_push=False)
+        NotificationDelivery.objects.filter(notification=notification).update(
+            attempts=NotificationDeliveryService.MAX_ATTEMPTS - 1
+        )
+
+        with mock.patch("notifications.services.send_mail", side_effect=ConnectionError("SMTP down")):
+            NotificationDeliveryService.process_pending()
+
+        delivery = NotificationDelivery.objects.get(notification=notification)
+        assert delivery.status == DeliveryStatus.FAILED
+        assert Notification.objects.get(pk=notification.pk).email_sent is False
+
+    def test_claimed_deliveries_are_not_claimed_twice(self, recipient):
+        """A row claimed by one worker is invisible to the next one until its lock expires"""
+        self._create(recipient, send_push=False)
+
+        assert len(NotificationDeliveryService.claim_due()) == 1
+        assert NotificationDeliveryService.claim_due() == []
+
+        NotificationDelivery.objects.update(locked_at=timezone.now() - timedelta(minutes=10))
+        assert len(NotificationDeliveryService.claim_due()) == 1
+
+    def test_management_command_drains_outbox(self, recipient):
+        """process_notification_outbox delivers everything that is due"""
+        self._create(recipient, send_push=False)
+
+        call_command("process_notification_outbox", "--workers", "1")
+
+        assert NotificationDelivery.objects.get().status == DeliveryStatus.SENT
+        assert len(mail.outbox) == 1
@@ -0,0 +1,114 @@
+"""
+Tests for the unread-count stream (notifications.views.unread_stream) and core.realtime.
+
+Tests verify:
+1. The local broker delivers published messages and times out quietly
+2. Publishing waits for the surrounding transaction to commit
+3. The stream sends the current counts, then fresh counts when woken
+4. Requests outside ASGI are told to stop reconnecting
+"""
+
+import asyncio
+import json
+
+import pytest
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, RequestFactory
+
+from accounts.models import User
+from core import realtime
+from core.header_state import HeaderState, header_state_key
+from core.realtime import LocalBroker, get_broker, publish_to_users, user_channel
+from notifications.models import Notification
+from notifications.views import unread_stream
+
+
+@pytest.fixture(autouse=True)
+def local_broker(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(realtime, "_broker", LocalBroker())
+    yield
+    cache.clear()
+
+
+def _events(chunk):
+    return [json.loads(line[len("data: ") :]) for line in chunk.splitlines() if line.startswith("data: ")]
+
+
+class TestLocalBroker:
+    """Test in-process pub/sub"""
+
+    def test_subscriber_receives_published_messages(self):
+        async def scenario():
+            broker = get_broker()
+            async with broker.subscribe("bricli:user:1") as subscription:
+                broker.publish("bricli:user:1", {"field": "messages", "delta": 1})
+                broker.publish("bricli:user:2", {"field": "messages", "delta": 1})
+                return [await subscription.get(timeout=1), await subscription.get(timeout=0.01)]
+
+        assert asyncio.run(scenario()) == [{"field": "messages", "delta": 1}, None]
+
+
+@pytest.mark.django_db
+class TestUnreadStream:
+    """Test the SSE endpoint"""
+
+    @pytest.fixture
+    def user(self, db):
+        return User.objects.create_user(username="stream_user", email="stream@test.com", password="x")
+
+    def test_publish_waits_for_commit(self, user, monkeypatch, django_capture_on_commit_callbacks):
+        published = []
+        monkeypatch.setattr(LocalBroker, "publish", lambda self, channel, message: published.append(channel))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            publish_to_users([user.pk], {"field": "notifications", "delta": 1})
+            assert published == []
+
+        assert published == [user_channel(user.pk)]
+
+    def test_notification_creation_is_published(self, user, monkeypatch, django_capture_on_commit_callbacks):
+        published = []
+        monkeypatch.setattr(LocalBroker, "publish", lambda self, channel, message: published.append(message))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Notification.objects.create(recipient=user, title="Titlu", message="Mesaj")
+
+        assert published == [{"field": "notifications", "delta": 1}]
+
+    def test_stream_sends_counts_then_updates(self, user):
+        HeaderState.get(user)  # warm the cache; the stream then reads no rows
+        request = AsyncRequestFactory().get("/notifications/stream/")
+
+        async def auser():
+            return user
+
+        request.auser = auser
+
+        async def scenario():
+            response = await unread_stream(request)
+            chunks = response.streaming_content
+            first = await anext(chunks)
+
+            cache.incr(header_state_key(user.pk, "messages"), 2)
+            get_broker().publish(user_channel(user.pk), {"field": "messages", "delta": 2})
+            second = await anext(chunks)
+            await chunks.aclose()
+            return response, first, second
+
+        response, first, second = asyncio.run(scenario())
+
+        assert response["Content-Type"] == "text/event-stream"
+        assert first.startswith(b"retry: ")
+        assert _events(first.decode()) == [{"notifications": 0, "messages": 0}]
+        assert _events(second.decode()) == [{"notifications": 0, "messages": 2}]
+
+    def test_wsgi_request_gets_no_stream(self, user):
+        request = RequestFactory().get("/notifications/stream/")
+
+        async def auser():
+            return user
+
+        request.auser = auser
+
+        assert asyncio.run(unread_stream(request)).status_code == 204
@@ -17,6 +17,8 @@ urlpatterns = [
     # AJAX endpoints
     path("toggle-read/<int:notification_id>/", views.toggle_notification_read, name="toggle_read"),
     path("delete/<int:notification_id>/", views.delete_notification, name="delete"),
+    # Server-Sent Events (served under ASGI)
+    path("stream/", views.unread_stream, name="stream"),
     # API endpoints
     path(
         "api/",
@@ -1,9 +1,13 @@
+import asyncio
+import json
 from datetime import datetime, timedelta
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import Count, Q
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
@@ -14,6 +18,9 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.header_state import HeaderState
+from core.realtime import get_broker, user_channel
+
 from .models import Notification, NotificationPreference
 from .serializers import (
     BulkNotificationSerializer,
@@ -272,6 +279,7 @@ class BulkNotificationAPIView(APIView):
 
             elif action == "mark_unread":
                 updated = notifications.filter(is_read=True).update(is_read=False, read_at=None)
+                HeaderState.invalidate([request.user.pk], "notifications")
                 message = f"{updated} notificări au fost marcate ca necitite."
 
             elif action == "delete":
@@ -303,9 +311,56 @@ def mark_all_read(request):
 @permission_classes([permissions.IsAuthenticated])
 def unread_count(request):
     """Get unread notification count for the current user"""
-    count = Notification.objects.filter(recipient=request.user, is_read=False).count()
+    return Response({"unread_count": HeaderState.get(request.user)["notifications"]})
+
+
+# Unread-count stream: the client holds one EventSource connection instead of polling
+STREAM_HEARTBEAT_SECONDS = 25
+# Connections are recycled so proxies and workers never hold them indefinitely
+STREAM_MAX_SECONDS = 300
+STREAM_RETRY_MS = 5000
+
+
+def _unread_counts(user):
+    state = HeaderState.get(user)
+    return {"notifications": state["notifications"], "messages": state["messages"]}
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _unread_events(user):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_MAX_SECONDS
+
+    # Subscribe before reading the counts so no change falls between the two
+    async with get_broker().subscribe(user_channel(user.pk)) as subscription:
+        yield f"retry: {STREAM_RETRY_MS}\n" + _sse("unread", await sync_to_async(_unread_counts)(user))
+
+        while loop.time() < deadline:
+            message = await subscription.get(timeout=min(STREAM_HEARTBEAT_SECONDS, deadline - loop.time()))
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            # Deltas only wake the stream; the cached counts are authoritative
+            yield _sse("unread", await sync_to_async(_unread_counts)(user))
+
+
+async def unread_stream(request):
+    """Server-Sent Events stream of the user's unread notification and message counts"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI a stream would pin a worker; 204 tells EventSource to stop and the client polls
+        return HttpResponse(status=204)
 
-    return Response({"unread_count": count})
+    response = StreamingHttpResponse(_unread_events(user), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # disable nginx buffering
+    return response
 
 
 @api_view(["POST"])
@@ -0,0 +1,220 @@
+"""
+Craftsman calendar feeds: quotes with a proposed start date.
+
+- JSON (CraftsmanCalendarEventsView): FullCalendar events for the visible start/end
+  window only, read through the (craftsman, proposed_start_date) index. Responses carry
+  an ETag derived from the craftsman's calendar generation, so revalidating an
+  unchanged window costs no query.
+- iCalendar (CraftsmanCalendarICSView): a subscribable .ics feed behind a signed URL,
+  so phone calendars can poll without a session. The rendered feed is cached; when the
+  calendar changes only events whose quote or order title changed are rendered again.
+
+The generation is a cache tag (core.cache_utils) bumped by services.signals on quote
+writes and order title changes.
+"""
+
+import logging
+import uuid
+from datetime import date, timedelta
+
+from django.core import signing
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache_utils import CacheManager, get_tag_versions
+
+logger = logging.getLogger(__name__)
+
+# Longest window the JSON feed serves (FullCalendar's month grid spans six weeks)
+MAX_WINDOW_DAYS = 366
+# Past events kept in the .ics feed
+ICS_PAST_DAYS = 180
+ICS_TIMEOUT = CacheManager.TIMEOUTS["very_long"]
+ICS_SALT = "services.calendar_feed.ics"
+UID_DOMAIN = "bricli.ro"
+# Event colours by quote status (accepted quotes stand out)
+COLORS = {"accepted": ("#8B5CF6", "#7C3AED"), None: ("#6b7280", "#4b5563")}
+# Stands in for the order id when the order_detail URL is reversed
+ORDER_PK_PLACEHOLDER = uuid.UUID(int=0)
+
+
+def calendar_tag(craftsman_id):
+    return f"calendar:{craftsman_id}"
+
+
+def calendar_version(craftsman_id):
+    """Current generation of a craftsman's calendar (no database access)"""
+    tag = calendar_tag(craftsman_id)
+    return get_tag_versions([tag], create=True)[tag]
+
+
+def calendar_etag(craftsman_id, start, end):
+    return f'"{calendar_version(craftsman_id)}-{start.isoformat()}-{end.isoformat()}"'
+
+
+def _quote_rows(craftsman_id, start=None, end=None):
+    from .models import Quote
+
+    quotes = Quote.objects.filter(craftsman_id=craftsman_id, proposed_start_date__isnull=False)
+    if start is not None:
+        quotes = quotes.filter(proposed_start_date__gte=start)
+    if end is not None:
+        quotes = quotes.filter(proposed_start_date__lt=end)
+    return quotes.order_by("proposed_start_date").values(
+        "id", "status", "price", "estimated_duration", "proposed_start_date", "updated_at", "order_id", "order__title"
+    )
+
+
+def _order_url_pattern():
+    """order_detail URL with a {pk} placeholder, reversed once instead of once per event"""
+    url = reverse("services:order_detail", kwargs={"pk": ORDER_PK_PLACEHOLDER})
+    return url.replace(str(ORDER_PK_PLACEHOLDER), "{pk}")
+
+
+def calendar_events(craftsman_id, start, end):
+    """FullCalendar events for quotes starting in [start, end)"""
+    order_url = _order_url_pattern()
+    events = []
+    for row in _quote_rows(craftsman_id, start, end):
+        background, border = COLORS.get(row["status"], COLORS[None])
+        events.append(
+            {
+                "id": str(row["id"]),
+                "title": row["order__title"],
+                "start": row["proposed_start_date"].isoformat(),
+                "url": order_url.format(pk=row["order_id"]),
+                "backgroundColor": background,
+                "borderColor": border,
+                "textColor": "#ffffff",
+                "extendedProps": {
+                    "status": row["status"],
+                    "price": float(row["price"]),
+                    "duration": row["estimated_duration"],
+                },
+            }
+        )
+    return events
+
+
+def parse_window(start, end):
+    """
+    (start, end) dates from FullCalendar's start/end parameters (ISO dates or datetimes).
+
+    Raises ValueError for missing, malformed, reversed or oversized windows.
+    """
+    try:
+        start, end = date.fromisoformat((start or "")[:10]), date.fromisoformat((end or "")[:10])
+    except ValueError:
+        raise ValueError("Parametrii start și end trebuie să fie date ISO (AAAA-LL-ZZ)") from None
+    if end <= start or (end - start).days > MAX_WINDOW_DAYS:
+        raise ValueError(f"Intervalul trebuie să aibă între 1 și {MAX_WINDOW_DAYS} zile")
+    return start, end
+
+
+# iCalendar (RFC 5545)
+
+
+def ics_token(craftsman_id):
+    """Signed token identifying a craftsman's .ics feed"""
+    return signing.Signer(salt=ICS_SALT).sign(str(craftsman_id))
+
+
+def craftsman_from_ics_token(token):
+    """CraftsmanProfile pk from a feed token, or None if the signature is invalid"""
+    try:
+        return signing.Signer(salt=ICS_SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+
+
+def _ics_escape(text):
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_fold(line):
+    """Fold a content line at 75 octets, continuation lines starting with a space"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts, current = [], b""
+    for char in line:
+        char_bytes = char.encode("utf-8")
+        if len(current) + len(char_bytes) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += char_bytes
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def _ics_event(row, order_url, stamp):
+    start = row["proposed_start_date"]
+    summary = row["order__title"]
+    if row["status"] != "accepted":
+        summary = f"{summary} (ofertă {row['status']})"
+    description = f"Preț: {row['price']} RON"
+    if row["estimated_duration"]:
+        description += f"\nDurată estimată: {row['estimated_duration']}"
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:quote-{row['id']}@{UID_DOMAIN}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{start + timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_ics_escape(summary)}",
+        f"DESCRIPTION:{_ics_escape(description)}",
+        f"URL:{order_url.format(pk=row['order_id'])}",
+        f"STATUS:{'CONFIRMED' if row['status'] == 'accepted' else 'TENTATIVE'}",
+        "END:VEVENT",
+    ]
+    return "\r\n".join(_ics_fold(line) for line in lines)
+
+
+def _ics_cache_key(craftsman_id):
+    return f"calendar_ics:{craftsman_id}"
+
+
+def calendar_ics(craftsman_id, base_url=""):
+    """
+    The craftsman's .ics feed. Served from the cache while the calendar generation is
+    unchanged; otherwise events are re-rendered only for quotes whose data changed.
+    """
+    version = calendar_version(craftsman_id)
+    key = _ics_cache_key(craftsman_id)
+    cached = cache.get(key) or {}
+    if cached.get("version") == version and cached.get("base_url") == base_url:
+        return cached["body"]
+
+    previous = cached.get("events", {}) if cached.get("base_url") == base_url else {}
+    order_url = base_url + _order_url_pattern()
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%SZ")
+    since = timezone.localdate() - timedelta(days=ICS_PAST_DAYS)
+
+    events = {}
+    rendered = 0
+    for row in _quote_rows(craftsman_id, start=since):
+        fingerprint = (row["updated_at"], row["order__title"])
+        entry = previous.get(row["id"])
+        if entry is None or entry[0] != fingerprint:
+            entry = (fingerprint, _ics_event(row, order_url, stamp))
+            rendered += 1
+        events[row["id"]] = entry
+
+    body = "\r\n".join(
+        [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//Bricli//Calendar meșter//RO",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            "X-WR-CALNAME:Bricli - Lucrări",
+            *(text for _, text in events.values()),
+            "END:VCALENDAR",
+            "",
+        ]
+    )
+    cache.set(key, {"version": version, "base_url": base_url, "events": events, "body": body}, ICS_TIMEOUT)
+    logger.info(f"Calendar feed for craftsman {craftsman_id}: {rendered}/{len(events)} events rendered")
+    return body
@@ -0,0 +1,119 @@
+"""
+Cached statistics for the craftsman dashboard.
+
+Every tab of CraftsmanDashboardView shows the same header counters (shortlists, quotes,
+accepted/pending quotes); the stats tab adds the quote value total, average and
+acceptance rate. DashboardStats.get() computes all of them in one query, with one
+correlated aggregate per counter, and caches the plain values per craftsman. The
+subscription shown next to them comes from the quota snapshot (LeadQuotaService).
+
+services.signals drops the entry on quote and shortlist writes, so the next dashboard
+load recomputes it. Entries also expire after STATS_TIMEOUT.
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from core.cache_utils import CacheManager
+
+STATS_TIMEOUT = CacheManager.TIMEOUTS["medium"]
+EMPTY_STATS = {
+    "total_shortlists": 0,
+    "total_quotes": 0,
+    "accepted_quotes": 0,
+    "pending_quotes": 0,
+    "total_quote_value": Decimal(0),
+    "avg_quote_value": Decimal(0),
+    "acceptance_rate": 0,
+}
+
+
+def dashboard_stats_key(craftsman_id):
+    return f"dashboard_stats:{craftsman_id}"
+
+
+def _correlated(queryset, group_field, outer_field, aggregate, output_field):
+    """One aggregate over queryset for the outer row, as a scalar subquery (0 when there are no rows)"""
+    rows = queryset.filter(**{group_field: OuterRef(outer_field)}).order_by().values(group_field)
+    return Coalesce(
+        Subquery(rows.annotate(value=aggregate).values("value"), output_field=output_field),
+        Value(0),
+        output_field=output_field,
+    )
+
+
+class DashboardStats:
+    """Per-craftsman dashboard counters and quote value aggregates"""
+
+    @staticmethod
+    def _compute(craftsman):
+        from accounts.models import CraftsmanProfile
+
+        from .models import Quote, Shortlist
+
+        integer, money = IntegerField(), DecimalField(max_digits=12, decimal_places=2)
+
+        def quotes(aggregate, output_field=integer):
+            return _correlated(Quote.objects.all(), "craftsman", "pk", aggregate, output_field)
+
+        # Counters as scalar subqueries: one statement
+        profile = (
+            CraftsmanProfile.objects.filter(pk=craftsman.pk)
+            .values("pk")
+            .annotate(
+                stat_shortlists=_correlated(Shortlist.objects.all(), "craftsman", "user_id", Count("pk"), integer),
+                stat_quotes=quotes(Count("pk")),
+                stat_accepted=quotes(Count("pk", filter=Q(status="accepted"))),
+                stat_pending=quotes(Count("pk", filter=Q(status="pending"))),
+                stat_value=quotes(Sum("price"), money),
+                stat_average=quotes(Avg("price"), money),
+            )
+            .first()
+        )
+        if profile is None:
+            return dict(EMPTY_STATS)
+
+        return {
+            "total_shortlists": profile["stat_shortlists"],
+            "total_quotes": profile["stat_quotes"],
+            "accepted_quotes": profile["stat_accepted"],
+            "pending_quotes": profile["stat_pending"],
+            "total_quote_value": profile["stat_value"],
+            "avg_quote_value": profile["stat_average"],
+            "acceptance_rate": profile["stat_accepted"] / profile["stat_quotes"] * 100 if profile["stat_quotes"] else 0,
+        }
+
+    @staticmethod
+    def get(craftsman):
+        """
+        Dashboard stats for a craftsman (the counters above), cached until the next
+        relevant write.
+        """
+        key = dashboard_stats_key(craftsman.pk)
+        stats = cache.get(key)
+        if stats is None:
+            stats = DashboardStats._compute(craftsman)
+            cache.set(key, stats, STATS_TIMEOUT)
+        return stats
+
+    @staticmethod
+    def invalidate(craftsman_id):
+        """
+        Drop the cached stats of a craftsman (CraftsmanProfile pk), now and again once the
+        current transaction commits (a read before the commit can cache the old counters again).
+        """
+        if craftsman_id is not None:
+            key = dashboard_stats_key(craftsman_id)
+            cache.delete(key)
+            transaction.on_commit(lambda: cache.delete(key))
+
+    @staticmethod
+    def invalidate_user(user_id):
+        """Drop the cached stats of the craftsman owned by a user"""
+        from accounts.models import CraftsmanProfile
+
+        DashboardStats.invalidate(CraftsmanProfile.objects.filter(user_id=user_id).values_list("pk", flat=True).first())
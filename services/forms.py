@@ -278,8 +278,8 @@ class ReviewImageForm(forms.ModelForm):
         )
 
     def clean_image(self):
-        """Validate and optimize review image"""
-        from accounts.utils import optimize_review_image
+        """Validate the review image and strip its metadata (resized variants are rendered in the background)"""
+        from core.images import strip_metadata
 
         image = self.cleaned_data.get("image")
         if image:
@@ -291,8 +291,8 @@ class ReviewImageForm(forms.ModelForm):
             if not image.content_type.startswith("image/"):
                 raise forms.ValidationError("Fișierul trebuie să fie o imagine.")
 
-            # Optimize the image
-            image = optimize_review_image(image)
+            # Drop EXIF (GPS position etc.) before the original is stored and served
+            image = strip_metadata(image)
 
         return image
 
@@ -313,7 +313,9 @@ class MultipleReviewImageForm(forms.Form):
 
     def clean(self):
         """Validate all uploaded images"""
-        from accounts.utils import optimize_review_image
+        from PIL import Image
+
+        from core.images import strip_metadata
 
         cleaned_data = super().clean()
 
@@ -337,7 +339,7 @@ class MultipleReviewImageForm(forms.Form):
             )
 
         # Validate each image
-        optimized_images = []
+        valid_images = []
         for idx, image in enumerate(images, start=1):
             # Check file size (max 5MB)
             if image.size > 5 * 1024 * 1024:
@@ -352,20 +354,21 @@ class MultipleReviewImageForm(forms.Form):
                     f"Fișierul #{idx} nu este o imagine validă. Tip: {image.content_type}"
                 )
 
-            # Optimize the image
+            # Check the file parses as an image and drop its EXIF (resizing happens in the background)
             try:
-                optimized_image = optimize_review_image(image)
-                optimized_images.append(optimized_image)
+                Image.open(image).verify()
+                image.seek(0)
+                valid_images.append(strip_metadata(image))
             except Exception as e:
                 raise forms.ValidationError(
                     f"Eroare la procesarea imaginii #{idx}: {str(e)}"
                 )
 
-        cleaned_data['images'] = optimized_images
+        cleaned_data['images'] = valid_images
         return cleaned_data
 
     def get_images(self):
-        """Return list of uploaded and optimized images"""
+        """Return list of uploaded images"""
         return self.cleaned_data.get('images', [])
 
 
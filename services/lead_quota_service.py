@@ -6,20 +6,54 @@ Now uses subscription tier limits instead of wallet deductions.
 
 BETA MODE: When SUBSCRIPTIONS_ENABLED = False, all checks are bypassed and
 everyone gets unlimited leads for free.
+
+Quota status (get_quota_status) is read from a cached per-craftsman snapshot of the
+subscription's own columns; the tier comes from an in-process map of SubscriptionTier
+rows. services.signals drops the snapshot on subscription writes (usage resets, webhook
+updates, tier changes) and moves the tier map's version on tier writes.
 """
 
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Subquery, When
 from django.utils import timezone
 
 from subscriptions.models import CraftsmanSubscription
 from subscriptions.services import InsufficientQuotaError
 from subscriptions.email_service import SubscriptionEmailService
 
+from core.cache_utils import CacheManager, get_tag_versions
+
 logger = logging.getLogger(__name__)
 
+QUOTA_STATUS_TIMEOUT = CacheManager.TIMEOUTS["medium"]
+SUBSCRIPTION_TIERS_TAG = "subscription_tiers"
+QUOTA_SNAPSHOT_FIELDS = (
+    'id', 'craftsman_id', 'tier_id', 'leads_used_this_month', 'status', 'current_period_end', 'grace_period_end',
+    'stripe_subscription_id',
+)
+
+# (version, {pk: SubscriptionTier}) for this process, reloaded when the tiers tag moves
+_subscription_tiers = (None, {})
+
+
+def quota_status_key(user_id):
+    return f"quota_status:{user_id}"
+
+
+def subscription_tiers():
+    """SubscriptionTier rows by pk, kept in process memory until any tier is saved or deleted"""
+    global _subscription_tiers
+    from subscriptions.models import SubscriptionTier
+
+    version = get_tag_versions([SUBSCRIPTION_TIERS_TAG], create=True)[SUBSCRIPTION_TIERS_TAG]
+    if _subscription_tiers[0] != version:
+        _subscription_tiers = (version, {tier.pk: tier for tier in SubscriptionTier.objects.all()})
+    return _subscription_tiers[1]
+
 
 class LeadQuotaService:
     """
@@ -58,49 +92,107 @@ class LeadQuotaService:
             subscription = CraftsmanSubscription.objects.select_related('tier').get(
                 craftsman__user=craftsman_user
             )
-
-            # Check if subscription is active or in grace period
-            if subscription.status == 'refunded':
-                return (False, "Subscription was refunded. Please upgrade to receive leads.")
-
-            if subscription.status == 'canceled':
-                # Check if still within current period
-                if subscription.current_period_end and timezone.now() > subscription.current_period_end:
-                    return (False, "Subscription expired. Please renew to receive leads.")
-
-            # Check grace period for past_due subscriptions
-            if subscription.status == 'past_due':
-                if subscription.grace_period_end:
-                    if timezone.now() > subscription.grace_period_end:
-                        return (
-                            False,
-                            "Payment failed and grace period expired. "
-                            "Please update payment method to receive leads."
-                        )
-                    # Still in grace period - allow access
-                else:
-                    # No grace period set, block immediately
-                    return (False, "Payment failed. Please update payment method to receive leads.")
-
-            # Check tier limits
-            tier = subscription.tier
-
-            # Free tier has monthly limit
-            if tier.monthly_lead_limit is not None:
-                if subscription.leads_used_this_month >= tier.monthly_lead_limit:
-                    return (
-                        False,
-                        f"Monthly lead limit reached ({tier.monthly_lead_limit}/{tier.monthly_lead_limit}). "
-                        "Upgrade to Plus or Pro for unlimited leads."
-                    )
-
-            # All checks passed
-            return (True, None)
-
         except CraftsmanSubscription.DoesNotExist:
             logger.error(f"No subscription found for craftsman user {craftsman_user.id}")
             return (False, "No active subscription found. Please contact support.")
 
+        error_msg = cls._lead_block_reason(
+            status=subscription.status,
+            leads_used=subscription.leads_used_this_month,
+            leads_limit=subscription.tier.monthly_lead_limit,
+            period_end=subscription.current_period_end,
+            grace_period_end=subscription.grace_period_end,
+        )
+        return (error_msg is None, error_msg)
+
+    @classmethod
+    def _lead_block_reason(cls, status, leads_used, leads_limit, period_end, grace_period_end):
+        """
+        Why a subscription in this state cannot receive a lead, or None if it can.
+
+        Shared by can_receive_lead() and the cached get_quota_status(); lead_eligibility()
+        is the same rules as a query predicate.
+        """
+        now = timezone.now()
+
+        # Check if subscription is active or in grace period
+        if status == 'refunded':
+            return "Subscription was refunded. Please upgrade to receive leads."
+
+        if status == 'canceled':
+            # Check if still within current period
+            if period_end and now > period_end:
+                return "Subscription expired. Please renew to receive leads."
+
+        # Check grace period for past_due subscriptions
+        if status == 'past_due':
+            if not grace_period_end:
+                # No grace period set, block immediately
+                return "Payment failed. Please update payment method to receive leads."
+            if now > grace_period_end:
+                return "Payment failed and grace period expired. Please update payment method to receive leads."
+            # Still in grace period - allow access
+
+        # Free tier has monthly limit
+        if leads_limit is not None and leads_used >= leads_limit:
+            return (
+                f"Monthly lead limit reached ({leads_limit}/{leads_limit}). "
+                "Upgrade to Plus or Pro for unlimited leads."
+            )
+
+        # All checks passed
+        return None
+
+    @classmethod
+    def lead_eligibility(cls, now):
+        """
+        Q over a CraftsmanSubscription's own columns: the rules of can_receive_lead() as one
+        predicate (status, period end, grace period and the tier's monthly limit).
+        """
+        from subscriptions.models import SubscriptionTier
+
+        tier_limit = Subquery(
+            SubscriptionTier.objects.filter(pk=OuterRef('tier_id')).order_by().values('monthly_lead_limit')[:1]
+        )
+        unlimited = Exists(SubscriptionTier.objects.filter(pk=OuterRef('tier_id'), monthly_lead_limit__isnull=True))
+
+        return (
+            ~Q(status='refunded')
+            & ~Q(status='canceled', current_period_end__lt=now)
+            # past_due keeps access only until the grace period ends
+            & (~Q(status='past_due') | Q(grace_period_end__gte=now))
+            & (Q(unlimited) | Q(leads_used_this_month__lt=tier_limit))
+        )
+
+    @classmethod
+    def consume_lead(cls, craftsman_user):
+        """
+        Take one lead from the craftsman's monthly quota.
+
+        A single conditional UPDATE: the counter moves only if the subscription is eligible
+        and under its limit at write time, so concurrent shortlists can never exceed the
+        quota and no row is locked before the write. Unlimited tiers are not counted.
+
+        Returns:
+            bool: True if the lead was granted
+        """
+        from accounts.models import CraftsmanProfile
+        from subscriptions.models import SubscriptionTier
+
+        now = timezone.now()
+        limited = Exists(SubscriptionTier.objects.filter(pk=OuterRef('tier_id'), monthly_lead_limit__isnull=False))
+
+        return bool(
+            CraftsmanSubscription.objects.filter(
+                cls.lead_eligibility(now),
+                # Only the subscription's own columns: the UPDATE needs no join
+                craftsman__in=CraftsmanProfile.objects.filter(user=craftsman_user).values('pk'),
+            ).update(
+                leads_used_this_month=F('leads_used_this_month') + Case(When(limited, then=1), default=0),
+                updated_at=now,
+            )
+        )
+
     @classmethod
     @transaction.atomic
     def process_shortlist(cls, craftsman_user, order):
@@ -122,47 +214,15 @@ class LeadQuotaService:
         """
         from services.models import Shortlist
 
-        # Check if can receive lead
-        can_receive, error_msg = cls.can_receive_lead(craftsman_user)
-
-        if not can_receive:
-            logger.warning(
-                f"Craftsman {craftsman_user.id} cannot receive lead for order {order.id}: {error_msg}"
-            )
-            raise InsufficientQuotaError(error_msg)
-
-        # BETA MODE: Skip subscription checks and usage tracking
-        if not settings.SUBSCRIPTIONS_ENABLED:
-            # Create shortlist without subscription tracking
-            shortlist, created = Shortlist.objects.get_or_create(
-                order=order,
-                craftsman=craftsman_user,
-                defaults={
-                    'lead_fee_amount': 0,  # Free during BETA
-                    'charged_at': timezone.now(),
-                },
-            )
-
-            if not created:
-                shortlist.charged_at = timezone.now()
-                shortlist.save(update_fields=['charged_at'])
-                logger.info(f"[BETA] Updated existing shortlist {shortlist.id}")
-            else:
-                logger.info(f"[BETA] Created new shortlist {shortlist.id} (free unlimited)")
-
-            return shortlist
-
-        # Get subscription with row-level lock to prevent race conditions
-        subscription = CraftsmanSubscription.objects.select_for_update().get(
-            craftsman__user=craftsman_user
-        )
+        if craftsman_user.user_type != 'craftsman':
+            raise InsufficientQuotaError("User is not a craftsman")
 
         # Create/update shortlist entry
         shortlist, created = Shortlist.objects.get_or_create(
             order=order,
             craftsman=craftsman_user,
             defaults={
-                'lead_fee_amount': 0,  # No fee charged with subscription model
+                'lead_fee_amount': 0,  # No fee charged with subscription model (free during BETA)
                 'charged_at': timezone.now(),
             },
         )
@@ -171,46 +231,81 @@ class LeadQuotaService:
             # Update existing shortlist
             shortlist.charged_at = timezone.now()
             shortlist.save(update_fields=['charged_at'])
-            logger.info(f"Updated existing shortlist {shortlist.id}")
-        else:
-            logger.info(f"Created new shortlist {shortlist.id}")
-
-        # Increment usage counter for free tier
-        if subscription.tier.monthly_lead_limit is not None:
-            subscription.increment_lead_usage()
-
-            # Log warning if approaching limit
-            if subscription.leads_used_this_month == subscription.tier.monthly_lead_limit - 1:
-                logger.warning(
-                    f"Craftsman {craftsman_user.id} used {subscription.leads_used_this_month} / "
-                    f"{subscription.tier.monthly_lead_limit} leads. One lead remaining!"
-                )
-
-                # Phase 6: Send "4/5 leads used" notification email
-                SubscriptionEmailService.send_lead_limit_warning(
-                    craftsman_profile=subscription.craftsman,
-                    leads_used=subscription.leads_used_this_month,
-                    leads_limit=subscription.tier.monthly_lead_limit
-                )
-
-            elif subscription.leads_used_this_month >= subscription.tier.monthly_lead_limit:
-                logger.warning(
-                    f"Craftsman {craftsman_user.id} reached lead limit "
-                    f"({subscription.leads_used_this_month} / {subscription.tier.monthly_lead_limit})"
-                )
-
-                # Phase 6: Send "5/5 leads used - upgrade now" notification email
-                SubscriptionEmailService.send_lead_limit_reached(
-                    craftsman_profile=subscription.craftsman
-                )
+
+        # BETA MODE: Skip subscription checks and usage tracking
+        if not settings.SUBSCRIPTIONS_ENABLED:
+            logger.info(f"[BETA] {'Created' if created else 'Updated existing'} shortlist {shortlist.id}")
+            return shortlist
+
+        # Consume quota last: the UPDATE's row lock is held only until this transaction commits
+        if not cls.consume_lead(craftsman_user):
+            # Rejected: read the subscription once to explain why (the shortlist is rolled back)
+            error_msg = cls.can_receive_lead(craftsman_user)[1] or "Monthly lead limit reached."
+            logger.warning(
+                f"Craftsman {craftsman_user.id} cannot receive lead for order {order.id}: {error_msg}"
+            )
+            raise InsufficientQuotaError(error_msg)
+
+        logger.info(f"{'Created' if created else 'Updated existing'} shortlist {shortlist.id}")
+
+        # The quota snapshot shows lead usage; the UPDATE above sends no post_save signal
+        # (the dashboard stats are dropped by the shortlist's own post_save)
+        cls.invalidate_quota_status(craftsman_user.pk)
+        # Emails go out once the lead is committed: never for a rolled-back shortlist, and not
+        # while this transaction holds the subscription row
+        transaction.on_commit(lambda: cls.notify_lead_usage(craftsman_user))
 
         return shortlist
 
+    @classmethod
+    def notify_lead_usage(cls, craftsman_user):
+        """
+        Email the craftsman one lead before the monthly limit and when it is reached.
+
+        Called after the shortlist commits; reads the committed usage.
+        """
+        subscription = (
+            CraftsmanSubscription.objects.select_related('tier', 'craftsman')
+            .filter(craftsman__user=craftsman_user)
+            .first()
+        )
+        # Usage counter only moves for tiers with a limit
+        if subscription is None or subscription.tier.monthly_lead_limit is None:
+            return
+
+        # Log warning if approaching limit
+        if subscription.leads_used_this_month == subscription.tier.monthly_lead_limit - 1:
+            logger.warning(
+                f"Craftsman {craftsman_user.id} used {subscription.leads_used_this_month} / "
+                f"{subscription.tier.monthly_lead_limit} leads. One lead remaining!"
+            )
+
+            # Phase 6: Send "4/5 leads used" notification email
+            SubscriptionEmailService.send_lead_limit_warning(
+                craftsman_profile=subscription.craftsman,
+                leads_used=subscription.leads_used_this_month,
+                leads_limit=subscription.tier.monthly_lead_limit
+            )
+
+        elif subscription.leads_used_this_month >= subscription.tier.monthly_lead_limit:
+            logger.warning(
+                f"Craftsman {craftsman_user.id} reached lead limit "
+                f"({subscription.leads_used_this_month} / {subscription.tier.monthly_lead_limit})"
+            )
+
+            # Phase 6: Send "5/5 leads used - upgrade now" notification email
+            SubscriptionEmailService.send_lead_limit_reached(
+                craftsman_profile=subscription.craftsman
+            )
+
     @classmethod
     def get_quota_status(cls, craftsman_user):
         """
         Get quota status for craftsman.
 
+        Served from the cached snapshot (see quota_snapshot()); grace period and period end
+        are evaluated against the current time on every call.
+
         Args:
             craftsman_user: User instance
 
@@ -237,32 +332,8 @@ class LeadQuotaService:
                 'period_end': None,
             }
 
-        try:
-            subscription = CraftsmanSubscription.objects.select_related('tier').get(
-                craftsman__user=craftsman_user
-            )
-
-            can_receive, error_msg = cls.can_receive_lead(craftsman_user)
-
-            leads_limit = subscription.tier.monthly_lead_limit
-            leads_remaining = None
-
-            if leads_limit is not None:
-                leads_remaining = max(0, leads_limit - subscription.leads_used_this_month)
-
-            return {
-                'tier_name': subscription.tier.name,
-                'tier_display': subscription.tier.display_name,
-                'leads_used': subscription.leads_used_this_month,
-                'leads_limit': leads_limit,
-                'leads_remaining': leads_remaining,
-                'can_receive': can_receive,
-                'error_message': error_msg,
-                'status': subscription.status,
-                'period_end': subscription.current_period_end,
-            }
-
-        except CraftsmanSubscription.DoesNotExist:
+        snapshot = cls.quota_snapshot(craftsman_user)
+        if not snapshot:
             return {
                 'tier_name': None,
                 'tier_display': None,
@@ -274,3 +345,82 @@ class LeadQuotaService:
                 'status': None,
                 'period_end': None,
             }
+
+        tier = subscription_tiers()[snapshot['tier_id']]
+        leads_used = snapshot['leads_used_this_month']
+        leads_limit = tier.monthly_lead_limit
+        leads_remaining = None
+
+        if leads_limit is not None:
+            leads_remaining = max(0, leads_limit - leads_used)
+
+        if craftsman_user.user_type != 'craftsman':
+            error_msg = "User is not a craftsman"
+        else:
+            error_msg = cls._lead_block_reason(
+                status=snapshot['status'],
+                leads_used=leads_used,
+                leads_limit=leads_limit,
+                period_end=snapshot['current_period_end'],
+                grace_period_end=snapshot['grace_period_end'],
+            )
+
+        return {
+            'tier_name': tier.name,
+            'tier_display': tier.display_name,
+            'leads_used': leads_used,
+            'leads_limit': leads_limit,
+            'leads_remaining': leads_remaining,
+            'can_receive': error_msg is None,
+            'error_message': error_msg,
+            'status': snapshot['status'],
+            'period_end': snapshot['current_period_end'],
+        }
+
+    @classmethod
+    def quota_snapshot(cls, craftsman_user):
+        """
+        Cached quota columns of the craftsman's subscription (QUOTA_SNAPSHOT_FIELDS),
+        or an empty dict if there is none. One query on a miss, none on a hit.
+        """
+        key = quota_status_key(craftsman_user.pk)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = (
+                CraftsmanSubscription.objects.filter(craftsman__user=craftsman_user)
+                .values(*QUOTA_SNAPSHOT_FIELDS)
+                .first()
+            ) or {}
+            cache.set(key, snapshot, QUOTA_STATUS_TIMEOUT)
+        return snapshot
+
+    @classmethod
+    def subscription_snapshot(cls, craftsman_user):
+        """
+        Unsaved CraftsmanSubscription (with its tier) built from the quota snapshot, for display
+        only (dashboard widget); None if the craftsman has no subscription. No query on a hit.
+        """
+        snapshot = dict(cls.quota_snapshot(craftsman_user))
+        if not snapshot:
+            return None
+        tier = subscription_tiers()[snapshot.pop('tier_id')]
+        return CraftsmanSubscription(tier=tier, **snapshot)
+
+    @classmethod
+    def invalidate_quota_status(cls, user_id):
+        """
+        Drop the quota snapshot of a craftsman user, now and again once the current
+        transaction commits (a read before the commit can cache the old values again).
+        """
+        key = quota_status_key(user_id)
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
+
+    @classmethod
+    def invalidate_craftsman_quota_status(cls, craftsman_id):
+        """Drop the quota snapshot of the user owning a CraftsmanProfile"""
+        from accounts.models import CraftsmanProfile
+
+        user_id = CraftsmanProfile.objects.filter(pk=craftsman_id).values_list('user_id', flat=True).first()
+        if user_id is not None:
+            cls.invalidate_quota_status(user_id)
@@ -85,34 +85,28 @@ def notify_new_order_to_craftsmen(order: 'Order') -> int:
     """
     Notify all craftsmen who have the order's service registered that a new order is available.
 
+    Uses the batched fan-out path, so the number of DB round-trips does not depend on how many
+    craftsmen offer the service; email/push are sent later by the notification outbox worker.
+
     Args:
         order: Order instance that was just published
 
     Returns:
-        int: Number of notifications successfully sent
+        int: Number of notifications created
     """
     # Import locally to avoid circular imports (logic -> models -> logic)
-    from accounts.models import CraftsmanProfile
-    from .models import Quote
+    from django.contrib.auth import get_user_model
+    from django.db.models import Exists, OuterRef
 
-    # Get all craftsmen who have this service registered
-    craftsmen_with_service = CraftsmanProfile.objects.filter(
-        services__service=order.service,
-        user__is_active=True
-    ).select_related('user').distinct()
+    from .models import CraftsmanService, Quote
 
-    # Exclude craftsmen who already quoted on this order
-    craftsmen_who_quoted = Quote.objects.filter(
-        order=order
-    ).values_list('craftsman_id', flat=True)
+    User = get_user_model()
 
-    eligible_craftsmen = craftsmen_with_service.exclude(
-        id__in=craftsmen_who_quoted
-    )[:50]  # Limit to 50 to avoid overwhelming the system
-
-    if not eligible_craftsmen.exists():
-        logger.info(f"No eligible craftsmen to notify for order {order.id}")
-        return 0
+    # Active craftsmen offering this service who haven't already quoted on the order
+    recipients = User.objects.filter(is_active=True).filter(
+        Exists(CraftsmanService.objects.filter(craftsman__user=OuterRef("pk"), service_id=order.service_id)),
+        ~Exists(Quote.objects.filter(order=order, craftsman__user=OuterRef("pk"))),
+    )
 
     # Determine notification priority based on order urgency
     is_urgent = order.urgency in ['urgent', 'high']
@@ -138,34 +132,30 @@ def notify_new_order_to_craftsmen(order: 'Order') -> int:
         f'Click pentru a vedea detalii și a trimite ofertă!'
     )
 
-    # Send notifications
-    notifications_sent = 0
-    for craftsman in eligible_craftsmen:
-        try:
-            NotificationService.create_notification(
-                recipient=craftsman.user,
-                title=title,
-                message=message,
-                notification_type="new_order",
-                priority=priority,
-                sender=None,  # System notification
-                action_url=f"/servicii/comanda/{order.id}/",
-                related_object_type="order",
-                related_object_id=order.id,
-                send_email=is_urgent,  # Only send email for urgent/high urgency orders
-                send_push=True,  # Always send push notification
-                data={
-                    "order_id": order.id,
-                    "service_id": order.service.id,
-                    "service_name": order.service.name,
-                    "location": f"{order.city.name}, {order.county.name}",
-                    "urgency": order.urgency
-                }
-            )
-            notifications_sent += 1
-        except Exception as e:
-            logger.error(f"Failed to notify craftsman {craftsman.user.id} about order {order.id}: {str(e)}")
-            continue
-
-    logger.info(f"Notified {notifications_sent} craftsmen about new order {order.id}")
-    return notifications_sent
+    notifications = NotificationService.fan_out_notifications(
+        recipients=recipients,
+        title=title,
+        message=message,
+        notification_type="new_order",
+        priority=priority,
+        sender=None,  # System notification
+        action_url=f"/servicii/comanda/{order.id}/",
+        related_object_type="order",
+        # related_object_id is an integer column and order ids are UUIDs; the id travels in data
+        send_email=is_urgent,  # Only send email for urgent/high urgency orders
+        send_push=True,  # Always send push notification
+        data={
+            "order_id": order.id,
+            "service_id": order.service.id,
+            "service_name": order.service.name,
+            "location": f"{order.city.name}, {order.county.name}",
+            "urgency": order.urgency
+        }
+    )
+
+    if not notifications:
+        logger.info(f"No eligible craftsmen to notify for order {order.id}")
+        return 0
+
+    logger.info(f"Notified {len(notifications)} craftsmen about new order {order.id}")
+    return len(notifications)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0018_craftsman_rating_counters"),
+        ("services", "0014_alter_order_id_alter_quote_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="quote",
+            index=models.Index(fields=["craftsman", "proposed_start_date"], name="quote_craftsman_start_idx"),
+        ),
+    ]
@@ -179,6 +179,10 @@ class Quote(models.Model):
     class Meta:
         ordering = ["-created_at"]
         unique_together = ["order", "craftsman"]
+        indexes = [
+            # The craftsman calendar reads quotes by date range
+            models.Index(fields=["craftsman", "proposed_start_date"], name="quote_craftsman_start_idx"),
+        ]
 
     def __str__(self):
         return f"Ofertă pentru {self.order.title} de la {self.craftsman.user.username}"
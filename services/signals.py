@@ -2,11 +2,16 @@
 Signal handlers for services app
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.urls import reverse
 
-from .models import Quote
+from core.cache_utils import invalidate_tags
+
+from .calendar_feed import calendar_tag
+from .dashboard_stats import DashboardStats
+from .lead_quota_service import SUBSCRIPTION_TIERS_TAG, LeadQuotaService
+from .models import Order, Quote, Shortlist
 from .logic import notify_new_quote
 
 
@@ -17,3 +22,44 @@ def notify_client_new_quote(sender, instance, created, **kwargs):
     """
     if created:  # Only for new quotes, not updates
         notify_new_quote(instance)
+
+
+@receiver([post_save, post_delete], sender=Quote)
+def invalidate_dashboard_stats_for_quote(sender, instance, **kwargs):
+    """Quote counters and values on the craftsman dashboard"""
+    DashboardStats.invalidate(instance.craftsman_id)
+
+
+@receiver([post_save, post_delete], sender=Shortlist)
+def invalidate_dashboard_stats_for_shortlist(sender, instance, **kwargs):
+    """Shortlist counter on the craftsman dashboard (Shortlist.craftsman is the user)"""
+    DashboardStats.invalidate_user(instance.craftsman_id)
+
+
+@receiver([post_save, post_delete], sender="subscriptions.CraftsmanSubscription")
+def invalidate_quota_status_for_subscription(sender, instance, **kwargs):
+    """Quota snapshot: usage resets, webhook status updates and tier changes all save the subscription"""
+    LeadQuotaService.invalidate_craftsman_quota_status(instance.craftsman_id)
+
+
+@receiver([post_save, post_delete], sender="subscriptions.SubscriptionTier")
+def invalidate_subscription_tiers(sender, instance, **kwargs):
+    """In-process SubscriptionTier maps reload on their next read"""
+    invalidate_tags(SUBSCRIPTION_TIERS_TAG)
+
+
+@receiver([post_save, post_delete], sender=Quote)
+def invalidate_calendar_for_quote(sender, instance, **kwargs):
+    """Calendar feeds (JSON ETags and the cached .ics) of the quoting craftsman"""
+    invalidate_tags(calendar_tag(instance.craftsman_id))
+
+
+@receiver(post_save, sender=Order)
+def invalidate_calendars_for_order_title(sender, instance, created=False, update_fields=None, **kwargs):
+    """Calendar events show the order title"""
+    if created or (update_fields is not None and "title" not in update_fields):
+        return
+    craftsman_ids = Quote.objects.filter(order=instance, proposed_start_date__isnull=False).values_list(
+        "craftsman_id", flat=True
+    )
+    invalidate_tags(*(calendar_tag(craftsman_id) for craftsman_id in craftsman_ids))
@@ -0,0 +1,131 @@
+"""
+Tests for the available-orders feed (services.views.AvailableOrdersView).
+
+Tests verify:
+1. Craftsmen with the same services share one cached candidate id list
+2. Orders a craftsman already quoted on are excluded per craftsman, not in the shared list
+3. Only the orders on the current page are loaded
+4. A new quote invalidates the candidate list (quote-count sorting stays fresh)
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.utils import timezone
+
+from accounts.models import City, County, CraftsmanProfile, User
+from core.cache_utils import CacheManager, invalidate_tags
+from services.models import CraftsmanService, Order, Quote, Service, ServiceCategory
+from services.views import AvailableOrdersView
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestAvailableOrdersFeed:
+    """Test candidate caching and page hydration"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Cluj", code="CJ", slug="cluj")
+        city = City.objects.create(name="Cluj-Napoca", county=county)
+        category = ServiceCategory.objects.create(name="Instalații", slug="instalatii")
+        service = Service.objects.create(category=category, name="Instalator", slug="instalator")
+        client = User.objects.create_user(username="feed_client", email="client@test.com", password="x")
+        orders = [
+            Order.objects.create(
+                client=client,
+                title=f"Comanda {i}",
+                description="Detalii",
+                service=service,
+                county=county,
+                city=city,
+                status="published",
+            )
+            for i in range(5)
+        ]
+        return {"service": service, "orders": orders}
+
+    def _craftsman(self, name, service):
+        user = User.objects.create_user(
+            username=name, email=f"{name}@test.com", password="x", user_type="craftsman"
+        )
+        profile = CraftsmanProfile.objects.create(user=user, display_name=name, slug=name)
+        CraftsmanService.objects.create(craftsman=profile, service=service)
+        return profile
+
+    def _view(self, craftsman, **params):
+        request = RequestFactory().get("/servicii/comenzi-disponibile/", params)
+        request.user = craftsman.user
+        view = AvailableOrdersView()
+        view.setup(request)
+        return view
+
+    def _quote(self, craftsman, order):
+        # bulk_create skips the new-quote notification signal
+        Quote.objects.bulk_create(
+            [
+                Quote(
+                    order=order,
+                    craftsman=craftsman,
+                    price=100,
+                    description="Ofertă",
+                    expires_at=timezone.now() + timedelta(days=30),
+                )
+            ]
+        )
+
+    def test_craftsmen_with_same_services_share_candidates(self, setup_data):
+        first = self._craftsman("first", setup_data["service"])
+        second = self._craftsman("second", setup_data["service"])
+
+        with mock.patch.object(
+            AvailableOrdersView, "get_candidate_orders", wraps=AvailableOrdersView.get_candidate_orders
+        ) as candidates:
+            assert len(self._view(first).get_queryset()) == 5
+            assert len(self._view(second).get_queryset()) == 5
+
+        assert candidates.call_count == 1
+
+    def test_quoted_orders_excluded_per_craftsman(self, setup_data):
+        first = self._craftsman("first", setup_data["service"])
+        second = self._craftsman("second", setup_data["service"])
+        quoted = setup_data["orders"][0]
+        self._quote(first, quoted)
+
+        assert quoted.pk not in self._view(first).get_queryset()
+        assert quoted.pk in self._view(second).get_queryset()
+
+    def test_only_current_page_is_hydrated(self, setup_data, django_assert_num_queries):
+        craftsman = self._craftsman("pager", setup_data["service"])
+        view = self._view(craftsman, page_size="2", page="2")
+        order_ids = view.get_queryset()
+
+        with django_assert_num_queries(1):
+            paginator, page, orders, is_paginated = view.paginate_queryset(order_ids, 2)
+
+        assert paginator.count == 5 and is_paginated
+        assert [order.pk for order in orders] == order_ids[2:4]
+        assert all(order.quotes_count == 0 for order in orders)
+
+    def test_new_quote_invalidates_least_quotes_order(self, setup_data):
+        viewer = self._craftsman("viewer", setup_data["service"])
+        rival = self._craftsman("rival", setup_data["service"])
+        newest = setup_data["orders"][-1]
+
+        # Equal quote counts: newest first
+        assert self._view(viewer, sort="least_quotes").get_queryset()[0] == newest.pk
+
+        self._quote(rival, newest)
+        # bulk_create skips post_save, so bump the tag the way core.signals does for a saved quote
+        invalidate_tags(CacheManager.service_tag(setup_data["service"].id))
+
+        assert self._view(viewer, sort="least_quotes").get_queryset()[-1] == newest.pk
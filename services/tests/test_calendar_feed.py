@@ -0,0 +1,174 @@
+"""
+Tests for the craftsman calendar feeds (services.calendar_feed).
+
+Tests verify:
+1. The JSON feed returns only events inside the requested window, linked to their orders
+2. Unchanged windows revalidate with the ETag (304) and quote writes change it
+3. The .ics feed is served from the cache and re-renders only changed events
+4. Invalid windows and feed tokens are rejected
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from accounts.models import City, County, CraftsmanProfile, User
+from services import calendar_feed
+from services.models import Order, Quote, Service, ServiceCategory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def skip_quote_notifications(monkeypatch):
+    # Notification.object_id is an integer and cannot reference UUID quotes on SQLite
+    monkeypatch.setattr("services.signals.notify_new_quote", lambda quote: None)
+
+
+@pytest.mark.django_db
+class TestCalendarFeed:
+    """Test the windowed JSON feed and the iCalendar export"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Bihor", code="BH", slug="bihor")
+        city = City.objects.create(name="Oradea", county=county)
+        category = ServiceCategory.objects.create(name="Acoperișuri", slug="acoperisuri")
+        service = Service.objects.create(category=category, name="Țiglă", slug="tigla")
+        client_user = User.objects.create_user(username="cal_client", email="cal_client@test.com", password="x")
+        craftsman_user = User.objects.create_user(
+            username="cal_craftsman", email="cal_craftsman@test.com", password="x", user_type="craftsman"
+        )
+        craftsman = CraftsmanProfile.objects.create(user=craftsman_user, display_name="Cal", county=county, city=city)
+        return {"county": county, "city": city, "service": service, "client_user": client_user, "craftsman": craftsman}
+
+    def _quote(self, setup_data, start, title="Reparație acoperiș", status="accepted"):
+        order = Order.objects.create(
+            client=setup_data["client_user"],
+            title=title,
+            description="Țigle sparte",
+            service=setup_data["service"],
+            county=setup_data["county"],
+            city=setup_data["city"],
+            status="published",
+        )
+        return Quote.objects.create(
+            order=order,
+            craftsman=setup_data["craftsman"],
+            price=1500,
+            description="Ofertă",
+            estimated_duration="2 zile",
+            proposed_start_date=start,
+            status=status,
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+
+    def _get_events(self, client, start, end, **headers):
+        return client.get(
+            reverse("services:craftsman_calendar_events"), {"start": start, "end": end}, **headers
+        )
+
+    def test_events_limited_to_window(self, setup_data, client):
+        inside = self._quote(setup_data, date(2026, 3, 10))
+        self._quote(setup_data, date(2026, 5, 2), title="Altă lună")
+        client.force_login(setup_data["craftsman"].user)
+
+        response = self._get_events(client, "2026-03-01T00:00:00+02:00", "2026-04-01T00:00:00+03:00")
+
+        assert response.status_code == 200
+        events = response.json()
+        assert [event["id"] for event in events] == [str(inside.pk)]
+        assert events[0]["start"] == "2026-03-10"
+        assert events[0]["backgroundColor"] == "#8B5CF6"
+        assert events[0]["extendedProps"] == {"status": "accepted", "price": 1500.0, "duration": "2 zile"}
+
+        # Events link to the order page
+        assert events[0]["url"] == reverse("services:order_detail", kwargs={"pk": inside.order_id})
+        assert resolve(events[0]["url"]).kwargs == {"pk": inside.order_id}
+
+    def test_etag_revalidation(self, setup_data, client):
+        quote = self._quote(setup_data, date(2026, 3, 10))
+        client.force_login(setup_data["craftsman"].user)
+        response = self._get_events(client, "2026-03-01", "2026-04-01")
+        etag = response["ETag"]
+
+        not_modified = self._get_events(client, "2026-03-01", "2026-04-01", HTTP_IF_NONE_MATCH=etag)
+        assert not_modified.status_code == 304
+
+        quote.status = "pending"
+        quote.save()
+        changed = self._get_events(client, "2026-03-01", "2026-04-01", HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == 200
+        assert changed["ETag"] != etag
+
+    def test_dashboard_tab_points_to_feeds(self, setup_data, client):
+        client.force_login(setup_data["craftsman"].user)
+
+        response = client.get(reverse("services:craftsman_dashboard"), {"tab": "calendar"})
+
+        assert response.status_code == 200
+        assert response.context["calendar_events_url"] == reverse("services:craftsman_calendar_events")
+        assert response.context["calendar_ics_url"].endswith(".ics")
+
+    def test_invalid_window(self, setup_data, client):
+        client.force_login(setup_data["craftsman"].user)
+
+        assert self._get_events(client, "martie", "2026-04-01").status_code == 400
+        assert self._get_events(client, "2026-04-01", "2026-03-01").status_code == 400
+        assert self._get_events(client, "2020-01-01", "2026-01-01").status_code == 400
+
+    def test_ics_feed_cached_and_incremental(self, setup_data, client, monkeypatch, django_assert_num_queries):
+        today = timezone.localdate()
+        first = self._quote(setup_data, today + timedelta(days=3), title="Montaj; jgheaburi, burlane")
+        self._quote(setup_data, today + timedelta(days=9), status="pending")
+        url = reverse(
+            "services:craftsman_calendar_ics", kwargs={"token": calendar_feed.ics_token(setup_data["craftsman"].pk)}
+        )
+
+        response = client.get(url)
+        body = response.content.decode()
+        assert response["Content-Type"].startswith("text/calendar")
+        assert body.count("BEGIN:VEVENT") == 2
+        assert f"UID:quote-{first.pk}@bricli.ro" in body
+        assert "SUMMARY:Montaj\\; jgheaburi\\, burlane" in body
+        assert "STATUS:TENTATIVE" in body
+        order_url = reverse("services:order_detail", kwargs={"pk": first.order_id})
+        assert f"URL:http://testserver{order_url}" in body.replace("\r\n ", "")
+
+        # Unchanged calendar: served from the cache
+        with django_assert_num_queries(0):
+            assert client.get(url).content.decode() == body
+
+        rendered = []
+        original = calendar_feed._ics_event
+        monkeypatch.setattr(
+            calendar_feed, "_ics_event", lambda row, *args: rendered.append(row["id"]) or original(row, *args)
+        )
+        first.price = 1800
+        first.save()
+
+        assert "1800" in client.get(url).content.decode()
+        assert rendered == [first.pk]
+
+    def test_ics_rejects_bad_token(self, setup_data, client):
+        token = calendar_feed.ics_token(setup_data["craftsman"].pk)
+
+        response = client.get(reverse("services:craftsman_calendar_ics", kwargs={"token": token + "x"}))
+
+        assert response.status_code == 404
+
+    def test_ics_folding(self):
+        line = "SUMMARY:" + "ă" * 60
+
+        folded = calendar_feed._ics_fold(line)
+
+        assert all(len(part.encode("utf-8")) <= 75 for part in folded.split("\r\n"))
+        assert folded.replace("\r\n ", "") == line
@@ -0,0 +1,166 @@
+"""
+Tests for cached craftsman dashboard statistics (services.dashboard_stats).
+
+Tests verify:
+1. Counters and quote value aggregates come from one query
+2. Repeated reads are served from the cache
+3. Quote and shortlist writes invalidate the entry, again once their transaction commits
+4. The stats tab renders the cached values; the subscription comes from the quota snapshot
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import City, County, CraftsmanProfile, User
+from services.dashboard_stats import DashboardStats, dashboard_stats_key
+from services.models import Order, Quote, Service, ServiceCategory, Shortlist
+from subscriptions.models import CraftsmanSubscription, SubscriptionTier
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def skip_quote_notifications(monkeypatch):
+    # Notification.object_id is an integer and cannot reference UUID quotes on SQLite
+    monkeypatch.setattr("services.signals.notify_new_quote", lambda quote: None)
+
+
+@pytest.mark.django_db
+class TestDashboardStats:
+    """Test the dashboard stats provider and its invalidation"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Sibiu", code="SB", slug="sibiu")
+        city = City.objects.create(name="Sibiu", county=county)
+        category = ServiceCategory.objects.create(name="Instalații", slug="instalatii")
+        service = Service.objects.create(category=category, name="Instalator", slug="instalator")
+        client_user = User.objects.create_user(username="dash_client", email="dash_client@test.com", password="x")
+        craftsman_user = User.objects.create_user(
+            username="dash_craftsman", email="dash_craftsman@test.com", password="x", user_type="craftsman"
+        )
+        craftsman = CraftsmanProfile.objects.create(user=craftsman_user, display_name="Dash", county=county, city=city)
+        return {
+            "county": county,
+            "city": city,
+            "service": service,
+            "client_user": client_user,
+            "craftsman": craftsman,
+        }
+
+    def _order(self, setup_data, title="Comandă"):
+        return Order.objects.create(
+            client=setup_data["client_user"],
+            title=title,
+            description="Schimbare țevi",
+            service=setup_data["service"],
+            county=setup_data["county"],
+            city=setup_data["city"],
+            status="published",
+        )
+
+    def _quote(self, setup_data, price, status="pending"):
+        return Quote.objects.create(
+            order=self._order(setup_data),
+            craftsman=setup_data["craftsman"],
+            price=price,
+            description="Ofertă",
+            status=status,
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+
+    def _subscription(self, craftsman):
+        tier = SubscriptionTier.objects.get_or_create(
+            name="free", defaults={"display_name": "Plan Gratuit", "price": 0, "monthly_lead_limit": 5}
+        )[0]
+        return CraftsmanSubscription.objects.create(
+            craftsman=craftsman,
+            tier=tier,
+            current_period_start=timezone.now(),
+            current_period_end=timezone.now() + timedelta(days=30),
+        )
+
+    def test_stats_in_one_query_then_cached(self, setup_data, django_assert_num_queries):
+        craftsman = setup_data["craftsman"]
+        self._quote(setup_data, 100, status="accepted")
+        self._quote(setup_data, 300)
+        Shortlist.objects.create(order=self._order(setup_data), craftsman=craftsman.user)
+
+        with django_assert_num_queries(1):
+            stats = DashboardStats.get(craftsman)
+
+        assert (stats["total_shortlists"], stats["total_quotes"]) == (1, 2)
+        assert (stats["accepted_quotes"], stats["pending_quotes"]) == (1, 1)
+        assert (stats["total_quote_value"], stats["avg_quote_value"]) == (Decimal("400"), Decimal("200"))
+        assert stats["acceptance_rate"] == 50
+
+        with django_assert_num_queries(0):
+            assert DashboardStats.get(craftsman) == stats
+
+    def test_empty_craftsman(self, setup_data):
+        stats = DashboardStats.get(setup_data["craftsman"])
+
+        assert stats["total_quotes"] == 0 and stats["total_quote_value"] == 0
+        assert stats["acceptance_rate"] == 0
+
+    def test_writes_invalidate(self, setup_data):
+        craftsman = setup_data["craftsman"]
+        assert DashboardStats.get(craftsman)["total_quotes"] == 0
+
+        quote = self._quote(setup_data, 250)
+        assert DashboardStats.get(craftsman)["pending_quotes"] == 1
+
+        quote.status = "accepted"
+        quote.save()
+        assert DashboardStats.get(craftsman)["accepted_quotes"] == 1
+
+        Shortlist.objects.create(order=quote.order, craftsman=craftsman.user)
+        assert DashboardStats.get(craftsman)["total_shortlists"] == 1
+
+        quote.delete()
+        assert DashboardStats.get(craftsman)["total_quotes"] == 0
+
+    def test_read_before_commit_is_dropped_on_commit(self, setup_data, django_capture_on_commit_callbacks):
+        craftsman = setup_data["craftsman"]
+        DashboardStats.get(craftsman)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self._quote(setup_data, 250)
+            # A concurrent dashboard load before the commit caches the old counters again
+            cache.set(dashboard_stats_key(craftsman.pk), {"total_quotes": 0})
+
+        assert DashboardStats.get(craftsman)["total_quotes"] == 1
+
+    def test_dashboard_subscription_from_quota_snapshot(self, setup_data, client):
+        craftsman = setup_data["craftsman"]
+        client.force_login(craftsman.user)
+        assert client.get(reverse("services:craftsman_dashboard")).context["subscription"] is None
+
+        subscription = self._subscription(craftsman)
+        subscription.increment_lead_usage()
+        widget = client.get(reverse("services:craftsman_dashboard")).context["subscription"]
+        assert (widget.pk, widget.tier.name, widget.leads_used_this_month) == (subscription.pk, "free", 1)
+        # Cached as plain values, not as a model instance
+        assert isinstance(cache.get(f"quota_status:{craftsman.user.pk}"), dict)
+
+    def test_stats_tab_uses_cached_stats(self, setup_data, client):
+        craftsman = setup_data["craftsman"]
+        self._quote(setup_data, 120, status="accepted")
+        client.force_login(craftsman.user)
+
+        response = client.get(reverse("services:craftsman_dashboard"), {"tab": "stats"})
+
+        assert response.status_code == 200
+        assert response.context["total_quotes"] == 1
+        assert response.context["acceptance_rate"] == 100
+        assert cache.get(f"dashboard_stats:{craftsman.pk}") is not None
@@ -0,0 +1,316 @@
+"""
+Tests for atomic lead quota consumption (services.lead_quota_service).
+
+Tests verify:
+1. A lead is taken with one conditional UPDATE, without reading or locking the row first
+2. Shortlists racing for the last lead (in parallel threads) cannot push usage past the limit
+3. Rejected shortlists are rolled back with the can_receive_lead() reason; limit emails go out after commit
+4. Grace periods, canceled periods and unlimited tiers follow the existing rules
+5. Quota status is served from a cached snapshot and in-process tier map, refreshed on writes
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import City, County, CraftsmanProfile, User
+from services.lead_quota_service import LeadQuotaService
+from services.models import Order, Service, ServiceCategory, Shortlist
+from subscriptions.models import CraftsmanSubscription, SubscriptionTier
+from subscriptions.services import InsufficientQuotaError, SubscriptionService
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def subscriptions_enabled(settings, monkeypatch):
+    settings.SUBSCRIPTIONS_ENABLED = True
+    monkeypatch.setattr(
+        "services.lead_quota_service.SubscriptionEmailService.send_lead_limit_warning", lambda **kwargs: True
+    )
+    monkeypatch.setattr(
+        "services.lead_quota_service.SubscriptionEmailService.send_lead_limit_reached", lambda **kwargs: True
+    )
+
+
+class QuotaFixtures:
+    """Craftsman on the free tier (5 leads/month) and helpers"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Iași", code="IS", slug="iasi")
+        city = City.objects.create(name="Iași", county=county)
+        category = ServiceCategory.objects.create(name="Zugrăveli", slug="zugraveli")
+        service = Service.objects.create(category=category, name="Zugrav", slug="zugrav")
+        client_user = User.objects.create_user(username="quota_client", email="quota_client@test.com", password="x")
+        craftsman_user = User.objects.create_user(
+            username="quota_craftsman", email="quota_craftsman@test.com", password="x", user_type="craftsman"
+        )
+        craftsman = CraftsmanProfile.objects.create(user=craftsman_user, display_name="Quota", county=county, city=city)
+        tier = SubscriptionTier.objects.get_or_create(
+            name="free", defaults={"display_name": "Plan Gratuit", "price": 0, "monthly_lead_limit": 5}
+        )[0]
+        subscription = CraftsmanSubscription.objects.create(
+            craftsman=craftsman,
+            tier=tier,
+            current_period_start=timezone.now(),
+            current_period_end=timezone.now() + timedelta(days=30),
+        )
+        return {
+            "county": county,
+            "city": city,
+            "service": service,
+            "client_user": client_user,
+            "craftsman_user": craftsman_user,
+            "subscription": subscription,
+        }
+
+    def _order(self, setup_data, title="Zugrăvit apartament"):
+        return Order.objects.create(
+            client=setup_data["client_user"],
+            title=title,
+            description="Două camere",
+            service=setup_data["service"],
+            county=setup_data["county"],
+            city=setup_data["city"],
+            status="published",
+        )
+
+    def _set(self, subscription, **fields):
+        CraftsmanSubscription.objects.filter(pk=subscription.pk).update(**fields)
+
+
+@pytest.mark.django_db
+class TestLeadQuotaConsumption(QuotaFixtures):
+    """Test lead consumption through the conditional UPDATE"""
+
+    def test_single_update_without_locking(self, setup_data):
+        with CaptureQueriesContext(connection) as queries:
+            assert LeadQuotaService.consume_lead(setup_data["craftsman_user"]) is True
+
+        assert len(queries) == 1
+        sql = queries[0]["sql"].upper()
+        assert sql.startswith("UPDATE") and "FOR UPDATE" not in sql
+        setup_data["subscription"].refresh_from_db()
+        assert setup_data["subscription"].leads_used_this_month == 1
+
+    def test_last_lead_granted_once(self, setup_data):
+        subscription = setup_data["subscription"]
+        self._set(subscription, leads_used_this_month=4)
+
+        # No read before the write: once the counter is at the limit the UPDATE matches nothing
+        results = [LeadQuotaService.consume_lead(setup_data["craftsman_user"]) for _ in range(2)]
+
+        assert results == [True, False]
+        subscription.refresh_from_db()
+        assert subscription.leads_used_this_month == 5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_parallel_shortlists_take_last_lead_once(self, setup_data):
+        subscription, craftsman_user = setup_data["subscription"], setup_data["craftsman_user"]
+        self._set(subscription, leads_used_this_month=4)
+        orders = [self._order(setup_data, f"Comanda {index}") for index in range(4)]
+        barrier = threading.Barrier(len(orders))
+        outcomes = []
+
+        def shortlist(order):
+            barrier.wait()
+            try:
+                for _ in range(500):
+                    try:
+                        LeadQuotaService.process_shortlist(craftsman_user, order)
+                    except InsufficientQuotaError:
+                        outcomes.append("rejected")
+                        return
+                    except OperationalError:
+                        # The shared-cache SQLite test database rejects a second writer instead of waiting
+                        time.sleep(0.005)
+                        continue
+                    outcomes.append("granted")
+                    return
+                outcomes.append("locked")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=shortlist, args=(order,)) for order in orders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(outcomes) == ["granted", "rejected", "rejected", "rejected"]
+        subscription.refresh_from_db()
+        assert subscription.leads_used_this_month == 5
+        assert Shortlist.objects.filter(order__in=orders).count() == 1
+
+    def test_process_shortlist_until_limit(self, setup_data):
+        craftsman_user = setup_data["craftsman_user"]
+        for index in range(5):
+            LeadQuotaService.process_shortlist(craftsman_user, self._order(setup_data, f"Comanda {index}"))
+
+        blocked = self._order(setup_data, "Comanda 6")
+        with pytest.raises(InsufficientQuotaError, match="Monthly lead limit reached"):
+            LeadQuotaService.process_shortlist(craftsman_user, blocked)
+
+        assert not Shortlist.objects.filter(order=blocked).exists()
+        setup_data["subscription"].refresh_from_db()
+        assert setup_data["subscription"].leads_used_this_month == 5
+
+    def test_limit_emails_sent_after_commit(self, setup_data, monkeypatch, django_capture_on_commit_callbacks):
+        sent = []
+        monkeypatch.setattr(
+            "services.lead_quota_service.SubscriptionEmailService.send_lead_limit_warning",
+            lambda **kwargs: sent.append(("warning", kwargs["leads_used"])),
+        )
+        monkeypatch.setattr(
+            "services.lead_quota_service.SubscriptionEmailService.send_lead_limit_reached",
+            lambda **kwargs: sent.append(("reached",)),
+        )
+        craftsman_user = setup_data["craftsman_user"]
+        self._set(setup_data["subscription"], leads_used_this_month=3)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            LeadQuotaService.process_shortlist(craftsman_user, self._order(setup_data, "Comanda 4"))
+        assert sent == []
+        for callback in callbacks:
+            callback()
+        assert sent == [("warning", 4)]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            LeadQuotaService.process_shortlist(craftsman_user, self._order(setup_data, "Comanda 5"))
+        assert sent == [("warning", 4), ("reached",)]
+
+        # Rejected and rolled back: nothing queued
+        with django_capture_on_commit_callbacks(execute=True), pytest.raises(InsufficientQuotaError):
+            LeadQuotaService.process_shortlist(craftsman_user, self._order(setup_data, "Comanda 6"))
+        assert sent == [("warning", 4), ("reached",)]
+
+    def test_past_due_grace_period(self, setup_data):
+        subscription, craftsman_user = setup_data["subscription"], setup_data["craftsman_user"]
+
+        self._set(subscription, status="past_due", grace_period_end=timezone.now() + timedelta(days=3))
+        assert LeadQuotaService.consume_lead(craftsman_user) is True
+
+        self._set(subscription, grace_period_end=timezone.now() - timedelta(days=1))
+        assert LeadQuotaService.consume_lead(craftsman_user) is False
+
+        self._set(subscription, grace_period_end=None)
+        with pytest.raises(InsufficientQuotaError, match="Payment failed"):
+            LeadQuotaService.process_shortlist(craftsman_user, self._order(setup_data))
+
+    def test_canceled_and_refunded(self, setup_data):
+        subscription, craftsman_user = setup_data["subscription"], setup_data["craftsman_user"]
+
+        # Canceled subscriptions keep access until the period ends
+        self._set(subscription, status="canceled")
+        assert LeadQuotaService.consume_lead(craftsman_user) is True
+
+        self._set(subscription, current_period_end=timezone.now() - timedelta(days=1))
+        assert LeadQuotaService.consume_lead(craftsman_user) is False
+
+        self._set(subscription, status="refunded", current_period_end=timezone.now() + timedelta(days=1))
+        assert LeadQuotaService.consume_lead(craftsman_user) is False
+
+    def test_unlimited_tier_not_counted(self, setup_data):
+        subscription = setup_data["subscription"]
+        plus = SubscriptionTier.objects.get_or_create(
+            name="plus", defaults={"display_name": "Plan Plus", "price": 49, "monthly_lead_limit": None}
+        )[0]
+        SubscriptionTier.objects.filter(pk=plus.pk).update(monthly_lead_limit=None)
+        self._set(subscription, tier=plus, leads_used_this_month=7)
+
+        LeadQuotaService.process_shortlist(setup_data["craftsman_user"], self._order(setup_data))
+
+        subscription.refresh_from_db()
+        assert subscription.leads_used_this_month == 7
+
+    def test_no_subscription(self, setup_data):
+        setup_data["subscription"].delete()
+
+        with pytest.raises(InsufficientQuotaError, match="No active subscription"):
+            LeadQuotaService.process_shortlist(setup_data["craftsman_user"], self._order(setup_data))
+
+
+@pytest.mark.django_db
+class TestQuotaStatusSnapshot(QuotaFixtures):
+    """Test the cached quota status and its invalidation"""
+
+    def test_one_query_then_cached(self, setup_data, django_assert_num_queries):
+        craftsman_user = setup_data["craftsman_user"]
+        LeadQuotaService.get_quota_status(craftsman_user)
+        LeadQuotaService.invalidate_quota_status(craftsman_user.pk)
+
+        # Tiers already in process memory: only the subscription's columns are read
+        with django_assert_num_queries(1):
+            status = LeadQuotaService.get_quota_status(craftsman_user)
+
+        assert status["tier_name"] == "free" and status["tier_display"] == "Plan Gratuit"
+        assert (status["leads_used"], status["leads_limit"], status["leads_remaining"]) == (0, 5, 5)
+        assert status["can_receive"] is True and status["error_message"] is None
+        assert status["period_end"] == setup_data["subscription"].current_period_end
+
+        with django_assert_num_queries(0):
+            assert LeadQuotaService.get_quota_status(craftsman_user) == status
+
+    def test_shortlist_and_reset_refresh(self, setup_data):
+        craftsman_user, subscription = setup_data["craftsman_user"], setup_data["subscription"]
+        assert LeadQuotaService.get_quota_status(craftsman_user)["leads_used"] == 0
+
+        for index in range(5):
+            LeadQuotaService.process_shortlist(craftsman_user, self._order(setup_data, f"Comanda {index}"))
+        status = LeadQuotaService.get_quota_status(craftsman_user)
+        assert (status["leads_used"], status["leads_remaining"], status["can_receive"]) == (5, 0, False)
+        assert "Monthly lead limit reached" in status["error_message"]
+
+        subscription.refresh_from_db()
+        SubscriptionService.reset_monthly_usage(subscription)
+        assert LeadQuotaService.get_quota_status(craftsman_user)["leads_used"] == 0
+
+    def test_status_and_tier_changes_refresh(self, setup_data):
+        craftsman_user, subscription = setup_data["craftsman_user"], setup_data["subscription"]
+        assert LeadQuotaService.get_quota_status(craftsman_user)["status"] == "active"
+
+        # As handle_payment_failed saves it
+        subscription.status = "past_due"
+        subscription.grace_period_end = timezone.now() - timedelta(days=1)
+        subscription.save()
+        status = LeadQuotaService.get_quota_status(craftsman_user)
+        assert status["status"] == "past_due" and "grace period expired" in status["error_message"]
+
+        pro = SubscriptionTier.objects.create(name="pro", display_name="Plan Pro", price=14900)
+        subscription.tier, subscription.status = pro, "active"
+        subscription.save()
+        status = LeadQuotaService.get_quota_status(craftsman_user)
+        assert (status["tier_name"], status["leads_limit"], status["can_receive"]) == ("pro", None, True)
+
+    def test_tier_edit_reloads_tier_map(self, setup_data, django_assert_num_queries):
+        craftsman_user = setup_data["craftsman_user"]
+        LeadQuotaService.get_quota_status(craftsman_user)
+
+        tier = setup_data["subscription"].tier
+        tier.monthly_lead_limit = 10
+        tier.save()
+
+        # Snapshot still cached; the tier map alone is reloaded
+        with django_assert_num_queries(1):
+            assert LeadQuotaService.get_quota_status(craftsman_user)["leads_limit"] == 10
+
+    def test_missing_subscription_cached(self, setup_data, django_assert_num_queries):
+        craftsman_user = setup_data["craftsman_user"]
+        setup_data["subscription"].delete()
+
+        status = LeadQuotaService.get_quota_status(craftsman_user)
+        assert status["can_receive"] is False and status["error_message"] == "No active subscription"
+        with django_assert_num_queries(0):
+            LeadQuotaService.get_quota_status(craftsman_user)
@@ -0,0 +1,125 @@
+"""
+Tests for the batched new-order fan-out (services.logic.notify_new_order_to_craftsmen).
+
+Tests verify:
+1. Every eligible craftsman is notified (no recipient cap)
+2. Craftsmen who already quoted, inactive users and other services are skipped
+3. The number of queries does not grow with the number of craftsmen
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import City, County, CraftsmanProfile, User
+from notifications.models import (
+    DeliveryChannel,
+    Notification,
+    NotificationDelivery,
+    NotificationPreference,
+    PushSubscription,
+)
+from services.logic import notify_new_order_to_craftsmen
+from services.models import CraftsmanService, Order, Quote, Service, ServiceCategory
+
+
+@pytest.mark.django_db
+class TestNewOrderFanOut:
+    """Test notify_new_order_to_craftsmen batching"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Cluj", code="CJ", slug="cluj")
+        city = City.objects.create(name="Cluj-Napoca", county=county)
+        category = ServiceCategory.objects.create(name="Instalații", slug="instalatii")
+        service = Service.objects.create(category=category, name="Instalator", slug="instalator")
+        other_service = Service.objects.create(category=category, name="Electrician", slug="electrician")
+        client = User.objects.create_user(username="fanout_client", email="client@test.com", password="x")
+        return {"county": county, "city": city, "service": service, "other_service": other_service, "client": client}
+
+    def _craftsman(self, index, service, is_active=True):
+        user = User.objects.create_user(
+            username=f"fanout_craftsman{index}",
+            email=f"craftsman{index}@test.com",
+            password="x",
+            user_type="craftsman",
+            is_active=is_active,
+        )
+        NotificationPreference.objects.create(user=user)
+        profile = CraftsmanProfile.objects.create(
+            user=user, display_name=f"Craftsman {index}", slug=f"fanout-craftsman-{index}"
+        )
+        CraftsmanService.objects.create(craftsman=profile, service=service)
+        return profile
+
+    def _order(self, data, urgency="medium"):
+        return Order.objects.create(
+            client=data["client"],
+            title="Schimbare boiler",
+            description="Boiler nou",
+            service=data["service"],
+            county=data["county"],
+            city=data["city"],
+            urgency=urgency,
+            status="published",
+        )
+
+    def test_notifies_all_eligible_craftsmen_without_cap(self, setup_data):
+        """More than the old 50-recipient cap are all notified"""
+        for i in range(55):
+            self._craftsman(i, setup_data["service"])
+        order = self._order(setup_data)
+
+        assert notify_new_order_to_craftsmen(order) == 55
+        assert Notification.objects.filter(notification_type="new_order").count() == 55
+
+    def test_skips_ineligible_craftsmen(self, setup_data):
+        """Quoted, inactive and other-service craftsmen are not notified"""
+        eligible = self._craftsman(1, setup_data["service"])
+        quoted = self._craftsman(2, setup_data["service"])
+        self._craftsman(3, setup_data["service"], is_active=False)
+        self._craftsman(4, setup_data["other_service"])
+        order = self._order(setup_data)
+        # bulk_create skips the new-quote notification signal, which is irrelevant here
+        Quote.objects.bulk_create(
+            [Quote(order=order, craftsman=quoted, price=100, description="Ofertă", expires_at=timezone.now())]
+        )
+
+        assert notify_new_order_to_craftsmen(order) == 1
+        assert list(Notification.objects.values_list("recipient_id", flat=True)) == [eligible.user_id]
+
+    def test_deliveries_follow_preferences_and_devices(self, setup_data):
+        """Push is queued only for users with an active device; email only for urgent orders"""
+        with_device = self._craftsman(1, setup_data["service"])
+        self._craftsman(2, setup_data["service"])
+        PushSubscription.objects.create(
+            user=with_device.user, endpoint="https://push.test/1", p256dh_key="k", auth_key="a"
+        )
+
+        notify_new_order_to_craftsmen(self._order(setup_data, urgency="medium"))
+
+        deliveries = NotificationDelivery.objects.all()
+        assert [(d.notification.recipient_id, d.channel) for d in deliveries] == [
+            (with_device.user_id, DeliveryChannel.PUSH)
+        ]
+
+        NotificationDelivery.objects.all().delete()
+        notify_new_order_to_craftsmen(self._order(setup_data, urgency="urgent"))
+        assert NotificationDelivery.objects.filter(channel=DeliveryChannel.EMAIL).count() == 2
+
+    def test_query_count_is_constant(self, setup_data):
+        """Publishing costs the same number of queries for 2 or 20 craftsmen"""
+        for i in range(2):
+            self._craftsman(i, setup_data["service"])
+        order = self._order(setup_data)
+        with CaptureQueriesContext(connection) as small:
+            notify_new_order_to_craftsmen(order)
+
+        for i in range(2, 20):
+            self._craftsman(i, setup_data["service"])
+        order = self._order(setup_data)
+        with CaptureQueriesContext(connection) as large:
+            notify_new_order_to_craftsmen(order)
+
+        assert len(large.captured_queries) == len(small.captured_queries)
@@ -2,11 +2,13 @@ import logging
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Avg, Count, Q
-from django.http import Http404
+from django.db.models import Count, F, Q
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views import View
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView, RedirectView
 from django.db.models import QuerySet
 from typing import Any, Dict, Optional, List, Union
@@ -14,14 +16,27 @@ from typing import Any, Dict, Optional, List, Union
 logger = logging.getLogger(__name__)
 from asgiref.sync import sync_to_async
 from accounts.models import County, CraftsmanProfile
+from core.header_state import HeaderState
 from notifications.models import Notification
 
 # RateLimitMixin ELIMINAT - nu mai este necesar
 from notifications.services import NotificationService
 
+from .calendar_feed import (
+    calendar_etag,
+    calendar_events,
+    calendar_ics,
+    calendar_version,
+    craftsman_from_ics_token,
+    ics_token,
+    parse_window,
+)
+from .dashboard_stats import DashboardStats
 from .decorators import ClientRequiredMixin, CraftsmanRequiredMixin
 from .forms import CraftsmanServiceForm, MultipleReviewImageForm, OrderForm, QuoteForm, ReviewForm, ReviewImageForm
+from .lead_quota_service import LeadQuotaService
 from .models import (
+    CoverageArea,
     CraftsmanService,
     Invitation,
     Order,
@@ -209,10 +224,8 @@ class ServiceCategoryDetailView(DetailView):
             .filter(services__service__category=category)
             .distinct()
             .select_related('user', 'county', 'city')
-            .annotate(
-                rating_avg=Avg('received_reviews__rating'),
-                reviews_count=Count('received_reviews')
-            )[:12]  # Show more craftsmen - 12 instead of 3
+            # Stored rating counters instead of aggregating over a services x reviews join
+            .annotate(rating_avg=F('average_rating'), reviews_count=F('total_reviews'))[:12]  # Show 12 craftsmen
         )
 
         return context
@@ -630,49 +643,79 @@ class AvailableOrdersView(CraftsmanRequiredMixin, ListView):
         return self.paginate_by
 
     def get_queryset(self):
-        from django.core.cache import cache
-        from django.db.models import Count, F, IntegerField, Q, Value, Case, When
+        """
+        Ordered ids of the orders this craftsman can quote on.
 
-        from core.cache_utils import CacheManager
+        The candidate list (published orders for the craftsman's services, matching the filters) is
+        cached per service set and filter combination, so craftsmen offering the same services share
+        it. Orders the craftsman already quoted on and the radius filter are applied per request as
+        set lookups; only the current page is loaded from the database (see paginate_queryset).
+        """
+        from core.cache_utils import CacheManager, cache_key_generator, get_tagged, set_tagged
 
         craftsman = self.request.user.craftsman_profile
 
-        # Create cache key based on craftsman, filters, and page size
         category = self.request.GET.get("category", "")
         county = self.request.GET.get("county", "")
         urgency = self.request.GET.get("urgency", "")
         budget_min = self.request.GET.get("budget_min", "")
         sort = self.request.GET.get("sort", "newest")
-        page_size = self.get_paginate_by(None)
+        within_radius = self.request.GET.get("within_radius", "")
+
+        # Limit to services registered by the craftsman
+        service_ids = sorted(
+            set(CraftsmanService.objects.filter(craftsman=craftsman).values_list("service_id", flat=True))
+        )
+        if not service_ids:
+            return []
 
         cache_key = CacheManager.generate_key(
             "available_orders",
-            craftsman_id=craftsman.id,
+            services=cache_key_generator(service_ids),
             category=category,
             county=county,
             urgency=urgency,
             budget_min=budget_min,
             sort=sort,
-            page_size=page_size
         )
 
-        # Try to get from cache first (shorter cache time for orders)
-        cached_result = cache.get(cache_key)
-        if cached_result is not None:
-            return cached_result
+        candidates = get_tagged(cache_key)
+        if candidates is None:
+            candidates = self.get_candidate_orders(service_ids, category, county, urgency, budget_min, sort)
+            # Order and quote changes invalidate the entry through the service tags
+            set_tagged(
+                cache_key,
+                candidates,
+                tags=["available_orders", *(CacheManager.service_tag(service_id) for service_id in service_ids)],
+                timeout=300,
+            )
 
-        # Limit to services registered by the craftsman
-        service_ids = CraftsmanService.objects.filter(craftsman=craftsman).values_list("service_id", flat=True)
+        # Per-craftsman exclusions: orders already quoted on
+        quoted_order_ids = set(
+            Quote.objects.filter(craftsman=craftsman, order__status="published").values_list("order_id", flat=True)
+        )
+
+        # Orders in cities inside the craftsman's coverage radius if requested
+        covered_city_ids = None
+        if within_radius:
+            from accounts.services.coverage_index import get_coverage_index
+
+            covered_city_ids = get_coverage_index().cities_covered_by(craftsman.pk)
+
+        return [
+            order_id
+            for order_id, city_id in candidates
+            if order_id not in quoted_order_ids and (covered_city_ids is None or city_id in covered_city_ids)
+        ]
+
+    @staticmethod
+    def get_candidate_orders(service_ids, category, county, urgency, budget_min, sort):
+        """(order id, city id) pairs of published orders for the given services, filtered and sorted"""
+        from django.db.models import Case, Count, F, IntegerField, Value, When
 
-        # Get published orders that the craftsman hasn't quoted on yet and match their services
         # EXCLUDE direct requests (orders with assigned_craftsman) from available orders listing
-        queryset = (
-            Order.objects.filter(status="published", service_id__in=service_ids)
-            .exclude(quotes__craftsman=craftsman)
-            .exclude(assigned_craftsman__isnull=False)  # Hide direct requests
-            .select_related("client", "service", "service__category", "county", "city")
-            .prefetch_related("quotes", "invitations")
-            .annotate(quotes_count=Count('quotes'))  # Always annotate quote count for display
+        queryset = Order.objects.filter(status="published", service_id__in=service_ids).exclude(
+            assigned_craftsman__isnull=False
         )
 
         # Filter by service category if requested
@@ -707,17 +750,25 @@ class AvailableOrdersView(CraftsmanRequiredMixin, ListView):
                 "-created_at"
             )
         elif sort == "least_quotes":
-            # quotes_count already annotated above
-            queryset = queryset.order_by('quotes_count', '-created_at')
+            queryset = queryset.annotate(quotes_count=Count("quotes")).order_by("quotes_count", "-created_at")
         else:  # newest (default)
             queryset = queryset.order_by("-created_at")
 
-        queryset = queryset.distinct()
+        return list(queryset.values_list("pk", "city_id"))
 
-        # Cache the result for 5 minutes (orders change frequently)
-        cache.set(cache_key, queryset, 300)
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the id list, then load only the orders on the current page"""
+        from django.db.models import Count
+
+        paginator, page, order_ids, is_paginated = super().paginate_queryset(queryset, page_size)
 
-        return queryset
+        orders = (
+            Order.objects.select_related("client", "service", "service__category", "county", "city")
+            .annotate(quotes_count=Count("quotes"))
+            .in_bulk(list(order_ids))
+        )
+        page.object_list = [orders[order_id] for order_id in order_ids if order_id in orders]
+        return paginator, page, page.object_list, is_paginated
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -748,6 +799,9 @@ class AvailableOrdersView(CraftsmanRequiredMixin, ListView):
         context["current_urgency"] = self.request.GET.get("urgency", "")
         context["current_budget_min"] = self.request.GET.get("budget_min", "")
         context["current_sort"] = self.request.GET.get("sort", "newest")
+        context["current_within_radius"] = self.request.GET.get("within_radius", "")
+        coverage_area = CoverageArea.objects.filter(profile=craftsman).only("radius_km").first()
+        context["coverage_radius_km"] = coverage_area.radius_km if coverage_area else craftsman.coverage_radius_km
 
         # Comenzi la care meșterul a fost invitat
         context["invited_order_ids"] = set(
@@ -805,9 +859,6 @@ class CreateQuoteView(LoginRequiredMixin, CreateView):
         return context
 
     def form_valid(self, form):
-        from django.core.cache import cache
-        from core.cache_utils import CacheManager
-
         form.instance.craftsman = self.request.user.craftsman_profile
         form.instance.order = self.order
         # Set quote expiration to 30 days from now
@@ -818,20 +869,9 @@ class CreateQuoteView(LoginRequiredMixin, CreateView):
             messages.error(self.request, "Ai trimis deja o ofertă pentru această comandă.")
             return redirect("services:order_detail", pk=self.order.pk)
 
+        # Cached available-orders pages for this service are invalidated by core.signals (quote count changed)
         response = super().form_valid(form)
 
-        # Invalidate available_orders cache for ALL craftsmen (since quote count changed)
-        # We need to clear cache because the quote count annotation has changed
-        # This ensures all craftsmen see updated quote counts immediately
-        try:
-            # Try to use delete_pattern if available (Redis, Memcached)
-            cache.delete_pattern("available_orders:*")
-        except (AttributeError, NotImplementedError):
-            # Fallback: Clear entire cache (LocMemCache doesn't support patterns)
-            # This is acceptable for development; in production use Redis
-            cache.clear()
-            logger.info("Cache cleared after new quote submission")
-
         messages.success(self.request, "Oferta a fost trimisă cu succes!")
         return response
 
@@ -1111,8 +1151,7 @@ class CreateReviewView(LoginRequiredMixin, CreateView):
             for error in image_form.non_field_errors():
                 messages.warning(self.request, error)
 
-        # Update craftsman ratings
-        self._update_craftsman_ratings()
+        # Craftsman rating counters are updated by accounts.signals
 
         # Update order status
         self.order.status = "completed"
@@ -1129,20 +1168,6 @@ class CreateReviewView(LoginRequiredMixin, CreateView):
 
         return response
 
-    def _update_craftsman_ratings(self):
-        """Update craftsman's average rating and review count"""
-        craftsman = self.order.assigned_craftsman
-        reviews = Review.objects.filter(craftsman=craftsman)
-
-        # Calculate new averages
-        avg_rating = reviews.aggregate(Avg("rating"))["rating__avg"] or 0
-        total_reviews = reviews.count()
-
-        # Update craftsman profile
-        craftsman.average_rating = round(avg_rating, 2)
-        craftsman.total_reviews = total_reviews
-        craftsman.save()
-
     def get_success_url(self):
         return reverse_lazy("services:order_detail", kwargs={"pk": self.order.pk})
 
@@ -1227,8 +1252,7 @@ class EditReviewView(LoginRequiredMixin, UpdateView):
             for error in image_form.non_field_errors():
                 messages.warning(self.request, error)
 
-        # Update craftsman ratings
-        self._update_craftsman_ratings()
+        # Craftsman rating counters are updated by accounts.signals
 
         total_images = self.object.images.count()
         if total_images > existing_count:
@@ -1242,20 +1266,6 @@ class EditReviewView(LoginRequiredMixin, UpdateView):
 
         return response
 
-    def _update_craftsman_ratings(self):
-        """Update craftsman's average rating and review count"""
-        craftsman = self.object.craftsman
-        reviews = Review.objects.filter(craftsman=craftsman)
-
-        # Calculate new averages
-        avg_rating = reviews.aggregate(Avg("rating"))["rating__avg"] or 0
-        total_reviews = reviews.count()
-
-        # Update craftsman profile
-        craftsman.average_rating = round(avg_rating, 2)
-        craftsman.total_reviews = total_reviews
-        craftsman.save()
-
     def get_success_url(self):
         return reverse_lazy("services:review_detail", kwargs={"pk": self.object.pk})
 
@@ -1281,16 +1291,15 @@ class CraftsmanReviewsView(ListView):
         context = super().get_context_data(**kwargs)
         context["craftsman"] = self.craftsman
 
-        # Calculate review statistics
-        reviews = self.get_queryset()
-        context["total_reviews"] = reviews.count()
-        context["average_rating"] = reviews.aggregate(Avg("rating"))["rating__avg"] or 0
+        # Review statistics come from the counters stored on the profile
+        context["total_reviews"] = self.craftsman.total_reviews
+        context["average_rating"] = self.craftsman.average_rating
 
-        # Rating distribution
-        rating_counts = {}
-        for i in range(1, 6):
-            rating_counts[i] = reviews.filter(rating=i).count()
-        context["rating_distribution"] = rating_counts
+        # Rating distribution in one query
+        distribution = Review.objects.filter(craftsman=self.craftsman).aggregate(
+            **{str(i): Count("pk", filter=Q(rating=i)) for i in range(1, 6)}
+        )
+        context["rating_distribution"] = {int(rating): count for rating, count in distribution.items()}
 
         return context
 
@@ -1357,8 +1366,13 @@ class InviteCraftsmenView(LoginRequiredMixin, DetailView):
             .distinct()
         )
 
-        # Filter by location if coverage area exists
-        # TODO: Implement distance-based filtering
+        # Drop craftsmen whose coverage radius does not reach the order's city
+        # (skipped when the city has no coordinates yet)
+        from accounts.services.coverage_index import covering_filter
+
+        coverage = covering_filter(order.city_id)
+        if coverage is not None:
+            craftsmen = craftsmen.filter(coverage)
 
         # Exclude already invited craftsmen
         invited_craftsmen_ids = order.invitations.values_list("craftsman_id", flat=True)
@@ -1677,7 +1691,12 @@ class NotificationsView(LoginRequiredMixin, ListView):
 
     def get(self, request, *args, **kwargs):
         # Mark all notifications as read when viewing the page
-        Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True, read_at=timezone.now())
+        updated = Notification.objects.filter(recipient=request.user, is_read=False).update(
+            is_read=True, read_at=timezone.now()
+        )
+        if updated:
+            # update() sends no signals: refresh the header badge and wake the unread stream
+            HeaderState.invalidate([request.user.pk], "notifications")
 
         return super().get(request, *args, **kwargs)
 
@@ -1698,35 +1717,18 @@ class CraftsmanDashboardView(LoginRequiredMixin, CraftsmanRequiredMixin, ListVie
 
         craftsman = self.request.user.craftsman_profile
         tab = self.request.GET.get('tab', 'overview')
+        orders = Order.objects.select_related('client', 'service', 'county', 'city').order_by('-created_at')
 
         if tab == 'orders':
             # Show all orders the craftsman has shortlisted
-            shortlisted_order_ids = Shortlist.objects.filter(
-                craftsman=craftsman.user
-            ).values_list('order_id', flat=True)
-
-            return Order.objects.filter(
-                id__in=shortlisted_order_ids
-            ).select_related('client', 'service', 'county', 'city').order_by('-created_at')
+            return orders.filter(shortlists__craftsman=craftsman.user)
 
         elif tab == 'quotes':
             # Show orders where craftsman has submitted quotes
-            quoted_order_ids = Quote.objects.filter(
-                craftsman=craftsman
-            ).values_list('order_id', flat=True)
-
-            return Order.objects.filter(
-                id__in=quoted_order_ids
-            ).select_related('client', 'service', 'county', 'city').order_by('-created_at')
+            return orders.filter(quotes__craftsman=craftsman).distinct()
 
         # For overview tab, return recent shortlisted orders (limit 5)
-        shortlisted_order_ids = Shortlist.objects.filter(
-            craftsman=craftsman.user
-        ).values_list('order_id', flat=True)[:5]
-
-        return Order.objects.filter(
-            id__in=shortlisted_order_ids
-        ).select_related('client', 'service', 'county', 'city').order_by('-created_at')
+        return orders.filter(shortlists__craftsman=craftsman.user)[:5]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1741,23 +1743,16 @@ class CraftsmanDashboardView(LoginRequiredMixin, CraftsmanRequiredMixin, ListVie
 
         context['active_tab'] = tab
 
-        # Common stats for all tabs
-        context['total_shortlists'] = Shortlist.objects.filter(craftsman=craftsman.user).count()
-        context['total_quotes'] = Quote.objects.filter(craftsman=craftsman).count()
-        context['accepted_quotes'] = Quote.objects.filter(craftsman=craftsman, status='accepted').count()
-        context['pending_quotes'] = Quote.objects.filter(craftsman=craftsman, status='pending').count()
-
-        # Phase 9: Add subscription info
-        try:
-            from subscriptions.models import CraftsmanSubscription
-            subscription = CraftsmanSubscription.objects.get(craftsman=craftsman)
-            context['subscription'] = subscription
-        except Exception:
-            context['subscription'] = None
+        # Common stats for all tabs (one query, cached until a quote or shortlist changes)
+        stats = DashboardStats.get(craftsman)
+        for key in ('total_shortlists', 'total_quotes', 'accepted_quotes', 'pending_quotes'):
+            context[key] = stats[key]
+        # Subscription widget: rebuilt from the cached quota snapshot
+        context['subscription'] = LeadQuotaService.subscription_snapshot(self.request.user)
 
         if tab == 'overview':
             # Overview tab: Show dashboard summary
-            context['recent_orders'] = self.get_queryset()[:5]
+            context['recent_orders'] = context['object_list']
             context['recent_quotes'] = Quote.objects.filter(
                 craftsman=craftsman
             ).select_related('order', 'order__client').order_by('-created_at')[:5]
@@ -1771,49 +1766,57 @@ class CraftsmanDashboardView(LoginRequiredMixin, CraftsmanRequiredMixin, ListVie
             ).select_related('order').order_by('proposed_start_date')[:5]
 
         elif tab == 'calendar':
-            # Calendar tab: Get all quotes with start dates for calendar view
-            all_quotes = Quote.objects.filter(
-                craftsman=craftsman,
-                proposed_start_date__isnull=False
-            ).select_related('order', 'order__client')
-
-            # Format for FullCalendar.js
-            context['calendar_events'] = [
-                {
-                    'id': quote.id,
-                    'title': quote.order.title,
-                    'start': quote.proposed_start_date.isoformat(),
-                    'url': reverse('services:order_detail', kwargs={'pk': quote.order.pk}),
-                    'backgroundColor': '#8B5CF6' if quote.status == 'accepted' else '#6b7280',
-                    'borderColor': '#7C3AED' if quote.status == 'accepted' else '#4b5563',
-                    'textColor': '#ffffff',
-                    'extendedProps': {
-                        'status': quote.status,
-                        'price': float(quote.price),
-                        'duration': quote.estimated_duration,
-                    }
-                }
-                for quote in all_quotes
-            ]
+            # Calendar tab: FullCalendar loads the visible range from the JSON feed
+            context['calendar_events_url'] = reverse('services:craftsman_calendar_events')
+            context['calendar_ics_url'] = self.request.build_absolute_uri(
+                reverse('services:craftsman_calendar_ics', kwargs={'token': ics_token(craftsman.pk)})
+            )
 
         elif tab == 'stats':
             # Stats tab: Detailed statistics
-            from django.db.models import Sum
-
-            # Quote statistics
-            context['total_quote_value'] = Quote.objects.filter(
-                craftsman=craftsman
-            ).aggregate(total=Sum('price'))['total'] or 0
-
-            context['avg_quote_value'] = Quote.objects.filter(
-                craftsman=craftsman
-            ).aggregate(avg=Avg('price'))['avg'] or 0
-
-            context['acceptance_rate'] = 0
-            if context['total_quotes'] > 0:
-                context['acceptance_rate'] = (context['accepted_quotes'] / context['total_quotes']) * 100
+            for key in ('total_quote_value', 'avg_quote_value', 'acceptance_rate'):
+                context[key] = stats[key]
 
             # REMOVED: Recent wallet transactions - wallet system removed
             # TODO Phase 3: Add subscription history here
 
         return context
+
+
+class CraftsmanCalendarEventsView(LoginRequiredMixin, CraftsmanRequiredMixin, View):
+    """JSON events for the dashboard calendar, limited to FullCalendar's visible start/end range"""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            start, end = parse_window(request.GET.get('start'), request.GET.get('end'))
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        craftsman = request.user.craftsman_profile
+        etag = calendar_etag(craftsman.pk, start, end)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse(calendar_events(craftsman.pk, start, end), safe=False)
+            response['ETag'] = etag
+        # Private data: browsers keep it but always revalidate with the ETag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class CraftsmanCalendarICSView(View):
+    """Subscribable iCalendar feed of a craftsman's quotes, authenticated by the signed URL"""
+
+    def get(self, request, token, *args, **kwargs):
+        craftsman_id = craftsman_from_ics_token(token)
+        if craftsman_id is None:
+            raise Http404("Calendar inexistent")
+
+        etag = f'"{calendar_version(craftsman_id)}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            body = calendar_ics(craftsman_id, base_url=request.build_absolute_uri("/").rstrip("/"))
+            response = HttpResponse(body, content_type="text/calendar; charset=utf-8")
+            response['ETag'] = etag
+            response['Content-Disposition'] = 'inline; filename="bricli.ics"'
+        patch_cache_control(response, private=True, max_age=900)
+        return response
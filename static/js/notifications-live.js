@@ -1,6 +1,7 @@
 /**
  * Live Notifications System
- * Polls the server for unread notification count and updates badges in real-time
+ * Receives unread counts over a Server-Sent Events stream and updates badges in real-time.
+ * Falls back to polling when the stream is unavailable (e.g. server running under WSGI).
  */
 
 (function() {
@@ -9,6 +10,7 @@
     // Configuration
     const POLL_INTERVAL = 30000; // 30 seconds
     const API_ENDPOINT = '/notifications/api/notifications/unread-count/';
+    const STREAM_ENDPOINT = '/notifications/stream/';
 
     // Badge elements
     const notificationsBadge = document.getElementById('notifications-badge');
@@ -18,6 +20,7 @@
 
     let previousCount = 0;
     let pollTimer = null;
+    let eventSource = null;
 
     /**
      * Fetch unread notifications count from API
@@ -149,17 +152,61 @@
         const count = await fetchUnreadCount();
 
         if (count !== null) {
-            // Check if count has increased (new notification)
-            if (count > previousCount && previousCount !== 0) {
-                showNewNotificationAlert(count);
-            }
+            applyCount(count);
+        }
+    }
+
+    /**
+     * Apply a count received from the server
+     */
+    function applyCount(count) {
+        // Check if count has increased (new notification)
+        if (count > previousCount && previousCount !== 0) {
+            showNewNotificationAlert(count);
+        }
 
-            // Update badges
-            updateBadges(count);
+        updateBadges(count);
+        previousCount = count;
+    }
 
-            // Store current count
-            previousCount = count;
+    /**
+     * Start interval polling (fallback when streaming is unavailable)
+     */
+    function startPolling() {
+        if (pollTimer) {
+            return;
         }
+        pollNotifications();
+        pollTimer = setInterval(pollNotifications, POLL_INTERVAL);
+        console.log('Live notifications system polling every 30s');
+    }
+
+    /**
+     * Open the unread-count stream; returns false if the browser lacks EventSource
+     */
+    function startStream() {
+        if (!window.EventSource) {
+            return false;
+        }
+
+        eventSource = new EventSource(STREAM_ENDPOINT, { withCredentials: true });
+
+        eventSource.addEventListener('unread', (event) => {
+            const data = JSON.parse(event.data);
+            applyCount(data.notifications || 0);
+            // Let other scripts (e.g. messaging badges) react to the same stream
+            document.dispatchEvent(new CustomEvent('bricli:unread', { detail: data }));
+        });
+
+        eventSource.onerror = () => {
+            // CONNECTING means the browser retries by itself; CLOSED means the server refused (204/401)
+            if (eventSource.readyState === EventSource.CLOSED) {
+                eventSource = null;
+                startPolling();
+            }
+        };
+
+        return true;
     }
 
     /**
@@ -174,16 +221,13 @@
             }
         }
 
-        // Start polling immediately
-        pollNotifications();
-
-        // Set up interval polling
-        pollTimer = setInterval(pollNotifications, POLL_INTERVAL);
+        // Prefer the server push stream; poll only if it is unavailable
+        if (!startStream()) {
+            startPolling();
+        }
 
         // Add CSS for pulse animation
         addPulseAnimation();
-
-        console.log('Live notifications system initialized (polling every 30s)');
     }
 
     /**
@@ -216,6 +260,10 @@
             clearInterval(pollTimer);
             pollTimer = null;
         }
+        if (eventSource) {
+            eventSource.close();
+            eventSource = null;
+        }
     }
 
     // Initialize when DOM is ready
@@ -1,23 +1,48 @@
 document.addEventListener('DOMContentLoaded', function () {
-    // Scroll to bottom of messages
+    // Scroll to bottom of messages (the latest ones are loaded; older ones on demand)
     const messagesContainer = document.querySelector('.messages-container');
-    if (messagesContainer) {
-        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    if (!messagesContainer) {
+        return;
+    }
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+    // Load older messages page by page (cursor pagination)
+    const loadOlderButton = messagesContainer.querySelector('.load-older');
+    if (!loadOlderButton) {
+        return;
+    }
 
-        // Mark conversation as read
-        const markReadUrl = messagesContainer.dataset.markReadUrl;
-        const csrfTokenInput = document.querySelector('[name=csrfmiddlewaretoken]');
+    loadOlderButton.addEventListener('click', function () {
+        const url = `${loadOlderButton.dataset.historyUrl}?cursor=${encodeURIComponent(loadOlderButton.dataset.cursor)}`;
+        loadOlderButton.disabled = true;
 
-        if (markReadUrl && csrfTokenInput) {
-            fetch(markReadUrl, {
-                method: 'POST',
-                headers: {
-                    'X-CSRFToken': csrfTokenInput.value,
-                    'Content-Type': 'application/json',
-                },
-            }).catch(error => {
-                console.error('Error marking conversation as read:', error);
+        fetch(url, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            credentials: 'same-origin',
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                // Keep the current messages in place while inserting above them
+                const wrapper = loadOlderButton.closest('.load-older-wrapper');
+                const previousHeight = messagesContainer.scrollHeight;
+                wrapper.insertAdjacentHTML('afterend', data.html);
+                messagesContainer.scrollTop += messagesContainer.scrollHeight - previousHeight;
+
+                if (data.next_cursor) {
+                    loadOlderButton.dataset.cursor = data.next_cursor;
+                    loadOlderButton.disabled = false;
+                } else {
+                    wrapper.remove();
+                }
+            })
+            .catch(error => {
+                console.error('Error loading older messages:', error);
+                loadOlderButton.disabled = false;
             });
-        }
-    }
+    });
 });
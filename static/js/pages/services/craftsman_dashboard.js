@@ -48,7 +48,7 @@ document.addEventListener('DOMContentLoaded', function () {
     // ========================================
     // Calendar - Mobile Optimized
     // ========================================
-    // Note: This logic depends on 'active_tab' and 'calendar_events' being available.
+    // Note: This logic depends on 'active_tab' and 'calendar_events_url' being available.
     // Since we are extracting to a static file, we need a way to pass these values.
     // The best approach is to check if the calendar element exists and if window.dashboardConfig is defined.
 
@@ -79,7 +79,8 @@ document.addEventListener('DOMContentLoaded', function () {
                 list: 'Listă'
             },
 
-            events: window.dashboardConfig.calendarEvents,
+            // Only the visible range is requested (start/end query parameters)
+            events: window.dashboardConfig.calendarEventsUrl,
 
             eventClick: function (info) {
                 info.jsEvent.preventDefault();
@@ -0,0 +1,144 @@
+"""
+Tests for single-query facet counts (core.facets).
+
+Tests verify:
+1. Rating, county, category and verified counts come from one aggregate query
+2. Each facet ignores its own filter but applies the others
+3. Craftsmen with several services in a category are counted once
+4. Facets are cached per filter signature and invalidated by profile changes
+"""
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db.models import Q
+from django.test import RequestFactory
+
+from accounts.models import County, CraftsmanProfile, User
+from accounts.views import CraftsmenListView
+from core.facets import CraftsmanFacets
+from core.views import SearchView
+from services.models import CraftsmanService, Service, ServiceCategory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestCraftsmanFacets:
+    """Test facet counting and caching"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        cluj = County.objects.create(name="Cluj", code="CJ", slug="cluj")
+        iasi = County.objects.create(name="Iași", code="IS", slug="iasi")
+        plumbing = ServiceCategory.objects.create(name="Instalații", slug="instalatii")
+        garden = ServiceCategory.objects.create(name="Grădinărit", slug="gradinarit")
+        pipes = Service.objects.create(category=plumbing, name="Țevi", slug="tevi")
+        boilers = Service.objects.create(category=plumbing, name="Centrale", slug="centrale")
+        lawns = Service.objects.create(category=garden, name="Gazon", slug="gazon")
+
+        craftsmen = {}
+        for name, county, rating, verified, services in [
+            ("ana", cluj, 4.8, True, [pipes, boilers]),
+            ("bogdan", cluj, 3.6, False, [lawns]),
+            ("cristi", iasi, 4.2, True, [pipes]),
+            ("dan", iasi, 2.5, False, []),
+        ]:
+            user = User.objects.create_user(
+                username=name, email=f"{name}@test.com", password="x", user_type="craftsman", is_verified=verified
+            )
+            profile = CraftsmanProfile.objects.create(
+                user=user, display_name=name, slug=name, county=county, average_rating=rating
+            )
+            for service in services:
+                CraftsmanService.objects.create(craftsman=profile, service=service)
+            craftsmen[name] = profile
+
+        return {
+            "counties": [cluj, iasi],
+            "categories": [plumbing, garden],
+            "craftsmen": craftsmen,
+        }
+
+    def _compute(self, setup_data, filters=None):
+        return CraftsmanFacets.compute(
+            CraftsmanProfile.objects.all(),
+            filters,
+            [c.id for c in setup_data["counties"]],
+            [c.id for c in setup_data["categories"]],
+        )
+
+    def test_all_facets_in_one_query(self, setup_data, django_assert_num_queries):
+        cluj, iasi = setup_data["counties"]
+        plumbing, garden = setup_data["categories"]
+
+        with django_assert_num_queries(1):
+            facets = self._compute(setup_data)
+
+        assert facets["total"] == 4
+        assert facets["verified"] == 2
+        assert facets["ratings"] == {3.0: 3, 3.5: 3, 4.0: 2, 4.5: 1, 5.0: 0}
+        assert facets["counties"] == {cluj.id: 2, iasi.id: 2}
+        # ana offers two plumbing services but is counted once
+        assert facets["categories"] == {plumbing.id: 2, garden.id: 1}
+
+    def test_facet_ignores_its_own_filter(self, setup_data):
+        cluj, iasi = setup_data["counties"]
+        plumbing, garden = setup_data["categories"]
+
+        facets = self._compute(setup_data, {"county": Q(county=cluj), "rating": Q(average_rating__gte=4.0)})
+
+        assert facets["total"] == 1  # ana
+        # Other counties are counted with the rating filter applied
+        assert facets["counties"] == {cluj.id: 1, iasi.id: 1}
+        # Rating buckets are counted within Cluj, without the rating filter
+        assert facets["ratings"][3.5] == 2
+        assert facets["categories"] == {plumbing.id: 1, garden.id: 0}
+
+    def test_cached_per_signature_and_invalidated_by_profile_save(self, setup_data, django_assert_num_queries):
+        signature = {"view": "test", "county": None}
+
+        first = CraftsmanFacets.cached(signature, lambda: self._compute(setup_data))
+        with django_assert_num_queries(0):
+            assert CraftsmanFacets.cached(signature, lambda: self._compute(setup_data)) == first
+
+        craftsman = setup_data["craftsmen"]["dan"]
+        craftsman.average_rating = 5.0
+        craftsman.save()
+
+        assert CraftsmanFacets.cached(signature, lambda: self._compute(setup_data))["ratings"][5.0] == 1
+
+    def test_search_view_facets(self, setup_data):
+        cluj, iasi = setup_data["counties"]
+        request = RequestFactory().get("/cautare/", {"county": "cluj"})
+        request.user = AnonymousUser()
+        view = SearchView()
+        view.setup(request)
+        view.object_list = view.get_queryset()
+
+        context = view.get_context_data()
+
+        assert context["results_total"] == 2
+        assert context["county_counts"] == {cluj.id: 2, iasi.id: 2}
+        assert context["total_craftsmen"] == 4 and context["verified_craftsmen"] == 2
+
+    def test_craftsmen_list_view_facets(self, setup_data):
+        cluj, iasi = setup_data["counties"]
+        plumbing, garden = setup_data["categories"]
+        request = RequestFactory().get("/mesteri/", {"category": "instalatii", "verified": "1"})
+        request.user = AnonymousUser()
+        view = CraftsmenListView()
+        view.setup(request)
+        view.object_list = view.get_queryset()
+
+        context = view.get_context_data()
+
+        assert {c.display_name for c in view.object_list} == {"ana", "cristi"}
+        assert context["county_counts"] == {cluj.id: 1, iasi.id: 1}
+        assert context["category_counts"] == {plumbing.id: 2, garden.id: 0}
+        assert context["verified_count"] == 2
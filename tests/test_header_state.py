@@ -0,0 +1,174 @@
+"""
+Tests for the cached per-user header state (core.header_state).
+
+Tests verify:
+1. user_context reads badges and avatar from the cache without database queries
+2. Notification, message and portfolio writes adjust the cached counters
+3. Bulk paths (fan-out, conversation read) and arbitrary saves keep the state current
+4. Missing entries are recomputed
+"""
+
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from accounts.models import CraftsmanPortfolio, CraftsmanProfile, User
+from core.context_processors import user_context
+from core.header_state import HeaderState, header_state_key
+from messaging.models import Conversation, Message
+from notifications.models import Notification
+from notifications.services import NotificationService
+from services.views import NotificationsView
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestHeaderState:
+    """Test header state caching and maintenance"""
+
+    @pytest.fixture
+    def users(self, db):
+        client = User.objects.create_user(username="header_client", email="client@test.com", password="x")
+        craftsman_user = User.objects.create_user(
+            username="header_craftsman", email="c@test.com", password="x", user_type="craftsman"
+        )
+        craftsman = CraftsmanProfile.objects.create(user=craftsman_user, display_name="Meșter", slug="header-craftsman")
+        return {"client": client, "craftsman_user": craftsman_user, "craftsman": craftsman}
+
+    def _notify(self, user):
+        return Notification.objects.create(recipient=user, title="Titlu", message="Mesaj")
+
+    def test_context_reads_cached_state_without_queries(self, users, django_assert_num_queries):
+        request = RequestFactory().get("/")
+        request.user = users["craftsman_user"]
+        self._notify(request.user)
+        user_context(request)  # warm the cache
+
+        with django_assert_num_queries(0):
+            context = user_context(request)
+
+        assert context["unread_notifications_count"] == 1
+        assert context["unread_messages_count"] == 0
+        assert context["has_portfolio"] is False and context["portfolio_count"] == 0
+        assert context["avatar_url"] == ""
+        assert context["craftsman_profile"].display_name == "Meșter"
+
+    def test_client_has_no_craftsman_context(self, users):
+        request = RequestFactory().get("/")
+        request.user = users["client"]
+
+        context = user_context(request)
+
+        assert "craftsman_profile" not in context
+        assert "portfolio_count" not in context
+
+    def test_notification_writes_adjust_counter(self, users, django_capture_on_commit_callbacks):
+        user = users["client"]
+        assert HeaderState.get(user)["notifications"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first = self._notify(user)
+            second = self._notify(user)
+        assert cache.get(header_state_key(user.pk, "notifications")) == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first.mark_as_read()
+            first.mark_as_read()  # already read, no save
+            second.delete()
+        assert HeaderState.get(user)["notifications"] == 0
+
+    def test_message_and_portfolio_writes_adjust_counters(self, users, django_capture_on_commit_callbacks):
+        client, craftsman_user = users["client"], users["craftsman_user"]
+        HeaderState.get(client)
+        HeaderState.get(craftsman_user)
+
+        conversation = Conversation.objects.create()
+        conversation.participants.add(client, craftsman_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            message = Message.objects.create(
+                conversation=conversation, sender=craftsman_user, recipient=client, content="Salut"
+            )
+            Message.objects.create(conversation=conversation, sender=craftsman_user, recipient=client, content="?")
+            image = CraftsmanPortfolio.objects.create(craftsman=users["craftsman"], image="portfolio/a.jpg")
+        assert HeaderState.get(client)["messages"] == 2
+        assert HeaderState.get(craftsman_user)["portfolio"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            message.mark_as_read()
+            image.delete()
+        assert HeaderState.get(client)["messages"] == 1
+        assert HeaderState.get(craftsman_user)["portfolio"] == 0
+
+        conversation.mark_as_read(client)
+        assert cache.get(header_state_key(client.pk, "messages")) is None
+        assert HeaderState.get(client)["messages"] == 0
+
+    def test_bulk_paths_keep_state_current(self, users, django_capture_on_commit_callbacks):
+        client, craftsman_user = users["client"], users["craftsman_user"]
+        HeaderState.get(client)
+        HeaderState.get(craftsman_user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            NotificationService.fan_out_notifications(
+                User.objects.filter(pk__in=[client.pk, craftsman_user.pk]), title="Anunț", message="Text"
+            )
+        assert HeaderState.get(client)["notifications"] == 1
+        assert HeaderState.get(craftsman_user)["notifications"] == 1
+
+        # Arbitrary saves drop the entry instead of guessing the delta
+        notification = Notification.objects.get(recipient=client)
+        notification.is_read = True
+        notification.save()
+        assert cache.get(header_state_key(client.pk, "notifications")) is None
+        assert HeaderState.get(client)["notifications"] == 0
+
+    def test_notifications_page_marks_all_read(self, users, django_capture_on_commit_callbacks):
+        user = users["client"]
+        self._notify(user)
+        self._notify(user)
+        assert HeaderState.get(user)["notifications"] == 2
+        request = RequestFactory().get("/servicii/notificari/")
+        request.user = user
+
+        with mock.patch("core.header_state.publish_to_users") as publish, django_capture_on_commit_callbacks(
+            execute=True
+        ):
+            response = NotificationsView.as_view()(request)
+
+        assert response.status_code == 200
+        assert HeaderState.get(user)["notifications"] == 0
+        publish.assert_called_once_with({user.pk}, {"field": "notifications", "delta": None})
+
+    def test_read_before_commit_is_dropped_on_commit(self, users, django_capture_on_commit_callbacks):
+        user = users["client"]
+        notification = self._notify(user)
+        assert HeaderState.get(user)["notifications"] == 1
+
+        with mock.patch("core.header_state.publish_to_users") as publish, django_capture_on_commit_callbacks(
+            execute=True
+        ):
+            notification.is_read = True
+            notification.save()
+            # A concurrent request recomputes before the commit: still unread from its point of view
+            cache.set(header_state_key(user.pk, "notifications"), 1)
+            publish.assert_not_called()
+
+        publish.assert_called_once_with({user.pk}, {"field": "notifications", "delta": None})
+        assert HeaderState.get(user)["notifications"] == 0
+
+    def test_profile_photo_change_refreshes_avatar(self, users):
+        user = users["craftsman_user"]
+        assert HeaderState.get(user)["profile"]["avatar_url"] == ""
+
+        users["craftsman"].profile_photo = "profiles/photo.jpg"
+        users["craftsman"].save()
+
+        assert HeaderState.get(user)["profile"]["avatar_url"].endswith("profiles/photo.jpg")
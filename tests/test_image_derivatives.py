@@ -0,0 +1,198 @@
+"""
+Tests for background image derivatives (core.images.ImagePipeline).
+
+Tests verify:
+1. Saving an uploaded image queues it without resizing in the request
+2. The worker renders every variant in JPEG and WebP with the real byte sizes
+3. lazy_img/image_srcset emit srcset candidates once derivatives exist, batched per page
+4. Craftsman cards, avatars and review images render those candidates
+5. Uploads are stored without their EXIF metadata
+"""
+
+import io
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.urls import reverse
+from PIL import Image
+
+from accounts.models import CraftsmanProfile, User
+from core.images import EXIF_ORIENTATION, ImagePipeline, render_derivatives, strip_metadata
+from core.models import ImageAsset, ImageDerivative
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_DERIVATIVES_EAGER = False
+
+
+def make_image(width, height, mode="RGB", image_format="PNG"):
+    output = io.BytesIO()
+    Image.new(mode, (width, height), (200, 80, 40)).save(output, format=image_format)
+    return output.getvalue()
+
+
+class TestRenderDerivatives:
+    """Test the pure rendering function"""
+
+    def test_renders_every_variant_and_format(self):
+        width, height, rendered = render_derivatives(make_image(2000, 1000, mode="RGBA"))
+
+        assert (width, height) == (2000, 1000)
+        sizes = {(variant, fmt): (w, h) for variant, fmt, w, h, _ in rendered}
+        assert sizes == {
+            ("full", "jpeg"): (1200, 600),
+            ("full", "webp"): (1200, 600),
+            ("card", "jpeg"): (480, 240),
+            ("card", "webp"): (480, 240),
+            ("thumb", "jpeg"): (160, 80),
+            ("thumb", "webp"): (160, 80),
+        }
+        for _, fmt, w, h, data in rendered:
+            with Image.open(io.BytesIO(data)) as decoded:
+                assert decoded.format == {"jpeg": "JPEG", "webp": "WEBP"}[fmt]
+                assert decoded.size == (w, h)
+
+    def test_small_images_are_not_upscaled(self):
+        _, _, rendered = render_derivatives(make_image(100, 50, image_format="JPEG"))
+
+        assert {(w, h) for _, _, w, h, _ in rendered} == {(100, 50)}
+
+
+class TestStripMetadata:
+    """Test metadata removal on upload"""
+
+    GPS_IFD = 0x8825
+
+    def upload(self, orientation=1, image_format="JPEG"):
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = orientation
+        exif[0x010F] = "Camera"
+        exif[self.GPS_IFD] = {1: "N", 2: (44.0, 25.0, 0.0)}
+        output = io.BytesIO()
+        Image.new("RGB", (40, 20), (200, 80, 40)).save(output, format=image_format, exif=exif)
+        return SimpleUploadedFile(f"photo.{image_format.lower()}", output.getvalue(), content_type="image/jpeg")
+
+    def test_exif_and_gps_removed(self):
+        stripped = strip_metadata(self.upload())
+
+        with Image.open(stripped) as img:
+            assert img.format == "JPEG" and img.size == (40, 20)
+            assert not img.getexif() and "exif" not in img.info
+        stripped.seek(0)
+        assert stripped.name == "photo.jpeg" and stripped.size == len(stripped.read())
+
+    def test_orientation_applied_before_removal(self):
+        for image_format in ("JPEG", "WEBP"):
+            with Image.open(strip_metadata(self.upload(orientation=6, image_format=image_format))) as img:
+                assert img.format == image_format and img.size == (20, 40)
+                assert not img.getexif()
+
+    def test_clean_upload_returned_as_sent(self):
+        upload = SimpleUploadedFile("plain.png", make_image(40, 20), content_type="image/png")
+
+        assert strip_metadata(upload) is upload
+
+
+@pytest.mark.django_db
+class TestImagePipeline:
+    """Test queueing, processing and rendering of derivatives"""
+
+    @pytest.fixture
+    def user(self, db):
+        user = User.objects.create_user(username="image_user", email="image@test.com", password="x")
+        user.profile_picture.save("avatar.png", ContentFile(make_image(1600, 1600)))
+        return user
+
+    def test_upload_is_queued_not_resized(self, user):
+        asset = ImageAsset.objects.get(source=user.profile_picture.name)
+
+        assert asset.status == "pending"
+        with Image.open(user.profile_picture.path) as original:
+            assert original.size == (1600, 1600)
+
+    def test_process_pending_records_derivatives(self, user):
+        assert ImagePipeline.process_pending(workers=1) == {"done": 1, "pending": 0, "failed": 0}
+
+        asset = ImageAsset.objects.get(source=user.profile_picture.name)
+        assert (asset.status, asset.width, asset.height) == ("done", 1600, 1600)
+
+        derivatives = list(ImageDerivative.objects.filter(asset=asset))
+        assert len(derivatives) == 6
+        for derivative in derivatives:
+            assert derivative.size == default_storage.size(derivative.name)
+        assert {d.width for d in derivatives if d.variant == "card"} == {480}
+
+        # Nothing left to claim
+        assert ImagePipeline.process_pending(workers=1) == {"done": 0, "pending": 0, "failed": 0}
+
+    def test_unreadable_image_retries_then_fails(self, db):
+        ImagePipeline.enqueue(["missing/nothing.jpg"])
+
+        for _ in range(ImagePipeline.MAX_ATTEMPTS):
+            ImagePipeline.process_pending(workers=1)
+
+        asset = ImageAsset.objects.get(source="missing/nothing.jpg")
+        assert asset.status == "failed" and asset.attempts == ImagePipeline.MAX_ATTEMPTS
+
+    def test_templates_emit_srcset_once_processed(self, user, django_assert_num_queries):
+        template = Template('{% load lazy_loading %}{% lazy_img image sizes="80px" %}|{% image_srcset image %}')
+        context = Context({"image": user.profile_picture})
+
+        before = template.render(context)
+        assert "srcset" not in before and user.profile_picture.url in before
+
+        ImagePipeline.process_pending(workers=1)
+        template.render(context)
+        with django_assert_num_queries(0):
+            html = template.render(context)
+
+        assert 'type="image/webp"' in html and 'sizes="80px"' in html
+        assert "_thumb.webp 160w" in html and "_card.jpg 480w" in html and "_full.jpg 1200w" in html
+        assert 'srcset="' in html.split("|")[1]
+
+    def test_prefetch_batches_lookups_per_page(self, user, django_assert_num_queries):
+        for index in range(5):
+            other = User.objects.create_user(username=f"image_user_{index}", email=f"i{index}@test.com", password="x")
+            other.profile_picture.save(f"avatar_{index}.png", ContentFile(make_image(200, 200)))
+        ImagePipeline.process_pending(workers=1)
+        users = list(User.objects.order_by("username"))
+        template = Template(
+            "{% load lazy_loading %}{% prefetch_image_derivatives users 'profile_picture' %}"
+            "{% for user in users %}{% image_srcset user.profile_picture '80px' %}|{% endfor %}"
+        )
+
+        # One get_many and, when cold, one derivative query for the whole page; no per-image lookups
+        with mock.patch("core.images.cache", wraps=cache) as spy:
+            with django_assert_num_queries(1):
+                html = template.render(Context({"users": users}))
+            with django_assert_num_queries(0):
+                template.render(Context({"users": users}))
+
+        assert (spy.get_many.call_count, spy.get.call_count) == (2, 0)
+        assert html.count("_thumb.jpg 160w") == 6
+
+    def test_search_cards_emit_srcset(self, user, client):
+        User.objects.filter(pk=user.pk).update(user_type="craftsman")
+        CraftsmanProfile.objects.create(user=user, display_name="Card Craftsman")
+        ImagePipeline.process_pending(workers=1)
+
+        response = client.get(reverse("core:search"))
+
+        assert response.status_code == 200
+        html = response.content.decode()
+        assert user.profile_picture.url in html
+        assert "_thumb.jpg 160w" in html and 'sizes="80px"' in html
@@ -0,0 +1,135 @@
+"""
+Tests for media fingerprints (core.images.fingerprint) and versioned image URLs.
+
+Tests verify:
+1. Uploads store content hash and dimensions next to the file field, once
+2. Version tags and the craftsman page build URLs without touching storage
+3. fingerprint_media backfills existing files and skips missing ones
+"""
+
+import io
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory
+from PIL import Image
+
+from accounts.models import CraftsmanProfile, User
+from accounts.views import CraftsmanDetailView
+from core import images
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def png_bytes(width, height, color=(10, 120, 200)):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def no_storage_access(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("storage accessed at render time")
+
+    for method in ("exists", "get_modified_time", "size", "open"):
+        monkeypatch.setattr(default_storage.__class__, method, fail)
+
+
+@pytest.mark.django_db
+class TestMediaFingerprints:
+    """Test fingerprinting on upload and its use in URLs"""
+
+    @pytest.fixture
+    def craftsman(self, db):
+        user = User.objects.create_user(username="fp_craftsman", email="fp@test.com", password="x")
+        profile = CraftsmanProfile.objects.create(user=user, display_name="Foto Ion", slug="foto-ion")
+        profile.profile_photo = SimpleUploadedFile("photo.png", png_bytes(300, 200), content_type="image/png")
+        profile.save()
+        return profile
+
+    def test_upload_stores_hash_and_dimensions(self, craftsman):
+        craftsman.refresh_from_db()
+
+        assert len(craftsman.profile_photo_hash) == 16
+        assert (craftsman.profile_photo_width, craftsman.profile_photo_height) == (300, 200)
+
+    def test_unchanged_file_is_not_read_again(self, craftsman, monkeypatch):
+        craftsman = CraftsmanProfile.objects.get(pk=craftsman.pk)
+        monkeypatch.setattr(images, "fingerprint", lambda file: pytest.fail("fingerprinted again"))
+
+        craftsman.bio = "Actualizat"
+        craftsman.save()
+
+    def test_replacing_with_update_fields_persists_fingerprint(self, craftsman):
+        old_hash = craftsman.profile_photo_hash
+        craftsman.profile_photo.save("other.png", ContentFile(png_bytes(40, 60, color=(0, 0, 0))), save=False)
+        craftsman.save(update_fields=["profile_photo"])
+
+        craftsman.refresh_from_db()
+        assert craftsman.profile_photo_hash not in ("", old_hash)
+        assert (craftsman.profile_photo_width, craftsman.profile_photo_height) == (40, 60)
+
+    def test_version_tags_use_stored_hash(self, craftsman, no_storage_access):
+        template = Template(
+            "{% load lazy_loading %}{% image_version craftsman.profile_photo fallback_dt=craftsman.updated_at %}"
+            "|{% profile_img_version craftsman.user %}"
+        )
+        photo_version, user_version = template.render(Context({"craftsman": craftsman})).split("|")
+
+        assert photo_version == craftsman.profile_photo_hash
+        assert user_version == str(int(craftsman.user.updated_at.timestamp()))
+
+    def test_detail_view_builds_url_without_storage_access(self, craftsman, no_storage_access):
+        request = RequestFactory().get("/")
+        view = CraftsmanDetailView()
+        view.setup(request, slug=craftsman.slug)
+        view.object = craftsman
+
+        context = view.get_context_data()
+
+        assert context["profile_photo_url"] == f"{craftsman.profile_photo.url}?v={craftsman.profile_photo_hash}"
+
+    def test_detail_view_serves_unfingerprinted_photo(self, craftsman, no_storage_access):
+        # Uploaded before fingerprinting and not backfilled yet
+        CraftsmanProfile.objects.filter(pk=craftsman.pk).update(profile_photo_hash="")
+        craftsman.refresh_from_db()
+        request = RequestFactory().get("/")
+        view = CraftsmanDetailView()
+        view.setup(request, slug=craftsman.slug)
+        view.object = craftsman
+
+        context = view.get_context_data()
+
+        assert context["profile_photo_url"] == craftsman.profile_photo.url
+
+    def test_backfill_command(self, craftsman):
+        default_storage.save("profile_pics/old.png", ContentFile(png_bytes(64, 32)))
+        with_file = User.objects.create_user(username="fp_old", email="old@test.com", password="x")
+        missing = User.objects.create_user(username="fp_missing", email="missing@test.com", password="x")
+        # Rows written before fingerprinting existed
+        User.objects.filter(pk=with_file.pk).update(profile_picture="profile_pics/old.png")
+        User.objects.filter(pk=missing.pk).update(profile_picture="profile_pics/gone.png")
+
+        call_command("fingerprint_media", stdout=io.StringIO())
+
+        with_file.refresh_from_db()
+        missing.refresh_from_db()
+        assert len(with_file.profile_picture_hash) == 16
+        assert (with_file.profile_picture_width, with_file.profile_picture_height) == (64, 32)
+        assert missing.profile_picture_hash == ""
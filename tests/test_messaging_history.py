@@ -0,0 +1,78 @@
+"""
+Tests for cursor-paginated conversation history (messaging.views.message_window).
+
+Tests verify:
+1. Opening a conversation renders only the latest page, oldest first
+2. Older pages are fetched with the returned cursor until exhausted
+3. Only the fetched messages are marked as read
+"""
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from accounts.models import User
+from messaging import views
+from messaging.models import InboxEntry, send_message
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestMessageHistory:
+    """Test history pagination and windowed read marking"""
+
+    @pytest.fixture
+    def conversation(self, db, monkeypatch):
+        monkeypatch.setattr(views, "MESSAGE_PAGE_SIZE", 2)
+        sender = User.objects.create_user(username="history_sender", email="s@test.com", password="x")
+        reader = User.objects.create_user(username="history_reader", email="r@test.com", password="x")
+        first = send_message(sender, reader, "Mesaj 1")
+        for index in range(2, 6):
+            send_message(sender, reader, f"Mesaj {index}", conversation=first.conversation)
+        return first.conversation, reader
+
+    def test_detail_shows_latest_page_and_marks_it_read(self, conversation, client):
+        conversation, reader = conversation
+        client.force_login(reader)
+
+        response = client.get(reverse("messaging:conversation_detail", args=[conversation.pk]))
+
+        assert [m.content for m in response.context["messages"]] == ["Mesaj 4", "Mesaj 5"]
+        assert response.context["older_cursor"]
+        assert list(conversation.messages.filter(is_read=False).values_list("content", flat=True)) == [
+            "Mesaj 3",
+            "Mesaj 2",
+            "Mesaj 1",
+        ]
+        assert InboxEntry.objects.get(user=reader).unread_count == 3
+
+    def test_history_pages_until_exhausted(self, conversation, client):
+        conversation, reader = conversation
+        client.force_login(reader)
+        url = reverse("messaging:message_history", args=[conversation.pk])
+
+        cursor = client.get(url).json()["next_cursor"]
+        page = client.get(url, {"cursor": cursor}).json()
+        assert "Mesaj 3" in page["html"] and "Mesaj 2" in page["html"] and "Mesaj 4" not in page["html"]
+
+        last = client.get(url, {"cursor": page["next_cursor"]}).json()
+        assert "Mesaj 1" in last["html"]
+        assert last["next_cursor"] is None
+
+        assert not conversation.messages.filter(is_read=False).exists()
+        assert InboxEntry.objects.get(user=reader).unread_count == 0
+
+    def test_history_requires_participant(self, conversation, client):
+        conversation, _ = conversation
+        outsider = User.objects.create_user(username="outsider", email="o@test.com", password="x")
+        client.force_login(outsider)
+
+        response = client.get(reverse("messaging:message_history", args=[conversation.pk]))
+
+        assert response.status_code == 404
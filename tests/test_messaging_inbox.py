@@ -0,0 +1,130 @@
+"""
+Tests for the conversation inbox (messaging.models.InboxEntry) and participant pairs.
+
+Tests verify:
+1. send_message keeps both participants' rows current (snippet, sender, unread count)
+2. Reading a conversation or a single message updates the unread count
+3. The inbox page is one query with stable keyset pagination
+4. Each pair of users has a single conversation, found with one indexed lookup
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.test import RequestFactory
+
+from accounts.models import CraftsmanProfile, User
+from messaging.models import Conversation, InboxEntry, create_conversation, participant_pair, send_message
+from messaging.views import ConversationListView
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestInbox:
+    """Test inbox maintenance and listing"""
+
+    @pytest.fixture
+    def users(self, db):
+        client = User.objects.create_user(
+            username="inbox_client", email="client@test.com", password="x", first_name="Ana", last_name="Pop"
+        )
+        craftsman_user = User.objects.create_user(
+            username="inbox_craftsman", email="c@test.com", password="x", user_type="craftsman"
+        )
+        CraftsmanProfile.objects.create(user=craftsman_user, display_name="Instalații Ion", slug="inbox-craftsman")
+        return client, craftsman_user
+
+    def test_send_message_updates_both_rows(self, users):
+        client, craftsman_user = users
+        conversation = create_conversation(client, craftsman_user, subject="Baie")
+        send_message(client, craftsman_user, "Bună ziua", conversation=conversation)
+        last = send_message(client, craftsman_user, "Când sunteți disponibil?", conversation=conversation)
+
+        client_entry = InboxEntry.objects.get(user=client)
+        craftsman_entry = InboxEntry.objects.get(user=craftsman_user)
+
+        assert client_entry.other_display_name == "Instalații Ion"
+        assert craftsman_entry.other_display_name == "Ana Pop"
+        assert craftsman_entry.last_message_snippet == "Când sunteți disponibil?"
+        assert craftsman_entry.last_message_sender == client
+        assert craftsman_entry.last_activity_at == last.created_at
+        assert (client_entry.unread_count, craftsman_entry.unread_count) == (0, 2)
+
+    def test_reading_updates_unread_count(self, users):
+        client, craftsman_user = users
+        first = send_message(client, craftsman_user, "Unu")
+        send_message(client, craftsman_user, "Doi", conversation=first.conversation)
+
+        first.mark_as_read()
+        first.mark_as_read()  # already read
+        assert InboxEntry.objects.get(user=craftsman_user).unread_count == 1
+
+        first.conversation.mark_as_read(craftsman_user)
+        entry = InboxEntry.objects.get(user=craftsman_user)
+        assert entry.unread_count == 0 and entry.is_read
+
+    def test_inbox_is_one_query_with_keyset_pagination(self, users, django_assert_num_queries):
+        client, _ = users
+        for index in range(3):
+            other = User.objects.create_user(username=f"other{index}", email=f"o{index}@test.com", password="x")
+            send_message(other, client, f"Mesaj {index}")
+
+        view = ConversationListView()
+        view.page_size = 2
+        request = RequestFactory().get("/mesaje/")
+        request.user = client
+        view.setup(request)
+
+        with django_assert_num_queries(1):
+            first_page = view.get_queryset()
+            assert [entry.conversation.subject for entry in first_page] == ["", ""]
+
+        assert [entry.last_message_snippet for entry in first_page] == ["Mesaj 2", "Mesaj 1"]
+        assert view.next_cursor
+
+        # A newer conversation does not shift the next page
+        newcomer = User.objects.create_user(username="newcomer", email="new@test.com", password="x")
+        send_message(newcomer, client, "Mesaj nou")
+        request = RequestFactory().get("/mesaje/", {"cursor": view.next_cursor})
+        request.user = client
+        view.setup(request)
+
+        assert [entry.last_message_snippet for entry in view.get_queryset()] == ["Mesaj 0"]
+        assert view.next_cursor is None
+
+
+@pytest.mark.django_db
+class TestParticipantPair:
+    """Test one conversation per pair of users"""
+
+    @pytest.fixture
+    def users(self, db):
+        return (
+            User.objects.create_user(username="pair_a", email="a@test.com", password="x"),
+            User.objects.create_user(username="pair_b", email="b@test.com", password="x"),
+        )
+
+    def test_existing_conversation_found_in_one_query(self, users, django_assert_num_queries):
+        first, second = users
+        conversation = create_conversation(first, second, subject="Ofertă")
+
+        with django_assert_num_queries(1):
+            assert create_conversation(second, first) == conversation
+
+        assert conversation.participant_pair == participant_pair(second, first)
+        assert send_message(second, first, "Răspuns").conversation == conversation
+
+    def test_concurrent_creation_returns_the_winner(self, users, monkeypatch):
+        first, second = users
+        winner = create_conversation(first, second)
+
+        # Simulate a request that checked before the winner committed
+        monkeypatch.setattr(QuerySet, "first", lambda self: None)
+        assert create_conversation(second, first) == winner
+        assert Conversation.objects.count() == 1
@@ -0,0 +1,163 @@
+"""
+Tests for the denormalised platform statistics (core.stats).
+
+Tests verify:
+1. Signals keep the SiteSettings counters in step with orders, reviews, craftsmen and users
+2. reconcile() repairs counters after changes that bypass signals
+3. HomeView reads stats and precomputed lists without aggregate queries
+4. Saves compute deltas without re-reading the row, and counter updates never fail a write
+"""
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import City, County, CraftsmanProfile, User
+from core.models import SiteSettings
+from core.stats import PlatformStats
+from core.views import HomeView
+from services.models import Order, Review, Service, ServiceCategory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestPlatformStats:
+    """Test counter maintenance"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Cluj", code="CJ", slug="cluj")
+        city = City.objects.create(name="Cluj-Napoca", county=county)
+        category = ServiceCategory.objects.create(name="Instalații", slug="instalatii")
+        service = Service.objects.create(category=category, name="Instalator", slug="instalator")
+        client = User.objects.create_user(username="stats_client", email="client@test.com", password="x")
+        user = User.objects.create_user(
+            username="stats_craftsman", email="c@test.com", password="x", user_type="craftsman", is_verified=True
+        )
+        craftsman = CraftsmanProfile.objects.create(user=user, display_name="Meșter", slug="stats-craftsman")
+        return {"county": county, "city": city, "service": service, "client": client, "craftsman": craftsman}
+
+    def _order(self, setup_data, status="published"):
+        return Order.objects.create(
+            client=setup_data["client"],
+            title="Lucrare",
+            description="Detalii",
+            service=setup_data["service"],
+            county=setup_data["county"],
+            city=setup_data["city"],
+            status=status,
+        )
+
+    def test_counters_follow_orders_and_reviews(self, setup_data):
+        order = self._order(setup_data)
+        assert PlatformStats.get()["completed_projects"] == 0
+
+        order.status = "completed"
+        order.save()
+        review = Review.objects.create(
+            order=order, client=setup_data["client"], craftsman=setup_data["craftsman"], rating=5
+        )
+        other = self._order(setup_data, status="completed")
+        Review.objects.create(order=other, client=setup_data["client"], craftsman=setup_data["craftsman"], rating=3)
+
+        stats = PlatformStats.get()
+        assert stats["completed_projects"] == 2
+        assert stats["total_reviews"] == 2
+        assert stats["avg_rating"] == 4.0
+
+        review.rating = 4
+        review.save()
+        other.delete()
+
+        stats = PlatformStats.get()
+        assert stats["completed_projects"] == 1
+        assert stats["avg_rating"] == 3.5  # the review of the deleted order survives (SET_NULL)
+        assert stats == PlatformStats.get(PlatformStats.reconcile())
+
+    def test_counters_follow_craftsmen(self, setup_data):
+        assert PlatformStats.get()["active_craftsmen"] == 1
+
+        user = setup_data["craftsman"].user
+        user.is_verified = False
+        user.save()
+        assert PlatformStats.get()["active_craftsmen"] == 0
+
+        # Saves that cannot change the flags are skipped without a lookup
+        user.save(update_fields=["last_login"])
+        assert PlatformStats.get()["active_craftsmen"] == 0
+
+        setup_data["craftsman"].beta_member = True
+        setup_data["craftsman"].save()
+        assert PlatformStats.get()["beta_members"] == 1
+
+        user.is_verified = True
+        user.save()
+        setup_data["craftsman"].delete()
+        stats = PlatformStats.get()
+        assert stats["active_craftsmen"] == 0
+        assert stats["beta_members"] == 0
+
+    def test_reconcile_repairs_drift(self, setup_data):
+        self._order(setup_data)
+        Order.objects.update(status="completed")  # bypasses signals
+        assert PlatformStats.get()["completed_projects"] == 0
+
+        PlatformStats.reconcile()
+        assert PlatformStats.get()["completed_projects"] == 1
+
+    def test_saves_do_not_reread_the_row(self, setup_data):
+        order = Order.objects.get(pk=self._order(setup_data).pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            order.status = "completed"
+            order.save()
+            order.status = "canceled"
+            order.save()
+
+        assert not [q for q in queries if q["sql"].startswith("SELECT") and 'FROM "services_order"' in q["sql"]]
+        assert PlatformStats.get()["completed_projects"] == 0
+
+    def test_drifted_counter_is_clamped_at_zero(self, setup_data):
+        order = self._order(setup_data, status="completed")
+        SiteSettings.objects.update(total_completed_jobs=0)
+
+        order.delete()
+
+        assert PlatformStats.get()["completed_projects"] == 0
+
+    def test_failed_counter_update_does_not_abort_the_write(self, setup_data, monkeypatch):
+        def fail(**kwargs):
+            raise DatabaseError("counter update failed")
+
+        monkeypatch.setattr(SiteSettings.objects, "update", fail)
+
+        order = self._order(setup_data, status="completed")
+
+        assert Order.objects.filter(pk=order.pk, status="completed").exists()
+
+    def test_uninitialised_row_is_reconciled_on_read(self, setup_data):
+        SiteSettings.objects.update(total_craftsmen=1250, stats_reconciled_at=None)
+        assert PlatformStats.get()["active_craftsmen"] == 1
+
+    def test_home_view_reads_precomputed_stats(self, setup_data, django_assert_num_queries):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        view = HomeView()
+        view.setup(request)
+        view.get_context_data()  # warm the home snapshot
+
+        with django_assert_num_queries(1):  # the SiteSettings row
+            context = view.get_context_data()
+
+        assert context["stats"]["active_craftsmen"] == 1
+        assert [c.display_name for c in context["top_craftsmen"]] == ["Meșter"]
+        assert [c.name for c in context["service_categories"]] == ["Instalații"]
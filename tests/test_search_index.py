@@ -0,0 +1,144 @@
+"""
+Tests for the craftsman full-text search index (core.search).
+
+Tests verify:
+1. Documents are folded like normalize_slug, so queries match with or without diacritics
+2. Name and service matches rank above description-only matches
+3. Signals keep documents in sync with profile, user and service changes
+4. SearchView computes the rating facet counts over the hits in a single query
+5. Filters and counts cover every match, not only the ranked ones
+"""
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from accounts.models import County, CraftsmanProfile, User
+from core.models import CraftsmanSearchDocument
+from core.search import CraftsmanSearchIndex, fold_text, query_tokens
+from core.views import SearchView
+from services.models import CraftsmanService, Service, ServiceCategory
+
+
+class TestFolding:
+    """Test text folding"""
+
+    def test_fold_text_removes_romanian_diacritics(self):
+        assert fold_text("Instalații sanitare și termice") == "instalatii sanitare si termice"
+        assert fold_text("ÎNVELITORI", None, "acoperiș-țiglă") == "invelitori acoperis tigla"
+
+    def test_query_tokens_are_deduplicated_and_short_tokens_dropped(self):
+        assert query_tokens("Grădină a grădina  flori") == ["gradina", "flori"]
+
+
+@pytest.mark.django_db
+class TestCraftsmanSearchIndex:
+    """Test document sync and ranking"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Iași", code="IS", slug="iasi")
+        category = ServiceCategory.objects.create(name="Grădinărit", slug="gradinarit")
+        service = Service.objects.create(category=category, name="Amenajare grădină", slug="amenajare-gradina")
+        return {"county": county, "category": category, "service": service}
+
+    def _craftsman(self, name, county, bio="", rating=0):
+        user = User.objects.create_user(
+            username=name, email=f"{name}@test.com", password="x", user_type="craftsman"
+        )
+        return CraftsmanProfile.objects.create(
+            user=user, display_name=name, slug=name, county=county, bio=bio, average_rating=rating
+        )
+
+    def test_query_matches_with_and_without_diacritics(self, setup_data):
+        craftsman = self._craftsman("gardener", setup_data["county"])
+        CraftsmanService.objects.create(craftsman=craftsman, service=setup_data["service"])
+
+        assert craftsman.pk in CraftsmanSearchIndex.search("grădină")
+        assert craftsman.pk in CraftsmanSearchIndex.search("GRADINA")
+        # Prefix matching covers longer forms such as "grădinărit"
+        assert craftsman.pk in CraftsmanSearchIndex.search("gradin")
+        assert CraftsmanSearchIndex.search("zidar") == {}
+
+    def test_service_match_ranks_above_bio_match(self, setup_data):
+        mentions = self._craftsman("mentions", setup_data["county"], bio="Fac și amenajări de grădină la cerere")
+        specialist = self._craftsman("specialist", setup_data["county"])
+        CraftsmanService.objects.create(craftsman=specialist, service=setup_data["service"])
+
+        hits = CraftsmanSearchIndex.search("amenajare gradina")
+        assert list(hits) == [specialist.pk, mentions.pk]
+
+    def test_documents_follow_profile_user_and_service_changes(self, setup_data):
+        craftsman = self._craftsman("painter", setup_data["county"])
+        assert not CraftsmanSearchIndex.search("zugrav")
+
+        craftsman.bio = "Zugrav cu experiență"
+        craftsman.save()
+        assert craftsman.pk in CraftsmanSearchIndex.search("zugrav")
+
+        craftsman.user.last_name = "Popescu"
+        craftsman.user.save()
+        assert craftsman.pk in CraftsmanSearchIndex.search("popescu")
+
+        link = CraftsmanService.objects.create(craftsman=craftsman, service=setup_data["service"])
+        setup_data["service"].name = "Peisagistică"
+        setup_data["service"].save()
+        assert craftsman.pk in CraftsmanSearchIndex.search("peisagistica")
+
+        link.delete()
+        assert craftsman.pk not in CraftsmanSearchIndex.search("peisagistica")
+
+    def test_deleting_craftsman_removes_document(self, setup_data):
+        craftsman = self._craftsman("leaving", setup_data["county"], bio="Zidar")
+        CraftsmanService.objects.create(craftsman=craftsman, service=setup_data["service"])
+
+        craftsman.user.delete()
+
+        assert not CraftsmanSearchDocument.objects.exists()
+        assert CraftsmanSearchIndex.search("zidar") == {}
+
+    def test_rebuild_restores_documents(self, setup_data):
+        craftsman = self._craftsman("restored", setup_data["county"], bio="Zidar")
+        CraftsmanSearchDocument.objects.all().delete()
+        assert CraftsmanSearchIndex.search("zidar") == {}
+
+        assert CraftsmanSearchIndex.rebuild() == 1
+        assert craftsman.pk in CraftsmanSearchIndex.search("zidar")
+
+    def test_rating_facets_in_one_query(self, setup_data, django_assert_num_queries):
+        for name, rating in [("low", 3.2), ("mid", 4.1), ("top", 4.8)]:
+            self._craftsman(name, setup_data["county"], bio="Zidar", rating=rating)
+        self._craftsman("other", setup_data["county"], bio="Electrician", rating=5.0)
+
+        cache.clear()
+        request = RequestFactory().get("/cautare/", {"q": "zidar", "rating": "4.5"})
+        request.user = AnonymousUser()
+        view = SearchView()
+        view.setup(request)
+
+        with django_assert_num_queries(1):
+            facets = view.get_facets(counties=[], categories=[])
+
+        assert facets["total"] == 1
+        assert facets["ratings"] == {3.0: 3, 3.5: 2, 4.0: 2, 4.5: 1, 5.0: 0}
+        assert [c.display_name for c in view.get_queryset()] == ["top"]
+
+    def test_matches_outside_ranked_hits_are_kept(self, setup_data, monkeypatch):
+        other_county = County.objects.create(name="Vaslui", code="VS", slug="vaslui")
+        for index in range(3):
+            self._craftsman(f"zidar_{index}", setup_data["county"], bio="Zidar")
+        remote = self._craftsman("zidar_remote", other_county, bio="Zidar")
+        # Rank only one match: filters and counts must still see all of them
+        monkeypatch.setattr("core.search.MAX_HITS", 1)
+
+        request = RequestFactory().get("/cautare/", {"q": "zidar", "county": "vaslui"})
+        request.user = AnonymousUser()
+        view = SearchView()
+        view.setup(request)
+        facets = view.get_facets(counties=[setup_data["county"], other_county], categories=[])
+
+        assert len(CraftsmanSearchIndex.search("zidar")) == 1
+        assert facets["total"] == 1
+        assert facets["counties"] == {setup_data["county"].id: 3, other_county.id: 1}
+        assert list(view.get_queryset()) == [remote]
@@ -0,0 +1,102 @@
+"""
+Tests for tag/generation based cache invalidation (core.cache_utils).
+
+Tests verify:
+1. Tagged entries are returned until one of their tags is invalidated
+2. Invalidating a tag only affects entries that carry it
+3. An evicted tag counter invalidates the entries recorded against it
+4. Model signals bump only the tags of the affected service/craftsman
+"""
+
+import pytest
+from django.core.cache import cache
+
+from accounts.models import City, County, CraftsmanProfile, User
+from core.cache_utils import CacheManager, get_tagged, invalidate_tags, set_tagged
+from services.models import CraftsmanService, Order, Service, ServiceCategory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestTaggedCache:
+    """Test set_tagged / get_tagged / invalidate_tags"""
+
+    def test_hit_until_tag_invalidated(self):
+        set_tagged("page", ["a", "b"], tags=["orders", "craftsman:1"])
+        assert get_tagged("page") == ["a", "b"]
+
+        invalidate_tags("craftsman:1")
+        assert get_tagged("page") is None
+
+    def test_invalidation_is_scoped_to_tag(self):
+        set_tagged("page:1", 1, tags=["service:1"])
+        set_tagged("page:2", 2, tags=["service:2"])
+
+        invalidate_tags("service:1")
+
+        assert get_tagged("page:1") is None
+        assert get_tagged("page:2") == 2
+
+    def test_evicted_tag_counter_invalidates_entries(self):
+        set_tagged("page", "value", tags=["service:1"])
+        cache.delete("cache_tag:service:1")
+
+        assert get_tagged("page", default="miss") == "miss"
+
+        # Re-caching creates a fresh counter and works again
+        set_tagged("page", "value", tags=["service:1"])
+        assert get_tagged("page") == "value"
+
+    def test_invalidating_unknown_tag_is_noop(self):
+        invalidate_tags("never-used")
+        assert cache.get("cache_tag:never-used") is None
+
+
+@pytest.mark.django_db
+class TestSignalInvalidation:
+    """Test that model saves bump only the related tags"""
+
+    @pytest.fixture
+    def setup_data(self, db):
+        county = County.objects.create(name="Cluj", code="CJ", slug="cluj")
+        city = City.objects.create(name="Cluj-Napoca", county=county)
+        category = ServiceCategory.objects.create(name="Instalații", slug="instalatii")
+        plumbing = Service.objects.create(category=category, name="Instalator", slug="instalator")
+        electrical = Service.objects.create(category=category, name="Electrician", slug="electrician")
+        client = User.objects.create_user(username="tag_client", email="client@test.com", password="x")
+        return {"county": county, "city": city, "plumbing": plumbing, "electrical": electrical, "client": client}
+
+    def test_order_save_only_invalidates_its_service(self, setup_data):
+        set_tagged("plumbing_page", 1, tags=[CacheManager.service_tag(setup_data["plumbing"].id)])
+        set_tagged("electrical_page", 2, tags=[CacheManager.service_tag(setup_data["electrical"].id)])
+
+        Order.objects.create(
+            client=setup_data["client"],
+            title="Țeavă spartă",
+            description="Reparație",
+            service=setup_data["plumbing"],
+            county=setup_data["county"],
+            city=setup_data["city"],
+            status="published",
+        )
+
+        assert get_tagged("plumbing_page") is None
+        assert get_tagged("electrical_page") == 2
+
+    def test_craftsman_service_change_invalidates_craftsman(self, setup_data):
+        user = User.objects.create_user(
+            username="tag_craftsman", email="c@test.com", password="x", user_type="craftsman"
+        )
+        craftsman = CraftsmanProfile.objects.create(user=user, display_name="Meșter", slug="tag-craftsman")
+        set_tagged("own_page", 1, tags=[CacheManager.craftsman_tag(craftsman.id)])
+        set_tagged("other_page", 2, tags=[CacheManager.craftsman_tag("someone-else")])
+
+        CraftsmanService.objects.create(craftsman=craftsman, service=setup_data["plumbing"])
+
+        assert get_tagged("own_page") is None
+        assert get_tagged("other_page") == 2